@@ -10,20 +10,25 @@ background service architecture for independent operation and robust error handl
 
 from version import __version__
 
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, Response, render_template, request, jsonify, make_response, send_from_directory
 from flask_socketio import SocketIO, emit
 import logging
 import os
 import re
+import time
 import atexit
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # Import our modules
 from config_manager import ConfigManager
 from database import PlayerDatabase
+from db_pool import close_all_pools
 from messaging import MessagingManager
 from logging_manager import LoggingManager
 from background_service import BackgroundService
+from server_registry import DEFAULT_SERVER_ID
+from gents_parser import format_gents
+from timeseries import get_metrics_store, flush_all_stores, KNOWN_SERIES, TIER_NAMES
 
 # Initialize logging manager first (before other logging)
 logging_manager = LoggingManager()
@@ -97,6 +102,14 @@ def initialize_app():
     
     # Initialize background service
     background_service = BackgroundService(config_manager, player_db, messaging_manager)
+    # Push per-cycle player changes to connected browsers
+    background_service.add_player_change_listener(
+        lambda delta: socketio.emit('players_changed', delta.to_dict())
+    )
+    # Countries arrive asynchronously from the geolocation resolver
+    player_db.geo_resolver.on_update = lambda count: socketio.emit(
+        'players_updated', {'reason': 'geolocation', 'updated': count}
+    )
     
     logger.info("Empyrion Web Helper v0.5.4 initialized with background service architecture")
     logger.info(f"Target server: {config_manager.get('host')}:{config_manager.get('telnet_port')}")
@@ -158,9 +171,57 @@ def cleanup_on_exit():
     """
     logger.info("🛑 Application shutting down, stopping background service...")
     stop_background_service()
+    flush_all_stores()
+    close_all_pools()
     
 atexit.register(cleanup_on_exit)
 
+def get_requested_server_id() -> str:
+    """
+    Get the server a request targets, from ?server= or a JSON body's 'server' field.
+
+    Returns:
+        str: Server id; the default server if none was given.
+    """
+    server_id = request.args.get('server')
+    if not server_id and request.is_json:
+        server_id = (request.get_json(silent=True) or {}).get('server')
+    return server_id or DEFAULT_SERVER_ID
+
+def get_server_db(server_id=None):
+    """
+    Get the player database for the requested server.
+
+    Args:
+        server_id (str, optional): Server id; taken from the request if omitted.
+
+    Returns:
+        PlayerDatabase or None: The server's database, or None if unknown or not initialized.
+    """
+    server_id = server_id or get_requested_server_id()
+    if server_id == DEFAULT_SERVER_ID:
+        return player_db
+    if not background_service:
+        return None
+    return background_service.server_registry.get_player_db(server_id)
+
+def server_unavailable_response(server_id=None):
+    """
+    Fail-fast response for routes that need a live server connection.
+
+    Args:
+        server_id (str, optional): Server id; taken from the request if omitted.
+
+    Returns:
+        Response or None: JSON error while the server's circuit breaker is open, else None.
+    """
+    if not background_service:
+        return None
+    reason = background_service.get_unavailable_reason(server_id or get_requested_server_id())
+    if reason:
+        return jsonify({'success': False, 'message': reason, 'circuit_open': True})
+    return None
+
 @app.route('/')
 def index():
     """
@@ -169,11 +230,7 @@ def index():
     Returns:
         Response: Rendered HTML for the main page.
     """
-    if player_db:
-        db_players = player_db.get_all_players()
-    else:
-        db_players = []
-    
+    # Players are fetched page by page by the frontend (/players/page)
     # Get connection status from background service
     connection_status = background_service.get_connection_status() if background_service else {
         'is_connected': False, 'is_running': False
@@ -181,7 +238,6 @@ def index():
     
     return render_template('index.html', 
                          connected=connection_status['is_connected'],
-                         players=db_players,
                          config=config_manager.get_all(),
                          service_status=connection_status)
 
@@ -214,15 +270,106 @@ def get_status():
             'message': 'Background service not initialized'
         })
     
-    status = background_service.get_connection_status()
+    status = background_service.get_connection_status(get_requested_server_id())
     return jsonify({
         'success': True,
+        'server_id': status['server_id'],
         'service_running': status['is_running'],
         'connected': status['is_connected'],
-        'last_attempt': status['last_attempt'],
-        'reconnect_attempts': status['reconnect_attempts']
+        'last_attempt': status.get('last_attempt'),
+        'reconnect_attempts': status.get('reconnect_attempts', 0),
+        'command_queue': status.get('command_queue'),
+        'auth_method': status.get('auth_method'),
+        'liveness': status.get('liveness'),
+        'poll_schedule': status.get('poll_schedule'),
+        'connect_latency': status.get('connect_latency'),
+        'circuit': status.get('circuit'),
+        'servers': status['servers'],
+        'db_pool': player_db.pool.get_stats() if player_db else None,
+        'geolocation': player_db.geo_resolver.get_status() if player_db else None
     })
 
+@app.route('/api/servers', methods=['GET'])
+def list_servers():
+    """
+    List monitored servers with their connection status.
+
+    Returns:
+        Response: JSON with one entry per server (passwords are never returned).
+    """
+    if not background_service:
+        return jsonify({'success': False, 'message': 'Background service not initialized'})
+    
+    try:
+        status = {s['server_id']: s for s in background_service.get_connection_status()['servers']}
+        servers = []
+        for server in background_service.server_registry.list_servers():
+            server_status = status.get(server['server_id'], {})
+            servers.append({
+                **server,
+                'is_connected': server_status.get('is_connected', False),
+                'reconnect_attempts': server_status.get('reconnect_attempts', 0),
+                'circuit': server_status.get('circuit'),
+                'poll_interval': server_status.get('poll_interval')
+            })
+        return jsonify({'success': True, 'servers': servers})
+    except Exception as e:
+        logger.error(f"Error listing servers: {e}", exc_info=True)
+        return jsonify({'success': False, 'message': 'An internal error occurred. Please try again later.'})
+
+@app.route('/api/servers', methods=['POST'])
+def save_server():
+    """
+    Add or update a monitored server.
+
+    Expects JSON with server_id, name, host, port, password (optional on update) and enabled.
+
+    Returns:
+        Response: JSON indicating success or failure.
+    """
+    if not background_service:
+        return jsonify({'success': False, 'message': 'Background service not initialized'})
+    
+    try:
+        data = request.get_json() or {}
+        result = background_service.server_registry.add_server(
+            server_id=(data.get('server_id') or '').strip().lower(),
+            name=(data.get('name') or '').strip(),
+            host=(data.get('host') or '').strip(),
+            port=data.get('port'),
+            password=(data.get('password') or '').strip(),
+            enabled=bool(data.get('enabled', True))
+        )
+        if result['success'] and background_service.is_running:
+            background_service.reload_servers()
+        return jsonify(result)
+    except Exception as e:
+        logger.error(f"Error saving server: {e}", exc_info=True)
+        return jsonify({'success': False, 'message': 'An internal error occurred. Please try again later.'})
+
+@app.route('/api/servers/<server_id>', methods=['DELETE'])
+def delete_server(server_id):
+    """
+    Stop monitoring a server and remove it from the registry.
+
+    Args:
+        server_id (str): Server identifier.
+
+    Returns:
+        Response: JSON indicating success or failure.
+    """
+    if not background_service:
+        return jsonify({'success': False, 'message': 'Background service not initialized'})
+    
+    try:
+        result = background_service.server_registry.remove_server(server_id)
+        if result['success'] and background_service.is_running:
+            background_service.reload_servers()
+        return jsonify(result)
+    except Exception as e:
+        logger.error(f"Error deleting server: {e}", exc_info=True)
+        return jsonify({'success': False, 'message': 'An internal error occurred. Please try again later.'})
+
 @app.route('/service/start', methods=['POST'])
 def start_service():
     """
@@ -294,12 +441,13 @@ def get_players():
     Returns:
         Response: JSON with player list and statistics.
     """
-    if not player_db:
-        return jsonify({'success': False, 'message': 'Database not initialized'})
+    server_db = get_server_db()
+    if not server_db:
+        return jsonify({'success': False, 'message': 'Database not initialized or unknown server'})
     
     try:
         # Get players from database (updated by background service)
-        players = player_db.get_all_players()
+        players = server_db.get_all_players()
         
         logger.info(f"=== /players route returning {len(players)} players from database ===")
         return jsonify({'success': True, 'players': players})
@@ -316,8 +464,9 @@ def get_all_players():
     Returns:
         Response: JSON with all player records and statistics.
     """
-    if not player_db:
-        return jsonify({'success': False, 'message': 'Database not initialized'})
+    server_db = get_server_db()
+    if not server_db:
+        return jsonify({'success': False, 'message': 'Database not initialized or unknown server'})
     
     try:
         filters = {}
@@ -326,8 +475,8 @@ def get_all_players():
             if value:
                 filters[param] = value
         
-        players = player_db.get_all_players(filters)
-        player_stats = player_db.get_player_count()
+        players = server_db.get_all_players(filters)
+        player_stats = server_db.get_player_count()
         
         logger.debug(f"=== /players/all returning {len(players)} players ===")
         
@@ -341,6 +490,131 @@ def get_all_players():
         logger.error(f"Error getting all players: {e}", exc_info=True)
         return jsonify({'success': False, 'message': 'An internal error occurred. Please try again later.'})
 
+@app.route('/players/page')
+def get_players_page():
+    """
+    Get one page of players for the players table.
+
+    Query parameters: limit, cursor (next_cursor of the previous page), fields
+    (comma-separated columns) and prefix filters named like the table columns.
+
+    Returns:
+        Response: JSON with the page of players, next_cursor and, for the first page, statistics.
+    """
+    server_db = get_server_db()
+    if not server_db:
+        return jsonify({'success': False, 'message': 'Database not initialized or unknown server'})
+    
+    try:
+        filters = {}
+        for param in ['steam_id', 'name', 'status', 'faction', 'ip_address', 'country', 'playfield']:
+            value = request.args.get(param)
+            if value:
+                filters[param] = value
+        
+        fields = request.args.get('fields')
+        columns = [field.strip() for field in fields.split(',') if field.strip()] if fields else None
+        cursor = request.args.get('cursor')
+        
+        result = server_db.get_players_page(filters, columns, request.args.get('limit', type=int), cursor)
+        if result['success'] and not cursor:
+            result['stats'] = server_db.get_player_count()
+        
+        return jsonify(result)
+        
+    except Exception as e:
+        logger.error(f"Error getting player page: {e}", exc_info=True)
+        return jsonify({'success': False, 'message': 'An internal error occurred. Please try again later.'})
+
+@app.route('/players/leaderboard')
+def get_playtime_leaderboard():
+    """
+    Get the players with the most playtime, from the session rollups.
+
+    Query parameters: limit, day (YYYY-MM-DD; all time if omitted).
+
+    Returns:
+        Response: JSON with the ranked players and their playtime in seconds.
+    """
+    server_db = get_server_db()
+    if not server_db:
+        return jsonify({'success': False, 'message': 'Database not initialized or unknown server'})
+    
+    day = request.args.get('day')
+    if day:
+        try:
+            day = datetime.strptime(day, '%Y-%m-%d').strftime('%Y-%m-%d')
+        except ValueError:
+            return jsonify({'success': False, 'message': 'day must be YYYY-MM-DD'})
+    
+    return jsonify(server_db.get_playtime_leaderboard(request.args.get('limit', 20, type=int), day))
+
+@app.route('/players/concurrency')
+def get_player_concurrency():
+    """
+    Get online players over time.
+
+    Query parameters: bucket ('hour' or 'day'), start and end (ISO dates; the
+    last 24 hours or 30 days by default).
+
+    Returns:
+        Response: JSON series with average and peak online players per period.
+    """
+    server_db = get_server_db()
+    if not server_db:
+        return jsonify({'success': False, 'message': 'Database not initialized or unknown server'})
+    
+    bucket = request.args.get('bucket', 'hour')
+    now = datetime.now()
+    default_start = now - (timedelta(hours=23) if bucket == 'hour' else timedelta(days=29))
+    try:
+        start = datetime.fromisoformat(request.args.get('start') or default_start.isoformat())
+        end = datetime.fromisoformat(request.args.get('end') or now.isoformat())
+    except ValueError:
+        return jsonify({'success': False, 'message': 'start and end must be ISO dates'})
+    
+    return jsonify(server_db.get_concurrency(start.isoformat(), end.isoformat(), bucket))
+
+@app.route('/players/<steam_id>/sessions')
+def get_player_sessions(steam_id):
+    """
+    Get a player's most recent sessions.
+
+    Query parameters: limit.
+
+    Returns:
+        Response: JSON with the sessions, newest first.
+    """
+    server_db = get_server_db()
+    if not server_db:
+        return jsonify({'success': False, 'message': 'Database not initialized or unknown server'})
+    
+    return jsonify({'success': True, 'steam_id': steam_id,
+                    'sessions': server_db.get_player_sessions(steam_id, request.args.get('limit', 50, type=int))})
+
+@app.route('/search')
+def search():
+    """
+    Search players, entities and message history.
+
+    Query parameters: q (search text), limit, types (comma-separated: player, entity, message).
+
+    Returns:
+        Response: JSON with ranked results.
+    """
+    server_db = get_server_db()
+    if not server_db:
+        return jsonify({'success': False, 'message': 'Database not initialized or unknown server'})
+    
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'success': False, 'message': 'Search text is required'})
+    
+    types = request.args.get('types')
+    kinds = [kind.strip() for kind in types.split(',') if kind.strip()] if types else None
+    
+    return jsonify(server_db.search(query, request.args.get('limit', type=int), kinds))
+
 @app.route('/players/purge', methods=['GET', 'POST'])
 def purge_old_players():
     """
@@ -352,8 +626,9 @@ def purge_old_players():
     Returns:
         Response: JSON with success status and detailed counts
     """
-    if not player_db:
-        return jsonify({'success': False, 'message': 'Database not initialized'})
+    server_db = get_server_db()
+    if not server_db:
+        return jsonify({'success': False, 'message': 'Database not initialized or unknown server'})
     
     try:
         # Check if this is a dry run (GET request or POST with dry_run param)
@@ -362,7 +637,7 @@ def purge_old_players():
         logger.info(f"Player data purge requested (dry_run: {dry_run})")
         
         # Call the database purge method with 14-day threshold
-        result = player_db.purge_old_players(days_threshold=14, dry_run=dry_run)
+        result = server_db.purge_old_players(days_threshold=14, dry_run=dry_run)
         
         if result['success']:
             if dry_run:
@@ -399,12 +674,13 @@ def backup_database():
     Returns:
         Response: JSON with success status and backup path
     """
-    if not player_db:
-        return jsonify({'success': False, 'message': 'Database not initialized'})
+    server_db = get_server_db()
+    if not server_db:
+        return jsonify({'success': False, 'message': 'Database not initialized or unknown server'})
     
     try:
         logger.info("Database backup requested")
-        result = player_db.backup_database()
+        result = server_db.backup_database()
         
         if result['success']:
             logger.info(f"Database backup completed: {result['backup_path']}")
@@ -429,21 +705,27 @@ def restore_database():
     """
     Restore the player database from backup.
     
+    Accepts an optional JSON body {"backup": "<name from /players/backups>"};
+    the newest backup is restored if omitted.
+    
     Returns:
-        Response: JSON with success status
+        Response: JSON with success status and the backup restored
     """
-    if not player_db:
-        return jsonify({'success': False, 'message': 'Database not initialized'})
+    server_db = get_server_db()
+    if not server_db:
+        return jsonify({'success': False, 'message': 'Database not initialized or unknown server'})
     
     try:
-        logger.info("Database restore requested")
-        result = player_db.restore_database()
+        backup_name = (request.get_json(silent=True) or {}).get('backup')
+        logger.info(f"Database restore requested ({backup_name or 'newest backup'})")
+        result = server_db.restore_database(backup_name)
         
         if result['success']:
             logger.info("Database restore completed")
             return jsonify({
                 'success': True,
-                'message': result['message']
+                'message': result['message'],
+                'backup': result.get('backup', '')
             })
         else:
             logger.error(f"Database restore failed: {result['message']}")
@@ -456,6 +738,24 @@ def restore_database():
         logger.error(f"Error restoring database: {e}", exc_info=True)
         return jsonify({'success': False, 'message': 'An internal error occurred while restoring database'})
 
+@app.route('/players/backups', methods=['GET'])
+def list_database_backups():
+    """
+    List the player database backup generations, newest first.
+    
+    Returns:
+        Response: JSON with the backups (name, created, label, compressed, bytes)
+    """
+    server_db = get_server_db()
+    if not server_db:
+        return jsonify({'success': False, 'message': 'Database not initialized or unknown server'})
+    
+    try:
+        return jsonify({'success': True, 'backups': server_db.list_backups()})
+    except Exception as e:
+        logger.error(f"Error listing database backups: {e}", exc_info=True)
+        return jsonify({'success': False, 'message': 'An internal error occurred while listing backups'})
+
 @app.route('/players/export-csv', methods=['GET'])
 def export_players_csv():
     """
@@ -464,12 +764,13 @@ def export_players_csv():
     Returns:
         Response: CSV file download
     """
-    if not player_db:
-        return jsonify({'success': False, 'message': 'Database not initialized'})
+    server_db = get_server_db()
+    if not server_db:
+        return jsonify({'success': False, 'message': 'Database not initialized or unknown server'})
     
     try:
         logger.info("Player CSV export requested")
-        result = player_db.export_players_csv()
+        result = server_db.export_players_csv()
         
         if result['success']:
             logger.info(f"Player CSV export completed: {result['player_count']} players")
@@ -494,6 +795,51 @@ def export_players_csv():
         logger.error(f"Error exporting players CSV: {e}", exc_info=True)
         return jsonify({'success': False, 'message': 'An internal error occurred while exporting CSV'})
 
+@app.route('/api/metrics/range', methods=['GET'])
+def get_metrics_range():
+    """
+    Get metric history for a server.
+
+    Query parameters: series (comma-separated, e.g. players.online,rcon.latency_ms),
+    from and to (Unix seconds or ISO dates; the last 24 hours by default),
+    tier (raw, 1m, 1h or 1d; picked from the range if omitted).
+
+    Returns:
+        Response: JSON with the tier used and [ts, avg, min, max, count] points per series.
+    """
+    def parse_time(value, default):
+        if not value:
+            return default
+        try:
+            return int(float(value))
+        except ValueError:
+            return int(datetime.fromisoformat(value).timestamp())
+    
+    try:
+        now = int(time.time())
+        start = parse_time(request.args.get('from'), now - 86400)
+        end = parse_time(request.args.get('to'), now)
+    except ValueError:
+        return jsonify({'success': False, 'message': 'from and to must be Unix seconds or ISO dates'})
+    if end < start:
+        return jsonify({'success': False, 'message': 'to must not be before from'})
+    
+    tier = request.args.get('tier')
+    if tier and tier not in TIER_NAMES:
+        return jsonify({'success': False, 'message': f"tier must be one of {', '.join(TIER_NAMES)}"})
+    
+    try:
+        metrics = get_metrics_store()
+        server_id = get_requested_server_id()
+        requested = request.args.get('series')
+        series = [name.strip() for name in requested.split(',') if name.strip()] if requested \
+            else metrics.list_series(server_id) or list(KNOWN_SERIES)
+        result = metrics.range(server_id, series, start, end, tier)
+        return jsonify(dict(result, success=True, server_id=server_id, **{'from': start, 'to': end}))
+    except Exception as e:
+        logger.error(f"Error reading metrics: {e}", exc_info=True)
+        return jsonify({'success': False, 'message': 'An internal error occurred. Please try again later.'})
+
 @app.route('/api/settings/monitoring', methods=['GET'])
 def get_monitoring_settings():
     """Return current monitoring settings (update_interval) from the database."""
@@ -516,6 +862,8 @@ def set_monitoring_settings():
     if interval < 10:
         return jsonify({'success': False, 'error': 'Update interval must be at least 10 seconds.'}), 400
     player_db.set_app_setting('update_interval', str(interval))
+    if background_service:
+        background_service.set_update_interval(interval)
     return jsonify({'success': True, 'update_interval': interval})
 
 # Theme Settings API endpoints  
@@ -634,7 +982,8 @@ def test_rcon_connection():
         
         # Create temporary connection for testing
         logger.info(f"Testing RCON connection to {host}:{port}")
-        test_conn = EmpyrionConnection(host=host, port=port, password=password, timeout=10)
+        test_conn = EmpyrionConnection(host=host, port=port, password=password, timeout=10,
+                                       settings_store=player_db)
         
         # Attempt connection
         result = test_conn.connect()
@@ -815,11 +1164,12 @@ def get_entities():
     """
     Get cached entities from database.
     """
-    if not player_db:
-        return jsonify({'success': False, 'message': 'Database not initialized'})
+    server_db = get_server_db()
+    if not server_db:
+        return jsonify({'success': False, 'message': 'Database not initialized or unknown server'})
     
     try:
-        result = player_db.get_entities()
+        result = server_db.get_entities()
         return jsonify(result)
     except Exception as e:
         logger.error(f"Error getting entities: {e}", exc_info=True)
@@ -839,142 +1189,130 @@ def refresh_entities():
         return jsonify({'success': False, 'message': 'Background service not initialized'})
     
     try:
-        # Get the connection from background service
-        connection = background_service.get_connection_handler()
-        logger.info(f"Connection status: {connection is not None}, Alive: {connection.is_connection_alive() if connection else 'N/A'}")
-        
-        if not connection:
-            logger.error("No connection available from background service")
-            return jsonify({'success': False, 'message': 'No connection available from background service'})
-            
-        if not connection.is_connection_alive():
-            logger.error("Not connected to Empyrion server")
-            return jsonify({'success': False, 'message': 'Not connected to Empyrion server'})
+        server_id = get_requested_server_id()
+        unavailable = server_unavailable_response(server_id)
+        if unavailable:
+            return unavailable
+        monitor = background_service.get_monitor(server_id)
+        if not monitor:
+            return jsonify({'success': False, 'message': 'Unknown server'})
         
         logger.info("Refreshing entities from server using 'gents' command")
+        background_service.note_admin_activity('entities refresh', server_id)
         
-        # Send 'gents' command to get entity list
-        response = connection.send_command('gents')
-        
-        if not response:
-            logger.error("No response from 'gents' command")
-            return jsonify({'success': False, 'message': 'No response from gents command'})
-        
-        # Handle error dict response
-        if isinstance(response, dict) and not response.get('success', True):
-            error_msg = response.get('message', 'Failed to execute gents command')
-            logger.error(f"Failed to get entity list: {error_msg}")
-            return jsonify({'success': False, 'message': f'Failed to get entity list: {error_msg}'})
-        
-        # Response should be a string with the gents output
-        raw_data = response if isinstance(response, str) else str(response)
-        logger.info(f"Received entity data: {len(raw_data)} characters")
-        
-        # Parse the entity data using the Empyrion gents format
-        entities = []
-        current_playfield = ''
+        # Shared with scheduled entity snapshots; the entity list itself is fetched from /entities
+        return jsonify(monitor.refresh_entities('manual'))
         
-        if raw_data:
-            lines = raw_data.strip().split('\n')
-            for line in lines:
-                line_stripped = line.strip()
-                
-                # Skip empty lines or command responses
-                if not line_stripped or line_stripped.startswith('gents:') or line_stripped.startswith('No'):
-                    continue
-                
-                # Check if this is a playfield header (no leading spaces, not an entity line)
-                if not line.startswith('  ') and not line_stripped.startswith(tuple('0123456789')):
-                    current_playfield = line_stripped
-                    logger.debug(f"Found playfield: {current_playfield}")
-                    continue
-                
-                # Parse entity lines (start with "  XX. ")
-                if line.startswith('  ') and '. ' in line:
-                    try:
-                        # Format: "  01. 051001 BA [Zrx] False False 'Drone Base' (-)"
-                        parts = line_stripped.split(' ', 6)  # Split into max 7 parts
-                        if len(parts) >= 7:
-                            # Extract components
-                            num_part = parts[0].rstrip('.')  # "01"
-                            entity_id = parts[1]  # "051001"
-                            entity_type = parts[2]  # "BA", "HV", "SV", "CV"
-                            faction_part = parts[3]  # "[Zrx]"
-                            # Skip parts[4] and parts[5] (boolean flags)
-                            name_and_time = parts[6]  # "'Drone Base' (-)"
-                            
-                            # Extract faction (remove brackets)
-                            faction = faction_part.strip('[]') if faction_part.startswith('[') else ''
-                            
-                            # Extract name and time from the last part
-                            name = ''
-                            time_info = ''
-                            if "'" in name_and_time:
-                                # Split by quotes to get name
-                                quote_parts = name_and_time.split("'")
-                                if len(quote_parts) >= 2:
-                                    name = quote_parts[1]
-                                    # Get time info (everything after the name)
-                                    remaining = "'".join(quote_parts[2:])
-                                    if '(' in remaining and ')' in remaining:
-                                        time_info = remaining[remaining.find('(')+1:remaining.find(')')]
-                            
-                            entity = {
-                                'id': entity_id,
-                                'name': name,
-                                'type': entity_type,
-                                'faction': faction,
-                                'playfield': current_playfield,
-                                'time_info': time_info
-                            }
-                            entities.append(entity)
-                            logger.debug(f"Parsed entity: {entity}")
-                            
-                    except Exception as e:
-                        logger.warning(f"Failed to parse entity line: '{line_stripped}' - {e}")
-                        continue
-        
-        # Update timestamp
-        from datetime import datetime
-        last_refresh = datetime.now().isoformat()
-        
-        logger.info(f"Parsed {len(entities)} entities from server")
-        
-        # Save entities to database
-        if player_db:
-            saved = player_db.save_entities(entities, raw_data)
-            if not saved:
-                logger.warning("Failed to save entities to database")
-        else:
-            logger.warning("Database not available - entities not saved")
-        
-        # Calculate detailed stats
-        stats = {
-            'total': len(entities),
-            'by_type': {},
-            'by_playfield': {}
-        }
-        
-        for entity in entities:
-            # Count by type
-            entity_type = entity['type']
-            stats['by_type'][entity_type] = stats['by_type'].get(entity_type, 0) + 1
-            
-            # Count by playfield  
-            playfield = entity['playfield'] or 'Unknown'
-            stats['by_playfield'][playfield] = stats['by_playfield'].get(playfield, 0) + 1
+    except Exception as e:
+        logger.error(f"Error refreshing entities: {e}", exc_info=True)
+        return jsonify({'success': False, 'message': 'An internal error occurred. Please try again later.'})
+
+@app.route('/entities/changes', methods=['GET'])
+def get_entity_changes():
+    """
+    Get the entities that appeared and disappeared with the last refresh.
+    
+    Returns:
+        Response: JSON with the 'new' and 'gone' entity lists
+    """
+    server_db = get_server_db()
+    if not server_db:
+        return jsonify({'success': False, 'message': 'Database not initialized or unknown server'})
+    
+    try:
+        return jsonify(server_db.get_entity_changes())
+    except Exception as e:
+        logger.error(f"Error getting entity changes: {e}", exc_info=True)
+        return jsonify({'success': False, 'message': 'An internal error occurred. Please try again later.'})
+
+@app.route('/entities/history', methods=['GET'])
+def get_entity_history():
+    """
+    Get entity counts and structure-and-ship counts over time from the entity snapshots.
+
+    Query parameters: playfield (galaxy totals if omitted), start and end (ISO dates;
+    the last 7 days by default).
+
+    Returns:
+        Response: JSON with 'points' ('time', 'entities', 'structures_and_ships'), oldest first.
+    """
+    server_db = get_server_db()
+    if not server_db:
+        return jsonify({'success': False, 'message': 'Database not initialized or unknown server'})
+    
+    now = datetime.now()
+    try:
+        start = datetime.fromisoformat(request.args.get('start') or (now - timedelta(days=7)).isoformat())
+        end = datetime.fromisoformat(request.args.get('end') or now.isoformat())
+    except ValueError:
+        return jsonify({'success': False, 'message': 'start and end must be ISO dates'})
+    
+    return jsonify(server_db.get_entity_history(request.args.get('playfield') or None, start, end))
+
+@app.route('/entities/snapshots', methods=['GET'])
+def get_entity_snapshots():
+    """
+    List the newest entity snapshots.
+
+    Query parameters: limit.
+
+    Returns:
+        Response: JSON with the snapshots, newest first.
+    """
+    server_db = get_server_db()
+    if not server_db:
+        return jsonify({'success': False, 'message': 'Database not initialized or unknown server'})
+    
+    return jsonify(server_db.get_entity_snapshots(request.args.get('limit', 100, type=int)))
+
+@app.route('/entities/snapshots/<int:snapshot_id>/export', methods=['GET'])
+def export_entity_snapshot(snapshot_id):
+    """
+    Download an entity snapshot as 'gents'-style text.
+
+    Query parameters: playfield (only that playfield).
+
+    Returns:
+        Response: Text file streamed line by line
+    """
+    server_db = get_server_db()
+    if not server_db:
+        return jsonify({'success': False, 'message': 'Database not initialized or unknown server'})
+    
+    try:
+        result = server_db.get_entity_snapshot(snapshot_id, request.args.get('playfield') or None)
+        if not result['success']:
+            return jsonify({'success': False, 'message': result['message']})
         
-        return jsonify({
-            'success': True,
-            'entities': entities,
-            'raw_data': raw_data,
-            'last_refresh': last_refresh,
-            'stats': stats,
-            'updated_count': len(entities)
-        })
+        filename = f"empyrion_entities_snapshot_{snapshot_id}.txt"
+        return Response(format_gents(result['entities']), mimetype='text/plain',
+                        headers={'Content-Disposition': f'attachment; filename={filename}'})
+    except Exception as e:
+        logger.error(f"Error exporting entity snapshot: {e}", exc_info=True)
+        return jsonify({'success': False, 'message': 'An internal error occurred. Please try again later.'})
+
+@app.route('/entities/export', methods=['GET'])
+def export_entities():
+    """
+    Download the stored entities as 'gents'-style text.
+    
+    Returns:
+        Response: Text file streamed line by line
+    """
+    server_db = get_server_db()
+    if not server_db:
+        return jsonify({'success': False, 'message': 'Database not initialized or unknown server'})
+    
+    try:
+        result = server_db.get_entities()
+        if not result['success']:
+            return jsonify({'success': False, 'message': result['message']})
         
+        filename = f"empyrion_entities_{datetime.now().strftime('%Y-%m-%dT%H-%M-%S')}.txt"
+        return Response(format_gents(result['entities']), mimetype='text/plain',
+                        headers={'Content-Disposition': f'attachment; filename={filename}'})
     except Exception as e:
-        logger.error(f"Error refreshing entities: {e}", exc_info=True)
+        logger.error(f"Error exporting entities: {e}", exc_info=True)
         return jsonify({'success': False, 'message': 'An internal error occurred. Please try again later.'})
 
 @app.route('/entities/clear', methods=['POST'])
@@ -982,11 +1320,12 @@ def clear_entities():
     """
     Clear all entities from the database.
     """
-    if not player_db:
-        return jsonify({'success': False, 'message': 'Database not initialized'})
+    server_db = get_server_db()
+    if not server_db:
+        return jsonify({'success': False, 'message': 'Database not initialized or unknown server'})
     
     try:
-        success = player_db.clear_entities()
+        success = server_db.clear_entities()
         if success:
             logger.info("All entities cleared from database")
             return jsonify({'success': True, 'message': 'All entities cleared successfully'})
@@ -1000,87 +1339,6 @@ def clear_entities():
 # Player Structure Detection (Test)
 # ===============================
 
-# DEFINITIVE NPC faction codes from Factions.ecf (IDs 1-99)
-NPC_FACTIONS = {
-    # Hardcoded Core Factions (IDs 1-8)
-    'Pub': 'Public',           # ID 1
-    'Zrx': 'Zirax',           # ID 2 
-    'Prd': 'Predator',        # ID 3
-    'Pry': 'Prey',            # ID 4
-    'Adm': 'Admin',           # ID 5
-    'Tal': 'Talon',           # ID 6 - Main Story Faction
-    'Pol': 'Polaris',         # ID 7 - Main Story Faction (Arkenian Republic)
-    'Aln': 'Alien',           # ID 8
-    
-    # Custom Static Factions (IDs 9-40)
-    'DSC': 'DESC',            # ID 9
-    'Lgc': 'TheLegacy',       # ID 10 - Main Story Faction
-    'Prg': 'Progenitor',      # ID 12 - Main Story Faction
-    'Voi': 'Void',            # ID 13 - Main Story Faction
-    'GLD': 'GLaD',            # ID 14 - Main Story Faction
-    'Civ': 'Civilian',        # ID 15
-    'War': 'Warlord',         # ID 27
-    'NTY': 'NTY',             # ID 31
-    'HIS': 'Hishkal',         # ID 32
-    'DRK': 'DarkFaction',     # ID 40
-    
-    # Custom Dynamic Factions (IDs 11, 16-30, 33-38)
-    'UCH': 'UCH',             # ID 11 - Main Story Faction
-    'Pir': 'Pirates',         # ID 16
-    'Kri': 'Kriel',           # ID 17
-    'Tra': 'Trader',          # ID 18 - Main Story Faction (Prenn Trading Federation)
-    'Col': 'Colonists',       # ID 19
-    'Tsc': 'Tesch',           # ID 20
-    'BoF': 'Farr',            # ID 28 - Brotherhood of Farr
-    'WST': 'Wastelanders',    # ID 29
-    'ARC': 'ARC',             # ID 30
-    'Ark': 'ArkenianRepublic', # ID 33
-    'Pre': 'PrennFederation', # ID 34
-    'HLS': 'Helios',          # ID 35
-    'RAV': 'Ravagers',        # ID 36
-    'KRN': 'Karana',          # ID 37
-    'TRS': 'Tresari',         # ID 38
-    
-    # Zirax Sub-Factions (IDs 21-26)
-    'Xen': 'Xenu',            # ID 21 - Zirax Empire Military
-    'Rad': 'Rados',           # ID 22 - Zirax Empire Support
-    'Eps': 'Epsilon',         # ID 23 - Zirax Empire Communication  
-    'Ghy': 'Ghyst',           # ID 24 - Zirax Empire Recon
-    'Ser': 'Serdu',           # ID 25 - Zirax Empire Religion
-    'Aby': 'Abyssal',         # ID 26 - Zirax Empire Science
-    
-    # Special Factions (IDs 39, 41)
-    'PDH': 'PlayerAssist',    # ID 39
-    'STR': 'STRY',            # ID 41 - Dynamic story faction
-    
-    # Star Salvage Scenario-Specific NPC Factions (Custom IDs)
-    'Gst': 'GhostShip',       # Custom faction
-    'Mys': 'Mystery',         # Custom faction  
-    'Slv': 'Salvage',         # Custom faction
-    'Isi': 'Interspace',      # ID 36 - Interspace Salvage Industries
-    'UEF': 'UEF',             # ID 37 - United Earth Fleet
-    'AJS': 'AJS',             # Custom faction (likely NPC based on ID pattern)
-    'SAS': 'SAS',             # Custom faction
-}
-
-NEUTRAL_FACTIONS = {'NoF'}  # No Faction - abandoned/neutral
-
-def classify_entity_faction(faction):
-    """Classify an entity's faction as NPC, Player, or Neutral"""
-    if faction in NPC_FACTIONS:
-        return 'NPC', NPC_FACTIONS[faction]
-    elif faction in NEUTRAL_FACTIONS:
-        return 'Neutral', 'Abandoned/No Faction'
-    elif faction.isdigit():
-        return 'Player', f'Player Faction {faction}'
-    elif faction == '':
-        return 'Player', 'Private/No Faction'
-    else:
-        # Based on Factions.ecf rule: "The id must be < 100 else a player faction will be created!"
-        # Unknown 3-letter codes are likely player factions (ID 100+)
-        return 'Player', f'Player Faction: {faction}'
-
-
 @app.route('/api/test/active-playfields', methods=['GET'])
 def get_active_playfields():
     """Get active playfields with entity counts for selective regeneration"""
@@ -1088,7 +1346,14 @@ def get_active_playfields():
         return jsonify({'success': False, 'message': 'Background service not available'})
     
     try:
-        connection_handler = background_service.get_connection_handler()
+        server_id = get_requested_server_id()
+        server_db = get_server_db(server_id)
+        if not server_db:
+            return jsonify({'success': False, 'message': 'Unknown server'})
+        unavailable = server_unavailable_response(server_id)
+        if unavailable:
+            return unavailable
+        connection_handler = background_service.get_connection_handler(server_id)
         if not connection_handler or not connection_handler.is_connection_alive():
             return jsonify({'success': False, 'message': 'Not connected to server'})
         
@@ -1115,99 +1380,18 @@ def get_active_playfields():
                         'pid': current_pid
                     })
         
-        # Get entity data and classify by playfield
-        entities_response = player_db.get_entities()
-        if not entities_response.get('success'):
+        # Entity counts per playfield and faction category, indexed by name once per entity refresh
+        playfield_index = server_db.get_playfield_index()
+        if playfield_index is None:
             return jsonify({'success': False, 'message': 'Failed to retrieve entities from database'})
         
-        entities = entities_response.get('entities', [])
-        
-        # Calculate entity counts per playfield
-        playfield_stats = {}
-        for entity in entities:
-            playfield = entity.get('playfield', 'Unknown')
-            faction = entity.get('faction', '')
-            
-            if playfield not in playfield_stats:
-                playfield_stats[playfield] = {
-                    'npc_count': 0,
-                    'player_count': 0,
-                    'neutral_count': 0,
-                    'total_count': 0
-                }
-            
-            # Classify entity
-            category, _ = classify_entity_faction(faction)
-            playfield_stats[playfield]['total_count'] += 1
-            
-            if category == 'NPC':
-                playfield_stats[playfield]['npc_count'] += 1
-            elif category == 'Player':
-                playfield_stats[playfield]['player_count'] += 1
-            else:
-                playfield_stats[playfield]['neutral_count'] += 1
-        
-        # Debug logging
-        logger.info(f"Parsed playfields from servers: {[pf['name'] for pf in playfields]}")
-        logger.info(f"Playfields with entity stats: {list(playfield_stats.keys())}")
-        logger.info(f"Total entities processed: {len(entities)}")
-        
         # Merge playfield info with statistics
+        empty_stats = {'npc_count': 0, 'player_count': 0, 'neutral_count': 0, 'total_count': 0}
         result_playfields = []
         for pf in playfields:
-            pf_name = pf['name']
-            logger.info(f"Processing playfield: '{pf_name}'")
-            
-            # Try exact match first
-            stats = playfield_stats.get(pf_name, None)
-            logger.info(f"Exact match for '{pf_name}': {stats}")
-            
-            # If no exact match, try with "(loaded)" suffix
-            if stats is None:
-                loaded_name = f"{pf_name} (loaded)"
-                stats = playfield_stats.get(loaded_name, None)
-                if stats and stats['total_count'] > 0:
-                    logger.info(f"Found entities for '{pf_name}' using loaded name '{loaded_name}'")
-            
-            # Debug the stats before fuzzy matching
-            logger.info(f"Before fuzzy match for '{pf_name}': stats={stats}")
-            
-            # If still no match, try fuzzy matching (remove numbers, extra spaces, etc.)
-            if stats is None or (stats and stats['total_count'] == 0):
-                # Try to find similar playfield names
-                import re
-                normalized_pf_name = re.sub(r'\s*\d+\s*', ' ', pf_name).strip()
-                logger.info(f"Trying fuzzy match for '{pf_name}' (normalized: '{normalized_pf_name}')")
-                
-                for db_playfield, db_stats in playfield_stats.items():
-                    normalized_db_name = re.sub(r'\s*\d+\s*', ' ', db_playfield).strip()
-                    logger.info(f"Comparing '{normalized_pf_name}' with '{normalized_db_name}' from '{db_playfield}'")
-                    
-                    # Check if normalized names match
-                    if normalized_pf_name.lower() == normalized_db_name.lower():
-                        stats = db_stats
-                        logger.info(f"Found entities for '{pf_name}' using fuzzy match with '{db_playfield}' (normalized: '{normalized_pf_name}' == '{normalized_db_name}')")
-                        break
-                    
-                    # Also try partial matching (contains)
-                    elif normalized_pf_name.lower() in normalized_db_name.lower() or normalized_db_name.lower() in normalized_pf_name.lower():
-                        stats = db_stats
-                        logger.info(f"Found entities for '{pf_name}' using partial match with '{db_playfield}' ('{normalized_pf_name}' partial match '{normalized_db_name}')")
-                        break
-            
-            # If still no match, create empty stats
-            if stats is None:
-                stats = {
-                    'npc_count': 0,
-                    'player_count': 0,
-                    'neutral_count': 0,
-                    'total_count': 0
-                }
-            
-            logger.info(f"Playfield '{pf_name}' final stats: {stats}")
-            
+            stats = playfield_index.lookup(pf['name']) or empty_stats
             result_playfields.append({
-                'name': pf_name,
+                'name': pf['name'],
                 'pid': pf['pid'],
                 'npc_count': stats['npc_count'],
                 'player_count': stats['player_count'],
@@ -1215,7 +1399,9 @@ def get_active_playfields():
                 'total_count': stats['total_count']
             })
         
-        logger.info(f"Found {len(result_playfields)} active playfields")
+        unmatched = sum(1 for pf in result_playfields if not pf['total_count'])
+        logger.debug(f"Active playfields: {len(result_playfields)} ({unmatched} without entities) "
+                     f"against {len(playfield_index)} entity playfields")
         
         response_data = {
             'success': True,
@@ -1224,8 +1410,6 @@ def get_active_playfields():
             'raw_servers_output': servers_result
         }
         
-        logger.info(f"API Response: {len(result_playfields)} playfields, first few: {result_playfields[:2] if result_playfields else 'None'}")
-        
         return jsonify(response_data)
         
     except Exception as e:
@@ -1240,81 +1424,26 @@ def get_active_playfields():
 @app.route('/api/test/player-structures', methods=['GET'])
 def get_player_structures():
     """Get all player-owned structures for testing selective POI regeneration"""
-    if not player_db:
-        return jsonify({'success': False, 'message': 'Database not initialized'})
+    server_db = get_server_db()
+    if not server_db:
+        return jsonify({'success': False, 'message': 'Database not initialized or unknown server'})
     
     try:
-        # Get all entities from database
-        entities_response = player_db.get_entities()
-        if not entities_response.get('success'):
+        result = server_db.get_entity_classification()
+        if not result.get('success'):
             return jsonify({'success': False, 'message': 'Failed to retrieve entities from database'})
         
-        entities = entities_response.get('entities', [])
-        
-        # Classify entities by faction
-        player_entities = []
-        npc_entities = []
-        neutral_entities = []
-        faction_breakdown = {}
-        
-        for entity in entities:
-            faction = entity.get('faction', '')
-            category, description = classify_entity_faction(faction)
-            
-            # Add faction to breakdown
-            if faction not in faction_breakdown:
-                faction_breakdown[faction] = {
-                    'count': 0,
-                    'category': category,
-                    'description': description
-                }
-            faction_breakdown[faction]['count'] += 1
-            
-            # Categorize entity
-            entity_data = {
-                'id': entity.get('id'),
-                'name': entity.get('name'),
-                'type': entity.get('type'),
-                'faction': faction,
-                'faction_description': description,
-                'playfield': entity.get('playfield'),
-                'time_info': entity.get('time_info'),
-                'last_seen': entity.get('last_seen')
-            }
-            
-            if category == 'Player':
-                player_entities.append(entity_data)
-            elif category == 'NPC':
-                npc_entities.append(entity_data)
-            else:  # Neutral
-                neutral_entities.append(entity_data)
-        
-        # Sort player entities by playfield and name
-        player_entities.sort(key=lambda x: (x['playfield'] or '', x['name'] or ''))
-        
-        logger.info(f"Player structure detection: {len(player_entities)} player, {len(npc_entities)} NPC, {len(neutral_entities)} neutral")
-        
-        # Fix faction breakdown data structure for frontend
-        frontend_faction_breakdown = {}
-        for faction, data in faction_breakdown.items():
-            frontend_faction_breakdown[faction] = {
-                'name': data['description'],
-                'count': data['count'],
-                'category': data['category']
-            }
+        statistics = result['statistics']
+        logger.info(f"Player structure detection: {statistics['player_entities']} player, "
+                    f"{statistics['npc_entities']} NPC, {statistics['neutral_entities']} neutral")
         
         return jsonify({
             'success': True,
-            'player_entities': player_entities,
-            'statistics': {
-                'total_entities': len(entities),
-                'player_entities': len(player_entities),
-                'npc_entities': len(npc_entities),
-                'neutral_entities': len(neutral_entities)
-            },
-            'faction_breakdown': frontend_faction_breakdown,
+            'player_entities': result['player_entities'],
+            'statistics': statistics,
+            'faction_breakdown': result['faction_breakdown'],
             'analysis_time': datetime.now().isoformat(),
-            'message': f'Found {len(player_entities)} player-owned structures'
+            'message': f"Found {statistics['player_entities']} player-owned structures"
         })
         
     except Exception as e:
@@ -1604,6 +1733,11 @@ def send_global_message():
         if not message:
             return jsonify({'success': False, 'message': 'Message cannot be empty'})
         
+        # Don't block on a connect() to a server the monitor already knows is down
+        unavailable = server_unavailable_response(DEFAULT_SERVER_ID)
+        if unavailable:
+            return unavailable
+        
         # Use direct RCON command instead of going through messaging manager to avoid conflicts
         # This bypasses the background service connection and uses a direct connection
         from connection import EmpyrionConnection
@@ -1624,6 +1758,8 @@ def send_global_message():
             
             if result and not result.startswith('Error:'):
                 logger.info(f"Manual global message sent: {message}")
+                if background_service:
+                    background_service.note_admin_activity('admin message sent')
                 return jsonify({'success': True, 'message': 'Message sent successfully'})
             else:
                 return jsonify({'success': False, 'message': 'Failed to send message to server'})
@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""
+asyncio RCON client for Empyrion Galactic Survival
+
+Non-blocking counterpart of connection.EmpyrionConnection built on
+asyncio.open_connection. It keeps the same surface and the same four fallback
+authentication strategies, but waits on socket reads instead of time.sleep, so
+one event loop can monitor several servers at once. Reply framing and the
+auth-method cache are connection.ReplyFramer and connection.AuthMethodCache,
+shared with the blocking client.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from typing import Dict, Iterable, List, Optional
+
+from connection import (AUTH_METHOD_NAMES, FRAMING_MODES, FRAME_SENTINEL_PREFIX, FRAME_SENTINEL_END,
+                        FRAME_MAX_BYTES, FRAME_RECV_SIZE, AuthMethodCache, ReplyFramer)
+from plys_parser import PlysParser
+
+logger = logging.getLogger(__name__)
+
+LOGIN_MARKER = b"Logged in successfully"
+HELP_MARKER = b"Available commands"
+
+
+class AsyncEmpyrionConnection:
+    """
+    asyncio RCON connection to an Empyrion Galactic Survival server.
+
+    Provides the same methods as EmpyrionConnection (connect, send_command, get_players,
+    kick_player, ban_player, unban_player) as coroutines. Commands on one connection are
+    serialized with an asyncio.Lock.
+    """
+
+    def __init__(self, host: str, port: int, password: str, timeout: int = 10,
+                 framing: str = 'auto', max_reply_bytes: int = FRAME_MAX_BYTES, settings_store=None):
+        """
+        Initialize the AsyncEmpyrionConnection.
+
+        Args:
+            host (str): Server hostname or IP address.
+            port (int): RCON/telnet port number.
+            password (str): RCON/telnet password.
+            timeout (int, optional): Connect timeout in seconds. Defaults to 10.
+            framing (str, optional): 'auto', 'sentinel' or 'drain'. Defaults to 'auto'.
+            max_reply_bytes (int, optional): Hard cap on the size of a single reply.
+            settings_store (PlayerDatabase, optional): Store with get/set_app_setting used to
+                remember which auth method works for this host:port.
+        """
+        if framing not in FRAMING_MODES or framing == 'prompt':
+            raise ValueError(f"Unsupported framing mode: {framing}")
+
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout
+        self.framing = framing
+        self.max_reply_bytes = max_reply_bytes
+        self.reader = None
+        self.writer = None
+        self.is_connected = False
+        self.auth_cache = AuthMethodCache(settings_store, host, port)
+        self.auth_method = None  # Name of the auth method that succeeded
+        self.auth_username = None  # Username used by the username_password method
+        self._sentinel_ids = itertools.count(1)
+        self.framer = ReplyFramer(max_reply_bytes)
+        self._lock = asyncio.Lock()
+        self.plys_parser = PlysParser()
+
+    async def connect(self) -> bool:
+        """
+        Connect to the Empyrion server and authenticate.
+
+        The authentication method that worked last time for this host:port (if a settings
+        store was given) is tried first; it is only remembered once a command round trip
+        has succeeded after it.
+
+        Returns:
+            bool or dict: True if successful, False or a dict with error info if connection/authentication fails.
+        """
+        try:
+            logger.info(f"Connecting to {self.host}:{self.port} (async)")
+            self.reader, self.writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), timeout=self.timeout
+            )
+
+            welcome_data = await self._read_available(timeout=2.0)
+            if welcome_data:
+                logger.info(f"Server welcome message: {welcome_data}")
+
+            auth_methods = [(name, getattr(self, f"_auth_{name}")) for name in AUTH_METHOD_NAMES]
+            self.auth_username = self.auth_cache.order(auth_methods)
+
+            for method_name, auth_func in auth_methods:
+                try:
+                    logger.info(f"Trying authentication method: {method_name}")
+                    if await auth_func():
+                        self.is_connected = True
+                        self.auth_method = method_name
+                        logger.info(f"✅ Authentication successful using method: {method_name}")
+                        # An answered sentinel probe is a round trip; otherwise test with 'help'
+                        verified = await self._select_framing() or await self._verify_round_trip()
+                        self.auth_cache.record(method_name, self.auth_username, verified)
+                        return True
+                    logger.debug(f"Authentication method {method_name} failed, trying next...")
+                except (OSError, asyncio.IncompleteReadError) as e:
+                    logger.info(f"Authentication method {method_name} errored: {e}, trying next...")
+
+            logger.error("❌ All authentication methods failed")
+            await self.disconnect()
+            return False
+
+        except Exception as e:
+            logger.error(f"Connection failed: {e}", exc_info=True)
+            await self.disconnect()
+            return {'success': False, 'message': 'An internal error occurred. Please try again later.'}
+
+    async def disconnect(self):
+        """
+        Disconnect from the server and close the stream.
+        """
+        writer = self.writer
+        self.reader = None
+        self.writer = None
+        self.is_connected = False
+        self.framer.reset()
+        if writer:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception as e:
+                logger.debug(f"Error during async disconnect: {e}")
+        logger.info("Disconnected from server")
+
+    def is_connection_alive(self) -> bool:
+        """
+        Check whether the stream is still open.
+
+        Returns:
+            bool: True if connected and the peer has not closed the stream.
+        """
+        return bool(self.is_connected and self.reader and not self.reader.at_eof())
+
+    async def send_command(self, command: str, timeout: float = 5.0) -> Optional[str]:
+        """
+        Send a command to the server and return the response.
+
+        Args:
+            command (str): Command string to send.
+            timeout (float, optional): Timeout for response. Defaults to 5.0.
+
+        Returns:
+            Optional[str] or dict: Response string if successful, None or error dict if failed.
+        """
+        if not self.is_connected or not self.writer:
+            logger.error("Cannot send command: not connected to server")
+            return None
+
+        async with self._lock:
+            try:
+                logger.debug(f"Sending command: {command}")
+                if self.framing == 'sentinel':
+                    token = self._next_sentinel()
+                    await self._send_raw(f"{command}\n{token}\n")
+                    response, _ = await self._read_frame(token.encode('utf-8'), timeout)
+                else:
+                    if self.framer.resync_needed:
+                        await self._drain_pending()
+                    await self._send_raw(f"{command}\n")
+                    response = await self._read_available(timeout=timeout)
+
+                if response:
+                    logger.debug(f"Response received: {response[:100]}...")
+                    return response
+                logger.warning(f"No response received for command: {command}")
+                return None
+
+            except Exception as e:
+                logger.error(f"Error sending command '{command}': {e}", exc_info=True)
+                self.is_connected = False
+                return {'success': False, 'message': 'An internal error occurred. Please try again later.'}
+
+    async def get_players(self) -> List[Dict]:
+        """
+        Get a comprehensive list of players from all sections of the 'plys' command.
+
+        Returns:
+            List[Dict] or dict: List of player dictionaries with full info, or error dict if failed.
+        """
+        try:
+            response = await self.send_command("plys")
+            if not response:
+                logger.warning("No response from 'plys' command")
+                return []
+            if isinstance(response, dict):
+                return response
+            return self.plys_parser.parse(response)
+        except Exception as e:
+            logger.error(f"Error getting players: {e}", exc_info=True)
+            return {'success': False, 'message': 'An internal error occurred. Please try again later.'}
+
+    async def kick_player(self, player_name: str, message: str = "Kicked by Admin") -> bool:
+        """
+        Kick a player by name with a custom message.
+
+        Args:
+            player_name (str): Name of the player to kick.
+            message (str, optional): Kick message. Defaults to "Kicked by Admin".
+
+        Returns:
+            bool: True if command succeeded, False otherwise.
+        """
+        escaped_message = message.replace("'", "\\'")
+        response = await self.send_command(f"kick '{player_name}' '{escaped_message}'")
+        if response and not isinstance(response, dict):
+            logger.info(f"Kicked player {player_name} with message: {message}")
+            return True
+        logger.warning(f"Kick command failed for player {player_name}")
+        return False
+
+    async def ban_player(self, steam_id: str, duration: str = "1d") -> bool:
+        """
+        Ban a player by Steam ID for a specified duration.
+
+        Args:
+            steam_id (str): Steam ID of the player to ban.
+            duration (str, optional): Ban duration (e.g., '1d'). Defaults to '1d'.
+
+        Returns:
+            bool: True if command succeeded, False otherwise.
+        """
+        response = await self.send_command(f"ban {steam_id} {duration}")
+        if response and not isinstance(response, dict):
+            logger.info(f"Banned player {steam_id} for {duration}")
+            return True
+        logger.warning(f"Ban command failed for player {steam_id}")
+        return False
+
+    async def unban_player(self, steam_id: str) -> bool:
+        """
+        Unban a player by Steam ID.
+
+        Args:
+            steam_id (str): Steam ID of the player to unban.
+
+        Returns:
+            bool: True if command succeeded, False otherwise.
+        """
+        response = await self.send_command(f"unban {steam_id}")
+        if response and not isinstance(response, dict):
+            logger.info(f"Unbanned player {steam_id}")
+            return True
+        logger.warning(f"Unban command failed for player {steam_id}")
+        return False
+
+    # ------------------------------------------------------------------
+    # Stream helpers
+    # ------------------------------------------------------------------
+
+    async def _send_raw(self, data: str):
+        if self.writer:
+            self.writer.write(data.encode('utf-8'))
+            await self.writer.drain()
+
+    def _next_sentinel(self) -> str:
+        return f"{FRAME_SENTINEL_PREFIX}{next(self._sentinel_ids)}{FRAME_SENTINEL_END}"
+
+    async def _recv(self, timeout: float) -> Optional[bytes]:
+        """Read one chunk; None on timeout, b'' on EOF."""
+        try:
+            return await asyncio.wait_for(self.reader.read(FRAME_RECV_SIZE), timeout=max(timeout, 0))
+        except asyncio.TimeoutError:
+            return None
+
+    async def _read_available(self, timeout: float = 5.0, idle: float = 0.1) -> str:
+        """
+        Wait up to timeout for data, then keep reading until the stream has been idle.
+
+        Args:
+            timeout (float, optional): Maximum wait for the first byte. Defaults to 5.0.
+            idle (float, optional): Quiet period that ends the read. Defaults to 0.1.
+
+        Returns:
+            str: Decoded text, or empty string if nothing arrived.
+        """
+        data = self.framer.pending
+        self.framer.pending = bytearray()
+        if not data:
+            chunk = await self._recv(timeout)
+            if not chunk:
+                return ""
+            data += chunk
+
+        while len(data) < self.max_reply_bytes:
+            chunk = await self._recv(idle)
+            if not chunk:
+                break
+            data += chunk
+        return data.decode('utf-8', errors='ignore').strip()
+
+    async def _read_until(self, marker: bytes, timeout: float) -> str:
+        """
+        Read until marker is seen or the deadline passes.
+
+        Args:
+            marker (bytes): Byte string to wait for.
+            timeout (float): Deadline in seconds.
+
+        Returns:
+            str: Everything read so far (including the marker if seen).
+        """
+        data = self.framer.pending
+        self.framer.pending = bytearray()
+        deadline = time.monotonic() + timeout
+        while marker not in data and len(data) < self.max_reply_bytes:
+            chunk = await self._recv(deadline - time.monotonic())
+            if not chunk:
+                break
+            data += chunk
+        return data.decode('utf-8', errors='ignore')
+
+    async def _drain_pending(self, idle: float = 0.05):
+        """
+        Discard unread bytes left over from an earlier, incomplete frame.
+
+        Args:
+            idle (float, optional): Stop once the stream has been quiet this long. Defaults to 0.05.
+        """
+        self.framer.reset()
+        while self.reader and await self._recv(idle):
+            pass
+
+    async def _read_frame(self, terminator: bytes, timeout: float = 5.0) -> tuple:
+        """
+        Read one framed reply: everything before the line containing the terminator.
+
+        Same framing as EmpyrionConnection._read_frame (see ReplyFramer): the rest of a
+        reply cut short by the deadline or byte cap is dropped by the next frame.
+
+        Returns:
+            tuple: (reply text, True if the terminator was seen before the deadline/cap).
+        """
+        framer = self.framer
+        framer.begin(terminator)
+        deadline = time.monotonic() + timeout
+
+        while not framer.scan():
+            chunk = await self._recv(deadline - time.monotonic())
+            if chunk is None:
+                logger.warning(f"Reply not terminated within {timeout}s ({len(framer.buffer)} bytes read)")
+                break
+            if not chunk:
+                logger.warning("Server closed the connection while reading a reply")
+                self.is_connected = False
+                break
+            framer.feed(chunk)
+
+        return framer.finish()
+
+    async def _select_framing(self) -> bool:
+        """
+        Resolve 'auto' framing by probing whether the server answers a sentinel line.
+
+        Returns:
+            bool: True if the sentinel probe was answered, i.e. a round trip succeeded.
+        """
+        if self.framing != 'auto':
+            return False
+        await self._drain_pending(idle=0.2)
+        token = self._next_sentinel()
+        await self._send_raw(f"{token}\n")
+        _, complete = await self._read_frame(token.encode('utf-8'), timeout=2.0)
+        self.framing = 'sentinel' if complete else 'drain'
+        logger.info(f"Using '{self.framing}' reply framing")
+        return complete
+
+    async def _verify_round_trip(self) -> bool:
+        """
+        Test the connection with a 'help' command after login.
+
+        Returns:
+            bool: True if the server answered with its command list.
+        """
+        logger.info("Testing connection with 'help' command")
+        test_result = await self.send_command("help", timeout=5.0)
+        if test_result and not isinstance(test_result, dict) and (
+                HELP_MARKER.decode() in test_result or "help" in test_result.lower()):
+            return True
+        logger.warning("Help command didn't return expected data, but auth was successful")
+        return False
+
+    # ------------------------------------------------------------------
+    # Authentication strategies (same order as EmpyrionConnection)
+    # ------------------------------------------------------------------
+
+    async def _auth_standard(self) -> bool:
+        """Standard authentication: password with \\r\\n (works with most providers)"""
+        await self._send_raw(f"{self.password}\r\n")
+        return LOGIN_MARKER.decode() in await self._read_until(LOGIN_MARKER, timeout=4.0)
+
+    async def _auth_direct_command(self) -> bool:
+        """Test if server allows direct commands without authentication"""
+        await self._send_raw("help\n")
+        response = await self._read_until(HELP_MARKER, timeout=4.0)
+        return HELP_MARKER.decode() in response
+
+    async def _auth_username_password(self) -> bool:
+        """Try username + password authentication (some providers require both)"""
+        # Try with admin/rcon as username (the one that worked last time first)
+        usernames = ["admin", "rcon", "server"]
+        if self.auth_username in usernames:
+            usernames.sort(key=lambda name: name != self.auth_username)
+        for username in usernames:
+            await self._send_raw(f"{username}\r\n")
+            # Give the server a chance to ask for the password before sending it
+            await self._read_until(b"\n", timeout=0.5)
+            await self._send_raw(f"{self.password}\r\n")
+            if LOGIN_MARKER.decode() in await self._read_until(LOGIN_MARKER, timeout=4.0):
+                logger.debug(f"Username + password auth successful with username: {username}")
+                self.auth_username = username
+                return True
+        return False
+
+    async def _auth_newline_only(self) -> bool:
+        """Try password with only \\n (some providers are picky about line endings)"""
+        await self._send_raw(f"{self.password}\n")
+        return LOGIN_MARKER.decode() in await self._read_until(LOGIN_MARKER, timeout=4.0)
+
+
+async def poll_players(connections: Iterable[AsyncEmpyrionConnection]) -> Dict[str, List[Dict]]:
+    """
+    Fetch the player list from several servers concurrently on one event loop.
+
+    Connections that are not connected yet are connected first.
+
+    Args:
+        connections (Iterable[AsyncEmpyrionConnection]): One connection per server.
+
+    Returns:
+        Dict[str, List[Dict]]: Player lists (or error dicts) keyed by "host:port".
+    """
+    async def poll(conn):
+        if not conn.is_connected and await conn.connect() is not True:
+            return {'success': False, 'message': 'Could not connect to server'}
+        return await conn.get_players()
+
+    connections = list(connections)
+    results = await asyncio.gather(*(poll(conn) for conn in connections), return_exceptions=True)
+    return {
+        f"{conn.host}:{conn.port}": (
+            {'success': False, 'message': str(result)} if isinstance(result, Exception) else result
+        )
+        for conn, result in zip(connections, results)
+    }
@@ -10,8 +10,17 @@ server monitoring, automated messaging, and player tracking for Empyrion Galacti
 import threading
 import time
 import logging
-from datetime import datetime
-from typing import Optional, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional, Dict, List, Callable
+
+from player_snapshot import PlayerDelta
+from poll_scheduler import AdaptivePollScheduler, DEFAULT_FLOOR, DEFAULT_CEILING
+from server_monitor import ServerMonitor
+from server_registry import ServerRegistry, DEFAULT_SERVER_ID
+from timeseries import flush_all_stores
+from backup_manager import DEFAULT_INTERVAL_HOURS as DEFAULT_BACKUP_INTERVAL_HOURS
+from entity_snapshots import DEFAULT_INTERVAL_MINUTES as DEFAULT_SNAPSHOT_INTERVAL_MINUTES
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +28,9 @@ class BackgroundService:
     """
     Core background service for independent operation.
 
-    Manages server connection, player monitoring, scheduled messaging, and background threads.
+    Manages server connections, player monitoring, scheduled messaging, and background threads.
+    Every server in the registry gets a ServerMonitor; one dispatcher thread runs due monitors
+    on a bounded worker pool.
     """
 
     def __init__(self, config_manager, player_db, messaging_manager):
@@ -37,25 +48,29 @@ class BackgroundService:
         
         # Service state
         self.is_running = False
-        self.is_connected = False  # This should start as False
-        self.connection_handler = None  # This should start as None
-        self.last_connection_attempt = None
-        self.reconnect_attempts = 0
         
         # Background threads
         self.monitor_thread = None
         self.scheduler_thread = None
         self.stop_event = threading.Event()
         
-        # Player tracking for status changes
-        self.previous_players = {}
+        # Monitored servers: one ServerMonitor each, run on a shared worker pool
+        self.server_registry = ServerRegistry(player_db, config_manager)
+        self.monitors: Dict[str, ServerMonitor] = {}
+        self._monitors_lock = threading.Lock()
+        self._dispatch_wake = threading.Event()
+        self.MONITOR_WORKERS = self._get_interval_setting('monitor_workers', 4)
+        self.player_change_listeners = []
         
         # Get update interval from config file
         self.MONITOR_INTERVAL = self._get_update_interval()
-        self.RECONNECT_DELAY = 30   # seconds between reconnection attempts
-        self.MAX_RECONNECT_DELAY = 300  # 5 minutes max delay
         
-        logger.info(f"Background service initialized with update_interval={self.MONITOR_INTERVAL}s")
+        # Actual wait between polls adapts between the floor and ceiling around MONITOR_INTERVAL
+        self.POLL_FLOOR = self._get_interval_setting('poll_interval_floor', DEFAULT_FLOOR)
+        self.POLL_CEILING = self._get_interval_setting('poll_interval_ceiling', DEFAULT_CEILING)
+        
+        logger.info(f"Background service initialized with update_interval={self.MONITOR_INTERVAL}s, "
+                    f"{self.MONITOR_WORKERS} monitor workers")
     
     def _get_update_interval(self) -> int:
         """Get update interval from config file with validation."""
@@ -73,6 +88,116 @@ class BackgroundService:
         # Default fallback
         return 20
     
+    def _get_interval_setting(self, key: str, default: int) -> int:
+        """Get an optional positive integer setting from config, falling back to default."""
+        try:
+            value = self.config_manager.get(key)
+            if value:
+                return max(1, int(value))
+        except (ValueError, TypeError):
+            logger.warning(f"Invalid {key} in config; using default {default}")
+        return default
+    
+    # Back-compat: single-server callers (POI timer, messaging, older routes) use the default server
+    @property
+    def default_monitor(self) -> ServerMonitor:
+        """Monitor for the default server, created on first use."""
+        return self.get_monitor(DEFAULT_SERVER_ID)
+    
+    @property
+    def connection_handler(self):
+        return self.default_monitor.connection_handler
+    
+    @property
+    def is_connected(self) -> bool:
+        return self.default_monitor.is_connected
+    
+    @property
+    def poll_scheduler(self) -> AdaptivePollScheduler:
+        return self.default_monitor.poll_scheduler
+    
+    def get_monitor(self, server_id: Optional[str] = None) -> Optional[ServerMonitor]:
+        """
+        Get the monitor for a server, creating it if the server is registered.
+
+        Args:
+            server_id (str, optional): Server identifier; defaults to the default server.
+
+        Returns:
+            ServerMonitor or None: The monitor, or None if the server is unknown.
+        """
+        server_id = server_id or DEFAULT_SERVER_ID
+        with self._monitors_lock:
+            monitor = self.monitors.get(server_id)
+        if monitor:
+            return monitor
+        
+        server = self.server_registry.get_server(server_id)
+        if not server or not server['enabled']:
+            return None
+        server_db = self.server_registry.get_player_db(server_id)
+        monitor = ServerMonitor(
+            server_id,
+            self.server_registry,
+            server_db,
+            AdaptivePollScheduler(self.MONITOR_INTERVAL, floor=self.POLL_FLOOR, ceiling=self.POLL_CEILING),
+            self.player_change_listeners,
+            self._dispatch_wake,
+            # Messaging (and its connection) stays tied to the default server
+            messaging_manager=self.messaging_manager if server_id == DEFAULT_SERVER_ID else None
+        )
+        with self._monitors_lock:
+            monitor = self.monitors.setdefault(server_id, monitor)
+        return monitor
+    
+    def reload_servers(self):
+        """
+        Sync monitors with the server registry after servers were added, changed or removed.
+        """
+        enabled = {s['server_id'] for s in self.server_registry.list_servers() if s['enabled']}
+        
+        with self._monitors_lock:
+            existing = set(self.monitors)
+            removed = [m for sid, m in self.monitors.items() if sid not in enabled]
+            for monitor in removed:
+                del self.monitors[monitor.server_id]
+        for monitor in removed:
+            logger.info(f"Stopping monitor for server '{monitor.server_id}'")
+            monitor.stop()
+        
+        for server_id in enabled:
+            monitor = self.get_monitor(server_id)
+            # Pick up changed host/port/password with a fresh connection
+            if monitor and server_id in existing and server_id != DEFAULT_SERVER_ID:
+                monitor.request_reconnect()
+        self._dispatch_wake.set()
+    
+    def set_update_interval(self, interval: int):
+        """
+        Apply a new update_interval without restarting the service.
+
+        Args:
+            interval (int): New baseline poll interval in seconds.
+        """
+        self.MONITOR_INTERVAL = interval
+        with self._monitors_lock:
+            monitors = list(self.monitors.values())
+        for monitor in monitors:
+            monitor.poll_scheduler.configure(interval, self.POLL_FLOOR, self.POLL_CEILING)
+            monitor.poll_scheduler.reset('update_interval changed')
+    
+    def note_admin_activity(self, reason: str = 'admin activity', server_id: Optional[str] = None):
+        """
+        Tell a server's monitor an admin just acted, so it polls at the fast rate for a while.
+
+        Args:
+            reason (str, optional): Short description shown in /status.
+            server_id (str, optional): Server the admin acted on; defaults to the default server.
+        """
+        monitor = self.get_monitor(server_id)
+        if monitor:
+            monitor.note_admin_activity(reason)
+    
     def start(self):
         """
         Start the background service.
@@ -89,13 +214,13 @@ class BackgroundService:
         self.is_running = True  # Re-enable for player monitoring
         self.stop_event.clear()
         
-        # Reset connection state on startup
-        self.is_connected = False
-        self.connection_handler = None
-        self.reconnect_attempts = 0
+        # Fresh monitors (disconnected, no backoff) for every enabled server
+        with self._monitors_lock:
+            self.monitors.clear()
+        self.reload_servers()
         
         try:
-            # Start monitoring thread
+            # Start monitoring dispatcher thread
             self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True, name="MonitorThread")
             self.monitor_thread.start()
             
@@ -114,7 +239,7 @@ class BackgroundService:
         """
         Stop the background service.
 
-        Signals threads to stop, disconnects from server, and waits for threads to finish.
+        Signals threads to stop, disconnects from all servers, and waits for threads to finish.
         """
         if not self.is_running:
             return
@@ -123,8 +248,9 @@ class BackgroundService:
         
         self.is_running = False
         self.stop_event.set()
+        self._dispatch_wake.set()
         
-        # Disconnect from server
+        # Disconnect from servers
         self._disconnect()
         
         # Wait for threads to finish
@@ -134,76 +260,127 @@ class BackgroundService:
         if self.scheduler_thread and self.scheduler_thread.is_alive():
             self.scheduler_thread.join(timeout=5)
         
+        flush_all_stores()  # buffered metric samples
+        
         logger.info("✅ Background service stopped")
     
-    def get_connection_status(self) -> Dict:
+    def get_connection_status(self, server_id: Optional[str] = None) -> Dict:
         """
         Get current connection status for web UI.
 
+        Args:
+            server_id (str, optional): Server to report on; defaults to the default server.
+
         Returns:
-            dict: Dictionary with connection and service status information.
-        """
-        return {
-            'is_connected': self.is_connected,
-            'last_attempt': self.last_connection_attempt,
-            'reconnect_attempts': self.reconnect_attempts,
-            'is_running': self.is_running
-        }
+            dict: Connection and service status for the server, plus a short summary of all servers.
+        """
+        monitor = self.get_monitor(server_id)
+        status = monitor.get_status() if monitor else {'server_id': server_id, 'is_connected': False}
+        status['is_running'] = self.is_running
+        
+        with self._monitors_lock:
+            monitors = list(self.monitors.values())
+        status['servers'] = [{
+            'server_id': m.server_id,
+            'is_connected': m.is_connected,
+            'reconnect_attempts': m.reconnect_attempts,
+            'circuit': m.circuit.state,
+            'poll_interval': m.poll_scheduler.interval
+        } for m in monitors]
+        status['monitor_workers'] = self.MONITOR_WORKERS
+        return status
+    
+    def add_player_change_listener(self, callback: Callable[[PlayerDelta], None]):
+        """
+        Register a callback invoked with a PlayerDelta whenever a monitor cycle sees changes.
+
+        Callbacks run on monitor worker threads and should return quickly; the delta's
+        server_id tells which server it came from.
+
+        Args:
+            callback (Callable[[PlayerDelta], None]): Function to call with the delta.
+        """
+        self.player_change_listeners.append(callback)
     
-    def get_connection_handler(self) -> Optional[object]:
+    def get_connection_handler(self, server_id: Optional[str] = None) -> Optional[object]:
         """
         Get the current connection handler for web UI commands.
 
+        Args:
+            server_id (str, optional): Server to get the connection for; defaults to the default server.
+
         Returns:
             object or None: The connection handler if connected, else None.
         """
-        return self.connection_handler if self.is_connected else None
+        monitor = self.get_monitor(server_id)
+        if monitor and monitor.is_connected:
+            return monitor.connection_handler
+        return None
+    
+    def get_unavailable_reason(self, server_id: Optional[str] = None) -> Optional[str]:
+        """
+        Tell web routes whether to fail fast instead of trying the server.
+
+        Args:
+            server_id (str, optional): Server the route needs; defaults to the default server.
+
+        Returns:
+            str or None: Why the server can't be used right now, or None if it can.
+        """
+        monitor = self.get_monitor(server_id)
+        if not monitor:
+            return f"Unknown server '{server_id}'"
+        if monitor.circuit.is_open():
+            retry_in = monitor.circuit.retry_in()
+            return f"Server unreachable (circuit open); next connection attempt in {retry_in:.0f}s"
+        return None
     
     def _monitor_loop(self):
         """
         Main monitoring loop.
 
-        Periodically checks server connection and player status while service is running.
+        Dispatches each server's monitor cycle to the worker pool when it is due. A server
+        is never polled by two workers at once; a slow or unreachable server only ties up
+        its own worker.
         """
-        logger.info("🔍 Starting player monitoring loop")
+        logger.info(f"🔍 Starting player monitoring loop ({self.MONITOR_WORKERS} workers)")
+        in_flight = {}
+        pool = ThreadPoolExecutor(max_workers=self.MONITOR_WORKERS, thread_name_prefix="MonitorWorker")
         
         try:
             while self.is_running and not self.stop_event.is_set():
                 try:
-                    logger.debug(f"Monitor cycle: is_connected={self.is_connected}, connection_handler={self.connection_handler is not None}")
+                    for server_id in [sid for sid, future in in_flight.items() if future.done()]:
+                        del in_flight[server_id]
                     
-                    # ALWAYS check connection status first
-                    if not self.is_connected or not self.connection_handler:
-                        logger.info("🔌 Not connected - attempting connection...")
-                        self._attempt_connection()
-                    else:
-                        # Test if existing connection is still alive
-                        if not self.connection_handler.is_connection_alive():
-                            logger.warning("🔌 Connection is dead - reconnecting...")
-                            self.is_connected = False
-                            self.connection_handler = None
-                            self._attempt_connection()
+                    with self._monitors_lock:
+                        monitors = list(self.monitors.values())
                     
-                    # If connected, monitor players
-                    if self.is_connected and self.connection_handler and self.is_running:
-                        logger.debug("🔍 Connected - monitoring players...")
-                        self._monitor_players()
-                        self.reconnect_attempts = 0  # Reset on successful operation
-                    else:
-                        logger.debug("🔍 Not connected - skipping player monitoring")
+                    now = time.monotonic()
+                    next_wakeup = now + 5.0
+                    for monitor in monitors:
+                        if monitor.server_id in in_flight:
+                            continue
+                        if monitor.is_due(now):
+                            future = pool.submit(monitor.run_cycle)
+                            future.add_done_callback(lambda _: self._dispatch_wake.set())
+                            in_flight[monitor.server_id] = future
+                        else:
+                            next_wakeup = min(next_wakeup, monitor.next_due)
                     
-                    # Wait for next cycle
-                    self.stop_event.wait(self.MONITOR_INTERVAL)
+                    # Sleep until the next monitor is due, a cycle finishes or an admin acts
+                    self._dispatch_wake.wait(max(0.05, next_wakeup - time.monotonic()))
+                    self._dispatch_wake.clear()
                     
                 except Exception as e:
                     logger.error(f"Exception in monitor loop: {e}", exc_info=True)
-                    
-                    if self.is_running:  # Only handle error if we're still supposed to be running
-                        self._handle_connection_error()
+                    if self.is_running:  # Only pause if we're still supposed to be running
                         self.stop_event.wait(5)  # Brief pause before retry
             
         except Exception as e:
             logger.error(f"Fatal error in monitor loop: {e}", exc_info=True)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
         
         logger.info("🔍 Player monitoring loop stopped")
     
@@ -232,6 +409,12 @@ class BackgroundService:
                             self._check_poi_timer()
                             self._poi_timer_counter = 0
                     
+                    # Backups don't need a server connection
+                    self._check_backup_schedule()
+                    
+                    # Entity snapshots on every connected server
+                    self._check_entity_snapshots()
+                    
                     # Check every 30 seconds (scheduled message interval)
                     self.stop_event.wait(30)
                     
@@ -269,6 +452,72 @@ class BackgroundService:
         except Exception as e:
             logger.error(f"Error checking POI timer: {e}", exc_info=True)
     
+    def _check_backup_schedule(self):
+        """
+        Take a 'scheduled' backup of every open player database whose newest backup is
+        older than the backup_interval_hours app setting (0 disables scheduled backups).
+        """
+        try:
+            interval_hours = float(self.player_db.get_app_setting('backup_interval_hours',
+                                                                  DEFAULT_BACKUP_INTERVAL_HOURS))
+        except (ValueError, TypeError):
+            interval_hours = DEFAULT_BACKUP_INTERVAL_HOURS
+        if interval_hours <= 0:
+            return
+        
+        now = datetime.now()
+        if getattr(self, '_next_backup_check', None) and now < self._next_backup_check:
+            return
+        self._next_backup_check = now + timedelta(minutes=10)
+        
+        for server_id, server_db in self.server_registry.open_databases():
+            if not self.is_running:
+                return
+            last_backup = server_db.backups.last_backup_time()
+            if last_backup and now - last_backup < timedelta(hours=interval_hours):
+                continue
+            result = server_db.backup_database('scheduled')
+            if not result['success']:
+                logger.error(f"❌ [{server_id}] Scheduled backup failed: {result['message']}")
+    
+    def _check_entity_snapshots(self):
+        """
+        Refresh entities and take a 'scheduled' entity snapshot on every connected server whose
+        newest snapshot is older than the entity_snapshot_interval_minutes app setting
+        (0 disables scheduled snapshots). A server whose refresh failed is retried after 10 minutes.
+        """
+        try:
+            interval_minutes = float(self.player_db.get_app_setting('entity_snapshot_interval_minutes',
+                                                                    DEFAULT_SNAPSHOT_INTERVAL_MINUTES))
+        except (ValueError, TypeError):
+            interval_minutes = DEFAULT_SNAPSHOT_INTERVAL_MINUTES
+        if interval_minutes <= 0:
+            return
+        
+        now = datetime.now()
+        if getattr(self, '_next_snapshot_check', None) and now < self._next_snapshot_check:
+            return
+        self._next_snapshot_check = now + timedelta(minutes=1)
+        if not hasattr(self, '_snapshot_retry_at'):
+            self._snapshot_retry_at = {}
+        
+        with self._monitors_lock:
+            monitors = list(self.monitors.values())
+        for monitor in monitors:
+            if not self.is_running:
+                return
+            if not monitor.is_connected or now < self._snapshot_retry_at.get(monitor.server_id, now):
+                continue
+            last_snapshot = monitor.player_db.get_last_entity_snapshot_time()
+            if last_snapshot and now - last_snapshot < timedelta(minutes=interval_minutes):
+                continue
+            result = monitor.refresh_entities('scheduled')
+            if result['success']:
+                self._snapshot_retry_at.pop(monitor.server_id, None)
+            else:
+                self._snapshot_retry_at[monitor.server_id] = now + timedelta(minutes=10)
+                logger.warning(f"⚠️ [{monitor.server_id}] Scheduled entity snapshot failed: {result['message']}")
+    
     def _is_poi_regeneration_due(self, interval: str, last_run_str: str) -> bool:
         """Check if POI regeneration is due based on interval and last run time"""
         if not last_run_str:
@@ -309,12 +558,11 @@ class BackgroundService:
             
             # First, refresh entity data (equivalent to clicking "Refresh Entity Data")
             logger.info("📡 Refreshing entity data from server...")
-            entities = self.connection_handler.get_entities()
-            if entities:
-                count = self.player_db.update_entities(entities)
-                logger.info(f"📡 Refreshed {count} entities from server")
+            refresh = self.default_monitor.refresh_entities('poi')
+            if refresh['success']:
+                logger.info(f"📡 Refreshed {refresh['updated_count']} entities from server")
             else:
-                logger.warning("Failed to refresh entity data, continuing with cached data")
+                logger.warning(f"Failed to refresh entity data ({refresh['message']}), continuing with cached data")
             
             # Get all active playfields (equivalent to clicking "Load Active Playfields") 
             logger.info("🌍 Loading active playfields...")
@@ -439,197 +687,17 @@ class BackgroundService:
         except Exception as e:
             logger.error(f"Error sending POI regeneration completion notification: {e}")
     
-    def _attempt_connection(self):
-        """
-        Attempt to connect to Empyrion server.
-
-        Handles reconnection logic and updates connection state.
-        """
-        if not self.is_running:
-            return False
-            
-        try:
-            self.last_connection_attempt = datetime.now().isoformat()
-            
-            # Get server config from database first
-            server_host = self.player_db.get_app_setting('server_host') or self.config_manager.get('host')
-            server_port = self.player_db.get_app_setting('server_port')
-            if server_port:
-                server_port = int(server_port)
-            else:
-                server_port = self.config_manager.get('telnet_port')
-            
-            logger.info(f"🔌 Attempting connection to {server_host}:{server_port}")
-            
-            # Clean up any existing connection
-            if self.connection_handler:
-                try:
-                    self.connection_handler.disconnect()
-                except:
-                    pass
-            
-            # Import here to avoid circular imports
-            from connection import EmpyrionConnection
-            
-            # Get RCON password
-            rcon_password = self.config_manager.get('telnet_password')
-            if not rcon_password:
-                logger.error("❌ No RCON password available")
-                self._handle_connection_error()
-                return False
-            
-            # Create new connection
-            self.connection_handler = EmpyrionConnection(
-                host=server_host,
-                port=server_port,
-                password=rcon_password,
-                timeout=10
-            )
-            
-            # Attempt connection
-            connection_result = self.connection_handler.connect()
-            
-            if connection_result is True:
-                self.is_connected = True
-                self.reconnect_attempts = 0
-                
-                # Set connection handler for messaging
-                if self.messaging_manager:
-                    self.messaging_manager.set_connection_handler(self.connection_handler)
-                
-                logger.info(f"✅ Successfully connected to Empyrion server at {server_host}:{server_port}")
-                return True
-            else:
-                logger.error(f"❌ Failed to connect to Empyrion server: {connection_result}")
-                self._handle_connection_error()
-                return False
-                
-        except Exception as e:
-            logger.error(f"❌ Connection attempt failed: {e}", exc_info=True)
-            self._handle_connection_error()
-            return False
-    
     def _disconnect(self):
         """
-        Disconnect from server.
+        Disconnect from all servers.
 
-        Closes the current connection handler and updates connection state.
+        Stops every monitor and closes its connection.
         """
-        if self.connection_handler:
-            try:
-                self.connection_handler.disconnect()
-            except Exception as e:
-                logger.error(f"Error during disconnect: {e}", exc_info=True)
-        
-        self.is_connected = False
-        self.connection_handler = None
-        logger.info("🔌 Disconnected from server")
-    
-    def _handle_connection_error(self):
-        """
-        Handle connection errors.
-
-        Logs the error and manages reconnection attempts.
-        """
-        self.is_connected = False
-        self.reconnect_attempts += 1
-        
-        # Calculate delay with exponential backoff
-        delay = min(self.RECONNECT_DELAY * (2 ** min(self.reconnect_attempts - 1, 3)), 
-                   self.MAX_RECONNECT_DELAY)
-        
-        logger.warning(f"⚠️ Connection lost. Attempt #{self.reconnect_attempts}. "
-                      f"Retrying in {delay} seconds...")
-        
-        if self.connection_handler:
-            try:
-                self.connection_handler.disconnect()
-            except:
-                pass
-        self.connection_handler = None
-    
-    def _monitor_players(self):
-        """
-        Monitor players.
-
-        Retrieves current player list and detects player status changes.
-        """
-        if not self.is_running:
-            return
-            
-        try:
-            if not self.connection_handler:
-                logger.warning("⚠️ No connection handler available for player monitoring")
-                return
-            
-            logger.debug("🔍 Checking player status...")
-            
-            # Get current players
-            current_players = self.connection_handler.get_players()
-            
-            if current_players is None:
-                logger.warning("⚠️ Failed to get player list from server")
-                if self.is_running:  # Only handle error if service should be running
-                    self._handle_connection_error()
-                return
-            
-            # Handle error dictionary response
-            if isinstance(current_players, dict) and not current_players.get('success', True):
-                logger.warning("⚠️ Failed to get player list from server (error response)")
-                if self.is_running:
-                    self._handle_connection_error()
-                return
-            
-            logger.debug(f"📊 Retrieved {len(current_players)} players from server")
-            
-            # Update database
-            if self.player_db and self.is_running:
-                updated_count = self.player_db.update_multiple_players(current_players)
-                logger.debug(f"💾 Updated {updated_count} players in database")
-            
-            # Detect status changes and send welcome/goodbye messages
-            if self.is_running:  # Only send messages if service is running
-                self._detect_status_changes(current_players)
-            
-        except Exception as e:
-            logger.error(f"❌ Error monitoring players: {e}", exc_info=True)
-            if self.is_running:  # Only handle error if service should be running
-                self._handle_connection_error()
-    
-    def _detect_status_changes(self, current_players: List[Dict]):
-        """
-        DISABLED: Welcome/goodbye messages now handled by PlayerStatusMod.
-        This method still updates player tracking but doesn't send messages.
-        """
-        if not self.is_running:
-            return
-        
-        try:
-            current_players_dict = {p['steam_id']: p for p in current_players}
-            
-            # Still track player changes for database purposes, but don't send messages
-            for player in current_players:
-                steam_id = player['steam_id']
-                player_name = player['name']
-                current_status = player['status']
-                
-                if steam_id in self.previous_players:
-                    previous_status = self.previous_players[steam_id]['status']
-                    
-                    # Log status changes but don't send messages
-                    if previous_status == 'Offline' and current_status == 'Online':
-                        logger.info(f"👋 Player joined: {player_name} (message handled by PlayerStatusMod)")
-                    elif previous_status == 'Online' and current_status == 'Offline':
-                        logger.info(f"👋 Player left: {player_name} (message handled by PlayerStatusMod)")
-                else:
-                    if current_status == 'Online':
-                        logger.info(f"👋 New player detected: {player_name} (message handled by PlayerStatusMod)")
-            
-            # Update previous players for next cycle
-            self.previous_players = current_players_dict.copy()
-            
-        except Exception as e:
-            logger.error(f"❌ Error detecting status changes: {e}", exc_info=True)
+        with self._monitors_lock:
+            monitors = list(self.monitors.values())
+        for monitor in monitors:
+            monitor.stop()
+        logger.info("🔌 Disconnected from all servers")
     
     def _check_scheduled_messages(self):
         """
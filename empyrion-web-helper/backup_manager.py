@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Online database backups for Empyrion Web Helper
+
+Copies a live database with SQLite's backup API instead of copying the file:
+the copy is taken from one read snapshot (a transaction held open on the
+source connection), a few hundred pages per step with a short sleep in
+between, so the monitor keeps writing (WAL) and the copy is never torn.
+
+Each backup is checked with PRAGMA integrity_check, optionally gzipped, and
+moved into place with an atomic rename; only the newest N generations are
+kept. Restores check the backup the same way, take a safety copy of the
+current file, and swap the file in while the connection pool is held
+exclusively.
+
+Backups written by older versions (players.db.bak next to the database and
+backups/players_backup_<stamp>.db) are renamed into 'legacy' generations on
+startup; rotation never deletes those.
+"""
+
+import gzip
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GENERATIONS = 7
+DEFAULT_INTERVAL_HOURS = 24
+PAGES_PER_STEP = 256          # ~1 MiB with 4 KiB pages
+STEP_SLEEP = 0.005            # seconds between steps; lets writers in
+
+_BACKUP_NAME = re.compile(r'^(?P<stem>.+)_(?P<stamp>\d{8}_\d{6})(?:_(?P<label>[a-z_]+))?\.db(?P<gz>\.gz)?$')
+_LEGACY_LABEL = 'legacy'
+
+
+class BackupManager:
+    """
+    Backup generations of one database file.
+
+    Backups are named <stem>_<YYYYmmdd_HHMMSS>[_<label>].db[.gz] inside backup_dir.
+    """
+
+    def __init__(self, pool, backup_dir: Optional[str] = None, generations: int = DEFAULT_GENERATIONS,
+                 compress: bool = True):
+        """
+        Initialize the BackupManager.
+
+        Args:
+            pool (ConnectionPool): Pool of the database to back up (restores swap its file).
+            backup_dir (str, optional): Where generations are kept; 'backups' next to the database by default.
+            generations (int, optional): Backups to keep; older ones are deleted.
+            compress (bool, optional): gzip each backup.
+        """
+        self.pool = pool
+        self.db_path = pool.db_path
+        self.backup_dir = backup_dir or os.path.join(os.path.dirname(self.db_path) or '.', 'backups')
+        self.generations = max(1, int(generations))
+        self.compress = compress
+        self.stem = os.path.splitext(os.path.basename(self.db_path))[0]
+        self._lock = threading.Lock()  # one backup or restore at a time
+
+    def import_legacy_backups(self) -> int:
+        """
+        Rename backups made by older versions into 'legacy' generations so they can be listed and restored.
+
+        Returns:
+            int: Number of files imported.
+        """
+        legacy = []
+        single = f"{self.db_path}.bak"
+        if os.path.isfile(single):
+            stamp = datetime.fromtimestamp(os.path.getmtime(single)).strftime('%Y%m%d_%H%M%S')
+            legacy.append((single, stamp))
+        if os.path.isdir(self.backup_dir):
+            old_name = re.compile(rf'^{re.escape(self.stem)}_backup_(?P<stamp>\d{{8}}_\d{{6}})\.db$')
+            for name in os.listdir(self.backup_dir):
+                match = old_name.match(name)
+                if match:
+                    legacy.append((os.path.join(self.backup_dir, name), match.group('stamp')))
+
+        imported = 0
+        for path, stamp in legacy:
+            target = os.path.join(self.backup_dir, f"{self.stem}_{stamp}_{_LEGACY_LABEL}.db")
+            if os.path.exists(target):
+                continue
+            try:
+                os.makedirs(self.backup_dir, exist_ok=True)
+                os.replace(path, target)
+                imported += 1
+            except OSError as e:
+                logger.warning(f"Could not import old backup {path}: {e}")
+        if imported:
+            logger.info(f"💾 Imported {imported} backup(s) from an older version into {self.backup_dir}")
+        return imported
+
+    # ------------------------------------------------------------------
+    # Backup
+    # ------------------------------------------------------------------
+
+    def create_backup(self, label: str = '') -> Dict:
+        """
+        Take a verified backup generation and rotate old ones.
+
+        Args:
+            label (str, optional): Suffix for the file name, e.g. 'scheduled' or 'pre_restore'.
+
+        Returns:
+            dict: 'success', 'message', 'backup_path', 'bytes', 'seconds'.
+        """
+        with self._lock:
+            return self._create_backup(label)
+
+    def _create_backup(self, label: str) -> Dict:
+        os.makedirs(self.backup_dir, exist_ok=True)
+        started = time.monotonic()
+        name = f"{self.stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{'_' + label if label else ''}.db"
+        final_path = os.path.join(self.backup_dir, name + ('.gz' if self.compress else ''))
+        temp_path = os.path.join(self.backup_dir, f".{name}.tmp")
+        try:
+            self._copy_online(temp_path)
+            problem = check_integrity(temp_path)
+            if problem:
+                raise sqlite3.DatabaseError(f"backup failed integrity check: {problem}")
+            if self.compress:
+                gz_temp = temp_path + '.gz'
+                with open(temp_path, 'rb') as source, gzip.open(gz_temp, 'wb', compresslevel=6) as target:
+                    shutil.copyfileobj(source, target, 1024 * 1024)
+                os.remove(temp_path)
+                temp_path = gz_temp
+            os.replace(temp_path, final_path)
+        except Exception as e:
+            for path in (temp_path, temp_path + '.gz'):
+                if os.path.exists(path):
+                    os.remove(path)
+            logger.error(f"Error backing up {self.db_path}: {e}", exc_info=True)
+            return {'success': False, 'message': f'Failed to create backup: {e}', 'backup_path': ''}
+
+        removed = self._rotate()
+        size = os.path.getsize(final_path)
+        seconds = time.monotonic() - started
+        logger.info(f"💾 Database backup created: {final_path} ({size / 1024:.0f} KiB, {seconds:.2f}s"
+                    f"{f', {removed} old generation(s) removed' if removed else ''})")
+        return {'success': True, 'message': 'Database backup created successfully', 'backup_path': final_path,
+                'bytes': size, 'seconds': round(seconds, 3)}
+
+    def _copy_online(self, target_path: str):
+        """Copy the live database page by page from one read snapshot."""
+        source = sqlite3.connect(self.db_path, timeout=30)
+        target = sqlite3.connect(target_path)
+        try:
+            # Holding a read transaction pins the snapshot: writers keep appending to the
+            # WAL, and the backup never restarts because the source changed under it
+            source.execute("BEGIN")
+            source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            source.backup(target, pages=PAGES_PER_STEP, sleep=STEP_SLEEP)
+            source.rollback()
+            # A self-contained file: no -wal needed next to the backup
+            target.execute("PRAGMA journal_mode = DELETE")
+        finally:
+            target.close()
+            source.close()
+
+    def _rotate(self) -> int:
+        removed = 0
+        generations = [backup for backup in self.list_backups() if backup['label'] != _LEGACY_LABEL]
+        for backup in generations[self.generations:]:
+            try:
+                os.remove(backup['path'])
+                removed += 1
+            except OSError as e:
+                logger.warning(f"Could not remove old backup {backup['path']}: {e}")
+        return removed
+
+    def list_backups(self) -> List[Dict]:
+        """
+        Get the backup generations, newest first.
+
+        Returns:
+            List[Dict]: name, path, created (ISO), label, compressed and bytes per backup.
+        """
+        if not os.path.isdir(self.backup_dir):
+            return []
+        backups = []
+        for name in os.listdir(self.backup_dir):
+            match = _BACKUP_NAME.match(name)
+            if not match or match.group('stem') != self.stem:
+                continue
+            path = os.path.join(self.backup_dir, name)
+            backups.append({
+                'name': name, 'path': path,
+                'created': datetime.strptime(match.group('stamp'), '%Y%m%d_%H%M%S').isoformat(),
+                'label': match.group('label') or '', 'compressed': bool(match.group('gz')),
+                'bytes': os.path.getsize(path)
+            })
+        backups.sort(key=lambda backup: (backup['created'], backup['name']), reverse=True)
+        return backups
+
+    def last_backup_time(self) -> Optional[datetime]:
+        """Time of the newest backup, or None if there is none."""
+        backups = self.list_backups()
+        return datetime.fromisoformat(backups[0]['created']) if backups else None
+
+    # ------------------------------------------------------------------
+    # Restore
+    # ------------------------------------------------------------------
+
+    def restore_backup(self, name: Optional[str] = None) -> Dict:
+        """
+        Replace the database with a backup generation.
+
+        The backup is unpacked next to the database and checked before anything is
+        touched; the current file is backed up as a 'pre_restore' generation first.
+
+        Args:
+            name (str, optional): Backup file name from list_backups(); the newest if omitted.
+
+        Returns:
+            dict: 'success', 'message' and the 'backup' restored.
+        """
+        with self._lock:
+            backups = self.list_backups()
+            if name:
+                backups = [backup for backup in backups if backup['name'] == os.path.basename(name)]
+            else:
+                backups = [backup for backup in backups if backup['label'] != 'pre_restore'] or backups
+            if not backups:
+                return {'success': False, 'message': 'No backup file found. Create a backup first.'}
+            backup = backups[0]
+
+            staged = f"{self.db_path}.restore"
+            try:
+                if backup['compressed']:
+                    with gzip.open(backup['path'], 'rb') as source, open(staged, 'wb') as target:
+                        shutil.copyfileobj(source, target, 1024 * 1024)
+                else:
+                    shutil.copyfile(backup['path'], staged)
+                problem = check_integrity(staged)
+                if problem:
+                    os.remove(staged)
+                    return {'success': False, 'message': f"Backup {backup['name']} is damaged: {problem}"}
+
+                safety = self._create_backup('pre_restore')
+                if not safety['success']:
+                    os.remove(staged)
+                    return {'success': False, 'message': 'Could not back up the current database before restoring'}
+                self.swap_in(staged)
+            except Exception as e:
+                if os.path.exists(staged):
+                    os.remove(staged)
+                logger.error(f"Error restoring {self.db_path} from {backup['path']}: {e}", exc_info=True)
+                return {'success': False, 'message': f'Failed to restore database: {e}'}
+
+        logger.info(f"Database restored from backup: {backup['path']}")
+        return {'success': True, 'message': 'Database restored successfully from backup', 'backup': backup['name']}
+
+    def swap_in(self, staged_path: str):
+        """
+        Atomically replace the database file with staged_path (same directory).
+
+        Every pooled connection is closed and other users wait while the file is swapped.
+        """
+        with self.pool.exclusive():
+            # A WAL left from the old file must not be replayed onto the restored one
+            for suffix in ('-wal', '-shm'):
+                if os.path.exists(self.db_path + suffix):
+                    os.remove(self.db_path + suffix)
+            os.replace(staged_path, self.db_path)
+
+
+def check_integrity(path: str) -> Optional[str]:
+    """
+    Run PRAGMA integrity_check on a database file.
+
+    Args:
+        path (str): Database file.
+
+    Returns:
+        Optional[str]: None if the file is sound, else the first problem reported.
+    """
+    try:
+        conn = sqlite3.connect(path)
+        try:
+            result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        return str(e)
+    return None if result == 'ok' else result
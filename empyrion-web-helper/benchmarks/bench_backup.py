@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark online backups: writer stalls while a backup runs.
+
+Builds a player database of N players (plus message history), then runs a
+writer that updates one player every few milliseconds while
+(a) the old approach copies the file with the pool held exclusively, and
+(b) BackupManager takes a stepped backup-API copy from a held snapshot.
+Reports backup time and size and the writer's worst and p99 write latency
+during each.
+
+Usage (from the empyrion-web-helper directory):
+    python3 benchmarks/bench_backup.py [--players 20000] [--messages 200000]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_pool import get_pool
+from backup_manager import BackupManager
+
+
+def build(pool, players, messages):
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE players (steam_id TEXT PRIMARY KEY, name TEXT, playfield TEXT, last_seen TEXT)")
+        conn.execute("CREATE TABLE messages (id INTEGER PRIMARY KEY, sender TEXT, message TEXT, ts TEXT)")
+        conn.executemany("INSERT INTO players VALUES (?, ?, 'Haven', '2026-01-01T00:00:00')",
+                         [(f"7656119{i:010d}", f"Player{i}") for i in range(players)])
+        conn.executemany("INSERT INTO messages (sender, message, ts) VALUES (?, ?, '2026-01-01T00:00:00')",
+                         [(f"Player{i % players}", f"chat line {i} " + 'x' * 80) for i in range(messages)])
+
+
+def run_with_writer(pool, action):
+    latencies, stop = [], threading.Event()
+
+    def writer():
+        i = 0
+        while not stop.is_set():
+            began = time.perf_counter()
+            with pool.connection() as conn:
+                conn.execute("UPDATE players SET last_seen = ? WHERE steam_id = ?",
+                             (str(i), f"7656119{i % 1000:010d}"))
+            latencies.append(time.perf_counter() - began)
+            i += 1
+            time.sleep(0.002)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    time.sleep(0.2)
+    began = time.perf_counter()
+    result = action()
+    elapsed = time.perf_counter() - began
+    time.sleep(0.2)
+    stop.set()
+    thread.join()
+    latencies.sort()
+    return result, elapsed, latencies[-1] * 1000, latencies[int(len(latencies) * 0.99)] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--players', type=int, default=20000)
+    parser.add_argument('--messages', type=int, default=200000)
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    workdir = tempfile.mkdtemp(prefix='ewh-bench-backup-')
+    pool = get_pool(os.path.join(workdir, 'players.db'))
+    build(pool, args.players, args.messages)
+    size = os.path.getsize(pool.db_path) / 2**20
+    print(f"{args.players:,} players, {args.messages:,} messages: {size:.1f} MiB database\n")
+
+    def exclusive_copy():
+        target = os.path.join(workdir, 'copy.db')
+        with pool.exclusive():
+            shutil.copy2(pool.db_path, target)
+        return os.path.getsize(target)
+
+    manager = BackupManager(pool, generations=3)
+    cases = (
+        ('file copy under exclusive pool', exclusive_copy),
+        ('backup API, gzip', lambda: manager.create_backup()['bytes']),
+    )
+    for label, action in cases:
+        written, elapsed, worst, p99 = run_with_writer(pool, action)
+        print(f"{label:<32} {elapsed:6.2f} s, {written / 2**20:5.1f} MiB on disk, "
+              f"writer worst {worst:7.1f} ms, p99 {p99:6.1f} ms")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
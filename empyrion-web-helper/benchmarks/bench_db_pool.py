@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark PlayerDatabase with the connection pool against one connection per call.
+
+Runs the same workload twice, each on a fresh database in a temp directory:
+'per-call' swaps in a stand-in pool that opens a plain sqlite3 connection for
+every block (the old behaviour, rollback journal), 'pooled' uses db_pool.
+For each it reports connections opened per monitor cycle (a full sync of the
+fixture's plys reply and a small delta write) and /players/all latency while a
+monitor thread keeps writing.
+
+Usage (from the empyrion-web-helper directory):
+    python3 benchmarks/bench_db_pool.py [--cycles 20] [--requests 300]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import PlayerDatabase
+from plys_parser import PlysParser
+from fake_rcon_server import load_fixtures
+
+# Fixture addresses are in 203.0.113.0/24 (documentation range), which the geolocation
+# resolver answers locally, so the benchmark makes no network requests
+
+
+class PerCallPool:
+    """Stand-in for ConnectionPool that opens a new connection per block, like the old code."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.stats = {'opened': 0}
+
+    @contextmanager
+    def connection(self):
+        self.stats['opened'] += 1
+        with sqlite3.connect(self.db_path) as conn:
+            yield conn
+
+    def get_stats(self):
+        return dict(self.stats)
+
+
+def opened(db) -> int:
+    return db.pool.get_stats()['opened']
+
+
+def mutate(players, rng: random.Random, count: int):
+    """Move a few online players to another playfield, as a quiet cycle would."""
+    online = [p for p in players if p['status'] == 'Online']
+    for player in rng.sample(online, min(count, len(online))):
+        player['playfield'] = rng.choice(['Akua', 'Omicron', 'Ningues', 'Aitis'])
+    return online[:count]
+
+
+def run(mode: str, players, cycles: int, requests: int):
+    workdir = tempfile.mkdtemp(prefix=f'ewh-bench-{mode}-')
+    os.chdir(workdir)
+    db_path = os.path.join(workdir, 'players.db')
+    db = PlayerDatabase(db_path)
+    if mode == 'per-call':
+        db.pool.close_all()
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("PRAGMA journal_mode=DELETE")
+        db.pool = PerCallPool(db_path)
+
+    db.update_multiple_players(players)
+    rng = random.Random(7)
+
+    before = opened(db)
+    full_time = time.perf_counter()
+    for _ in range(cycles):
+        db.update_multiple_players(players)
+    full_time = (time.perf_counter() - full_time) / cycles
+    full_opened = (opened(db) - before) / cycles
+
+    before = opened(db)
+    delta_time = time.perf_counter()
+    for _ in range(cycles):
+        db.apply_player_changes(mutate(players, rng, 5), [])
+    delta_time = (time.perf_counter() - delta_time) / cycles
+    delta_opened = (opened(db) - before) / cycles
+
+    # /players/all while the monitor keeps writing deltas in the background
+    import app as app_module
+    app_module.player_db = db
+    client = app_module.app.test_client()
+    stop = threading.Event()
+
+    def monitor():
+        while not stop.is_set():
+            db.apply_player_changes(mutate(players, rng, 5), [])
+            time.sleep(0.01)
+
+    writer = threading.Thread(target=monitor, daemon=True)
+    writer.start()
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.get('/players/all')
+        samples.append((time.perf_counter() - started) * 1000)
+        assert response.get_json()['success']
+    stop.set()
+    writer.join()
+
+    return {
+        'full_opened': full_opened, 'full_ms': full_time * 1000,
+        'delta_opened': delta_opened, 'delta_ms': delta_time * 1000,
+        'p50_ms': statistics.median(samples),
+        'p99_ms': statistics.quantiles(samples, n=100)[98]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--cycles', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=300)
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    players = PlysParser().parse(load_fixtures()['plys'])
+    print(f"{len(players)} players from fixtures/plys.txt, {args.cycles} cycles, {args.requests} requests\n")
+    print(f"{'mode':>9} {'full sync conns':>16} {'full ms':>9} {'delta conns':>12} {'delta ms':>9} "
+          f"{'/players/all p50':>17} {'p99':>8}")
+    for mode in ('per-call', 'pooled'):
+        result = run(mode, [dict(p) for p in players], args.cycles, args.requests)
+        print(f"{mode:>9} {result['full_opened']:>16.0f} {result['full_ms']:>9.1f} {result['delta_opened']:>12.0f} "
+              f"{result['delta_ms']:>9.2f} {result['p50_ms']:>15.1f}ms {result['p99_ms']:>6.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
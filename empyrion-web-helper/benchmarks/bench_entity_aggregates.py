@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark entity reports: Python loops over every entity versus entity_aggregates.
+
+Loads N entities over P playfields, then times the per-playfield faction
+counts behind /api/test/active-playfields and the stats block of
+get_entities() computed the old way (fetch every entity, classify each one
+in Python) and from the aggregate table, plus the player-structures report.
+Also reports what the aggregate triggers add to a 1% churn refresh.
+
+Usage (from the empyrion-web-helper directory):
+    python3 benchmarks/bench_entity_aggregates.py [--entities 50000] [--playfields 400]
+"""
+
+import argparse
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entity_classification import classify_entity_faction, NPC_FACTIONS
+
+TYPES = ['BA', 'CV', 'SV', 'HV', 'AstVoxel']
+NAMES = ['Drone Base', 'Cargo Hauler', 'Mining Outpost', 'Wreckage', 'Outpost Relay', 'Iron Asteroid']
+
+
+def legacy_playfield_counts(db):
+    """Per-playfield counts as the active-playfields route computed them."""
+    stats = {}
+    for entity in db.get_entities()['entities']:
+        counts = stats.setdefault(entity.get('playfield', 'Unknown'),
+                                  {'npc_count': 0, 'player_count': 0, 'neutral_count': 0, 'total_count': 0})
+        category, _ = classify_entity_faction.__wrapped__(entity.get('faction', ''))
+        counts['total_count'] += 1
+        counts[{'NPC': 'npc_count', 'Player': 'player_count'}.get(category, 'neutral_count')] += 1
+    return stats
+
+
+def legacy_stats(entities):
+    """get_entities() stats as five list scans."""
+    return {
+        'total': len(entities),
+        'asteroids': len([e for e in entities if 'astvoxel' in e.get('type', '').lower()
+                          or 'asteroid' in e.get('type', '').lower()]),
+        'structures': len([e for e in entities if e.get('type', '') == 'BA']),
+        'ships': len([e for e in entities if e.get('type', '') in ['CV', 'SV', 'HV']]),
+        'wrecks': len([e for e in entities if 'wreck' in e.get('name', '').lower()])
+    }
+
+
+def best_of(action, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        action()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--entities', type=int, default=50000)
+    parser.add_argument('--playfields', type=int, default=400)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    workdir = tempfile.mkdtemp(prefix='ewh-bench-entity-aggregates-')
+    cwd = os.getcwd()
+    os.chdir(workdir)  # PlayerDatabase keeps its key file under ./instance
+    os.makedirs('instance', exist_ok=True)
+    try:
+        from database import PlayerDatabase
+        db = PlayerDatabase(os.path.join(workdir, 'players.db'))
+        rng = random.Random(9)
+        factions = list(NPC_FACTIONS)[:12] + ['NoF', '', '1043', '2001', 'ABC']
+        galaxy = [{'id': str(1000000 + index), 'name': rng.choice(NAMES), 'type': rng.choice(TYPES),
+                   'faction': rng.choice(factions), 'playfield': f"Playfield {index % args.playfields:03d}",
+                   'time_info': '-'} for index in range(args.entities)]
+        db.save_entities(galaxy)
+
+        print(f"{args.entities:,} entities in {args.playfields} playfields\n")
+        print(f"playfield counts, Python loop:     {best_of(lambda: legacy_playfield_counts(db)):8.1f} ms")
+        print(f"playfield counts, aggregates:      {best_of(db.get_playfield_entity_counts):8.1f} ms")
+        entities = db.get_entities()['entities']
+        print(f"entity stats, five list scans:     {best_of(lambda: legacy_stats(entities)):8.1f} ms")
+        with db.pool.connection() as conn:
+            print(f"entity stats, aggregates:          {best_of(lambda: db._entity_stats(conn.cursor())):8.1f} ms")
+        print(f"player structures report:          {best_of(db.get_entity_classification):8.1f} ms")
+
+        refresh = [dict(entity) for entity in galaxy]
+        for entity in rng.sample(refresh, len(refresh) // 100):
+            entity['playfield'] = 'Playfield moved'
+        started = time.perf_counter()
+        db.save_entities(refresh)
+        print(f"1% churn refresh with triggers:    {(time.perf_counter() - started) * 1000:8.1f} ms")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark entity snapshots: storage, snapshot time and history queries.
+
+Loads N entities over P playfields, then takes a week of hourly snapshots in
+which a given share of entities changes between snapshots (moves playfield,
+appears or goes) and every 4th hour is quiet (no change at all). Reports
+what the snapshots take on disk against storing every snapshot as a plain
+copy of its entity lines, the time per snapshot, and the time to answer
+"entities in playfield X over the last week".
+
+Usage (from the empyrion-web-helper directory):
+    python3 benchmarks/bench_entity_snapshots.py [--entities 50000] [--playfields 400] [--hours 168] [--churn 0.01]
+"""
+
+import argparse
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entity_snapshots import take_snapshot, snapshot_history
+
+TYPES = ['BA', 'CV', 'SV', 'HV', 'AstVoxel']
+FACTIONS = ['Zrx', 'TRD', 'NoF', 'Pub', '1043']
+NAMES = ['Drone Base', 'Cargo Hauler', 'Mining Outpost', 'Wreckage', 'Outpost Relay', 'Iron Asteroid']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--entities', type=int, default=50000)
+    parser.add_argument('--playfields', type=int, default=400)
+    parser.add_argument('--hours', type=int, default=168)
+    parser.add_argument('--churn', type=float, default=0.01)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    workdir = tempfile.mkdtemp(prefix='ewh-bench-entity-snapshots-')
+    cwd = os.getcwd()
+    os.chdir(workdir)  # PlayerDatabase keeps its key file under ./instance
+    os.makedirs('instance', exist_ok=True)
+    try:
+        from database import PlayerDatabase
+        db = PlayerDatabase(os.path.join(workdir, 'players.db'))
+        rng = random.Random(13)
+        playfields = [f"Playfield {index:03d}" for index in range(args.playfields)]
+        galaxy = {str(1000000 + index): {'id': str(1000000 + index), 'name': rng.choice(NAMES),
+                                         'type': rng.choice(TYPES), 'faction': rng.choice(FACTIONS),
+                                         'playfield': playfields[index % args.playfields], 'time_info': '-'}
+                  for index in range(args.entities)}
+        next_id = 5000000
+        start = datetime.now() - timedelta(hours=args.hours)
+        plain_bytes = 0
+        timings = []
+        for hour in range(args.hours):
+            if hour % 4:
+                count = int(len(galaxy) * args.churn / 3)
+                for entity_id in rng.sample(sorted(galaxy), count):
+                    galaxy[entity_id]['playfield'] = rng.choice(playfields)
+                for entity_id in rng.sample(sorted(galaxy), count):
+                    del galaxy[entity_id]
+                for _ in range(count):
+                    galaxy[str(next_id)] = {'id': str(next_id), 'name': 'New Base', 'type': 'BA', 'faction': '1043',
+                                            'playfield': rng.choice(playfields), 'time_info': '-'}
+                    next_id += 1
+            db.save_entities(list(galaxy.values()))
+            plain_bytes += sum(len(f"{e['id']}\t{e['type']}\t{e['faction']}\t{e['name']}\n") + len(e['playfield'])
+                               for e in galaxy.values())
+            with db.pool.connection() as conn:
+                started = time.perf_counter()
+                take_snapshot(conn.cursor(), start + timedelta(hours=hour), 'scheduled')
+                timings.append(time.perf_counter() - started)
+
+        with db.pool.connection() as conn:
+            snapshots = conn.execute("SELECT COUNT(*), SUM(repeats) FROM entity_snapshots").fetchone()
+            chunks, chunk_bytes = conn.execute(
+                "SELECT COUNT(*), SUM(length(data)) + COUNT(*) * 40 FROM entity_snapshot_chunks").fetchone()
+            links = conn.execute("SELECT COUNT(*) FROM entity_snapshot_playfields").fetchone()[0]
+            cursor = conn.cursor()
+            started = time.perf_counter()
+            for _ in range(20):
+                points = snapshot_history(cursor, playfields[7], start, datetime.now())
+            history_ms = (time.perf_counter() - started) / 20 * 1000
+
+        stored = chunk_bytes + links * 24
+        print(f"{args.entities:,} entities in {args.playfields} playfields, {args.hours} hourly snapshots, "
+              f"{args.churn:.0%} churn\n")
+        print(f"snapshot rows / snapshots taken:  {snapshots[0]} / {snapshots[1]}")
+        print(f"chunks stored:                    {chunks:,} (of {args.hours * args.playfields:,} playfield copies)")
+        print(f"plain copies:                     {plain_bytes / 2**20:8.1f} MiB")
+        print(f"stored (chunks + links, approx.): {stored / 2**20:8.1f} MiB")
+        print(f"snapshot time, median:            {sorted(timings)[len(timings) // 2] * 1000:8.1f} ms")
+        print(f"playfield week history:           {history_ms:8.2f} ms ({len(points)} points)")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
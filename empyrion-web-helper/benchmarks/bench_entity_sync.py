@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark entity refreshes: full rewrite versus incremental sync.
+
+Loads a galaxy of N entities, then applies refreshes in which a given share
+of entities changed (renamed or moved), vanished or appeared. Each refresh is
+written once the old way (DELETE FROM entities, then insert everything) and
+once through save_entities() (entity_sync), on separate copies of the same
+database, and the time, rows written and WAL growth are reported. As on a
+live server, two in three entities carry a timer in time_info that moves on
+every refresh, changed or not. Rows
+written is SQLite's change count, including the full-text index and, for the
+sync, two changes per entity for filling and clearing the temporary staging
+table (which never reaches the WAL).
+
+Usage (from the empyrion-web-helper directory):
+    python3 benchmarks/bench_entity_sync.py [--entities 50000] [--churn 0 0.01 0.1]
+"""
+
+import argparse
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TYPES = ['BA', 'CV', 'SV', 'HV', 'AstVoxel']
+FACTIONS = ['Zrx', 'TRD', 'NoF', 'Pub', 'SCB']
+NAMES = ['Drone Base', 'Cargo Hauler', 'Mining Outpost', 'Wreckage', 'Outpost Relay', 'Iron Asteroid']
+
+
+def timer(entity_id: str, refresh: int) -> str:
+    """time_info for an entity at a refresh; two in three entities tick."""
+    return '-' if int(entity_id) % 3 == 0 else f"{refresh * 5 + int(entity_id) % 60}m"
+
+
+def build_galaxy(total: int, rng: random.Random) -> list:
+    return [{'id': str(1000000 + index), 'name': rng.choice(NAMES), 'type': rng.choice(TYPES),
+             'faction': rng.choice(FACTIONS), 'playfield': f"Playfield {index % 400:03d}",
+             'time_info': timer(str(1000000 + index), 0)}
+            for index in range(total)]
+
+
+def churn(entities: list, share: float, rng: random.Random, next_id: int, refresh: int) -> list:
+    """Tick the timers, then change, drop and add share/3 of the entities each."""
+    count = int(len(entities) * share / 3)
+    result = [dict(entity, time_info=timer(entity['id'], refresh)) for entity in entities]
+    for entity in rng.sample(result, count):
+        entity['name'] = entity['name'] + ' II'
+    for entity in rng.sample(result, count):
+        result.remove(entity)
+    result.extend({'id': str(next_id + index), 'name': 'New Base', 'type': 'BA', 'faction': 'TRD',
+                   'playfield': 'Akua', 'time_info': timer(str(next_id + index), refresh)}
+                  for index in range(count))
+    return result
+
+
+def legacy_save(db, entities):
+    """DELETE-all and reinsert, as save_entities did before."""
+    now = time.strftime('%Y-%m-%dT%H:%M:%S')
+    with db.pool.connection() as conn:
+        conn.execute("DELETE FROM entities")
+        conn.executemany(
+            "INSERT OR IGNORE INTO entities (id, name, type, faction, playfield, time_info, last_seen, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(e['id'], e['name'], e['type'], e['faction'], e['playfield'], e['time_info'], now, now)
+             for e in entities])
+
+
+def run(db, save, entities):
+    wal = db.db_path + '-wal'
+    with db.pool.connection() as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        before = conn.total_changes
+    started = time.perf_counter()
+    save(entities)
+    elapsed = time.perf_counter() - started
+    with db.pool.connection() as conn:
+        # total_changes is per connection; the pool hands the same idle connection back
+        written = conn.total_changes - before
+    return elapsed, written, os.path.getsize(wal) if os.path.exists(wal) else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--entities', type=int, default=50000)
+    parser.add_argument('--churn', type=float, nargs='+', default=[0.0, 0.01, 0.1])
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    workdir = tempfile.mkdtemp(prefix='ewh-bench-entity-sync-')
+    cwd = os.getcwd()
+    os.chdir(workdir)  # PlayerDatabase keeps its key file under ./instance
+    os.makedirs('instance', exist_ok=True)
+    try:
+        from database import PlayerDatabase
+        rng = random.Random(5)
+        galaxy = build_galaxy(args.entities, rng)
+        dbs = {}
+        for label in ('rewrite', 'sync'):
+            dbs[label] = PlayerDatabase(os.path.join(workdir, f"{label}.db"))
+            dbs[label].save_entities(galaxy)
+
+        print(f"{args.entities:,} entities\n")
+        print(f"{'churn':>6}  {'method':<8} {'ms':>9} {'rows written':>13} {'WAL KiB':>9}")
+        next_id = 5000000
+        for refresh_number, share in enumerate(args.churn, start=1):
+            refresh = churn(galaxy, share, rng, next_id, refresh_number)
+            next_id += len(refresh)
+            for label, save in (('rewrite', lambda e: legacy_save(dbs['rewrite'], e)),
+                                ('sync', dbs['sync'].save_entities)):
+                elapsed, written, wal = run(dbs[label], save, refresh)
+                print(f"{share:>6.0%}  {label:<8} {elapsed * 1000:>9.1f} {written:>13,} {wal / 1024:>9.0f}")
+            galaxy = refresh
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
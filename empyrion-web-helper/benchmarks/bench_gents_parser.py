@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark GentsParser over synthetic 'gents' dumps: parse time and peak memory.
+
+Builds replies with 5k, 50k and 100k entities spread over playfields and
+compares the parser that used to live in the /entities/refresh route (split
+into lines, one dict per entity, a debug f-string per entity) with
+GentsParser feeding straight into save_entities(). Peak memory is the
+tracemalloc high-water mark above the reply itself (timed runs are
+separate, as tracemalloc slows allocation-heavy code down several times).
+
+Usage (from the empyrion-web-helper directory):
+    python3 benchmarks/bench_gents_parser.py [--sizes 5000 50000 100000] [--repeat 3]
+"""
+
+import argparse
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gents_parser import GentsParser
+
+TYPES = ['BA', 'CV', 'SV', 'HV', 'AstVoxel', 'Proxy', 'Drone', 'Enemy']
+FACTIONS = ['Zrx', 'TRD', 'NoF', 'Pub', 'SCB', '1043', 'Tal', 'Pol']
+NAMES = ['Drone Base', 'Cargo Hauler', 'Mining Outpost', 'Wreckage', 'Outpost Relay', 'Iron Asteroid',
+         'Abandoned Factory', 'Trading Station', 'Ruined Tower']
+TIMES = ['-', '12h', '3d 4h', '21d 2h']
+
+logger = logging.getLogger('bench_gents_parser')
+
+
+def build_gents(total: int, playfields: int = 400, seed: int = 1) -> str:
+    """
+    Build a synthetic 'gents' reply.
+
+    Args:
+        total (int): Entity lines.
+        playfields (int, optional): Playfield headers the entities are spread over.
+        seed (int, optional): Random seed so runs are comparable.
+
+    Returns:
+        str: Reply text in the server's format.
+    """
+    rng = random.Random(seed)
+    per_playfield = max(1, total // playfields)
+    lines = []
+    for index in range(total):
+        if index % per_playfield == 0:
+            lines.append(f"Playfield {index // per_playfield:03d}")
+        lines.append(f"  {index % per_playfield + 1:02d}. {1000000 + index} {rng.choice(TYPES)} "
+                     f"[{rng.choice(FACTIONS)}] False {rng.choice(['True', 'False'])} "
+                     f"'{rng.choice(NAMES)}' ({rng.choice(TIMES)})")
+    return '\n'.join(lines)
+
+
+def legacy_parse(raw_data: str) -> list:
+    """The parser as it was inlined in the /entities/refresh route."""
+    entities = []
+    current_playfield = ''
+    for line in raw_data.strip().split('\n'):
+        line_stripped = line.strip()
+        if not line_stripped or line_stripped.startswith('gents:') or line_stripped.startswith('No'):
+            continue
+        if not line.startswith('  ') and not line_stripped.startswith(tuple('0123456789')):
+            current_playfield = line_stripped
+            logger.debug(f"Found playfield: {current_playfield}")
+            continue
+        if line.startswith('  ') and '. ' in line:
+            parts = line_stripped.split(' ', 6)
+            if len(parts) >= 7:
+                faction = parts[3].strip('[]') if parts[3].startswith('[') else ''
+                name = time_info = ''
+                if "'" in parts[6]:
+                    quote_parts = parts[6].split("'")
+                    if len(quote_parts) >= 2:
+                        name = quote_parts[1]
+                        remaining = "'".join(quote_parts[2:])
+                        if '(' in remaining and ')' in remaining:
+                            time_info = remaining[remaining.find('(') + 1:remaining.find(')')]
+                entity = {'id': parts[1], 'name': name, 'type': parts[2], 'faction': faction,
+                          'playfield': current_playfield, 'time_info': time_info}
+                entities.append(entity)
+                logger.debug(f"Parsed entity: {entity}")
+    return entities
+
+
+def measure(action, repeat: int):
+    """Time action (best of repeat), then run it once more under tracemalloc for the peak."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = action()
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    action()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5000, 50000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger('gents_parser').setLevel(logging.WARNING)
+    logging.getLogger('database').setLevel(logging.WARNING)
+
+    workdir = tempfile.mkdtemp(prefix='ewh-bench-gents-')
+    cwd = os.getcwd()
+    os.chdir(workdir)  # PlayerDatabase keeps its key file under ./instance
+    os.makedirs('instance', exist_ok=True)
+    from database import PlayerDatabase
+    db = PlayerDatabase(os.path.join(workdir, 'players.db'))
+
+    print(f"{'entities':>8} {'reply KiB':>10}  {'variant':<26} {'best ms':>9} {'peak MiB':>9}")
+    try:
+        for size in args.sizes:
+            reply = build_gents(size)
+            gents = GentsParser()
+
+            def consume():
+                deque(gents.parse(reply), maxlen=0)
+                return gents.total
+
+            def save():
+                db.save_entities(gents.parse(reply))
+                with db.pool.connection() as conn:
+                    return conn.execute("SELECT COUNT(*) FROM entities").fetchone()[0]
+
+            variants = (
+                ('legacy split + dicts', lambda: len(legacy_parse(reply))),
+                ('GentsParser, consume only', consume),
+                ('GentsParser -> database', save),
+            )
+            for label, action in variants:
+                best, peak, count = measure(action, args.repeat)
+                assert count == size, f"{label}: expected {size} entities, got {count}"
+                print(f"{size:>8} {len(reply) / 1024:>10.0f}  {label:<26} {best * 1000:>9.1f} {peak / 2**20:>9.2f}")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark the offline IP range backend against the geo_cache table.
+
+Writes a synthetic range file (integer bounds, IP2Location LITE layout) with
+N contiguous IPv4 ranges, loads it with RangeFileBackend and times single
+lookups (bisect over the sorted arrays) for random addresses. For comparison
+the same addresses are read from a filled geo_cache table, one indexed SELECT
+per address as GeoResolver.cached_countries would do for a single player.
+
+Usage (from the empyrion-web-helper directory):
+    python3 benchmarks/bench_geo_backends.py [--ranges 500000] [--lookups 20000]
+"""
+
+import argparse
+import ipaddress
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from geo_backends import RangeFileBackend
+from database import PlayerDatabase
+
+CODES = ['DE', 'NL', 'US', 'FR', 'CA', 'SE', 'JP', 'BR', 'GB', 'AU', 'PL', 'RU']
+
+
+def write_range_file(path: str, count: int, rng: random.Random):
+    """Contiguous ranges covering 1.0.0.0 - 223.255.255.255."""
+    first, last = int(ipaddress.ip_address('1.0.0.0')), int(ipaddress.ip_address('223.255.255.255'))
+    bounds = sorted(rng.sample(range(first + 1, last), count - 1))
+    starts = [first] + bounds
+    ends = [b - 1 for b in bounds] + [last]
+    with open(path, 'w') as f:
+        f.write('"0","16777215","-","-"\n')
+        for start, end in zip(starts, ends):
+            code = rng.choice(CODES)
+            f.write(f'"{start}","{end}","{code}","{code}"\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--ranges', type=int, default=500000)
+    parser.add_argument('--lookups', type=int, default=20000)
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    rng = random.Random(17)
+    workdir = tempfile.mkdtemp(prefix='ewh-bench-geo-backends-')
+    csv_path = os.path.join(workdir, 'geoip.csv')
+    write_range_file(csv_path, args.ranges, rng)
+    addresses = [str(ipaddress.ip_address(rng.randint(16777216, 3758096383))) for _ in range(args.lookups)]
+
+    tracemalloc.start()
+    RangeFileBackend(csv_path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    backend = RangeFileBackend(csv_path)  # timed without tracemalloc's overhead
+    resident = sum(part.buffer_info()[1] * part.itemsize if hasattr(part, 'buffer_info') else sys.getsizeof(part)
+                   for part in backend._v4 + backend._v6)
+
+    started = time.perf_counter()
+    hits = sum(1 for ip in addresses if backend.lookup(ip))
+    bisect_us = (time.perf_counter() - started) / len(addresses) * 1e6
+
+    db = PlayerDatabase(os.path.join(workdir, 'cache', 'players.db'))
+    with db.pool.connection() as conn:
+        now = time.time()
+        conn.executemany("INSERT OR REPLACE INTO geo_cache (ip_address, country, resolved, expires_at, updated_at) "
+                         "VALUES (?, ?, 1, ?, '')", [(ip, backend.lookup(ip), now + 3600) for ip in addresses])
+        conn.commit()
+        started = time.perf_counter()
+        for ip in addresses:
+            conn.execute("SELECT country FROM geo_cache WHERE expires_at > ? AND ip_address = ?",
+                         (now, ip)).fetchone()
+        cache_us = (time.perf_counter() - started) / len(addresses) * 1e6
+    db.pool.close_all()
+
+    print(f"{backend.range_count:,} ranges, {args.lookups:,} random lookups\n")
+    print(f"load:          {backend.load_seconds:6.2f} s, {resident / 2**20:.1f} MiB in arrays "
+          f"(peak {peak / 2**20:.1f} MiB while parsing)")
+    print(f"bisect lookup: {bisect_us:6.2f} us/address ({hits:,} hits)")
+    print(f"geo_cache:     {cache_us:6.2f} us/address (indexed SELECT, warm)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark player syncs with background geolocation against the fake ip-api server.
+
+A full sync of N players on addresses never seen before is timed (the sync no
+longer waits for lookups), then the time until every country has been
+backfilled and the number of HTTP requests it took. A second database instance
+on the same file (a restart) then syncs new players on the same addresses,
+which must be answered from geo_cache without any request.
+
+For comparison, the old inline lookup did one GET per address, spaced at least
+1 s apart, inside the sync: its cost is estimated from one measured GET.
+
+Usage (from the empyrion-web-helper directory):
+    python3 benchmarks/bench_geo_resolver.py [--players 250] [--latency 0.05]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import PlayerDatabase
+from db_pool import get_pool
+from geo_backends import IpApiBackend, classify_local
+from fake_geoip_server import FakeGeoIpServer
+
+
+def public_addresses(count: int, rng: random.Random):
+    addresses = set()
+    while len(addresses) < count:
+        ip = '.'.join(str(rng.randint(1, 223)) for _ in range(4))
+        if classify_local(ip) is None:
+            addresses.add(ip)
+    return sorted(addresses)
+
+
+def make_players(addresses, first_id: int):
+    return [{'steam_id': str(76561198000000000 + first_id + i), 'name': f"Pilot{first_id + i}", 'status': 'Online',
+             'faction': '', 'playfield': 'Akua', 'ip_address': ip} for i, ip in enumerate(addresses)]
+
+
+def open_db(db_path: str, api_url: str) -> PlayerDatabase:
+    db = PlayerDatabase(db_path)
+    db.set_app_setting('geoip_api_url', api_url)
+    db.geo_resolver.remote_backend = IpApiBackend(api_url)
+    return db
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--players', type=int, default=250)
+    parser.add_argument('--latency', type=float, default=0.05, help='fake ip-api reply latency in seconds')
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    workdir = tempfile.mkdtemp(prefix='ewh-bench-geo-')
+    os.chdir(workdir)
+    db_path = os.path.join(workdir, 'players.db')
+    addresses = public_addresses(args.players, random.Random(11))
+
+    with FakeGeoIpServer(latency=args.latency) as server:
+        started = time.perf_counter()
+        requests.get(f"http://127.0.0.1:{server.port}/json/{addresses[0]}", timeout=5)
+        single_get = time.perf_counter() - started
+        server.requests_served = server.addresses_served = 0
+
+        db = open_db(db_path, server.batch_url)
+        started = time.perf_counter()
+        db.update_multiple_players(make_players(addresses, 0))
+        sync_ms = (time.perf_counter() - started) * 1000
+        db.geo_resolver.wait_idle(timeout=120)
+        backfill_s = time.perf_counter() - started
+        missing = sum(1 for p in db.get_all_players() if not p['country'])
+        cold_requests = server.requests_served
+
+        # Restart: fresh resolver, same file; new players on already known addresses
+        db.geo_resolver.stop()
+        get_pool(db_path).close_all()
+        db = open_db(db_path, server.batch_url)
+        started = time.perf_counter()
+        db.update_multiple_players(make_players(addresses, args.players))
+        warm_ms = (time.perf_counter() - started) * 1000
+        db.geo_resolver.wait_idle(timeout=30)
+        warm_missing = sum(1 for p in db.get_all_players() if not p['country'])
+        warm_requests = server.requests_served - cold_requests
+        db.geo_resolver.stop()
+
+    inline_s = args.players * (1.0 + single_get)
+    print(f"{args.players} new addresses, fake ip-api latency {args.latency * 1000:.0f} ms\n")
+    print(f"cold sync:     {sync_ms:8.1f} ms blocking, all countries after {backfill_s:.1f} s, "
+          f"{cold_requests} request(s), {missing} player(s) without country")
+    print(f"after restart: {warm_ms:8.1f} ms blocking, {warm_requests} request(s), "
+          f"{warm_missing} player(s) without country")
+    print(f"old inline:    ~{inline_s:,.0f} s blocking the monitor cycle ({args.players} GETs, 1 s apart)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark playfield name matching: the old fuzzy scan versus PlayfieldIndex.
+
+Builds E entity playfields and P running playfields named the way 'servers'
+reports them (a third exact, a third with the entity name carrying
+" (loaded)" or a number, a third with no entities at all), then times the
+matching behind /api/test/active-playfields: the per-playfield scan of every
+entity playfield with re.sub that the route used to do (its logging
+switched off), and PlayfieldIndex build plus lookups. Every playfield the
+scan matched must resolve to the same entry through the index.
+
+Usage (from the empyrion-web-helper directory):
+    python3 benchmarks/bench_playfield_index.py [--entity-playfields 200 2000 20000] [--active 100]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playfield_index import PlayfieldIndex
+
+WORDS = ['Akua', 'Omicron', 'Ningues', 'Zeyhines', 'Masperon', 'Skillon', 'Aitis', 'Oscutune',
+         'Tallodar', 'Roggery', 'Alpha', 'Orbit', 'Moon', 'Station', 'Nebula', 'Rift']
+
+
+def legacy_match(name, playfield_stats):
+    """Matching as the active-playfields route did it, without the per-comparison logging."""
+    stats = playfield_stats.get(name)
+    if stats is None:
+        stats = playfield_stats.get(f"{name} (loaded)")
+    if stats is None or stats['total_count'] == 0:
+        normalized = re.sub(r'\s*\d+\s*', ' ', name).strip()
+        for db_playfield, db_stats in playfield_stats.items():
+            normalized_db = re.sub(r'\s*\d+\s*', ' ', db_playfield).strip()
+            if normalized.lower() == normalized_db.lower():
+                stats = db_stats
+                break
+            elif normalized.lower() in normalized_db.lower() or normalized_db.lower() in normalized.lower():
+                stats = db_stats
+                break
+    return stats
+
+
+def build(entity_playfields: int, active: int, rng: random.Random):
+    # Distinct four-word names, so names do not collide once their numbers are dropped
+    bases = set()
+    while len(bases) < entity_playfields:
+        bases.add(' '.join(rng.sample(WORDS, 4)))
+    names = [f"{base} {rng.randint(1, 9999)}" for base in sorted(bases)]
+    rng.shuffle(names)
+    stats = {}
+    for index, name in enumerate(names):
+        stored = f"{name} (loaded)" if index % 2 else name
+        stats[stored] = {'npc_count': 1, 'player_count': 0, 'neutral_count': 0, 'total_count': 1}
+    servers = []
+    for index in range(active):
+        source = rng.choice(names)
+        servers.append((source, source.rsplit(' ', 1)[0] + ' Prime', f"Unknown Sector {index}")[index % 3])
+    return stats, servers
+
+
+def best_of(action, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = action()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--entity-playfields', type=int, nargs='+', default=[200, 2000, 20000])
+    parser.add_argument('--active', type=int, default=100)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    print(f"{args.active} active playfields\n")
+    print(f"{'entity playfields':>17} {'scan ms':>9} {'build ms':>9} {'lookup ms':>10}  matched (scan -> index)")
+    for size in args.entity_playfields:
+        stats, servers = build(size, args.active, rng)
+        scan_ms, expected = best_of(lambda: [legacy_match(name, stats) for name in servers])
+        build_ms, index = best_of(lambda: PlayfieldIndex(stats.items()))
+        lookup_ms, found = best_of(lambda: [index.lookup(name) for name in servers])
+        # Whatever the scan matched the index matches too; it also strips " (loaded)"
+        # before partial matching, which the scan did not
+        assert all(new is old for old, new in zip(expected, found) if old is not None)
+        print(f"{size:>17,} {scan_ms:>9.1f} {build_ms:>9.1f} {lookup_ms:>10.2f} "
+              f"{sum(1 for s in expected if s):>4} -> {sum(1 for s in found if s)}")
+
+
+if __name__ == '__main__':
+    main()
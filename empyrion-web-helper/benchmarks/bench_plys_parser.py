@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for PlysParser over synthetic 'plys' dumps.
+
+Builds replies with 1k, 10k and 100k entries in the global players list (plus a
+connected/online section the size of a busy server) and times a full parse.
+
+Usage (from the empyrion-web-helper directory):
+    python3 benchmarks/bench_plys_parser.py [--sizes 1000 10000 100000] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plys_parser import PlysParser
+
+NAMES = ['Nova', 'Jin', 'Orbit Rat', 'Hale', 'Wren', 'Ash Fenwick', 'Dusk', 'Vega', 'Kaelen', 'Tyr', 'Rook', 'Cinder']
+FACTIONS = ['TRD', 'SCB', 'Zrx', 'Pub', '1043', 'NoF']
+ROLES = ['Member', 'Owner', 'Admin']
+PLAYFIELDS = ['Akua', 'Akua Orbit', 'Omicron', 'Omicron Orbit', 'Ningues', 'Masperon', 'Skillon Moon', 'Aitis']
+
+
+def build_plys(total: int, connected: int, seed: int = 1) -> str:
+    """
+    Build a synthetic 'plys' reply.
+
+    Args:
+        total (int): Entries in the global players list.
+        connected (int): Players in the connected and global online sections.
+        seed (int, optional): Random seed so runs are comparable.
+
+    Returns:
+        str: Reply text in the server's format.
+    """
+    rng = random.Random(seed)
+    players = [(str(76561198000000000 + i), f"{rng.choice(NAMES)}_{i}") for i in range(total)]
+    online = players[:connected]
+
+    lines = [f"Players connected ({connected}):", "C-Id: SteamId, Name, Playfield, IP|Port"]
+    for index, (steam_id, name) in enumerate(online, 1):
+        lines.append(f"  {index}: {steam_id}, {name}, {rng.choice(PLAYFIELDS)}, "
+                     f"203.0.113.{rng.randint(1, 254)}|{rng.randint(30000, 60000)}")
+    lines.append(f"Global online players list ({connected}):")
+    for steam_id, name in online:
+        lines.append(f"  id={steam_id} name={name} fac=[{rng.choice(FACTIONS)}] role={rng.choice(ROLES)}")
+    lines.append(f"Global players list ({total}):")
+    for steam_id, name in players:
+        lines.append(f"  id={steam_id} name={name} fac=[{rng.choice(FACTIONS)}] role={rng.choice(ROLES)} "
+                     f"online={rng.randint(0, 1000000)}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    plys = PlysParser()
+    print(f"{'players':>8} {'bytes':>10} {'mean ms':>10} {'min ms':>10} {'lines/s':>12}")
+    for size in args.sizes:
+        reply = build_plys(size, connected=min(size, 100))
+        line_count = reply.count('\n') + 1
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            result = plys.parse(reply)
+            timings.append(time.perf_counter() - started)
+        assert len(result) == size, f"expected {size} players, got {len(result)}"
+        print(f"{size:>8} {len(reply):>10} {statistics.mean(timings) * 1000:>10.1f} "
+              f"{min(timings) * 1000:>10.1f} {line_count / min(timings):>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark RCON connect latency with and without the cached auth method.
+
+The fake server is started in username + password mode, so a cold connect has to
+probe its way through the earlier auth methods before one succeeds. A warm connect
+reads the winning method from the settings store and tries it first.
+
+Usage (from the empyrion-web-helper directory):
+    python3 benchmarks/bench_rcon_connect.py [--iterations 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connection import EmpyrionConnection
+from latency_histogram import LatencyHistogram
+from fake_rcon_server import FakeRconServer
+
+
+class MemorySettings:
+    """In-memory stand-in for PlayerDatabase.get/set_app_setting."""
+
+    def __init__(self):
+        self.values = {}
+
+    def get_app_setting(self, key, default=None):
+        return self.values.get(key, default)
+
+    def set_app_setting(self, key, value):
+        self.values[key] = value
+        return True
+
+
+def run(server: FakeRconServer, settings, iterations: int) -> LatencyHistogram:
+    """Connect and disconnect repeatedly, recording connect latency."""
+    histogram = LatencyHistogram()
+    for _ in range(iterations):
+        conn = EmpyrionConnection('127.0.0.1', server.port, server.password, timeout=10,
+                                  settings_store=settings)
+        started = time.monotonic()
+        if conn.connect() is not True:
+            raise RuntimeError("Could not connect to fake server")
+        histogram.record(time.monotonic() - started)
+        conn.disconnect()
+    return histogram
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--iterations', type=int, default=3)
+    args = parser.parse_args()
+
+    with FakeRconServer(username='rcon') as server:
+        cold = run(server, None, args.iterations)
+        settings = MemorySettings()
+        run(server, settings, 1)  # Populate the cache
+        warm = run(server, settings, args.iterations)
+
+    print(f"{'auth cache':<12} {'mean ms':>10} {'p95 ms':>10} {'max ms':>10}")
+    for label, histogram in (('cold', cold), ('cached', warm)):
+        stats = histogram.snapshot()
+        print(f"{label:<12} {stats['mean_ms']:>10.1f} {stats['p95_ms']:>10.1f} {stats['max_ms']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
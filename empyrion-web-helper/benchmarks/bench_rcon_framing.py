@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark RCON reply framing against the fake telnet server.
+
+Compares legacy sleep-and-drain reads with sentinel framing for the 'plys' and
+'gents' replies (plus the short 'help' reply): per-command latency and whether the full reply was received.
+
+Usage (from the empyrion-web-helper directory):
+    python3 benchmarks/bench_rcon_framing.py [--iterations 20]
+"""
+
+import argparse
+import math
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connection import EmpyrionConnection
+from fake_rcon_server import FakeRconServer
+
+
+def _expected_lines(reply: str) -> int:
+    return len([line for line in reply.strip().split('\n') if line.strip()])
+
+
+def run_mode(server: FakeRconServer, framing: str, commands, iterations: int) -> dict:
+    """Connect with the given framing and time each command."""
+    conn = EmpyrionConnection('127.0.0.1', server.port, server.password, timeout=10, framing=framing)
+    if conn.connect() is not True:
+        raise RuntimeError(f"Could not connect with framing={framing}")
+
+    results = {}
+    try:
+        for command in commands:
+            expected = _expected_lines(server.fixtures[command])
+            latencies = []
+            complete = 0
+            for _ in range(iterations):
+                started = time.perf_counter()
+                reply = conn.send_command(command, timeout=10.0) or ''
+                latencies.append((time.perf_counter() - started) * 1000)
+                if _expected_lines(reply) == expected:
+                    complete += 1
+            latencies.sort()
+            results[command] = {
+                'mean_ms': statistics.mean(latencies),
+                'p95_ms': latencies[math.ceil(len(latencies) * 0.95) - 1],
+                'complete': complete,
+            }
+    finally:
+        conn.disconnect()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--burst-delay', type=float, default=0.15,
+                        help='Pause between reply bursts on the fake server (seconds)')
+    args = parser.parse_args()
+
+    commands = ['help', 'plys', 'gents']
+    with FakeRconServer(burst_delay=args.burst_delay) as server:
+        print(f"{'framing':<10} {'command':<8} {'mean ms':>10} {'p95 ms':>10} {'complete':>10}")
+        for framing in ('drain', 'sentinel'):
+            for command, row in run_mode(server, framing, commands, args.iterations).items():
+                print(f"{framing:<10} {command:<8} {row['mean_ms']:>10.1f} {row['p95_ms']:>10.1f} "
+                      f"{row['complete']:>5}/{args.iterations}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark session tracking: monitor writes with sessions, and rollup reads versus raw scans.
+
+Simulates D days of monitor cycles for a pool of P players (random joins and
+leaves every 5 minutes) through apply_player_changes, so sessions are opened,
+closed and rolled up the way the monitor does it. Then times the all-time
+leaderboard and a 30-day daily concurrency series from the rollups against the
+same answers computed by scanning player_sessions.
+
+Usage (from the empyrion-web-helper directory):
+    python3 benchmarks/bench_sessions.py [--players 2000] [--days 60]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from database import PlayerDatabase
+
+
+class _Clock(datetime):
+    current = datetime(2026, 1, 1)
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--players', type=int, default=2000)
+    parser.add_argument('--days', type=int, default=60)
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    workdir = tempfile.mkdtemp(prefix='ewh-bench-sessions-')
+    os.chdir(workdir)
+    database.datetime = _Clock
+    db = PlayerDatabase(os.path.join(workdir, 'players.db'))
+    rng = random.Random(5)
+    players = [{'steam_id': str(76561198000000000 + i), 'name': f"Pilot{i}", 'status': 'Offline',
+                'faction': '', 'playfield': 'Akua', 'ip_address': '10.0.0.1'} for i in range(args.players)]
+    db.update_multiple_players(players)
+
+    online = set()
+    cycles = args.days * 24 * 12
+    started = time.perf_counter()
+    for _ in range(cycles):
+        _Clock.current += timedelta(minutes=5)
+        changed = []
+        for i in rng.sample(range(args.players), 6):
+            # Drift towards ~5% of the pool online
+            status = 'Offline' if i in online or rng.random() > 0.05 * args.players / max(1, len(online)) else 'Online'
+            (online.discard if status == 'Offline' else online.add)(i)
+            changed.append(dict(players[i], status=status))
+        db.apply_player_changes(changed, [])
+    write_ms = (time.perf_counter() - started) * 1000 / cycles
+
+    with db.pool.connection() as conn:
+        sessions = conn.execute("SELECT COUNT(*) FROM player_sessions").fetchone()[0]
+    end = _Clock.current
+    start = end - timedelta(days=29)
+
+    def timed(fn, repeat=20):
+        began = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return (time.perf_counter() - began) * 1000 / repeat
+
+    rollup_board = timed(lambda: db.get_playtime_leaderboard(20))
+    rollup_series = timed(lambda: db.get_concurrency(start.isoformat(), end.isoformat(), 'day'))
+    with db.pool.connection() as conn:
+        scan_board = timed(lambda: conn.execute(
+            "SELECT steam_id, SUM(strftime('%s', COALESCE(session_end, ?)) - strftime('%s', session_start)) AS s "
+            "FROM player_sessions GROUP BY steam_id ORDER BY s DESC LIMIT 20", (end.isoformat(),)).fetchall())
+        scan_series = timed(lambda: conn.execute(
+            "SELECT substr(session_start, 1, 10), SUM(strftime('%s', COALESCE(session_end, ?)) "
+            "- strftime('%s', session_start)) FROM player_sessions WHERE session_start >= ? GROUP BY 1",
+            (end.isoformat(), start.isoformat())).fetchall())
+
+    print(f"{args.players} players, {args.days} days, {cycles:,} monitor cycles, {sessions:,} sessions\n")
+    print(f"write with session sync: {write_ms:6.2f} ms per cycle")
+    print(f"leaderboard:  rollup {rollup_board:6.2f} ms   raw scan {scan_board:7.2f} ms")
+    print(f"30-day curve: rollup {rollup_series:6.2f} ms   raw scan {scan_series:7.2f} ms "
+          f"(the scan does not even split sessions at midnight)")
+
+
+if __name__ == '__main__':
+    main()
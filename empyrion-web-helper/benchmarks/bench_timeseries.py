@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark the metrics store: write cost, disk size and range reads.
+
+Feeds D days of samples ending now (one per monitor cycle of C seconds for
+players.online and rcon.latency_ms, one entities.total per 10 minutes) into a
+fresh metrics database in FLUSH_INTERVAL-sized batches, prunes, and reports
+the file size, the average flush time and the time to read a 6 hour, 7 day
+and full-range series (each from the tier choose_tier picks).
+
+Usage (from the empyrion-web-helper directory):
+    python3 benchmarks/bench_timeseries.py [--days 30] [--cycle 10]
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from timeseries import MetricsStore, FLUSH_INTERVAL
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--cycle', type=int, default=10, help='seconds between monitor cycles')
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    workdir = tempfile.mkdtemp(prefix='ewh-bench-timeseries-')
+    store = MetricsStore(os.path.join(workdir, 'metrics.db'))
+    rng = random.Random(3)
+    now = int(time.time())
+    start = now - args.days * 86400
+
+    flushes, flush_seconds, samples = 0, 0.0, 0
+    for ts in range(start, now, args.cycle):
+        hour = (ts % 86400) / 3600
+        online = max(0, round(12 + 10 * math.sin((hour - 14) / 24 * 2 * math.pi) + rng.gauss(0, 2)))
+        store.record('default', 'players.online', online, ts)
+        store.record('default', 'rcon.latency_ms', round(rng.lognormvariate(3.5, 0.4), 1), ts)
+        samples += 2
+        if ts % 600 < args.cycle:
+            store.record('default', 'entities.total', 4000 + rng.randint(-50, 50), ts)
+            samples += 1
+        if ts % FLUSH_INTERVAL < args.cycle:
+            began = time.perf_counter()
+            store.flush()
+            flush_seconds += time.perf_counter() - began
+            flushes += 1
+    store.flush()
+    with store.pool.connection() as conn:
+        store._prune(conn)
+    with store.pool.connection() as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    status = store.get_status()
+
+    print(f"{args.days} days, one cycle per {args.cycle} s: {samples:,} samples in {flushes:,} flushes\n")
+    print(f"flush:  {flush_seconds / flushes * 1000:6.2f} ms per {FLUSH_INTERVAL} s batch")
+    print(f"disk:   {status['file_bytes'] / 2**20:6.2f} MiB after retention "
+          f"({status['raw_rows']:,} raw rows, {status['rollup_rows']:,} rollup rows)")
+    for label, seconds in (('6 hours', 6 * 3600), ('7 days', 7 * 86400), (f"{args.days} days", args.days * 86400)):
+        began = time.perf_counter()
+        result = store.range('default', ['players.online', 'rcon.latency_ms'], now - seconds, now)
+        elapsed = (time.perf_counter() - began) * 1000
+        points = len(result['series']['players.online'])
+        print(f"read {label:>8}: {elapsed:6.2f} ms, tier {result['tier']:>3}, {points:,} points per series")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Fake ip-api.com server for local benchmarks and smoke tests.
+
+Answers POST /batch (list of addresses, the endpoint GeoResolver uses) and
+GET /json/<ip> (the old single lookup) with a country derived from the first
+octet, so results are deterministic. Addresses listed in `invalid` fail with
+'invalid query'. Sends ip-api's X-Rl / X-Ttl rate limit headers and answers
+429 once the per-window budget is used up; `down = True` makes it answer 503.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterable, Optional
+
+COUNTRIES = ['Germany', 'Netherlands', 'United States', 'France', 'Canada', 'Sweden', 'Japan', 'Brazil']
+
+
+def country_for(ip_address: str) -> str:
+    """Deterministic fake country for an address."""
+    first = ip_address.split('.', 1)[0].split(':', 1)[0]
+    return COUNTRIES[int(first) % len(COUNTRIES)] if first.isdigit() else COUNTRIES[0]
+
+
+class _GeoHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _answer(self, ip_address: str) -> dict:
+        if ip_address in self.server.invalid:
+            return {'status': 'fail', 'message': 'invalid query', 'query': ip_address}
+        return {'status': 'success', 'country': country_for(ip_address), 'query': ip_address}
+
+    def _reply(self, status: int, payload):
+        server = self.server
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-Rl', str(max(0, server.requests_per_window - server.window_requests)))
+        self.send_header('X-Ttl', str(max(0, int(server.window_end - time.monotonic()))))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _admit(self) -> bool:
+        """Count the request against the rate limit window; False if it must be refused."""
+        server = self.server
+        with server.lock:
+            now = time.monotonic()
+            if now >= server.window_end:
+                server.window_end = now + server.window
+                server.window_requests = 0
+            server.window_requests += 1
+            server.requests_served += 1
+            return server.window_requests <= server.requests_per_window
+
+    def do_POST(self):
+        server = self.server
+        admitted = self._admit()
+        length = int(self.headers.get('Content-Length', 0))
+        addresses = json.loads(self.rfile.read(length) or b'[]')
+        time.sleep(server.latency)
+        if server.down:
+            self._reply(503, {'message': 'service unavailable'})
+        elif not admitted:
+            self._reply(429, {'message': 'too many requests'})
+        elif not self.path.startswith('/batch') or len(addresses) > 100:
+            self._reply(422, {'message': 'bad batch'})
+        else:
+            server.addresses_served += len(addresses)
+            self._reply(200, [self._answer(a if isinstance(a, str) else a.get('query', '')) for a in addresses])
+
+    def do_GET(self):
+        server = self.server
+        admitted = self._admit()
+        time.sleep(server.latency)
+        if server.down:
+            self._reply(503, {'message': 'service unavailable'})
+        elif not admitted:
+            self._reply(429, {'message': 'too many requests'})
+        elif self.path.startswith('/json/'):
+            server.addresses_served += 1
+            self._reply(200, self._answer(self.path[len('/json/'):].split('?', 1)[0]))
+        else:
+            self._reply(404, {'message': 'not found'})
+
+
+class FakeGeoIpServer(ThreadingHTTPServer):
+    """
+    Threaded fake ip-api server bound to localhost.
+
+    Use as a context manager; point GeoResolver at .batch_url.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, latency: float = 0.05, requests_per_window: int = 15, window: float = 60.0,
+                 invalid: Optional[Iterable[str]] = None, port: int = 0):
+        """
+        Initialize the fake server.
+
+        Args:
+            latency (float, optional): Seconds before each reply. Defaults to 0.05.
+            requests_per_window (int, optional): Requests allowed per window (ip-api: 15 batch/min).
+            window (float, optional): Rate limit window in seconds. Defaults to 60.
+            invalid (Iterable[str], optional): Addresses answered with 'invalid query'.
+            port (int, optional): Port to bind, 0 for an ephemeral port.
+        """
+        super().__init__(('127.0.0.1', port), _GeoHandler)
+        self.latency = latency
+        self.requests_per_window = requests_per_window
+        self.window = window
+        self.invalid = set(invalid or ())
+        self.down = False
+        self.lock = threading.Lock()
+        self.window_end = 0.0
+        self.window_requests = 0
+        self.requests_served = 0
+        self.addresses_served = 0
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    @property
+    def batch_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/batch"
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True, name="FakeGeoIpServer")
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == '__main__':
+    with FakeGeoIpServer(port=30080) as server:
+        print(f"Fake ip-api server at {server.batch_url}; set the 'geoip_api_url' app setting to use it. Ctrl+C to stop")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
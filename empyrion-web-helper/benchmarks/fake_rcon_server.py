@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Fake Empyrion telnet/RCON server for local benchmarks.
+
+Replays canned command output (benchmarks/fixtures, in the server's reply format),
+splitting large replies into several bursts like a real server under load. Unknown
+commands (including the sentinel lines used by reply framing) are echoed back.
+"""
+
+import os
+import socket
+import socketserver
+import threading
+import time
+from typing import Dict, Optional
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def load_fixtures(fixtures_dir: str = FIXTURES_DIR) -> Dict[str, str]:
+    """
+    Load canned replies keyed by command name (fixture file name without extension).
+
+    Args:
+        fixtures_dir (str, optional): Directory containing <command>.txt files.
+
+    Returns:
+        Dict[str, str]: Mapping of command to reply text.
+    """
+    fixtures = {}
+    for filename in os.listdir(fixtures_dir):
+        if filename.endswith('.txt'):
+            with open(os.path.join(fixtures_dir, filename), 'r', encoding='utf-8') as f:
+                fixtures[filename[:-4]] = f.read()
+    return fixtures
+
+
+class _RconHandler(socketserver.StreamRequestHandler):
+    """Serve one telnet session: (username and) password login, then one reply per command line."""
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle(self):
+        server = self.server
+        self.wfile.write(b"Empyrion Dedicated Server - Telnet\r\nPlease enter password:\r\n")
+        authenticated = False
+        username_ok = not server.username
+
+        for raw_line in self.rfile:
+            line = raw_line.decode('utf-8', errors='ignore').strip()
+            if not line:
+                continue
+
+            if not authenticated:
+                if not username_ok:
+                    username_ok = line == server.username
+                    self.wfile.write(b"Password:\r\n" if username_ok else b"Unknown user\r\n")
+                elif line == server.password:
+                    authenticated = True
+                    self.wfile.write(b"Logged in successfully\r\n")
+                else:
+                    username_ok = not server.username
+                    self.wfile.write(b"Wrong password\r\n")
+                continue
+
+            server.commands_served += 1
+            reply = server.fixtures.get(line.split(' ', 1)[0])
+            if reply is None:
+                self.wfile.write(f"Unknown command: '{line}'\r\n".encode('utf-8'))
+                continue
+
+            try:
+                self._send_in_bursts(reply.encode('utf-8'))
+            except (BrokenPipeError, ConnectionResetError):
+                return
+
+    def _send_in_bursts(self, payload: bytes):
+        server = self.server
+        time.sleep(server.reply_delay)
+        for offset in range(0, len(payload), server.burst_size):
+            if offset:
+                time.sleep(server.burst_delay)
+            self.wfile.write(payload[offset:offset + server.burst_size])
+            self.wfile.flush()
+
+
+class FakeRconServer(socketserver.ThreadingTCPServer):
+    """
+    Threaded fake RCON server bound to localhost.
+
+    Use as a context manager; the chosen port is available as .port.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, password: str = 'secret', fixtures: Optional[Dict[str, str]] = None,
+                 burst_size: int = 16384, burst_delay: float = 0.15, reply_delay: float = 0.005,
+                 port: int = 0, username: Optional[str] = None):
+        """
+        Initialize the fake server.
+
+        Args:
+            password (str, optional): Password accepted at login. Defaults to 'secret'.
+            fixtures (Dict[str, str], optional): Command replies. Defaults to the fixtures directory.
+            burst_size (int, optional): Bytes written per burst. Defaults to 16384.
+            burst_delay (float, optional): Pause between bursts in seconds. Defaults to 0.15.
+            reply_delay (float, optional): Server think time before replying. Defaults to 0.005.
+            port (int, optional): Port to bind, 0 for an ephemeral port.
+            username (str, optional): If set, login asks for this username before the password.
+        """
+        super().__init__(('127.0.0.1', port), _RconHandler)
+        self.password = password
+        self.username = username
+        self.fixtures = fixtures if fixtures is not None else load_fixtures()
+        self.burst_size = burst_size
+        self.burst_delay = burst_delay
+        self.reply_delay = reply_delay
+        self.commands_served = 0
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True, name="FakeRconServer")
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == '__main__':
+    with FakeRconServer(port=30004) as server:
+        print(f"Fake RCON server listening on 127.0.0.1:{server.port} (password 'secret'), Ctrl+C to stop")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Circuit breaker for Empyrion Web Helper server connections
+
+Tracks whether a game server is worth talking to. After repeated connection
+failures the circuit opens and no attempts are made until a jittered,
+exponentially growing delay has passed; then a single trial attempt is allowed
+(half-open). A successful trial closes the circuit, a failed one re-opens it
+with a longer delay.
+"""
+
+import random
+import threading
+import time
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+DEFAULT_FAILURE_THRESHOLD = 2   # consecutive failures before the circuit opens
+DEFAULT_BASE_DELAY = 5.0        # seconds the circuit stays open the first time
+DEFAULT_MAX_DELAY = 300.0       # 5 minutes max delay
+DEFAULT_JITTER = 0.5            # open delay is drawn from [delay * (1 - jitter), delay]
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker with jittered exponential backoff.
+
+    Thread-safe: the monitor worker records results while web routes ask whether
+    the server can be used.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 base_delay: float = DEFAULT_BASE_DELAY, max_delay: float = DEFAULT_MAX_DELAY,
+                 jitter: float = DEFAULT_JITTER, clock: Callable[[], float] = time.monotonic,
+                 rng: Callable[[], float] = random.random):
+        """
+        Initialize the CircuitBreaker.
+
+        Args:
+            name (str): Name used in log messages (e.g. the server id).
+            failure_threshold (int, optional): Consecutive failures that open the circuit.
+            base_delay (float, optional): Open delay after the first trip, in seconds.
+            max_delay (float, optional): Upper bound for the open delay, in seconds.
+            jitter (float, optional): Fraction of the delay that is randomized (0 disables jitter).
+            clock (Callable[[], float], optional): Monotonic clock, replaceable for benchmarks.
+            rng (Callable[[], float], optional): Random source in [0, 1).
+        """
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.base_delay = float(base_delay)
+        self.max_delay = max(float(max_delay), self.base_delay)
+        self.jitter = min(max(float(jitter), 0.0), 1.0)
+        self._clock = clock
+        self._rng = rng
+        self._lock = threading.Lock()
+
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.trips = 0               # consecutive times the circuit opened without a success in between
+        self.next_retry_at = 0.0     # clock() time when an open circuit allows a trial
+        self.opened_at = None
+        self.last_failure = None
+        self.rejected = 0            # requests refused while open
+
+    def allow_request(self) -> bool:
+        """
+        Ask whether a connection attempt may be made now.
+
+        An open circuit whose delay has passed moves to half-open and lets exactly
+        one caller through; everybody else is refused until that trial reports back.
+
+        Returns:
+            bool: True if the caller may try the server.
+        """
+        with self._lock:
+            if self.state == STATE_CLOSED:
+                return True
+            if self.state == STATE_OPEN and self._clock() >= self.next_retry_at:
+                self.state = STATE_HALF_OPEN
+                logger.info(f"🔁 [{self.name}] Circuit half-open, allowing a trial connection")
+                return True
+            self.rejected += 1
+            return False
+
+    def is_open(self) -> bool:
+        """True while callers should fail fast (open, or half-open with a trial in progress)."""
+        with self._lock:
+            return self.state != STATE_CLOSED
+
+    def record_success(self):
+        """Report a successful connection or command; closes the circuit."""
+        with self._lock:
+            if self.state != STATE_CLOSED:
+                logger.info(f"✅ [{self.name}] Circuit closed after {self.trips} trip(s)")
+            self.state = STATE_CLOSED
+            self.consecutive_failures = 0
+            self.trips = 0
+            self.opened_at = None
+
+    def reset(self):
+        """Close the circuit and forget past failures (e.g. after the server's settings changed)."""
+        with self._lock:
+            self.state = STATE_CLOSED
+            self.consecutive_failures = 0
+            self.trips = 0
+            self.opened_at = None
+            self.last_failure = None
+
+    def record_failure(self, reason: str = '') -> float:
+        """
+        Report a failed attempt; may open (or re-open) the circuit.
+
+        Args:
+            reason (str, optional): Short description for /status.
+
+        Returns:
+            float: Seconds until the next attempt is allowed (0 if the circuit is still closed).
+        """
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_failure = reason or None
+            if self.state == STATE_CLOSED and self.consecutive_failures < self.failure_threshold:
+                return 0.0
+
+            self.trips += 1
+            delay = self._open_delay(self.trips)
+            self.state = STATE_OPEN
+            self.opened_at = datetime.now().isoformat()
+            self.next_retry_at = self._clock() + delay
+            logger.warning(f"⛔ [{self.name}] Circuit open after {self.consecutive_failures} failure(s); "
+                           f"next attempt in {delay:.1f}s")
+            return delay
+
+    def _open_delay(self, trips: int) -> float:
+        delay = min(self.base_delay * (2 ** min(trips - 1, 16)), self.max_delay)
+        # Spread retries so several helpers (or servers) don't reconnect in lockstep
+        return delay * (1.0 - self.jitter * self._rng())
+
+    def retry_in(self) -> float:
+        """Seconds until an open circuit allows a trial (0 if closed or already due)."""
+        with self._lock:
+            if self.state != STATE_OPEN:
+                return 0.0
+            return max(0.0, self.next_retry_at - self._clock())
+
+    def get_status(self) -> Dict:
+        """
+        Get the breaker state for the status page.
+
+        Returns:
+            dict: State, failure counters and next retry time.
+        """
+        with self._lock:
+            retry_in = max(0.0, self.next_retry_at - self._clock()) if self.state == STATE_OPEN else 0.0
+            next_retry: Optional[str] = None
+            if self.state == STATE_OPEN:
+                next_retry = (datetime.now() + timedelta(seconds=retry_in)).isoformat()
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'trips': self.trips,
+                'opened_at': self.opened_at,
+                'next_retry_at': next_retry,
+                'retry_in': round(retry_in, 1),
+                'last_failure': self.last_failure,
+                'rejected': self.rejected
+            }
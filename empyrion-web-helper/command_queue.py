@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+RCON command queue for Empyrion Web Helper
+
+Owns the RCON socket from a single I/O thread so the monitor loop, web routes and
+messaging can all send commands at once without interleaving replies. Commands are
+tagged with the connection's sentinel tokens, which lets several of them be written
+in one go (pipelined) and each reply be matched back to its caller's future.
+"""
+
+import queue
+import threading
+import time
+import logging
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Extra time a caller waits on top of its command timeout for commands queued ahead of it
+QUEUE_WAIT_GRACE = 30.0
+
+
+class QueuedCommand:
+    """A command waiting for (or being processed by) the I/O thread."""
+
+    __slots__ = ('command', 'timeout', 'future', 'token', 'submitted_at')
+
+    def __init__(self, command: str, timeout: float):
+        self.command = command
+        self.timeout = timeout
+        self.future = Future()
+        self.token = None
+        self.submitted_at = time.monotonic()
+
+
+class CommandQueue:
+    """
+    Serializes access to an EmpyrionConnection through one I/O thread.
+
+    Callers submit commands and get futures back. With sentinel framing up to
+    max_in_flight commands are pipelined per write; other framing modes fall back
+    to one command in flight.
+    """
+
+    def __init__(self, connection, max_in_flight: int = 8):
+        """
+        Initialize the CommandQueue.
+
+        Args:
+            connection (EmpyrionConnection): Authenticated connection whose socket the queue will own.
+            max_in_flight (int, optional): Maximum commands pipelined in one batch. Defaults to 8.
+        """
+        self.connection = connection
+        self.max_in_flight = max(1, max_in_flight)
+        self._queue = queue.Queue()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self._stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'batches': 0, 'max_batch': 0}
+
+    def start(self):
+        """Start the I/O thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._io_loop, daemon=True, name="RconIOThread")
+        self._thread.start()
+        logger.info(f"RCON command queue started (max {self.max_in_flight} in flight)")
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Stop the I/O thread and fail any commands still waiting.
+
+        Args:
+            timeout (float, optional): Seconds to wait for the I/O thread to exit. Defaults to 5.0.
+        """
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive() and not self.is_io_thread():
+            self._thread.join(timeout=timeout)
+        self._thread = None
+        self._fail_pending(ConnectionError("RCON command queue stopped"))
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._stop_event.is_set()
+
+    def is_io_thread(self) -> bool:
+        """Return True when called from the queue's own I/O thread."""
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, command: str, timeout: float = 5.0) -> Future:
+        """
+        Queue a command for the I/O thread.
+
+        Args:
+            command (str): Command string to send.
+            timeout (float, optional): Deadline for this command's reply. Defaults to 5.0.
+
+        Returns:
+            Future: Resolves to the reply (str or None); fails with ConnectionError if the socket breaks.
+        """
+        item = QueuedCommand(command, timeout)
+        if not self.is_running:
+            item.future.set_exception(ConnectionError("RCON command queue is not running"))
+            return item.future
+
+        with self._stats_lock:
+            self._stats['submitted'] += 1
+        self._queue.put(item)
+        return item.future
+
+    def send_command(self, command: str, timeout: float = 5.0) -> Optional[str]:
+        """
+        Submit a command and wait for its reply.
+
+        Args:
+            command (str): Command string to send.
+            timeout (float, optional): Deadline for this command's reply. Defaults to 5.0.
+
+        Returns:
+            Optional[str]: Reply text, or None if there was no reply.
+
+        Raises:
+            ConnectionError: If the connection failed while the command was queued or in flight.
+        """
+        return self.submit(command, timeout).result(timeout=timeout + QUEUE_WAIT_GRACE)
+
+    def get_stats(self) -> Dict:
+        """
+        Get queue counters for the status page.
+
+        Returns:
+            dict: Submitted/completed/failed counts, batch counts and current queue depth.
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['queued'] = self._queue.qsize()
+        return stats
+
+    # ------------------------------------------------------------------
+    # I/O thread
+    # ------------------------------------------------------------------
+
+    def _io_loop(self):
+        while not self._stop_event.is_set():
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            batch = [first]
+            if self.connection.framing == 'sentinel':
+                while len(batch) < self.max_in_flight:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+            try:
+                if len(batch) > 1:
+                    self._run_pipelined(batch)
+                else:
+                    self._run_single(first)
+            except Exception as e:
+                logger.error(f"RCON I/O error, failing {len(batch)} queued command(s): {e}", exc_info=True)
+                self.connection.is_connected = False
+                self._fail_batch(batch, ConnectionError(str(e)))
+
+            with self._stats_lock:
+                self._stats['batches'] += 1
+                self._stats['max_batch'] = max(self._stats['max_batch'], len(batch))
+
+        logger.info("RCON command queue stopped")
+
+    def _run_single(self, item: QueuedCommand):
+        response = self.connection._execute_command(item.command, item.timeout)
+        if isinstance(response, dict) and not response.get('success', True):
+            self._fail_batch([item], ConnectionError(response.get('message', 'Command failed')))
+        else:
+            self._complete(item, response)
+
+    def _run_pipelined(self, batch: List[QueuedCommand]):
+        conn = self.connection
+
+        # One write for the whole batch: each command followed by its own tag
+        payload = []
+        for item in batch:
+            item.token = conn._next_sentinel()
+            payload.append(f"{item.command}\n{item.token}\n")
+            logger.debug(f"Pipelining command: {item.command} ({item.token})")
+        conn._send_raw(''.join(payload))
+
+        for index, item in enumerate(batch):
+            # A reply cut short is skipped by the next frame read, so it is not attributed to this command
+            response, _ = conn._read_frame(item.token.encode('utf-8'), timeout=item.timeout)
+            if not conn.is_connected:
+                self._fail_batch(batch[index:], ConnectionError("Server closed the connection"))
+                return
+            self._complete(item, response or None)
+
+    def _complete(self, item: QueuedCommand, response):
+        if not item.future.done():
+            item.future.set_result(response)
+        with self._stats_lock:
+            self._stats['completed'] += 1
+
+    def _fail_batch(self, batch: List[QueuedCommand], error: Exception):
+        for item in batch:
+            if not item.future.done():
+                item.future.set_exception(error)
+        with self._stats_lock:
+            self._stats['failed'] += len(batch)
+
+    def _fail_pending(self, error: Exception):
+        pending = []
+        while True:
+            try:
+                pending.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if pending:
+            self._fail_batch(pending, error)
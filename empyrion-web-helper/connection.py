@@ -6,14 +6,262 @@ Phase 1: Connection + Player List Only
 Compatible with Python 3.13+ (no telnetlib dependency)
 """
 
+import select
 import socket
 import time
 import re
 import logging
+import itertools
 from typing import List, Dict, Optional
 
+from plys_parser import PlysParser
+
 logger = logging.getLogger(__name__)
 
+# Reply framing: every command is followed by a sentinel line the server
+# answers to, so the end of a reply can be detected without sleep-and-drain.
+FRAMING_MODES = ('auto', 'sentinel', 'prompt', 'drain')
+FRAME_SENTINEL_PREFIX = 'ewh-sync-'
+FRAME_SENTINEL_END = '.'  # ends every token, so ewh-sync-1. is never found inside ewh-sync-10.
+FRAME_MAX_BYTES = 8 * 1024 * 1024  # Hard cap on a single command reply
+FRAME_RECV_SIZE = 65536
+
+# Liveness: TCP keepalive catches dead peers, a non-blocking peek catches closed
+# sockets, and a command round trip is only needed after this much silence.
+# The monitor loop skips the round trip altogether (max_idle=None): its 'plys' poll
+# is the round trip, and the adaptive interval can be longer than this.
+LIVENESS_IDLE_THRESHOLD = 60.0  # seconds without any reply before is_connection_alive probes
+KEEPALIVE_IDLE = 30  # seconds idle before the kernel sends keepalive probes
+KEEPALIVE_INTERVAL = 10
+KEEPALIVE_COUNT = 3
+
+AUTH_METHOD_NAMES = ("standard", "direct_command", "username_password", "newline_only")
+
+
+class ReplyFramer:
+    """
+    Reply framing state shared by the blocking and asyncio RCON clients.
+
+    The clients do the reading and feed what arrives; scan() decides where the
+    current frame ends. Bytes read past the end of a frame are kept for the next
+    one. A frame cut short by the deadline or byte cap stays in unfinished, and
+    the next frame first drops the rest of it, through its own terminator line,
+    so a late reply is never handed to the command after it.
+    """
+
+    def __init__(self, max_reply_bytes: int = FRAME_MAX_BYTES):
+        """
+        Initialize the ReplyFramer.
+
+        Args:
+            max_reply_bytes (int, optional): Hard cap on the size of a single reply.
+        """
+        self.max_reply_bytes = max_reply_bytes
+        self.pending = bytearray()  # Bytes read past the end of the previous frame
+        self.unfinished = []  # (terminator, consume_line) of frames cut short, oldest first
+        self.skip_partial_line = False  # Set when a terminator line's tail has not arrived yet
+        self.buffer = bytearray()
+        self._skip = []
+        self._terminator = b''
+        self._consume_line = True
+        self._search_from = 0
+        self._complete = False
+
+    @property
+    def resync_needed(self) -> bool:
+        """True while the rest of a cut-short frame may still arrive."""
+        return bool(self.unfinished)
+
+    def reset(self):
+        """Forget leftover bytes and state, after draining the socket or disconnecting."""
+        self.pending = bytearray()
+        self.unfinished = []
+        self.skip_partial_line = False
+
+    def begin(self, terminator: bytes, consume_line: bool = True):
+        """
+        Start a frame, beginning with the bytes left over from the previous one.
+
+        Args:
+            terminator (bytes): Sentinel token or prompt marking the end of the reply.
+            consume_line (bool, optional): Also discard the rest of the terminator line, which
+                may arrive later. Use False for prompts that are not newline-terminated.
+        """
+        self.buffer = self.pending
+        self.pending = bytearray()
+        self._skip, self.unfinished = self.unfinished, []
+        self._terminator = terminator
+        self._consume_line = consume_line
+        self._search_from = 0
+        self._complete = False
+
+    def feed(self, chunk: bytes):
+        """Append bytes read from the server."""
+        self.buffer += chunk
+
+    def _line_end(self, index: int, terminator: bytes, consume_line: bool) -> int:
+        """Offset just past the terminator (line) at index; sets skip_partial_line if the line's tail is late."""
+        if not consume_line:
+            # A prompt: whatever follows it already belongs to the next reply
+            return index + len(terminator)
+        line_end = self.buffer.find(b'\n', index)
+        if line_end != -1:
+            return line_end + 1
+        self.skip_partial_line = True
+        return len(self.buffer)
+
+    def scan(self) -> bool:
+        """
+        Look for the end of the current frame in what has been fed so far.
+
+        Returns:
+            bool: True once the terminator line was found or max_reply_bytes was reached.
+        """
+        buffer = self.buffer
+        if self.skip_partial_line:
+            # Tail of an earlier terminator line arrived after that frame ended
+            newline = buffer.find(b'\n')
+            if newline != -1:
+                del buffer[:newline + 1]
+                self.skip_partial_line = False
+                self._search_from = 0
+        
+        while self._skip and not self.skip_partial_line:
+            # Late rest of a frame that was cut short; it belongs to no one
+            terminator, consume_line = self._skip[0]
+            index = buffer.find(terminator)
+            if index == -1:
+                # Keep only what could be the start of a split terminator
+                del buffer[:max(0, len(buffer) - len(terminator) + 1)]
+                return False
+            del buffer[:self._line_end(index, terminator, consume_line)]
+            self._skip.pop(0)
+            self._search_from = 0
+        
+        index = -1 if self.skip_partial_line else buffer.find(self._terminator, self._search_from)
+        if index != -1:
+            self._complete = True
+            line_start = buffer.rfind(b'\n', 0, index) + 1
+            self.pending = buffer[self._line_end(index, self._terminator, self._consume_line):]
+            del buffer[line_start:]
+            return True
+        
+        if len(buffer) >= self.max_reply_bytes:
+            logger.error(f"Reply exceeded {self.max_reply_bytes} bytes, truncating")
+            del buffer[self.max_reply_bytes:]
+            return True
+        
+        # Only rescan the tail that could contain a split terminator
+        self._search_from = max(0, len(buffer) - len(self._terminator) + 1)
+        return False
+
+    def finish(self) -> tuple:
+        """
+        End the current frame.
+
+        Returns:
+            tuple: (reply text without stray sentinel lines, True if the terminator was seen).
+        """
+        if not self._complete:
+            self.unfinished = self._skip + [(self._terminator, self._consume_line)]
+        # Still inside an earlier reply's tail: nothing read belongs to this one
+        text = '' if self._skip else self.buffer.decode('utf-8', errors='ignore')
+        self._skip = []
+        self.buffer = bytearray()
+        if FRAME_SENTINEL_PREFIX in text:
+            text = '\n'.join(line for line in text.split('\n') if FRAME_SENTINEL_PREFIX not in line)
+        return text.strip(), self._complete
+
+
+class AuthMethodCache:
+    """
+    Remembers which auth method logged in to a host:port, in an app_settings store.
+
+    username_password entries also remember the username, as 'username_password:<name>'.
+    """
+
+    def __init__(self, settings_store, host: str, port: int):
+        """
+        Initialize the AuthMethodCache.
+
+        Args:
+            settings_store (PlayerDatabase): Store with get/set_app_setting, or None to cache nothing.
+            host (str): Server hostname or IP address.
+            port (int): RCON/telnet port number.
+        """
+        self.settings_store = settings_store
+        self.key = f"rcon_auth_method:{host}:{port}"
+
+    def get(self) -> Optional[str]:
+        """
+        Look up the auth method that worked last time.
+
+        Returns:
+            Optional[str]: Method name, or None if there is no settings store or nothing cached.
+        """
+        if not self.settings_store:
+            return None
+        try:
+            return self.settings_store.get_app_setting(self.key)
+        except Exception as e:
+            logger.debug(f"Could not read cached auth method: {e}")
+            return None
+
+    def store(self, method_name: str):
+        """
+        Remember an auth method ('' forgets the cached one).
+
+        Args:
+            method_name (str): Name of the method that authenticated, optionally
+                suffixed with ':<username>' for username_password.
+        """
+        if not self.settings_store:
+            return
+        try:
+            self.settings_store.set_app_setting(self.key, method_name)
+        except Exception as e:
+            logger.debug(f"Could not cache auth method: {e}")
+
+    def order(self, auth_methods: List[tuple]) -> Optional[str]:
+        """
+        Move the cached method to the front of auth_methods, in place.
+
+        Args:
+            auth_methods (List[tuple]): (method name, auth function) pairs in probe order.
+
+        Returns:
+            Optional[str]: Username cached with username_password, if any.
+        """
+        cached_method, username = self.get(), None
+        if cached_method and ':' in cached_method:
+            cached_method, username = cached_method.split(':', 1)
+        if cached_method in dict(auth_methods):
+            logger.info(f"Trying cached authentication method first: {cached_method}")
+            auth_methods.sort(key=lambda method: method[0] != cached_method)
+        else:
+            logger.info("Testing universal authentication methods...")
+        return username
+
+    def record(self, method_name: str, username: Optional[str], verified: bool):
+        """
+        Cache a method after login, but only if a command round trip succeeded after it.
+
+        Args:
+            method_name (str): Method that authenticated.
+            username (Optional[str]): Username that worked for username_password.
+            verified (bool): Whether a round trip succeeded after the login.
+        """
+        winner = method_name
+        if method_name == "username_password" and username:
+            winner = f"{method_name}:{username}"
+        cached = self.get()
+        if verified and winner != cached:
+            self.store(winner)
+        elif not verified and winner == cached:
+            # Don't keep trying first a method that may not really log in
+            self.store('')
+
+
 class EmpyrionConnection:
     """
     Handles RCON connection and basic player management for Empyrion Galactic Survival servers.
@@ -21,7 +269,9 @@ class EmpyrionConnection:
     Provides methods for connecting, authenticating, sending commands, retrieving player lists, and managing player status (kick, ban, unban) via the server's RCON/telnet interface.
     """
     
-    def __init__(self, host: str, port: int, password: str, timeout: int = 10):
+    def __init__(self, host: str, port: int, password: str, timeout: int = 10,
+                 framing: str = 'auto', prompt: Optional[str] = None,
+                 max_reply_bytes: int = FRAME_MAX_BYTES, settings_store=None):
         """
         Initialize the EmpyrionConnection.
 
@@ -30,18 +280,50 @@ class EmpyrionConnection:
             port (int): RCON/telnet port number.
             password (str): RCON/telnet password.
             timeout (int, optional): Socket timeout in seconds. Defaults to 10.
+            framing (str, optional): Reply framing mode: 'sentinel', 'prompt', 'drain'
+                (legacy sleep-and-drain) or 'auto' to detect after login. Defaults to 'auto'.
+            prompt (str, optional): Telnet prompt that terminates each reply, used by 'prompt' framing.
+            max_reply_bytes (int, optional): Hard cap on the size of a single reply.
+            settings_store (PlayerDatabase, optional): Store with get/set_app_setting used to
+                remember which auth method works for this host:port.
         """
+        if framing not in FRAMING_MODES:
+            raise ValueError(f"Unknown framing mode: {framing}")
+        
         self.host = host
         self.port = port
         self.password = password
         self.timeout = timeout
         self.socket = None
         self.is_connected = False
+        self.auth_cache = AuthMethodCache(settings_store, host, port)
+        self.auth_method = None  # Name of the auth method that succeeded
+        self.auth_username = None  # Username used by the username_password method
+        
+        # Liveness tracking (see is_connection_alive)
+        self.last_reply_at = None  # time.monotonic() of the last bytes received
+        self.liveness_stats = {'checks': 0, 'round_trips': 0, 'eof_detected': 0}
+        
+        # Reply framing state
+        self.framing = framing
+        self.prompt = prompt
+        self.max_reply_bytes = max_reply_bytes
+        self._sentinel_ids = itertools.count(1)
+        self.framer = ReplyFramer(max_reply_bytes)
+        
+        self.plys_parser = PlysParser()
+        
+        # Optional single-writer queue (see start_command_queue)
+        self.command_queue = None
         
     def connect(self) -> bool:
         """
         Connect to the Empyrion server via RCON/telnet and authenticate.
 
+        The authentication method that worked last time for this host:port (if a settings
+        store was given) is tried first; the full probe of all methods is the fallback.
+        A method is only remembered once a command round trip has succeeded after it.
+
         Returns:
             bool or dict: True if successful, False or a dict with error info if connection/authentication fails.
         """
@@ -51,16 +333,16 @@ class EmpyrionConnection:
             # Create socket connection
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.socket.settimeout(self.timeout)
+            # Commands are small writes; don't let Nagle hold them back
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._enable_keepalive()
             
             # Connect to server
             logger.info(f"Attempting socket connection to {self.host}:{self.port}")
             self.socket.connect((self.host, self.port))
             logger.info("Socket connected successfully")
             
-            # Wait for server response and read any initial data
-            time.sleep(1.0)
-            
-            # Try to read welcome message
+            # Read the welcome banner (returns as soon as it has arrived)
             try:
                 welcome_data = self._receive_data(timeout=2.0)
                 if welcome_data:
@@ -69,14 +351,8 @@ class EmpyrionConnection:
                 logger.info(f"No welcome message or timeout: {e}")
             
             # Try multiple authentication methods for different hosting providers
-            logger.info("Testing universal authentication methods...")
-            
-            auth_methods = [
-                ("standard", lambda: self._auth_standard()),
-                ("direct_command", lambda: self._auth_direct_command()),
-                ("username_password", lambda: self._auth_username_password()),
-                ("newline_only", lambda: self._auth_newline_only())
-            ]
+            auth_methods = [(name, getattr(self, f"_auth_{name}")) for name in AUTH_METHOD_NAMES]
+            self.auth_username = self.auth_cache.order(auth_methods)
             
             for method_name, auth_func in auth_methods:
                 try:
@@ -84,17 +360,12 @@ class EmpyrionConnection:
                     
                     if auth_func():
                         self.is_connected = True
+                        self.auth_method = method_name
                         logger.info(f"✅ Authentication successful using method: {method_name}")
                         
-                        # Test connection with help command
-                        logger.info("Testing connection with 'help' command")
-                        test_result = self.send_command("help", timeout=5.0)
-                        
-                        if test_result and ("Available commands" in test_result or "help" in test_result.lower()):
-                            logger.info(f"Help command successful: {test_result[:100]}...")
-                        else:
-                            logger.warning("Help command didn't return expected data, but auth was successful")
-                        
+                        # An answered sentinel probe is a round trip; otherwise test with 'help'
+                        verified = self._select_framing() or self._verify_round_trip()
+                        self.auth_cache.record(method_name, self.auth_username, verified)
                         return True
                     else:
                         logger.debug(f"Authentication method {method_name} failed, trying next...")
@@ -113,15 +384,41 @@ class EmpyrionConnection:
             self.disconnect()
             return {'success': False, 'message': 'An internal error occurred. Please try again later.'}
     
+    def start_command_queue(self, max_in_flight: int = 8):
+        """
+        Hand the socket to a CommandQueue I/O thread.
+
+        Afterwards send_command (and everything built on it) can be called from any
+        thread; commands are pipelined when sentinel framing is active.
+
+        Args:
+            max_in_flight (int, optional): Maximum commands pipelined per batch. Defaults to 8.
+        """
+        from command_queue import CommandQueue
+        
+        if self.command_queue and self.command_queue.is_running:
+            return self.command_queue
+        
+        self.command_queue = CommandQueue(self, max_in_flight=max_in_flight)
+        self.command_queue.start()
+        return self.command_queue
+    
     def disconnect(self):
         """
         Disconnect from the server and clean up the socket.
         """
         try:
+            queue = self.command_queue
+            self.command_queue = None
             if self.socket:
+                # Closing first unblocks an I/O thread waiting in recv()
                 self.socket.close()
+            if queue:
+                queue.stop()
             self.is_connected = False
             self.socket = None
+            self.framer.reset()
+            self.last_reply_at = None
             logger.info("Disconnected from server")
         except Exception as e:
             logger.error(f"Error during disconnect: {e}", exc_info=True)
@@ -134,7 +431,120 @@ class EmpyrionConnection:
             data (str): Data string to send.
         """
         if self.socket:
-            self.socket.send(data.encode('utf-8'))
+            self.socket.sendall(data.encode('utf-8'))
+    
+    def _next_sentinel(self) -> str:
+        """Return a fresh sentinel token used to mark the end of one reply."""
+        return f"{FRAME_SENTINEL_PREFIX}{next(self._sentinel_ids)}{FRAME_SENTINEL_END}"
+    
+    def _select_framing(self) -> bool:
+        """
+        Resolve 'auto' framing after login.
+
+        Uses prompt framing when a prompt is configured, otherwise probes whether the
+        server answers a sentinel line. Falls back to legacy sleep-and-drain if it does not.
+
+        Returns:
+            bool: True if the sentinel probe was answered, i.e. a round trip succeeded.
+        """
+        if self.framing != 'auto':
+            return False
+        
+        complete = False
+        if self.prompt:
+            self.framing = 'prompt'
+        else:
+            self._drain_pending(idle=0.2)
+            token = self._next_sentinel()
+            self._send_raw(f"{token}\n")
+            _, complete = self._read_frame(token.encode('utf-8'), timeout=2.0)
+            self.framing = 'sentinel' if complete else 'drain'
+        
+        logger.info(f"Using '{self.framing}' reply framing")
+        return complete
+    
+    def _verify_round_trip(self) -> bool:
+        """
+        Test the connection with a 'help' command after login.
+
+        Returns:
+            bool: True if the server answered with its command list.
+        """
+        logger.info("Testing connection with 'help' command")
+        test_result = self._execute_command("help", timeout=5.0)
+        if test_result and not isinstance(test_result, dict) and (
+                "Available commands" in test_result or "help" in test_result.lower()):
+            logger.info(f"Help command successful: {test_result[:100]}...")
+            return True
+        logger.warning("Help command didn't return expected data, but auth was successful")
+        return False
+    
+    def _drain_pending(self, idle: float = 0.05):
+        """
+        Discard unread bytes left over from an earlier, incomplete frame.
+
+        Args:
+            idle (float, optional): Stop once the socket has been quiet this long. Defaults to 0.05.
+        """
+        self.framer.reset()
+        if not self.socket:
+            return
+        
+        original_timeout = self.socket.gettimeout()
+        self.socket.settimeout(idle)
+        try:
+            while self.socket.recv(FRAME_RECV_SIZE):
+                pass
+        except (socket.timeout, BlockingIOError):
+            pass
+        finally:
+            self.socket.settimeout(original_timeout)
+    
+    def _read_frame(self, terminator: bytes, timeout: float = 5.0, consume_line: bool = True) -> tuple:
+        """
+        Read one framed reply: everything up to the line containing the terminator.
+
+        Data is accumulated until the terminator is seen, the deadline passes or
+        max_reply_bytes is reached (see ReplyFramer). Bytes past the terminator line
+        are kept for the next frame, and stray sentinel lines are removed.
+
+        Args:
+            terminator (bytes): Sentinel token or prompt marking the end of the reply.
+            timeout (float, optional): Deadline for the whole reply in seconds. Defaults to 5.0.
+            consume_line (bool, optional): Also discard the rest of the terminator line, which
+                may arrive later. Use False for prompts that are not newline-terminated.
+
+        Returns:
+            tuple: (reply text, True if the terminator was seen before the deadline/cap).
+        """
+        framer = self.framer
+        framer.begin(terminator, consume_line)
+        deadline = time.monotonic() + timeout
+        original_timeout = self.socket.gettimeout()
+        
+        try:
+            while not framer.scan():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(f"Reply not terminated within {timeout}s ({len(framer.buffer)} bytes read)")
+                    break
+                
+                self.socket.settimeout(remaining)
+                try:
+                    chunk = self.socket.recv(FRAME_RECV_SIZE)
+                except socket.timeout:
+                    continue
+                if not chunk:
+                    logger.warning("Server closed the connection while reading a reply")
+                    self.is_connected = False
+                    break
+                framer.feed(chunk)
+                self.last_reply_at = time.monotonic()
+        finally:
+            if self.socket:
+                self.socket.settimeout(original_timeout)
+        
+        return framer.finish()
     
     def _receive_data(self, timeout: float = 5.0) -> str:
         """
@@ -164,6 +574,7 @@ class EmpyrionConnection:
                     if not chunk:
                         break
                     data += chunk
+                    self.last_reply_at = time.monotonic()
                     
                     # For telnet/RCON, we often get data immediately
                     # Break after first chunk if we have data
@@ -206,6 +617,39 @@ class EmpyrionConnection:
         """
         Send a command to the server and return the response.
 
+        When the command queue is running, the command is handed to its I/O thread so
+        concurrent callers never share the socket directly.
+
+        Args:
+            command (str): Command string to send.
+            timeout (float, optional): Timeout for response. Defaults to 5.0.
+
+        Returns:
+            Optional[str] or dict: Response string if successful, None or error dict if failed.
+        """
+        if not self.is_connected or not self.socket:
+            logger.error("Cannot send command: not connected to server")
+            return None
+        
+        if self.command_queue and self.command_queue.is_running and not self.command_queue.is_io_thread():
+            try:
+                response = self.command_queue.send_command(command, timeout)
+            except Exception as e:
+                logger.error(f"Error sending command '{command}' via queue: {e}")
+                self.is_connected = False
+                return {'success': False, 'message': 'An internal error occurred. Please try again later.'}
+            
+            if not response:
+                logger.warning(f"No response received for command: {command}")
+                return None
+            return response
+        
+        return self._execute_command(command, timeout)
+    
+    def _execute_command(self, command: str, timeout: float = 5.0) -> Optional[str]:
+        """
+        Write a command to the socket and read its reply on the calling thread.
+
         Args:
             command (str): Command string to send.
             timeout (float, optional): Timeout for response. Defaults to 5.0.
@@ -220,11 +664,20 @@ class EmpyrionConnection:
         try:
             logger.debug(f"Sending command: {command}")
             
-            # Send command
-            self._send_raw(f"{command}\n")
-            
-            # Receive response
-            response = self._receive_data(timeout)
+            # Sentinel and prompt frames skip the rest of a cut-short reply themselves
+            if self.framing == 'sentinel':
+                token = self._next_sentinel()
+                self._send_raw(f"{command}\n{token}\n")
+                response, _ = self._read_frame(token.encode('utf-8'), timeout)
+            elif self.framing == 'prompt':
+                self._send_raw(f"{command}\n")
+                response, _ = self._read_frame(self.prompt.encode('utf-8'), timeout, consume_line=False)
+            else:
+                # Legacy sleep-and-drain
+                if self.framer.resync_needed:
+                    self._drain_pending()
+                self._send_raw(f"{command}\n")
+                response = self._receive_data(timeout)
             
             if response:
                 logger.debug(f"Response received: {response[:100]}...")
@@ -244,329 +697,122 @@ class EmpyrionConnection:
         Get a comprehensive list of players from all sections of the 'plys' command.
 
         Returns:
-            List[Dict] or dict: List of player dictionaries with full info, or error dict if failed.
+            List[Dict] or dict: List of player dictionaries with full info, None if the server
+            did not answer, or error dict if failed.
         """
         try:
             # Use 'plys' command to get comprehensive player data
             response = self.send_command("plys")
             if not response:
+                # Even an empty server answers 'plys'; silence means the connection is gone
                 logger.warning("No response from 'plys' command")
-                return []
-            
-            logger.debug(f"Raw plys response:\n{response}")
-            
-            players = []
-            lines = response.split('\n')
-            
-            # Parse the three sections of plys output
-            current_section = None
-            
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # Identify sections
-                if "Players connected" in line:
-                    current_section = "connected"
-                    logger.debug("Entering connected players section")
-                    continue
-                elif "Global online players list" in line:
-                    current_section = "online"
-                    logger.debug("Entering online players section")
-                    continue
-                elif "Global players list" in line:
-                    current_section = "global"
-                    logger.debug("Entering global players section")
-                    continue
-                elif line.startswith('---') or line.startswith('Available commands') or 'C-Id:' in line:
-                    # Skip separator lines and headers
-                    continue
-                
-                # Parse player data based on section
-                if current_section == "connected":
-                    player_data = self._parse_connected_player(line)
-                    if player_data:
-                        logger.debug(f"Connected player: {player_data}")
-                        players.append(player_data)
-                
-                elif current_section == "online":
-                    player_data = self._parse_online_player(line)
-                    if player_data:
-                        logger.debug(f"Online player: {player_data}")
-                        players.append(player_data)
-                
-                elif current_section == "global":
-                    player_data = self._parse_global_player(line)
-                    if player_data:
-                        logger.debug(f"Global player: {player_data}")
-                        players.append(player_data)
-            
-            # Merge player data (same player might appear in multiple sections)
-            merged_players = self._merge_player_data(players)
+                return None
             
-            logger.info(f"Retrieved {len(merged_players)} players from plys command")
-            return merged_players
+            return self.plys_parser.parse(response)
             
         except Exception as e:
             logger.error(f"Error getting players: {e}", exc_info=True)
             return {'success': False, 'message': 'An internal error occurred. Please try again later.'}
     
-    def _parse_connected_player(self, line: str) -> Optional[Dict]:
+    def is_connection_alive(self, max_idle: Optional[float] = LIVENESS_IDLE_THRESHOLD) -> bool:
         """
-        Parse a connected player line from the 'plys' output.
+        Check if the connection is still alive and responsive.
+
+        Cheap checks first: a non-blocking peek for EOF/errors on the socket and the time
+        since the server last sent anything. A 'help' round trip is only made when the
+        connection has been silent for longer than max_idle.
 
         Args:
-            line (str): Line of text representing a connected player.
+            max_idle (float, optional): Seconds of silence after which a round trip is
+                required. Defaults to LIVENESS_IDLE_THRESHOLD. None never makes one, for
+                callers whose next command is the round trip.
 
         Returns:
-            Optional[Dict]: Player info dictionary if parsed, else None.
+            bool: True if connected and responsive, False otherwise.
         """
+        if not self.is_connected or not self.socket:
+            return False
+        
+        self.liveness_stats['checks'] += 1
         try:
-            import re
-            
-            # Skip header lines
-            if 'C-Id:' in line or '---' in line or not line.strip():
-                return None
+            if self._peer_closed():
+                logger.warning("Server closed the RCON connection")
+                self.liveness_stats['eof_detected'] += 1
+                self.is_connected = False
+                return False
             
-            # Match pattern: "number: steam_id, name, playfield, ip|port"
-            # More flexible pattern to handle varying spaces
-            pattern = r'^\s*\d+:\s*(\d+),\s*([^,]+),\s*([^,]+),\s*([^|]+)'
-            match = re.match(pattern, line)
+            idle = self.idle_seconds()
+            if max_idle is None or (idle is not None and idle < max_idle):
+                return True
             
-            if match:
-                steam_id = match.group(1).strip()
-                name = match.group(2).strip()
-                playfield = match.group(3).strip()
-                ip_address = match.group(4).strip()
-                
-                logger.debug(f"Parsed connected player: {name} ({steam_id}) at {playfield} from {ip_address}")
-                
-                return {
-                    'steam_id': steam_id,
-                    'name': name,
-                    'status': 'Online',
-                    'playfield': playfield,
-                    'ip_address': ip_address,
-                    'faction': '',
-                    'role': '',
-                    'ping': 0
-                }
-            else:
-                logger.debug(f"Connected player line didn't match pattern: '{line}'")
-                
+            # Silent for too long: prove the server still answers
+            self.liveness_stats['round_trips'] += 1
+            response = self.send_command("help", timeout=3.0)
+            return response is not None and not isinstance(response, dict)
         except Exception as e:
-            logger.debug(f"Error parsing connected player line '{line}': {e}")
-        
-        return None
+            logger.error(f"Error checking connection: {e}", exc_info=True)
+            self.is_connected = False
+            return False
     
-    def _parse_online_player(self, line: str) -> Optional[Dict]:
+    def idle_seconds(self) -> Optional[float]:
         """
-        Parse an online player line from the 'plys' output.
-
-        Args:
-            line (str): Line of text representing an online player.
+        Seconds since the server last sent any data.
 
         Returns:
-            Optional[Dict]: Player info dictionary if parsed, else None.
+            Optional[float]: Idle time, or None if nothing has been received yet.
         """
-        try:
-            import re
-            
-            # Extract ID
-            id_match = re.search(r'id=(\d+)', line)
-            if not id_match:
-                return None
-            
-            steam_id = id_match.group(1)
-            
-            # Extract name (everything between name= and fac=, handling spaces)
-            name_match = re.search(r'name=([^f]+?)(?:\s+fac=)', line)
-            if not name_match:
-                # Fallback: name until space before fac
-                name_match = re.search(r'name=([^\s]+)', line)
-            name = name_match.group(1).strip() if name_match else 'Unknown'
-            
-            # Extract faction (between brackets)
-            faction_match = re.search(r'fac=\[([^\]]+)\]', line)
-            faction = faction_match.group(1) if faction_match else ''
-            
-            # Extract role
-            role_match = re.search(r'role=(\w+)', line)
-            role = role_match.group(1) if role_match else ''
-            
-            return {
-                'steam_id': steam_id,
-                'name': name,
-                'status': 'Online',  # Players in online section are definitely online
-                'faction': faction,
-                'role': role,
-                'playfield': '',
-                'ip_address': '',
-                'ping': 0
-            }
-            
-        except Exception as e:
-            logger.debug(f"Error parsing online player line '{line}': {e}")
-        
-        return None
+        if self.last_reply_at is None:
+            return None
+        return time.monotonic() - self.last_reply_at
     
-    def _parse_global_player(self, line: str) -> Optional[Dict]:
+    def _peer_closed(self) -> bool:
         """
-        Parse a global player line (includes offline players) from the 'plys' output.
+        Non-blocking check whether the server has closed (or reset) the socket.
 
-        Args:
-            line (str): Line of text representing a global player.
+        Peeks at the receive buffer without consuming anything, so it is safe while
+        the command queue owns the socket.
 
         Returns:
-            Optional[Dict]: Player info dictionary if parsed, else None.
+            bool: True if the socket reports EOF or an error.
         """
+        sock = self.socket
+        if not sock:
+            return True
         try:
-            import re
-            
-            # Extract ID
-            id_match = re.search(r'id=(\d+)', line)
-            if not id_match:
-                return None
-            
-            steam_id = id_match.group(1)
-            
-            # Extract name (everything between name= and fac=, handling spaces)
-            name_match = re.search(r'name=([^f]+?)(?:\s+fac=)', line)
-            if not name_match:
-                # Fallback: name until space before fac
-                name_match = re.search(r'name=([^\s]+)', line)
-            name = name_match.group(1).strip() if name_match else 'Unknown'
-            
-            # Extract faction (between brackets)
-            faction_match = re.search(r'fac=\[([^\]]+)\]', line)
-            faction = faction_match.group(1) if faction_match else ''
-            
-            # Extract role
-            role_match = re.search(r'role=(\w+)', line)
-            role = role_match.group(1) if role_match else ''
-            
-            # Check if online (presence of online= indicates they're in global list, default to offline)
-            online_match = re.search(r'online=(\d+)', line)
-            total_playtime = int(online_match.group(1)) if online_match else 0
-            
-            return {
-                'steam_id': steam_id,
-                'name': name,
-                'status': 'Offline',  # Global list players are offline unless also in online section
-                'faction': faction,
-                'role': role,
-                'playfield': '',
-                'ip_address': '',
-                'ping': 0,
-                'total_playtime': total_playtime
-            }
-            
-        except Exception as e:
-            logger.debug(f"Error parsing global player line '{line}': {e}")
-        
-        return None
+            readable, _, errored = select.select([sock], [], [sock], 0)
+            if errored:
+                return True
+            if not readable:
+                return False
+            return sock.recv(1, socket.MSG_PEEK | getattr(socket, 'MSG_DONTWAIT', 0)) == b''
+        except (BlockingIOError, InterruptedError, socket.timeout):
+            return False
+        except (OSError, ValueError):
+            return True
     
-    def _merge_player_data(self, players: List[Dict]) -> List[Dict]:
-        """
-        Merge player data from different sections, combining information.
-
-        Priority: Connected > Online > Global for status determination.
-
-        Args:
-            players (List[Dict]): List of player dictionaries from all sections.
-
-        Returns:
-            List[Dict]: Merged and deduplicated list of player dictionaries.
-        """
-        merged = {}
-        connected_steam_ids = set()
-        online_steam_ids = set()
-        
-        # First pass: identify connected players (they have IP/playfield data)
-        for player in players:
-            steam_id = player.get('steam_id')
-            if not steam_id:
-                continue
-                
-            # Skip negative Steam IDs
-            if steam_id.lstrip('-').isdigit() and int(steam_id) < 0:
-                logger.debug(f"Skipping negative Steam ID: {steam_id}")
-                continue
-            
-            # Track connected players (they have IP address or playfield)
-            if player.get('ip_address') or player.get('playfield'):
-                connected_steam_ids.add(steam_id)
-                logger.debug(f"Player {player.get('name')} ({steam_id}) is connected")
-            
-            # Track players from online section
-            if player.get('status') == 'Online' and not player.get('total_playtime'):
-                online_steam_ids.add(steam_id)
-                logger.debug(f"Player {player.get('name')} ({steam_id}) is in online list")
-        
-        # Second pass: merge all data
-        for player in players:
-            steam_id = player.get('steam_id')
-            if not steam_id:
-                continue
-            
-            # Skip negative Steam IDs
-            if steam_id.lstrip('-').isdigit() and int(steam_id) < 0:
-                continue
-            
-            if steam_id in merged:
-                # Merge data, prioritizing non-empty values
-                existing = merged[steam_id]
-                
-                # Update with non-empty values, but don't overwrite good data with empty data
-                for key, value in player.items():
-                    if value and (not existing.get(key) or 
-                                key in ['status'] or  # Always update status 
-                                (key in ['ip_address', 'playfield'] and value.strip())):  # Prioritize IP/playfield from connected section
-                        existing[key] = value
-                        
-            else:
-                merged[steam_id] = player.copy()
-        
-        # Third pass: determine final online status based on sections
-        # FIXED: Only trust "connected" section for Online status to avoid stale data
-        for steam_id, player in merged.items():
-            if steam_id in connected_steam_ids:
-                player['status'] = 'Online'
-                logger.debug(f"Setting {player['name']} to Online (connected)")
-            else:
-                player['status'] = 'Offline'
-                logger.debug(f"Setting {player['name']} to Offline")
-        
-        result = list(merged.values())
-        
-        # Sort by status (Online first), then by name
-        result.sort(key=lambda p: (p['status'] != 'Online', p['name'].lower()))
-        
-        online_count = len([p for p in result if p['status'] == 'Online'])
-        offline_count = len([p for p in result if p['status'] == 'Offline'])
-        logger.info(f"Final result: {online_count} online, {offline_count} offline players")
-        
-        return result
+    def _enable_keepalive(self):
+        """Turn on TCP keepalive so the kernel notices a silently dead peer."""
+        try:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            # Tunables are platform specific; use whichever exist
+            for option, value in (('TCP_KEEPIDLE', KEEPALIVE_IDLE),
+                                  ('TCP_KEEPALIVE', KEEPALIVE_IDLE),  # macOS name for KEEPIDLE
+                                  ('TCP_KEEPINTVL', KEEPALIVE_INTERVAL),
+                                  ('TCP_KEEPCNT', KEEPALIVE_COUNT)):
+                if hasattr(socket, option):
+                    self.socket.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+        except OSError as e:
+            logger.debug(f"Could not configure TCP keepalive: {e}")
     
-    def is_connection_alive(self) -> bool:
+    def get_liveness_stats(self) -> Dict:
         """
-        Check if the connection is still alive and responsive.
+        Get liveness counters for the status page.
 
         Returns:
-            bool: True if connected and responsive, False otherwise.
+            dict: Check/round-trip/EOF counts and seconds since the last reply.
         """
-        if not self.is_connected or not self.socket:
-            return False
-        
-        try:
-            # Send a simple command to test connection
-            response = self.send_command("help", timeout=3.0)
-            return response is not None
-        except Exception as e:
-            logger.error(f"Error checking connection: {e}", exc_info=True)
-            self.is_connected = False
-            return False
+        idle = self.idle_seconds()
+        return dict(self.liveness_stats, idle_seconds=round(idle, 1) if idle is not None else None)
     
     def kick_player(self, player_name: str, message: str = "Kicked by Admin") -> bool:
         """
@@ -647,13 +893,49 @@ class EmpyrionConnection:
             logger.error(f"Error unbanning player {steam_id}: {e}", exc_info=True)
             return False
     
+    def _read_until(self, marker: str, timeout: float = 4.0) -> str:
+        """
+        Read until marker appears in the received text or the deadline passes.
+
+        Args:
+            marker (str): Text to wait for.
+            timeout (float, optional): Deadline in seconds. Defaults to 4.0.
+
+        Returns:
+            str: Everything received (including the marker if it arrived).
+        """
+        if not self.socket:
+            return ""
+        
+        data = self.framer.pending
+        self.framer.pending = bytearray()
+        needle = marker.encode('utf-8')
+        deadline = time.monotonic() + timeout
+        original_timeout = self.socket.gettimeout()
+        try:
+            while needle not in data and len(data) < self.max_reply_bytes:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.socket.settimeout(remaining)
+                try:
+                    chunk = self.socket.recv(FRAME_RECV_SIZE)
+                except socket.timeout:
+                    break
+                if not chunk:
+                    break
+                data += chunk
+                self.last_reply_at = time.monotonic()
+        finally:
+            self.socket.settimeout(original_timeout)
+        return data.decode('utf-8', errors='ignore').strip()
+    
     def _auth_standard(self) -> bool:
         """Standard authentication: password with \\r\\n (works with most providers)"""
         try:
             self._send_raw(f"{self.password}\r\n")
-            time.sleep(1.0)
             
-            auth_response = self._receive_data(timeout=3.0)
+            auth_response = self._read_until("Logged in successfully")
             if auth_response and "Logged in successfully" in auth_response:
                 logger.debug("Standard auth successful")
                 return True
@@ -667,9 +949,8 @@ class EmpyrionConnection:
         try:
             # Some servers don't require authentication - try direct command
             self._send_raw("help\n")
-            time.sleep(1.0)
             
-            test_response = self._receive_data(timeout=3.0)
+            test_response = self._read_until("Available commands")
             if test_response and ("Available commands" in test_response or "help" in test_response.lower()):
                 logger.debug("Direct command auth successful - no password needed")
                 return True
@@ -681,16 +962,20 @@ class EmpyrionConnection:
     def _auth_username_password(self) -> bool:
         """Try username + password authentication (some providers require both)"""
         try:
-            # Try with admin/rcon as username
-            for username in ["admin", "rcon", "server"]:
+            # Try with admin/rcon as username (the one that worked last time first)
+            usernames = ["admin", "rcon", "server"]
+            if self.auth_username in usernames:
+                usernames.sort(key=lambda name: name != self.auth_username)
+            for username in usernames:
                 self._send_raw(f"{username}\r\n")
-                time.sleep(0.5)
+                # Give the server a moment to prompt for the password (returns on the first line)
+                self._read_until("\n", timeout=0.5)
                 self._send_raw(f"{self.password}\r\n")
-                time.sleep(1.0)
                 
-                auth_response = self._receive_data(timeout=3.0)
+                auth_response = self._read_until("Logged in successfully")
                 if auth_response and "Logged in successfully" in auth_response:
                     logger.debug(f"Username + password auth successful with username: {username}")
+                    self.auth_username = username
                     return True
             return False
         except Exception as e:
@@ -701,9 +986,8 @@ class EmpyrionConnection:
         """Try password with only \\n (some providers are picky about line endings)"""
         try:
             self._send_raw(f"{self.password}\n")
-            time.sleep(1.0)
             
-            auth_response = self._receive_data(timeout=3.0)
+            auth_response = self._read_until("Logged in successfully")
             if auth_response and "Logged in successfully" in auth_response:
                 logger.debug("Newline-only auth successful")
                 return True
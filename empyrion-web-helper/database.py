@@ -10,12 +10,25 @@ import logging
 import os
 import base64
 import getpass
-import requests
+import json
 import time
-import threading
-import shutil
-from datetime import datetime
-from typing import List, Dict, Optional, Union
+from datetime import datetime, timedelta
+from typing import Iterable, List, Dict, Optional, Union
+
+from db_pool import get_pool
+from db_migrations import migrate
+from search_index import ensure_search_index, search as search_index
+from geo_resolver import GeoResolver
+from backup_manager import BackupManager, DEFAULT_GENERATIONS as DEFAULT_BACKUP_GENERATIONS
+from session_tracker import (sync_sessions, write_heartbeat, reconcile_open_sessions, leaderboard,
+                             concurrency, HEARTBEAT_INTERVAL)
+from entity_sync import sync_entities, classify_entities, get_last_refresh
+from playfield_index import PlayfieldIndex
+from entity_snapshots import (take_snapshot, prune_snapshots, last_snapshot_time, snapshot_history, list_snapshots,
+                              read_snapshot, DEFAULT_RETENTION_DAYS as DEFAULT_SNAPSHOT_RETENTION_DAYS)
+from entity_classification import (classify_entity_faction, is_asteroid_type, STRUCTURE_TYPES, SHIP_TYPES,
+                                   CATEGORY_NPC, CATEGORY_PLAYER, CATEGORY_NEUTRAL, FACTION_CATEGORIES)
+from geo_backends import IpApiBackend, open_local_backend, DEFAULT_API_URL as DEFAULT_GEOIP_API_URL
 
 # Import cryptography only if available
 try:
@@ -26,6 +39,17 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Columns of the players table that the paginated player API can return
+PLAYER_COLUMNS = ('steam_id', 'name', 'status', 'faction', 'role', 'ip_address', 'country', 'playfield',
+                  'last_seen', 'first_seen', 'total_playtime', 'updated_at')
+PLAYER_PAGE_COLUMNS = ('steam_id', 'name', 'status', 'faction', 'ip_address', 'country', 'playfield', 'last_seen')
+PLAYER_KEY_COLUMNS = ('steam_id', 'status', 'last_seen')  # always returned; the page cursor is built from them
+PLAYER_FILTER_COLUMNS = ('steam_id', 'name', 'status', 'faction', 'ip_address', 'country', 'playfield')
+GEO_ERROR_STATES = ('Unknown location', 'Service down', 'No Internet')  # countries worth looking up again
+DEFAULT_GEOIP_DATABASE = 'geoip.csv'  # IP range file next to the database (.csv, or .mmdb with maxminddb)
+DEFAULT_PLAYER_PAGE_SIZE = 100
+MAX_PLAYER_PAGE_SIZE = 500
+
 class PlayerDatabase:
     """
     Manages the SQLite database for Empyrion Web Helper, including player tracking, secure credential storage, and geolocation data.
@@ -33,20 +57,47 @@ class PlayerDatabase:
     Provides methods for initializing the database, storing and retrieving encrypted credentials, updating player status, and managing geolocation data for player IP addresses.
     """
     
-    def __init__(self, db_path: str = "instance/players.db"):
+    def __init__(self, db_path: str = "instance/players.db", settings_db: Optional['PlayerDatabase'] = None,
+                 geo_resolver: Optional[GeoResolver] = None):
         """
         Initialize the PlayerDatabase.
 
         Args:
             db_path (str, optional): Path to the SQLite database file. Defaults to 'instance/players.db'.
+            settings_db (PlayerDatabase, optional): Database whose app_settings hold the admin
+                configuration (geolocation, backups, snapshot retention); this one if omitted.
+            geo_resolver (GeoResolver, optional): Resolver shared with another database; a new one
+                is started for this database if omitted.
         """
         self.db_path = db_path
+        self.settings_db = settings_db or self
+        self.pool = get_pool(db_path)  # Shared, persistent WAL connections for this file
         self.encryption_key = None
-        self.geolocation_cache = {}  # Simple in-memory cache for geolocation
-        self.last_geo_request = 0  # Rate limiting for API calls
-        self.geo_lock = threading.Lock() # Lock for geolocation cache and API calls
+        self._negative_ids_checked = False  # legacy negative Steam ID rows are cleaned once per start
+        self.search_available = False  # FTS5 search index present (set by init_database)
+        self._last_heartbeat = 0.0  # monotonic time of the last session heartbeat write
+        self._playfield_index = (None, None)  # (last_refresh, PlayfieldIndex) built per entity refresh
         self.ensure_directory_exists()
         self.init_database()
+        self.reconcile_sessions()
+        # Online backup generations in backups/ next to the database (see backup_manager)
+        self.backups = BackupManager(
+            self.pool,
+            generations=int(self.settings_db.get_app_setting('backup_generations', DEFAULT_BACKUP_GENERATIONS)),
+            compress=self.settings_db.get_app_setting('backup_compress', 'true') != 'false')
+        self.backups.import_legacy_backups()
+        if geo_resolver:
+            # One worker, cache and IP range file for every server; it backfills this database too
+            geo_resolver.add_player_pool(self.pool)
+            self.geo_resolver = geo_resolver
+        else:
+            # Countries come from a local IP range file if present, then geo_cache; the rest is
+            # looked up in the background (an empty geoip_api_url keeps lookups fully offline)
+            geoip_database = self.settings_db.get_app_setting(
+                'geoip_database', os.path.join(os.path.dirname(db_path) or '.', DEFAULT_GEOIP_DATABASE))
+            geoip_api_url = self.settings_db.get_app_setting('geoip_api_url', DEFAULT_GEOIP_API_URL)
+            self.geo_resolver = GeoResolver(self.pool, local_backend=open_local_backend(geoip_database),
+                                            remote_backend=IpApiBackend(geoip_api_url) if geoip_api_url else None)
         if CRYPTO_AVAILABLE:
             self._init_encryption()
         else:
@@ -118,7 +169,7 @@ class PlayerDatabase:
         Initialize the database tables for players, credentials, and player sessions, including geolocation support.
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 # Create players table with country column
@@ -198,6 +249,20 @@ class PlayerDatabase:
                     )
                 """)
                 
+                # Create monitored_servers table for additional servers (the default
+                # server keeps using server_host/server_port in app_settings)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS monitored_servers (
+                        server_id TEXT PRIMARY KEY,
+                        name TEXT NOT NULL,
+                        host TEXT NOT NULL,
+                        port INTEGER NOT NULL,
+                        enabled INTEGER DEFAULT 1,
+                        created_at TEXT NOT NULL,
+                        updated_at TEXT NOT NULL
+                    )
+                """)
+                
                 # Create entities_meta table for last refresh tracking
                 cursor.execute("""
                     CREATE TABLE IF NOT EXISTS entities_meta (
@@ -215,7 +280,13 @@ class PlayerDatabase:
                     return {'success': False, 'message': 'An internal error occurred. Please try again later.'}
                 
                 conn.commit()
-                logger.info("Database initialized successfully with credentials and geolocation support")
+                
+                # Indexes and later schema changes are versioned (PRAGMA user_version)
+                schema_version = migrate(conn)
+                classify_entities(conn)
+                self.search_available = ensure_search_index(conn)
+                logger.info(f"Database initialized successfully with credentials and geolocation support "
+                            f"(schema version {schema_version})")
                 
         except Exception as e:
             logger.error(f"Error initializing database: {e}", exc_info=True)
@@ -225,94 +296,13 @@ class PlayerDatabase:
     # GEOLOCATION METHODS
     # ============================================================================
     
-    def _lookup_country(self, ip_address: str) -> str:
-        """
-        Lookup country for IP address using ip-api.com
-        Returns country name or appropriate error message
-        """
-        if not ip_address or ip_address.strip() == '':
-            return "Unknown location"
-        
-        with self.geo_lock:
-            # Check cache first
-            if ip_address in self.geolocation_cache:
-                logger.debug(f"Using cached geolocation for {ip_address}: {self.geolocation_cache[ip_address]}")
-                return self.geolocation_cache[ip_address]
-            
-            # Rate limiting - wait at least 1 second between requests
-            current_time = time.time()
-            if current_time - self.last_geo_request < 1.0:
-                time.sleep(1.0 - (current_time - self.last_geo_request))
-            
-            try:
-                logger.debug(f"Looking up geolocation for IP: {ip_address}")
-                
-                # Make request to ip-api.com
-                url = f"http://ip-api.com/json/{ip_address}"
-                response = requests.get(url, timeout=10)
-                self.last_geo_request = time.time()
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    if data.get('status') == 'success':
-                        country = data.get('country', 'Unknown location')
-                        logger.info(f"Geolocation lookup successful: {ip_address} -> {country}")
-                        
-                        # Cache the result
-                        self.geolocation_cache[ip_address] = country
-                        return country
-                        
-                    elif data.get('status') == 'fail':
-                        error_msg = data.get('message', 'Unknown error')
-                        logger.warning(f"Geolocation lookup failed for {ip_address}: {error_msg}")
-                        
-                        if 'private range' in error_msg.lower() or 'reserved range' in error_msg.lower():
-                            result = "Local network"
-                        elif 'invalid' in error_msg.lower():
-                            result = "Unknown location"
-                        else:
-                            result = "Unknown location"
-                        
-                        # Cache failed lookups to avoid repeated attempts
-                        self.geolocation_cache[ip_address] = result
-                        return result
-                        
-                    else:
-                        logger.warning(f"Unexpected geolocation response for {ip_address}: {data}")
-                        return "Unknown location"
-                        
-                elif response.status_code == 429:
-                    logger.warning(f"Geolocation API rate limited for {ip_address}")
-                    return "Unknown location"  # Don't cache rate limits
-                    
-                else:
-                    logger.warning(f"Geolocation API returned status {response.status_code} for {ip_address}")
-                    return "Service down"
-                    
-            except requests.exceptions.ConnectException:
-                logger.warning(f"No internet connection for geolocation lookup of {ip_address}")
-                return "No Internet"
-                
-            except requests.exceptions.Timeout:
-                logger.warning(f"Geolocation lookup timed out for {ip_address}")
-                return "Service down"
-                
-            except requests.exceptions.RequestException as e:
-                logger.warning(f"Geolocation lookup failed for {ip_address}: {e}")
-                return "Service down"
-                
-            except Exception as e:
-                logger.error(f"Unexpected error in geolocation lookup for {ip_address}: {e}")
-                return "Unknown location"
-    
     def _should_update_geolocation(self, player_data: Dict, existing_player: Optional[Dict]) -> bool:
         """
         Determine if we should update the geolocation for this player
         Only lookup when:
         1. Player has no country stored (NULL)
         2. IP address changed from what's in database
-        3. Current country is an error state (retry failed lookups occasionally)
+        3. Current country is an error state (the resolver's cache decides when to ask again)
         """
         current_ip = player_data.get('ip_address', '').strip()
         
@@ -334,16 +324,46 @@ class PlayerDatabase:
         if not existing_country:
             return True
         
-        # Retry error states occasionally (every 10th update to avoid spam)
-        error_states = ["Unknown location", "Service down", "No Internet"]
-        if existing_country in error_states:
-            # Simple retry mechanism - only retry occasionally
-            import random
-            if random.randint(1, 10) == 1:  # 10% chance to retry
-                logger.debug(f"Retrying geolocation for {player_data.get('name')} (was: {existing_country})")
-                return True
-        
-        return False
+        # Error states are answered from the negative cache until it expires
+        return existing_country in GEO_ERROR_STATES
+    
+    def refresh_geolocation_for_existing_players(self) -> int:
+        """
+        Fill in countries for players stored without one (or with a failed lookup).
+
+        Cached answers are written right away; the other addresses are queued and
+        backfilled by the resolver in the background.
+
+        Returns:
+            int: Number of players updated from the cache.
+        """
+        try:
+            placeholders = ','.join('?' * len(GEO_ERROR_STATES))
+            with self.pool.connection() as conn:
+                rows = conn.execute(f"""
+                    SELECT DISTINCT ip_address FROM players
+                    WHERE (country IS NULL OR country IN ({placeholders})) AND ip_address != ''
+                """, GEO_ERROR_STATES).fetchall()
+            ip_addresses = [row[0] for row in rows]
+            if not ip_addresses:
+                return 0
+            
+            known = self.geo_resolver.resolve(ip_addresses)
+            current_time = datetime.now().isoformat()
+            with self.pool.connection() as conn:
+                before = conn.total_changes
+                conn.executemany(
+                    "UPDATE players SET country = ?, updated_at = ? WHERE ip_address = ? AND country IS NOT ?",
+                    [(country, current_time, ip_address, country) for ip_address, country in known.items()])
+                updated = conn.total_changes - before
+            
+            logger.info(f"🌍 Geolocation refresh: {updated} player(s) updated from cache, "
+                        f"{len(ip_addresses) - len(known)} address(es) queued for lookup")
+            return updated
+            
+        except Exception as e:
+            logger.error(f"Error refreshing geolocation for existing players: {e}", exc_info=True)
+            return 0
     
     # ============================================================================
     # CREDENTIAL MANAGEMENT METHODS
@@ -360,7 +380,7 @@ class PlayerDatabase:
             encrypted_password = self._encrypt_credential(password) if password else ''
             encrypted_username = self._encrypt_credential(username) if username else ''
             
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
@@ -385,7 +405,7 @@ class PlayerDatabase:
         Retrieve and decrypt credentials from the database.
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT username, password, host, port, additional_data 
@@ -417,7 +437,7 @@ class PlayerDatabase:
         Delete credentials from the database.
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("DELETE FROM credentials WHERE credential_type = ?", (credential_type,))
                 conn.commit()
@@ -438,7 +458,7 @@ class PlayerDatabase:
         Get a list of all stored credential types in the database.
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT credential_type FROM credentials")
                 return [row[0] for row in cursor.fetchall()]
@@ -487,8 +507,9 @@ class PlayerDatabase:
                 return False
             
             current_time = datetime.now().isoformat()
+            resolved_country = self._resolve_countries([player_data]).get(steam_id)
             
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("SELECT steam_id, first_seen, ip_address, playfield, status, last_seen, country FROM players WHERE steam_id = ?", (steam_id,))
@@ -499,10 +520,7 @@ class PlayerDatabase:
                     'playfield': existing[3], 'status': existing[4], 'last_seen': existing[5], 'country': existing[6]
                 } if existing else None
                 
-                country = existing_player.get('country') if existing_player else None
-                if self._should_update_geolocation(player_data, existing_player):
-                    current_ip = player_data.get('ip_address', '').strip()
-                    country = self._lookup_country(current_ip) if current_ip else "Unknown location"
+                country = resolved_country or (existing_player.get('country') if existing_player else None)
                 
                 if existing_player:
                     # Player exists - update their information
@@ -538,6 +556,7 @@ class PlayerDatabase:
                         country, player_data.get('playfield', ''), initial_last_seen, current_time, current_time
                     ))
                 
+                sync_sessions(cursor, current_time)
                 conn.commit()
                 return True
                 
@@ -545,66 +564,215 @@ class PlayerDatabase:
             logger.error(f"Error updating player {player_data.get('name', 'Unknown')}: {e}", exc_info=True)
             return False
     
+    def _is_valid_steam_id(self, steam_id: str) -> bool:
+        """True for real (positive, numeric or opaque) Steam IDs; False for '', '-1' and negative IDs."""
+        return bool(steam_id) and steam_id != '-1' and not (steam_id.lstrip('-').isdigit() and int(steam_id) < 0)
+
+    def _resolve_countries(self, players: List[Dict]) -> Dict[str, Optional[str]]:
+        """
+        Work out the country to store for each player before any write transaction starts.
+
+        Lookups that are due are answered from the geolocation cache; addresses that
+        are not cached yet are queued for the background resolver, which backfills
+        the country later. Nothing here waits for the network.
+
+        Args:
+            players (List[Dict]): Player dictionaries with valid Steam IDs.
+
+        Returns:
+            Dict[str, Optional[str]]: steam_id -> country (None keeps the stored value).
+        """
+        query = "SELECT steam_id, ip_address, country FROM players"
+        params = []
+        if len(players) <= 500:
+            # Small deltas look up just their rows; full syncs read the table once
+            params = [str(p['steam_id']) for p in players]
+            query += f" WHERE steam_id IN ({','.join('?' * len(params))})"
+        with self.pool.connection() as conn:
+            existing = {row[0]: {'ip_address': row[1] or '', 'country': row[2]}
+                        for row in conn.execute(query, params)}
+
+        countries, due = {}, {}
+        for player_data in players:
+            steam_id = str(player_data['steam_id'])
+            existing_player = existing.get(steam_id)
+            countries[steam_id] = existing_player.get('country') if existing_player else None
+            if self._should_update_geolocation(player_data, existing_player):
+                due[steam_id] = player_data.get('ip_address', '').strip()
+
+        if due:
+            known = self.geo_resolver.resolve(due.values())
+            for steam_id, ip_address in due.items():
+                if ip_address in known:
+                    countries[steam_id] = known[ip_address]
+        return countries
+
+    def _upsert_players(self, cursor, players: List[Dict], countries: Dict[str, Optional[str]], current_time: str):
+        """
+        Insert or update many players with one prepared statement.
+
+        last_seen moves to now for online players and is kept for offline ones;
+        first_seen is only set on insert. A None country keeps the stored one, so a
+        background geolocation backfill is never overwritten by a stale value.
+        """
+        cursor.executemany("""
+            INSERT INTO players (steam_id, name, status, faction, role, ip_address, country, playfield,
+                                 last_seen, first_seen, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(steam_id) DO UPDATE SET
+                name = excluded.name, status = excluded.status, faction = excluded.faction,
+                role = excluded.role, ip_address = excluded.ip_address,
+                country = COALESCE(excluded.country, players.country),
+                playfield = excluded.playfield, last_seen = COALESCE(excluded.last_seen, players.last_seen),
+                updated_at = excluded.updated_at
+        """, [(
+            str(p['steam_id']), p.get('name', ''), p.get('status', 'Offline'), p.get('faction', ''),
+            p.get('role', ''), p.get('ip_address', ''), countries.get(str(p['steam_id'])),
+            p.get('playfield', ''), current_time if p.get('status', 'Offline') == 'Online' else None,
+            current_time, current_time
+        ) for p in players])
+
     def update_multiple_players(self, players_data: List[Dict]) -> int:
         """
-        Update multiple players at once.
+        Write a full 'plys' player list in a single transaction.
+
+        Upserts every valid player, marks online players missing from the list offline,
+        and only runs the negative Steam ID cleanup when one shows up (or once per start
+        for rows left over from older versions).
+
+        Args:
+            players_data (List[Dict]): Current merged player list.
+
+        Returns:
+            int: Number of players written.
         """
-        updated_count = 0
+        players = []
+        saw_negative_id = False
         for player_data in players_data:
-            if self.update_player(player_data):
-                updated_count += 1
-        
-        self.mark_remaining_offline([p for p in players_data if p.get('steam_id')])
-        self.cleanup_negative_steam_ids()
-        
-        logger.info(f"Updated {updated_count} players in database")
-        return updated_count
+            if self._is_valid_steam_id(str(player_data.get('steam_id', ''))):
+                players.append(player_data)
+            elif player_data.get('steam_id'):
+                saw_negative_id = True
+                logger.warning(f"Skipping player with invalid Steam ID: {player_data.get('steam_id')}")
+
+        try:
+            countries = self._resolve_countries(players)
+            current_time = datetime.now().isoformat()
+
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+                self._upsert_players(cursor, players, countries, current_time)
+                self._mark_absent_offline(cursor, [str(p['steam_id']) for p in players], current_time)
+                sync_sessions(cursor, current_time)
+                if saw_negative_id or not self._negative_ids_checked:
+                    self._delete_negative_steam_id_duplicates(cursor)
+                    self._negative_ids_checked = True
+
+        except Exception as e:
+            logger.error(f"Error updating {len(players)} players: {e}", exc_info=True)
+            return 0
+
+        logger.info(f"Updated {len(players)} players in database")
+        return len(players)
     
+    def apply_player_changes(self, changed_players: List[Dict], left_steam_ids: List[str]) -> int:
+        """
+        Write only the players that changed since the previous monitor cycle.
+
+        Unlike update_multiple_players this does not touch unchanged rows and does not
+        mark absent players offline; players who left are passed in explicitly.
+
+        Args:
+            changed_players (List[Dict]): Player dictionaries that differ from the last snapshot.
+            left_steam_ids (List[str]): Steam IDs of players who went offline this cycle.
+
+        Returns:
+            int: Number of player rows written.
+        """
+        players = [p for p in changed_players if self._is_valid_steam_id(str(p.get('steam_id', '')))]
+        if not players and not left_steam_ids:
+            return 0
+
+        try:
+            countries = self._resolve_countries(players) if players else {}
+            current_time = datetime.now().isoformat()
+
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+                self._upsert_players(cursor, players, countries, current_time)
+                if left_steam_ids:
+                    # last_seen is the moment we noticed the logout
+                    cursor.executemany(
+                        "UPDATE players SET status = 'Offline', last_seen = ?, updated_at = ? WHERE steam_id = ?",
+                        [(current_time, current_time, str(steam_id)) for steam_id in left_steam_ids]
+                    )
+                    logger.info(f"PLAYER LOGOUT: {len(left_steam_ids)} player(s) - Setting last_seen: {current_time}")
+                sync_sessions(cursor, current_time)
+
+        except Exception as e:
+            logger.error(f"Error applying player changes: {e}", exc_info=True)
+            return 0
+
+        if players:
+            logger.debug(f"Applied changes for {len(players)} players")
+        return len(players)
+
+    def _mark_absent_offline(self, cursor, current_steam_ids: List[str], current_time: str):
+        """
+        Set-based offline marking: every online player not in current_steam_ids goes offline.
+        The IDs are staged in a temp table so the UPDATE is a single anti-join.
+        """
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS current_steam_ids (steam_id TEXT PRIMARY KEY)")
+        cursor.execute("DELETE FROM temp.current_steam_ids")
+        cursor.executemany("INSERT OR IGNORE INTO temp.current_steam_ids (steam_id) VALUES (?)",
+                           [(steam_id,) for steam_id in current_steam_ids])
+
+        absent = """
+            FROM players WHERE status = 'Online'
+            AND steam_id NOT IN (SELECT steam_id FROM temp.current_steam_ids)
+        """
+        names = [row[0] for row in cursor.execute(f"SELECT name {absent}")]
+        if names:
+            cursor.execute(f"UPDATE players SET status = 'Offline', last_seen = ?, updated_at = ? "
+                           f"WHERE steam_id IN (SELECT steam_id {absent})", (current_time, current_time))
+            for name in names:
+                logger.info(f"PLAYER LOGOUT (not in plys): {name} - Setting last_seen: {current_time}")
+
     def mark_remaining_offline(self, current_players: List[Dict]):
         """
         Mark players as offline who did not appear in the current 'plys' data.
         """
         try:
             current_time = datetime.now().isoformat()
-            current_steam_ids = {str(p.get('steam_id', '')) for p in current_players}
-            
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
-                
-                cursor.execute("SELECT steam_id, name FROM players WHERE status = 'Online'")
-                online_players = cursor.fetchall()
-                
-                for steam_id, name in online_players:
-                    if steam_id not in current_steam_ids:
-                        cursor.execute("UPDATE players SET status = 'Offline', last_seen = ?, updated_at = ? WHERE steam_id = ?", (current_time, current_time, steam_id))
-                        logger.info(f"PLAYER LOGOUT (not in plys): {name} - Setting last_seen: {current_time}")
-                
-                conn.commit()
-                
+                self._mark_absent_offline(cursor, [str(p.get('steam_id', '')) for p in current_players], current_time)
+                sync_sessions(cursor, current_time)
         except Exception as e:
             logger.error(f"Error marking remaining players offline: {e}", exc_info=True)
 
+    def _delete_negative_steam_id_duplicates(self, cursor) -> int:
+        cursor.execute("""
+            SELECT n.steam_id, n.name FROM players n
+            WHERE n.steam_id >= '-' AND n.steam_id < '.'  -- negative ids only, via the primary key
+            AND CAST(n.steam_id AS INTEGER) < 0 AND EXISTS (
+                SELECT 1 FROM players p WHERE p.name = n.name AND CAST(p.steam_id AS INTEGER) > 0
+            )
+        """)
+        negative_entries = cursor.fetchall()
+        if negative_entries:
+            cursor.executemany("DELETE FROM players WHERE steam_id = ?", [(steam_id,) for steam_id, _ in negative_entries])
+            for steam_id, name in negative_entries:
+                logger.info(f"Removed duplicate negative Steam ID {steam_id} for player {name}")
+        return len(negative_entries)
+
     def cleanup_negative_steam_ids(self):
         """
         Remove entries with negative Steam IDs if a positive Steam ID exists for the same player name.
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT n.steam_id, n.name FROM players n
-                    WHERE CAST(n.steam_id AS INTEGER) < 0 AND EXISTS (
-                        SELECT 1 FROM players p WHERE p.name = n.name AND CAST(p.steam_id AS INTEGER) > 0
-                    )
-                """)
-                negative_entries = cursor.fetchall()
-                
-                for steam_id, name in negative_entries:
-                    cursor.execute("DELETE FROM players WHERE steam_id = ?", (steam_id,))
-                    logger.info(f"Removed duplicate negative Steam ID {steam_id} for player {name}")
-                
-                if negative_entries:
-                    conn.commit()
+            with self.pool.connection() as conn:
+                self._delete_negative_steam_id_duplicates(conn.cursor())
         except Exception as e:
             logger.error(f"Error cleaning up negative Steam IDs: {e}", exc_info=True)
 
@@ -613,7 +781,7 @@ class PlayerDatabase:
         Get all players from the database, with optional filters.
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 
@@ -639,6 +807,133 @@ class PlayerDatabase:
             logger.error(f"Error getting players from database: {e}", exc_info=True)
             return []
 
+    def get_players_page(self, filters: Optional[Dict] = None, columns: Optional[List[str]] = None,
+                         limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict:
+        """
+        Get one page of players, online first and most recently seen first.
+
+        Keyset pagination over (status, last_seen, steam_id): a page continues after
+        the last row of the previous one instead of skipping an OFFSET, so every page
+        is an index range read no matter how large the table is or how far the client
+        has scrolled. Each status is read in two index ranges, players with a
+        last_seen (newest first) and then players never seen online.
+
+        Text filters are prefix matches; name, steam_id and ip_address use their
+        indexes, status is matched exactly.
+
+        Args:
+            filters (dict, optional): Column -> prefix to match (see PLAYER_FILTER_COLUMNS).
+            columns (list, optional): Columns to return; defaults to PLAYER_PAGE_COLUMNS.
+                steam_id, status and last_seen are always included.
+            limit (int, optional): Page size, at most MAX_PLAYER_PAGE_SIZE.
+            cursor (str, optional): next_cursor of the previous page.
+
+        Returns:
+            dict: 'players', 'next_cursor' (None on the last page) and 'has_more' on success,
+                otherwise 'success': False and a message.
+        """
+        filters = filters or {}
+        wanted = set(columns or PLAYER_PAGE_COLUMNS) | set(PLAYER_KEY_COLUMNS)
+        selected = ', '.join(c for c in PLAYER_COLUMNS if c in wanted)
+        limit = max(1, min(int(limit or DEFAULT_PLAYER_PAGE_SIZE), MAX_PLAYER_PAGE_SIZE))
+
+        try:
+            position = self._decode_player_cursor(cursor) if cursor else None
+        except ValueError:
+            return {'success': False, 'message': 'Invalid page cursor'}
+
+        conditions, params = self._player_prefix_conditions(filters)
+        base = f"SELECT {selected} FROM players WHERE status = ?" + ''.join(f" AND {c}" for c in conditions)
+        status_filter = str(filters.get('status') or '').strip() or None
+
+        try:
+            with self.pool.connection() as conn:
+                conn.row_factory = sqlite3.Row
+                db_cursor = conn.cursor()
+
+                if position:
+                    status, last_seen, after_id = position
+                    seen_segment = last_seen is not None
+                else:
+                    status = status_filter or db_cursor.execute("SELECT MAX(status) FROM players").fetchone()[0]
+                    last_seen = after_id = None
+                    seen_segment = True
+
+                # One row more than the page tells whether another page exists
+                rows = []
+                while status is not None and len(rows) <= limit:
+                    remaining = limit + 1 - len(rows)
+                    if seen_segment:
+                        query, args = base + " AND last_seen IS NOT NULL", [status] + params
+                        if after_id is not None:
+                            query += " AND (last_seen, steam_id) < (?, ?)"
+                            args += [last_seen, after_id]
+                        query += " ORDER BY last_seen DESC, steam_id DESC LIMIT ?"
+                    else:
+                        query, args = base + " AND last_seen IS NULL", [status] + params
+                        if after_id is not None:
+                            query += " AND steam_id < ?"
+                            args.append(after_id)
+                        query += " ORDER BY steam_id DESC LIMIT ?"
+                    db_cursor.execute(query, args + [remaining])
+                    rows.extend(db_cursor.fetchall())
+
+                    after_id = None
+                    if seen_segment:
+                        seen_segment = False
+                    else:
+                        seen_segment = True
+                        status = None if status_filter else db_cursor.execute(
+                            "SELECT MAX(status) FROM players WHERE status < ?", (status,)).fetchone()[0]
+
+                has_more = len(rows) > limit
+                players = [dict(row) for row in rows[:limit]]
+                next_cursor = None
+                if has_more:
+                    last = players[-1]
+                    next_cursor = self._encode_player_cursor(last['status'], last['last_seen'], last['steam_id'])
+
+                return {'success': True, 'players': players, 'next_cursor': next_cursor, 'has_more': has_more}
+
+        except Exception as e:
+            logger.error(f"Error getting player page from database: {e}", exc_info=True)
+            return {'success': False, 'message': 'An internal error occurred. Please try again later.'}
+
+    @staticmethod
+    def _player_prefix_conditions(filters: Dict) -> tuple:
+        conditions, params = [], []
+        for key, value in filters.items():
+            value = str(value or '').strip()
+            if not value or key == 'status' or key not in PLAYER_FILTER_COLUMNS:
+                continue
+            if key in ('steam_id', 'ip_address'):
+                # Digits and dots only: a case-sensitive GLOB prefix can use the plain index
+                escaped = ''.join(f"[{ch}]" if ch in '*?[' else ch for ch in value)
+                conditions.append(f"{key} GLOB ?")
+                params.append(escaped + '*')
+            else:
+                # Case-insensitive like the old filter; name has a NOCASE index for this
+                escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                conditions.append(f"{key} LIKE ? ESCAPE '\\'")
+                params.append(escaped + '%')
+        return conditions, params
+
+    @staticmethod
+    def _encode_player_cursor(status: str, last_seen: Optional[str], steam_id: str) -> str:
+        raw = json.dumps([status, last_seen, steam_id], separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+
+    @staticmethod
+    def _decode_player_cursor(cursor: str) -> tuple:
+        try:
+            status, last_seen, steam_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except Exception:
+            raise ValueError("Invalid page cursor")
+        if not isinstance(status, str) or not isinstance(steam_id, str) \
+                or not (last_seen is None or isinstance(last_seen, str)):
+            raise ValueError("Invalid page cursor")
+        return status, last_seen, steam_id
+
     def get_player_count(self) -> Dict[str, int]:
         """
         Get player statistics including online/offline counts.
@@ -647,7 +942,7 @@ class PlayerDatabase:
             Dict containing player count statistics
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 # Count online players
@@ -680,7 +975,7 @@ class PlayerDatabase:
         Store or update an application setting in the app_settings table.
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 now = datetime.now().isoformat()
                 cursor.execute("""
@@ -699,7 +994,7 @@ class PlayerDatabase:
         Retrieve an application setting from the app_settings table.
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT value FROM app_settings WHERE key = ?", (key,))
                 row = cursor.fetchone()
@@ -715,6 +1010,82 @@ class PlayerDatabase:
         """
         return self.get_app_setting(key, default)
 
+    def get_poi_timer_enabled(self) -> bool:
+        """Whether automatic POI regeneration is switched on."""
+        return self.get_app_setting('poi_timer_enabled', 'false') == 'true'
+
+    def set_poi_timer_enabled(self, enabled: bool) -> bool:
+        """Switch automatic POI regeneration on or off."""
+        return self.set_app_setting('poi_timer_enabled', 'true' if enabled else 'false')
+
+    def get_poi_timer_interval(self) -> str:
+        """Automatic POI regeneration interval ('12h', '24h', '1w', '2w' or '1m')."""
+        return self.get_app_setting('poi_timer_interval', '24h')
+
+    def set_poi_timer_interval(self, interval: str) -> bool:
+        """Store the automatic POI regeneration interval."""
+        return self.set_app_setting('poi_timer_interval', interval)
+
+    def get_poi_last_run(self) -> Optional[str]:
+        """ISO time of the last automatic POI regeneration, or None if it never ran (or was reset)."""
+        return self.get_app_setting('poi_last_run') or None
+
+    def set_poi_last_run(self) -> bool:
+        """Record that automatic POI regeneration ran now."""
+        return self.set_app_setting('poi_last_run', datetime.now().isoformat())
+
+    # ============================================================================
+    # SERVER REGISTRY METHODS
+    # ============================================================================
+
+    def save_monitored_server(self, server_id: str, name: str, host: str, port: int, enabled: bool = True) -> bool:
+        """
+        Add or update an additional server in the monitored_servers table.
+        """
+        try:
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+                now = datetime.now().isoformat()
+                cursor.execute("""
+                    INSERT INTO monitored_servers (server_id, name, host, port, enabled, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(server_id) DO UPDATE SET name=excluded.name, host=excluded.host,
+                        port=excluded.port, enabled=excluded.enabled, updated_at=excluded.updated_at
+                """, (server_id, name, host, int(port), 1 if enabled else 0, now, now))
+                conn.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Error saving monitored server {server_id}: {e}", exc_info=True)
+            return False
+
+    def get_monitored_servers(self) -> List[Dict]:
+        """
+        List the additional servers from the monitored_servers table.
+        """
+        try:
+            with self.pool.connection() as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
+                cursor.execute("SELECT server_id, name, host, port, enabled FROM monitored_servers ORDER BY name")
+                return [dict(row, enabled=bool(row['enabled'])) for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Error listing monitored servers: {e}", exc_info=True)
+            return []
+
+    def delete_monitored_server(self, server_id: str) -> bool:
+        """
+        Remove an additional server (its player database file is left on disk).
+        """
+        try:
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM monitored_servers WHERE server_id = ?", (server_id,))
+                conn.commit()
+                return cursor.rowcount > 0
+        except Exception as e:
+            logger.error(f"Error deleting monitored server {server_id}: {e}", exc_info=True)
+            return False
+
     # ============================================================================
     # FTP TEST STATUS METHODS
     # ============================================================================
@@ -736,50 +1107,54 @@ class PlayerDatabase:
     # HIGH-VALUE & DATA INTEGRITY METHODS
     # ============================================================================
 
-    def backup_database(self, backup_dir: str = 'instance/backups') -> Optional[str]:
+    def backup_database(self, label: str = '') -> Dict:
         """
-        Create a backup of the database file.
+        Take an online backup generation (SQLite backup API, verified, rotated).
+
+        Args:
+            label (str, optional): Suffix for the backup file name, e.g. 'scheduled'.
+
+        Returns:
+            dict: {'success': bool, 'message': str, 'backup_path': str}
         """
-        try:
-            if not os.path.exists(backup_dir):
-                os.makedirs(backup_dir)
-            
-            backup_filename = f"players_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
-            backup_path = os.path.join(backup_dir, backup_filename)
-            
-            shutil.copy2(self.db_path, backup_path)
-            
-            logger.info(f"Database backed up to {backup_path}")
-            return backup_path
-            
-        except Exception as e:
-            logger.error(f"Error backing up database: {e}")
-            return None
+        return self.backups.create_backup(label)
 
-    def restore_database(self, backup_path: str) -> bool:
+    def restore_database(self, backup_name: Optional[str] = None) -> Dict:
         """
-        Restore the database from a backup file.
+        Restore the database from a backup generation.
+
+        The current file is kept as a 'pre_restore' backup. Schema migrations run on
+        the restored file, so backups from older versions can be restored.
+
+        Args:
+            backup_name (str, optional): File name from list_backups(); the newest backup if omitted.
+
+        Returns:
+            dict: {'success': bool, 'message': str}
         """
-        try:
-            if not os.path.exists(backup_path):
-                logger.error(f"Backup file not found: {backup_path}")
-                return False
-            
-            shutil.copy2(backup_path, self.db_path)
-            
-            logger.info(f"Database restored from {backup_path}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error restoring database: {e}")
-            return False
+        result = self.backups.restore_backup(backup_name)
+        if result['success']:
+            self._negative_ids_checked = False
+            self.init_database()
+            self.reconcile_sessions()
+        return result
+
+    def list_backups(self) -> List[Dict]:
+        """
+        Get the backup generations of this database, newest first.
+
+        Returns:
+            List[Dict]: name, created, label, compressed and bytes per backup.
+        """
+        return [{key: value for key, value in backup.items() if key != 'path'}
+                for backup in self.backups.list_backups()]
 
     def get_players_with_duplicate_names(self) -> Dict:
         """
         Get players with duplicate names.
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT name, COUNT(*) FROM players GROUP BY name HAVING COUNT(*) > 1")
                 return {'success': True, 'duplicates': dict(cursor.fetchall())}
@@ -792,7 +1167,7 @@ class PlayerDatabase:
         Get players with duplicate IP addresses.
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT ip_address, COUNT(*) FROM players WHERE ip_address IS NOT NULL AND ip_address != '' GROUP BY ip_address HAVING COUNT(*) > 1")
                 return {'success': True, 'duplicates': dict(cursor.fetchall())}
@@ -805,7 +1180,7 @@ class PlayerDatabase:
         Get entities with invalid IDs (e.g., not a number).
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 cursor.execute("SELECT * FROM entities")
@@ -831,33 +1206,22 @@ class PlayerDatabase:
         Get all entities from the database with last refresh time.
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 
-                # Get entities
-                cursor.execute("SELECT * FROM entities ORDER BY playfield, type, name")
+                # Live entities were all seen by the last refresh
+                last_refresh = get_last_refresh(cursor)
+                cursor.execute("SELECT * FROM entities WHERE removed_at IS NULL ORDER BY playfield, type, name")
                 entities = [dict(row) for row in cursor.fetchall()]
-                
-                # Get last refresh time
-                cursor.execute("SELECT last_refresh FROM entities_meta WHERE id = 1")
-                row = cursor.fetchone()
-                last_refresh = row[0] if row else None
-                
-                # Calculate stats
-                stats = {
-                    'total': len(entities),
-                    'asteroids': len([e for e in entities if 'astvoxel' in e.get('type', '').lower() or 'asteroid' in e.get('type', '').lower()]),
-                    'structures': len([e for e in entities if e.get('type', '') == 'BA']),
-                    'ships': len([e for e in entities if e.get('type', '') in ['CV', 'SV', 'HV']]),
-                    'wrecks': len([e for e in entities if 'wreck' in e.get('name', '').lower()])
-                }
+                for entity in entities:
+                    entity['last_seen'] = last_refresh or entity['last_seen']
                 
                 return {
                     'success': True,
                     'entities': entities,
                     'last_refresh': last_refresh,
-                    'stats': stats
+                    'stats': self._entity_stats(cursor)
                 }
                 
         except Exception as e:
@@ -869,53 +1233,281 @@ class PlayerDatabase:
                 'stats': {'total': 0, 'asteroids': 0, 'structures': 0, 'ships': 0, 'wrecks': 0}
             }
 
-    def save_entities(self, entities, raw_data=None):
+    def _entity_stats(self, cursor) -> Dict:
+        """Entity totals by kind, from the entity_aggregates rollup."""
+        stats = {'total': 0, 'asteroids': 0, 'structures': 0, 'ships': 0, 'wrecks': 0}
+        for entity_type, entities, wrecks in cursor.execute(
+                "SELECT type, SUM(entities), SUM(wrecks) FROM entity_aggregates GROUP BY type"):
+            stats['total'] += entities
+            stats['wrecks'] += wrecks
+            if is_asteroid_type(entity_type):
+                stats['asteroids'] += entities
+            elif entity_type in STRUCTURE_TYPES:
+                stats['structures'] += entities
+            elif entity_type in SHIP_TYPES:
+                stats['ships'] += entities
+        return stats
+
+    def get_playfield_entity_counts(self) -> Dict:
+        """
+        Get live entity counts per playfield and faction category.
+
+        Returns:
+            dict: 'success' and 'playfields' mapping each playfield to its npc_count,
+            player_count, neutral_count and total_count.
+        """
+        try:
+            with self.pool.connection() as conn:
+                playfields = {}
+                for playfield, category, entities in conn.execute(
+                        "SELECT playfield, faction_category, SUM(entities) FROM entity_aggregates "
+                        "GROUP BY playfield, faction_category"):
+                    counts = playfields.setdefault(playfield or 'Unknown', {
+                        'npc_count': 0, 'player_count': 0, 'neutral_count': 0, 'total_count': 0
+                    })
+                    key = f"{category.lower()}_count" if category in FACTION_CATEGORIES else 'neutral_count'
+                    counts[key] += entities
+                    counts['total_count'] += entities
+                return {'success': True, 'playfields': playfields}
+        except Exception as e:
+            logger.error(f"Error getting playfield entity counts: {e}", exc_info=True)
+            return {'success': False, 'message': 'Error getting playfield entity counts', 'playfields': {}}
+
+    def get_playfield_index(self) -> Optional[PlayfieldIndex]:
+        """
+        Get the playfield name index over live entity counts.
+
+        The index is rebuilt only when an entity refresh has happened since it was built.
+
+        Returns:
+            Optional[PlayfieldIndex]: Playfield names mapped to their get_playfield_entity_counts()
+            entry, or None if the counts could not be read.
         """
-        Save entities to the database and update last refresh time.
+        try:
+            with self.pool.connection() as conn:
+                last_refresh = get_last_refresh(conn.cursor())
+        except Exception as e:
+            logger.error(f"Error reading last entity refresh: {e}", exc_info=True)
+            return None
+        built_for, index = self._playfield_index
+        if index is not None and built_for == last_refresh:
+            return index
+
+        counts = self.get_playfield_entity_counts()
+        if not counts.get('success'):
+            return None
+        index = PlayfieldIndex(counts['playfields'].items())
+        self._playfield_index = (last_refresh, index)
+        logger.debug(f"Built playfield index over {len(index)} playfields")
+        return index
+
+    def get_entity_classification(self) -> Dict:
+        """
+        Get player-owned entities and entity counts by faction.
+
+        Returns:
+            dict: 'success', 'player_entities' (live entities in the Player category, by playfield
+            and name), 'statistics' (counts per category) and 'faction_breakdown' (count,
+            category and description per faction code).
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
+                conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
-                
-                # Clear existing entities
-                cursor.execute("DELETE FROM entities")
-                
-                # Insert new entities
-                for entity in entities:
-                    cursor.execute("""
-                        INSERT INTO entities (id, name, type, faction, playfield, time_info)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    """, (
-                        entity.get('id', ''),
-                        entity.get('name', ''),
-                        entity.get('type', ''),
-                        entity.get('faction', ''),
-                        entity.get('playfield', ''),
-                        entity.get('time_info', '')
-                    ))
-                
-                # Update refresh time
-                from datetime import datetime
-                refresh_time = datetime.now().isoformat()
+                last_refresh = get_last_refresh(cursor)
                 cursor.execute("""
-                    INSERT OR REPLACE INTO entities_meta (id, last_refresh, raw_data)
-                    VALUES (1, ?, ?)
-                """, (refresh_time, raw_data or ''))
-                
-                conn.commit()
-                logger.info(f"Saved {len(entities)} entities to database")
-                return True
+                    SELECT id, name, type, faction, playfield, time_info, last_seen FROM entities
+                    WHERE faction_category = ? AND removed_at IS NULL ORDER BY playfield, name
+                """, (CATEGORY_PLAYER,))
+                player_entities = []
+                for row in cursor.fetchall():
+                    entity = dict(row)
+                    entity['faction_description'] = classify_entity_faction(entity['faction'] or '')[1]
+                    entity['last_seen'] = last_refresh or entity['last_seen']
+                    player_entities.append(entity)
+
+                by_category = dict(cursor.execute(
+                    "SELECT faction_category, SUM(entities) FROM entity_aggregates GROUP BY faction_category"
+                ).fetchall())
+                faction_breakdown = {}
+                for faction, count in cursor.execute(
+                        "SELECT faction, COUNT(*) FROM entities WHERE removed_at IS NULL GROUP BY faction"):
+                    category, description = classify_entity_faction(faction or '')
+                    faction_breakdown[faction or ''] = {'name': description, 'count': count, 'category': category}
+
+                return {
+                    'success': True,
+                    'player_entities': player_entities,
+                    'statistics': {
+                        'total_entities': sum(by_category.values()),
+                        'player_entities': by_category.get(CATEGORY_PLAYER, 0),
+                        'npc_entities': by_category.get(CATEGORY_NPC, 0),
+                        'neutral_entities': by_category.get(CATEGORY_NEUTRAL, 0)
+                    },
+                    'faction_breakdown': faction_breakdown
+                }
+        except Exception as e:
+            logger.error(f"Error classifying entities: {e}", exc_info=True)
+            return {'success': False, 'message': 'Error classifying entities'}
+
+    def save_entities(self, entities: Iterable) -> Dict:
+        """
+        Sync the stored entities with a full refresh.
+
+        Only new, changed and vanished entities are written (see entity_sync); vanished
+        ones are kept as tombstones with removed_at set. Entities are read once, so a
+        GentsParser generator can be passed straight in.
+
+        Args:
+            entities (Iterable): GentsEntity records or dicts with id, name, type,
+                faction, playfield and time_info.
+
+        Returns:
+            dict: 'success' and the 'total', 'added', 'changed', 'removed' and 'purged' counts,
+            plus 'timers' for entities whose time_info was written on its own (not counted as changed).
+        """
+        try:
+            with self.pool.connection() as conn:
+                result = sync_entities(conn.cursor(), entities, datetime.now())
+            logger.info(f"Synced {result['total']} entities: {result['added']} new, {result['changed']} changed, "
+                        f"{result['removed']} gone, {result['timers']} timers")
+            return {'success': True, **result}
                 
         except Exception as e:
-            logger.error(f"Error saving entities: {e}")
-            return False
+            logger.error(f"Error saving entities: {e}", exc_info=True)
+            return {'success': False, 'message': 'Error saving entities'}
+
+    def get_entity_changes(self) -> Dict:
+        """
+        Get the entities the last refresh added and removed.
+
+        Returns:
+            dict: 'success', 'last_refresh', and 'new' and 'gone' entity lists.
+        """
+        try:
+            with self.pool.connection() as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
+                new = [dict(row) for row in cursor.execute("SELECT * FROM entities_new ORDER BY playfield, type, name")]
+                gone = [dict(row) for row in cursor.execute("SELECT * FROM entities_gone ORDER BY playfield, type, name")]
+                return {'success': True, 'last_refresh': get_last_refresh(cursor), 'new': new, 'gone': gone}
+        except Exception as e:
+            logger.error(f"Error getting entity changes: {e}", exc_info=True)
+            return {'success': False, 'message': 'Error getting entity changes', 'new': [], 'gone': []}
+
+    def save_entity_snapshot(self, source: str = 'manual') -> Dict:
+        """
+        Snapshot the live entities for the entity history, then prune expired snapshots.
+
+        Snapshots are kept for the entity_snapshot_retention_days app setting (default 90).
+
+        Args:
+            source (str, optional): What triggered the snapshot ('scheduled', 'manual', 'poi').
+
+        Returns:
+            dict: 'success' and the snapshot summary from entity_snapshots.take_snapshot.
+        """
+        try:
+            retention_days = float(self.settings_db.get_app_setting('entity_snapshot_retention_days',
+                                                        DEFAULT_SNAPSHOT_RETENTION_DAYS))
+        except (ValueError, TypeError):
+            retention_days = DEFAULT_SNAPSHOT_RETENTION_DAYS
+        try:
+            now = datetime.now()
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+                result = take_snapshot(cursor, now, source)
+                if retention_days > 0:
+                    prune_snapshots(cursor, now - timedelta(days=retention_days))
+            logger.info(f"📸 Entity snapshot {result['snapshot_id']}"
+                        f"{' (unchanged)' if result['repeated'] else ''}: {result['entities']} entities, "
+                        f"{result['structures_and_ships']} structures and ships, {result['new_chunks']}/{result['playfields']} "
+                        f"playfields stored")
+            return {'success': True, **result}
+        except Exception as e:
+            logger.error(f"Error saving entity snapshot: {e}", exc_info=True)
+            return {'success': False, 'message': 'Error saving entity snapshot'}
+
+    def get_last_entity_snapshot_time(self) -> Optional[datetime]:
+        """
+        Get the time the newest entity snapshot was last taken.
+
+        Returns:
+            Optional[datetime]: Snapshot time, or None if there is none or it can't be read.
+        """
+        try:
+            with self.pool.connection() as conn:
+                return last_snapshot_time(conn.cursor())
+        except Exception as e:
+            logger.error(f"Error reading last entity snapshot: {e}", exc_info=True)
+            return None
+
+    def get_entity_history(self, playfield: Optional[str] = None, since: Optional[datetime] = None,
+                           until: Optional[datetime] = None) -> Dict:
+        """
+        Get entity counts and structure-and-ship counts over time from the entity snapshots.
+
+        Args:
+            playfield (str, optional): Playfield name; galaxy totals if omitted.
+            since (datetime, optional): Start of the range. Defaults to 7 days ago.
+            until (datetime, optional): End of the range. Defaults to now.
+
+        Returns:
+            dict: 'success', 'playfield', 'since', 'until' and 'points' ('time', 'entities',
+            'structures_and_ships' (BA, CV, SV and HV); oldest first).
+        """
+        until = until or datetime.now()
+        since = since or until - timedelta(days=7)
+        try:
+            with self.pool.connection() as conn:
+                points = snapshot_history(conn.cursor(), playfield, since, until)
+            return {'success': True, 'playfield': playfield, 'since': since.isoformat(timespec='seconds'),
+                    'until': until.isoformat(timespec='seconds'), 'points': points}
+        except Exception as e:
+            logger.error(f"Error getting entity history: {e}", exc_info=True)
+            return {'success': False, 'message': 'Error getting entity history', 'points': []}
+
+    def get_entity_snapshots(self, limit: int = 100) -> Dict:
+        """
+        List the newest entity snapshots.
+
+        Args:
+            limit (int, optional): Most snapshots returned. Defaults to 100.
+
+        Returns:
+            dict: 'success' and 'snapshots' (newest first).
+        """
+        try:
+            with self.pool.connection() as conn:
+                return {'success': True, 'snapshots': list_snapshots(conn.cursor(), limit)}
+        except Exception as e:
+            logger.error(f"Error listing entity snapshots: {e}", exc_info=True)
+            return {'success': False, 'message': 'Error listing entity snapshots', 'snapshots': []}
+
+    def get_entity_snapshot(self, snapshot_id: int, playfield: Optional[str] = None) -> Dict:
+        """
+        Get the entities stored in a snapshot.
+
+        Args:
+            snapshot_id (int): Snapshot id.
+            playfield (str, optional): Only this playfield.
+
+        Returns:
+            dict: 'success' and 'entities' ordered by playfield and id (without time_info).
+        """
+        try:
+            with self.pool.connection() as conn:
+                return {'success': True, 'entities': list(read_snapshot(conn.cursor(), snapshot_id, playfield))}
+        except Exception as e:
+            logger.error(f"Error reading entity snapshot {snapshot_id}: {e}", exc_info=True)
+            return {'success': False, 'message': 'Error reading entity snapshot', 'entities': []}
 
     def clear_entities(self):
         """
         Clear all entities from the database.
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("DELETE FROM entities")
                 cursor.execute("DELETE FROM entities_meta")
@@ -927,6 +1519,129 @@ class PlayerDatabase:
             logger.error(f"Error clearing entities: {e}")
             return False
 
+    # ============================================================================
+    # SEARCH METHODS
+    # ============================================================================
+
+    def search(self, query: str, limit: Optional[int] = None, kinds: Optional[List[str]] = None) -> Dict:
+        """
+        Full-text search over players, entities and message history.
+
+        Args:
+            query (str): Search text; every word must match as a prefix.
+            limit (int, optional): Maximum number of results.
+            kinds (list, optional): Restrict to 'player', 'entity' and/or 'message'.
+
+        Returns:
+            dict: 'results' (best first) and the 'engine' used ('fts5' or 'like').
+        """
+        try:
+            with self.pool.connection() as conn:
+                results = search_index(conn, query, limit, kinds, use_fts=self.search_available)
+            return {'success': True, 'results': results, 'engine': 'fts5' if self.search_available else 'like'}
+        except Exception as e:
+            logger.error(f"Error searching database: {e}", exc_info=True)
+            return {'success': False, 'message': 'An internal error occurred. Please try again later.'}
+
+    # ============================================================================
+    # SESSION METHODS
+    # ============================================================================
+
+    def reconcile_sessions(self) -> int:
+        """
+        Close open sessions at the last heartbeat: ones a previous run left open (crash,
+        kill), or ones open when the monitor lost the server connection.
+
+        Returns:
+            int: Number of sessions closed.
+        """
+        try:
+            with self.pool.connection() as conn:
+                return reconcile_open_sessions(conn.cursor(), datetime.now().isoformat())
+        except Exception as e:
+            logger.error(f"Error reconciling open sessions: {e}", exc_info=True)
+            return 0
+
+    def record_session_heartbeat(self):
+        """
+        Note that the monitor has just confirmed the online list. Called every monitor
+        cycle; writes at most once per HEARTBEAT_INTERVAL.
+        """
+        now = time.monotonic()
+        if now - self._last_heartbeat < HEARTBEAT_INTERVAL:
+            return
+        self._last_heartbeat = now
+        try:
+            with self.pool.connection() as conn:
+                write_heartbeat(conn.cursor(), datetime.now().isoformat())
+        except Exception as e:
+            logger.error(f"Error writing session heartbeat: {e}", exc_info=True)
+
+    def get_playtime_leaderboard(self, limit: int = 20, day: Optional[str] = None) -> Dict:
+        """
+        Players with the most playtime, from the session rollups.
+
+        Args:
+            limit (int, optional): Number of players (1-100).
+            day (str, optional): 'YYYY-MM-DD' for one day's playtime, None for all time.
+
+        Returns:
+            dict: 'players' with steam_id, name, status, seconds and sessions, most playtime first.
+        """
+        try:
+            limit = max(1, min(int(limit or 20), 100))
+            with self.pool.connection() as conn:
+                players = leaderboard(conn.cursor(), datetime.now().isoformat(), limit, day)
+            return {'success': True, 'players': players, 'day': day}
+        except Exception as e:
+            logger.error(f"Error reading playtime leaderboard: {e}", exc_info=True)
+            return {'success': False, 'message': 'An internal error occurred. Please try again later.'}
+
+    def get_concurrency(self, start: str, end: str, bucket: str = 'hour') -> Dict:
+        """
+        Online players over time, per hour or per day.
+
+        Args:
+            start (str): First period, ISO date or date and hour.
+            end (str): Last period, ISO date or date and hour.
+            bucket (str, optional): 'hour' or 'day'.
+
+        Returns:
+            dict: 'series' of period, avg_online, peak_online, player_hours and sessions_started.
+        """
+        if bucket not in ('hour', 'day'):
+            return {'success': False, 'message': "bucket must be 'hour' or 'day'"}
+        try:
+            with self.pool.connection() as conn:
+                series = concurrency(conn.cursor(), datetime.now().isoformat(), start, end, bucket)
+            return {'success': True, 'bucket': bucket, 'series': series}
+        except Exception as e:
+            logger.error(f"Error reading player concurrency: {e}", exc_info=True)
+            return {'success': False, 'message': 'An internal error occurred. Please try again later.'}
+
+    def get_player_sessions(self, steam_id: str, limit: int = 50) -> List[Dict]:
+        """
+        Get a player's most recent sessions, newest first.
+
+        Args:
+            steam_id (str): Player's Steam ID.
+            limit (int, optional): Maximum number of sessions.
+
+        Returns:
+            List[Dict]: Sessions; session_end is None while the session is in progress.
+        """
+        try:
+            with self.pool.connection() as conn:
+                rows = conn.execute(
+                    "SELECT session_start, session_end, ip_address, playfield FROM player_sessions "
+                    "WHERE steam_id = ? ORDER BY session_start DESC LIMIT ?",
+                    (str(steam_id), max(1, min(int(limit), 500)))).fetchall()
+            return [{'session_start': start, 'session_end': end, 'ip_address': ip, 'playfield': playfield}
+                    for start, end, ip, playfield in rows]
+        except Exception as e:
+            logger.error(f"Error reading sessions for {steam_id}: {e}", exc_info=True)
+            return []
+
     # ============================================================================
     # PLAYER DATA MANAGEMENT METHODS
     # ============================================================================
@@ -952,7 +1667,7 @@ class PlayerDatabase:
             if days_threshold < 1:
                 return {'success': False, 'message': 'Days threshold must be at least 1'}
             
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 # Calculate cutoff date
@@ -1052,73 +1767,6 @@ class PlayerDatabase:
                 'total_deleted': 0
             }
 
-    def backup_database(self):
-        """
-        Create a backup of the current database.
-        Creates players.db.bak in the same directory.
-        
-        Returns:
-            dict: {'success': bool, 'message': str, 'backup_path': str}
-        """
-        try:
-            import shutil
-            backup_path = f"{self.db_path}.bak"
-            
-            # Copy database file to backup
-            shutil.copy2(self.db_path, backup_path)
-            
-            logger.info(f"Database backup created: {backup_path}")
-            return {
-                'success': True,
-                'message': f'Database backup created successfully',
-                'backup_path': backup_path
-            }
-            
-        except Exception as e:
-            logger.error(f"Error creating database backup: {e}")
-            return {
-                'success': False,
-                'message': f'Failed to create backup: {e}',
-                'backup_path': ''
-            }
-
-    def restore_database(self):
-        """
-        Restore database from backup file.
-        Restores from players.db.bak to players.db.
-        
-        Returns:
-            dict: {'success': bool, 'message': str}
-        """
-        try:
-            import shutil
-            import os
-            backup_path = f"{self.db_path}.bak"
-            
-            # Check if backup exists
-            if not os.path.exists(backup_path):
-                return {
-                    'success': False,
-                    'message': 'No backup file found. Create a backup first.'
-                }
-            
-            # Close any existing connections
-            # Restore backup to main database
-            shutil.copy2(backup_path, self.db_path)
-            
-            logger.info(f"Database restored from backup: {backup_path}")
-            return {
-                'success': True,
-                'message': 'Database restored successfully from backup'
-            }
-            
-        except Exception as e:
-            logger.error(f"Error restoring database: {e}")
-            return {
-                'success': False,
-                'message': f'Failed to restore database: {e}'
-            }
-
     def export_players_csv(self):
         """
         Export all players to CSV format.
@@ -1130,7 +1778,7 @@ class PlayerDatabase:
             import csv
             import io
             
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.connection() as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 
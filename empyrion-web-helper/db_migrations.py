@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Versioned schema migrations for the Empyrion Web Helper database
+
+Each migration has a version number; the highest applied version is kept in
+PRAGMA user_version, so a migration runs exactly once per database file. Run
+after init_database has created the base tables.
+
+The module also carries a query-plan audit: the hot queries from database.py
+and messaging.py are run through EXPLAIN QUERY PLAN and any full table scan or
+temporary sort that the indexes are meant to prevent is reported. Check a
+database by hand with:
+
+    python3 db_migrations.py [instance/players.db]
+"""
+
+import sqlite3
+import sys
+import logging
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+# (version, description, statements) - append only; never edit a released migration
+MIGRATIONS = [
+    (1, "secondary indexes for players, sessions, entities and message history", [
+        # message_history is normally created by MessagingManager; make sure it exists to index it
+        """CREATE TABLE IF NOT EXISTS message_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            message_type TEXT NOT NULL,
+            message_text TEXT NOT NULL,
+            player_name TEXT,
+            success BOOLEAN DEFAULT TRUE
+        )""",
+        # Online counts, offline marking
+        "CREATE INDEX IF NOT EXISTS idx_players_status_last_seen ON players(status, last_seen)",
+        # get_all_players ordering (online first, then most recently seen) without a sort step
+        "CREATE INDEX IF NOT EXISTS idx_players_online_order "
+        "ON players((CASE WHEN status = 'Online' THEN 0 ELSE 1 END), last_seen DESC)",
+        # purge_old_players age filter
+        "CREATE INDEX IF NOT EXISTS idx_players_last_seen ON players(last_seen)",
+        # purge/duplicate self-joins on name, CSV export order
+        "CREATE INDEX IF NOT EXISTS idx_players_name ON players(name, first_seen)",
+        # duplicate IP report
+        "CREATE INDEX IF NOT EXISTS idx_players_ip_address ON players(ip_address)",
+        "CREATE INDEX IF NOT EXISTS idx_player_sessions_steam_id ON player_sessions(steam_id, session_start)",
+        "CREATE INDEX IF NOT EXISTS idx_entities_playfield_type ON entities(playfield, type, name)",
+        "CREATE INDEX IF NOT EXISTS idx_message_history_timestamp ON message_history(timestamp)",
+    ]),
+    (2, "keyset pagination and prefix search indexes for players", [
+        # steam_id completes the page key, so each page is one index range
+        "DROP INDEX IF EXISTS idx_players_status_last_seen",
+        "CREATE INDEX IF NOT EXISTS idx_players_status_seen_id ON players(status, last_seen, steam_id)",
+        # case-insensitive name prefix search (LIKE 'abc%')
+        "CREATE INDEX IF NOT EXISTS idx_players_name_nocase ON players(name COLLATE NOCASE)",
+    ]),
+    (3, "persistent geolocation cache", [
+        # resolved = 0 marks a negative entry (lookup failed), kept for a shorter time
+        """CREATE TABLE IF NOT EXISTS geo_cache (
+            ip_address TEXT PRIMARY KEY,
+            country TEXT NOT NULL,
+            resolved INTEGER NOT NULL,
+            expires_at REAL NOT NULL,
+            updated_at TEXT NOT NULL
+        )""",
+        # refresh_geolocation_for_existing_players finds missing and error countries
+        "CREATE INDEX IF NOT EXISTS idx_players_country ON players(country)",
+    ]),
+    (4, "session tracking rollups", [
+        # At most one open session per player; also how open sessions are found and counted
+        "UPDATE player_sessions SET session_end = session_start WHERE session_end IS NULL "
+        "AND id NOT IN (SELECT MAX(id) FROM player_sessions WHERE session_end IS NULL GROUP BY steam_id)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_player_sessions_open ON player_sessions(steam_id) "
+        "WHERE session_end IS NULL",
+        """CREATE TABLE IF NOT EXISTS playtime_totals (
+            steam_id TEXT PRIMARY KEY,
+            sessions INTEGER NOT NULL DEFAULT 0,
+            seconds INTEGER NOT NULL DEFAULT 0,
+            longest_seconds INTEGER NOT NULL DEFAULT 0,
+            last_session_end TEXT
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_playtime_totals_seconds ON playtime_totals(seconds DESC)",
+        """CREATE TABLE IF NOT EXISTS playtime_daily (
+            day TEXT NOT NULL,
+            steam_id TEXT NOT NULL,
+            sessions INTEGER NOT NULL DEFAULT 0,
+            seconds INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, steam_id)
+        ) WITHOUT ROWID""",
+        "CREATE INDEX IF NOT EXISTS idx_playtime_daily_seconds ON playtime_daily(day, seconds DESC)",
+        """CREATE TABLE IF NOT EXISTS concurrency_hourly (
+            hour TEXT PRIMARY KEY,
+            player_seconds INTEGER NOT NULL DEFAULT 0,
+            peak_online INTEGER NOT NULL DEFAULT 0,
+            sessions_started INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID""",
+    ]),
+    (5, "incremental entity sync with tombstones", [
+        # removed_at: refresh the entity was first missing from (NULL while it is live);
+        # appeared_at: refresh its current live stretch began (created_at stays the first sighting)
+        "ALTER TABLE entities ADD COLUMN removed_at TEXT",
+        "ALTER TABLE entities ADD COLUMN appeared_at TEXT",
+        "UPDATE entities SET appeared_at = created_at",
+        # Live entity listing in get_entities order
+        "DROP INDEX IF EXISTS idx_entities_playfield_type",
+        "CREATE INDEX IF NOT EXISTS idx_entities_live ON entities(playfield, type, name) WHERE removed_at IS NULL",
+        "CREATE INDEX IF NOT EXISTS idx_entities_appeared_at ON entities(appeared_at)",
+        # Tombstones only, so the live listing can't pick it over idx_entities_live
+        "CREATE INDEX IF NOT EXISTS idx_entities_removed_at ON entities(removed_at) WHERE removed_at IS NOT NULL",
+        # Entities that came and went with the last refresh
+        """CREATE VIEW IF NOT EXISTS entities_new AS
+            SELECT * FROM entities WHERE removed_at IS NULL
+            AND appeared_at = (SELECT value FROM entities_meta WHERE key = 'last_refresh')""",
+        """CREATE VIEW IF NOT EXISTS entities_gone AS
+            SELECT * FROM entities
+            WHERE removed_at = (SELECT value FROM entities_meta WHERE key = 'last_refresh')""",
+    ]),
+    (6, "entity faction categories and per-playfield aggregates", [
+        # 'NPC', 'Player' or 'Neutral' (entity_classification); set when entities are saved
+        "ALTER TABLE entities ADD COLUMN faction_category TEXT",
+        "CREATE INDEX IF NOT EXISTS idx_entities_category ON entities(faction_category, playfield, name) "
+        "WHERE removed_at IS NULL",
+        "CREATE INDEX IF NOT EXISTS idx_entities_faction ON entities(faction) WHERE removed_at IS NULL",
+        # Live entities per playfield, type and category, kept current by the triggers below
+        """CREATE TABLE IF NOT EXISTS entity_aggregates (
+            playfield TEXT NOT NULL,
+            type TEXT NOT NULL,
+            faction_category TEXT NOT NULL,
+            entities INTEGER NOT NULL DEFAULT 0,
+            wrecks INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (playfield, type, faction_category)
+        ) WITHOUT ROWID""",
+        """CREATE TRIGGER IF NOT EXISTS entity_aggregates_ai AFTER INSERT ON entities
+            WHEN new.removed_at IS NULL BEGIN
+            INSERT INTO entity_aggregates (playfield, type, faction_category, entities, wrecks)
+            VALUES (IFNULL(new.playfield, ''), new.type, IFNULL(new.faction_category, ''), 1,
+                    new.name LIKE '%wreck%')
+            ON CONFLICT(playfield, type, faction_category) DO UPDATE SET
+                entities = entities + 1, wrecks = wrecks + excluded.wrecks;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS entity_aggregates_ad AFTER DELETE ON entities
+            WHEN old.removed_at IS NULL BEGIN
+            UPDATE entity_aggregates SET entities = entities - 1, wrecks = wrecks - (old.name LIKE '%wreck%')
+            WHERE playfield = IFNULL(old.playfield, '') AND type = old.type
+              AND faction_category = IFNULL(old.faction_category, '');
+            DELETE FROM entity_aggregates WHERE entities <= 0 AND playfield = IFNULL(old.playfield, '')
+              AND type = old.type AND faction_category = IFNULL(old.faction_category, '');
+        END""",
+        # Tombstoning counts as a delete, coming back as an insert
+        """CREATE TRIGGER IF NOT EXISTS entity_aggregates_au
+            AFTER UPDATE OF name, type, playfield, faction_category, removed_at ON entities BEGIN
+            UPDATE entity_aggregates SET entities = entities - 1, wrecks = wrecks - (old.name LIKE '%wreck%')
+            WHERE old.removed_at IS NULL AND playfield = IFNULL(old.playfield, '') AND type = old.type
+              AND faction_category = IFNULL(old.faction_category, '');
+            DELETE FROM entity_aggregates WHERE entities <= 0 AND playfield = IFNULL(old.playfield, '')
+              AND type = old.type AND faction_category = IFNULL(old.faction_category, '');
+            INSERT INTO entity_aggregates (playfield, type, faction_category, entities, wrecks)
+            SELECT IFNULL(new.playfield, ''), new.type, IFNULL(new.faction_category, ''), 1,
+                   new.name LIKE '%wreck%'
+            WHERE new.removed_at IS NULL
+            ON CONFLICT(playfield, type, faction_category) DO UPDATE SET
+                entities = entities + 1, wrecks = wrecks + excluded.wrecks;
+        END""",
+        # Existing entities (category '' until PlayerDatabase classifies them on startup)
+        """INSERT INTO entity_aggregates (playfield, type, faction_category, entities, wrecks)
+            SELECT IFNULL(playfield, ''), type, IFNULL(faction_category, ''), COUNT(*),
+                   SUM(name LIKE '%wreck%')
+            FROM entities WHERE removed_at IS NULL GROUP BY 1, 2, 3""",
+    ]),
+    (7, "entity snapshots", [
+        # One row per distinct snapshot; an identical follow-up only moves last_taken_at
+        """CREATE TABLE IF NOT EXISTS entity_snapshots (
+            id INTEGER PRIMARY KEY,
+            taken_at TEXT NOT NULL,
+            last_taken_at TEXT NOT NULL,
+            repeats INTEGER NOT NULL DEFAULT 1,
+            source TEXT NOT NULL,
+            digest BLOB NOT NULL,
+            entities INTEGER NOT NULL,
+            structures INTEGER NOT NULL,
+            playfields INTEGER NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_entity_snapshots_last_taken_at ON entity_snapshots(last_taken_at)",
+        # A playfield's compressed entity list, stored once per distinct content
+        """CREATE TABLE IF NOT EXISTS entity_snapshot_chunks (
+            id INTEGER PRIMARY KEY,
+            digest BLOB NOT NULL UNIQUE,
+            entities INTEGER NOT NULL,
+            structures INTEGER NOT NULL,
+            data BLOB NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS entity_snapshot_playfields (
+            playfield TEXT NOT NULL,
+            snapshot_id INTEGER NOT NULL,
+            chunk_id INTEGER NOT NULL,
+            PRIMARY KEY (playfield, snapshot_id)
+        ) WITHOUT ROWID""",
+        "CREATE INDEX IF NOT EXISTS idx_entity_snapshot_playfields_snapshot "
+        "ON entity_snapshot_playfields(snapshot_id)",
+        "CREATE INDEX IF NOT EXISTS idx_entity_snapshot_playfields_chunk ON entity_snapshot_playfields(chunk_id)",
+    ]),
+    (8, "name the snapshot count of BA, CV, SV and HV structures_and_ships", [
+        # get_entities() counts only BA as structures; the snapshot column counts ships too
+        "ALTER TABLE entity_snapshots RENAME COLUMN structures TO structures_and_ships",
+        "ALTER TABLE entity_snapshot_chunks RENAME COLUMN structures TO structures_and_ships",
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# (name, sql, tables allowed to be scanned in full) - the scans listed are inherent:
+# the query has to look at every row (e.g. the outer side of a per-row EXISTS check)
+AUDITED_QUERIES = [
+    ('get_all_players',
+     "SELECT * FROM players ORDER BY CASE WHEN status = 'Online' THEN 0 ELSE 1 END, last_seen DESC", ()),
+    ('get_player_count online', "SELECT COUNT(*) FROM players WHERE status = 'Online'", ()),
+    ('mark offline',
+     "SELECT name FROM players WHERE status = 'Online' AND steam_id NOT IN (SELECT ?)", ()),
+    ('purge_old_players age', "SELECT steam_id, name, last_seen FROM players WHERE last_seen IS NULL OR last_seen < ?", ()),
+    ('purge_old_players duplicates',
+     "SELECT p1.steam_id, p1.name, p1.first_seen FROM players p1 WHERE EXISTS ("
+     "SELECT 1 FROM players p2 WHERE p2.name = p1.name AND p2.steam_id != p1.steam_id "
+     "AND p2.first_seen > p1.first_seen)", ('p1',)),
+    ('negative steam id cleanup',
+     "SELECT n.steam_id, n.name FROM players n WHERE n.steam_id >= '-' AND n.steam_id < '.' "
+     "AND CAST(n.steam_id AS INTEGER) < 0 AND EXISTS ("
+     "SELECT 1 FROM players p WHERE p.name = n.name AND CAST(p.steam_id AS INTEGER) > 0)", ()),
+    ('get_players_page seen',
+     "SELECT steam_id, status, last_seen FROM players WHERE status = ? AND last_seen IS NOT NULL "
+     "AND (last_seen, steam_id) < (?, ?) ORDER BY last_seen DESC, steam_id DESC LIMIT ?", ()),
+    ('get_players_page never seen',
+     "SELECT steam_id, status, last_seen FROM players WHERE status = ? AND last_seen IS NULL "
+     "AND steam_id < ? ORDER BY steam_id DESC LIMIT ?", ()),
+    ('get_players_page next status', "SELECT MAX(status) FROM players WHERE status < ?", ()),
+    ('get_players_page name prefix', "SELECT steam_id FROM players WHERE name LIKE ? ESCAPE '\\'", ()),
+    ('get_players_page ip prefix', "SELECT steam_id FROM players WHERE ip_address GLOB ?", ()),
+    ('duplicate names', "SELECT name, COUNT(*) FROM players GROUP BY name HAVING COUNT(*) > 1", ()),
+    ('duplicate ips',
+     "SELECT ip_address, COUNT(*) FROM players WHERE ip_address IS NOT NULL AND ip_address != '' "
+     "GROUP BY ip_address HAVING COUNT(*) > 1", ()),
+    ('export_players_csv', "SELECT steam_id FROM players ORDER BY name", ()),
+    ('player sessions', "SELECT * FROM player_sessions WHERE steam_id = ? ORDER BY session_start", ()),
+    ('open sessions', "SELECT id, steam_id, session_start FROM player_sessions WHERE session_end IS NULL", ()),
+    ('online session count', "SELECT COUNT(*) FROM player_sessions WHERE session_end IS NULL", ()),
+    ('playtime leaderboard',
+     "SELECT t.steam_id, p.name FROM playtime_totals t JOIN players p ON p.steam_id = t.steam_id "
+     "ORDER BY t.seconds DESC LIMIT ?", ()),
+    ('daily playtime leaderboard',
+     "SELECT t.steam_id, t.seconds FROM playtime_daily t WHERE t.day = ? ORDER BY t.seconds DESC LIMIT ?", ()),
+    ('concurrency range',
+     "SELECT hour, player_seconds, peak_online FROM concurrency_hourly WHERE hour >= ? AND hour <= ? ORDER BY hour", ()),
+    ('get_entities', "SELECT * FROM entities WHERE removed_at IS NULL ORDER BY playfield, type, name", ()),
+    ('entities new since last refresh', "SELECT * FROM entities_new", ()),
+    ('entities gone since last refresh', "SELECT * FROM entities_gone", ()),
+    ('expired entity tombstones', "SELECT id FROM entities WHERE removed_at < ?", ()),
+    ('player structures',
+     "SELECT * FROM entities WHERE faction_category = ? AND removed_at IS NULL ORDER BY playfield, name", ()),
+    ('entity faction breakdown',
+     "SELECT faction, COUNT(*) FROM entities WHERE removed_at IS NULL GROUP BY faction", ()),
+    # One row per playfield, type and category: reading all of it is the point
+    ('entity aggregates', "SELECT playfield, type, faction_category, entities, wrecks FROM entity_aggregates",
+     ('entity_aggregates',)),
+    ('entity snapshot source', "SELECT IFNULL(playfield, ''), id, type, faction, name FROM entities "
+     "WHERE removed_at IS NULL ORDER BY playfield", ()),
+    ('entity snapshot chunk by digest', "SELECT id FROM entity_snapshot_chunks WHERE digest = ?", ()),
+    ('latest entity snapshot',
+     "SELECT id, digest FROM entity_snapshots WHERE id = (SELECT MAX(id) FROM entity_snapshots)", ()),
+    ('expired entity snapshots', "SELECT id FROM entity_snapshots WHERE last_taken_at < ?", ()),
+    ('entity snapshot chunks in use',
+     "SELECT 1 FROM entity_snapshot_playfields WHERE chunk_id = ?", ()),
+    ('entity snapshot chunks of snapshot',
+     "SELECT chunk_id FROM entity_snapshot_playfields WHERE snapshot_id = ?", ()),
+    ('entity history range',
+     "SELECT id, taken_at, last_taken_at, entities, structures_and_ships FROM entity_snapshots "
+     "WHERE last_taken_at >= ? AND taken_at <= ? ORDER BY last_taken_at", ()),
+    ('entity history playfield',
+     "SELECT p.snapshot_id, c.entities, c.structures_and_ships FROM entity_snapshot_playfields p "
+     "JOIN entity_snapshot_chunks c ON c.id = p.chunk_id "
+     "WHERE p.playfield = ? AND p.snapshot_id BETWEEN ? AND ?", ()),
+    ('read entity snapshot',
+     "SELECT p.playfield, c.data FROM entity_snapshot_playfields p "
+     "JOIN entity_snapshot_chunks c ON c.id = p.chunk_id WHERE p.snapshot_id = ? ORDER BY p.playfield", ()),
+    ('get_message_history',
+     "SELECT timestamp, message_type, message_text, player_name, success FROM message_history "
+     "ORDER BY timestamp DESC LIMIT ?", ()),
+]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Return the database's PRAGMA user_version."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """
+    Apply all pending migrations, each in its own transaction, then refresh statistics.
+
+    Args:
+        conn (sqlite3.Connection): Open connection to the database.
+
+    Returns:
+        int: Schema version after migrating.
+
+    Raises:
+        sqlite3.Error: If a migration fails (that migration is rolled back).
+    """
+    current = get_schema_version(conn)
+    applied = []
+    for version, description, statements in MIGRATIONS:
+        if version <= current:
+            continue
+        logger.info(f"Applying database migration {version}: {description}")
+        try:
+            conn.execute("BEGIN")
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        applied.append(version)
+        current = version
+
+    if applied:
+        # Give the planner row counts for the new indexes
+        conn.execute("ANALYZE")
+        conn.commit()
+        for problem in audit_query_plans(conn):
+            logger.warning(f"Query plan audit: {problem['query']}: {problem['issue']} ({problem['plan']})")
+    else:
+        # Cheap; only re-analyzes tables whose statistics have drifted
+        conn.execute("PRAGMA optimize")
+    return current
+
+
+def audit_query_plans(conn: sqlite3.Connection) -> List[Dict]:
+    """
+    Run the hot queries through EXPLAIN QUERY PLAN and report regressions.
+
+    Plans are made against an empty copy of the schema without statistics, so the
+    result depends on the indexes only - on a small live database SQLite rightly
+    prefers scanning a handful of rows. A plan step that scans a table without an
+    index (outside the allowed scans) or sorts with a temporary B-tree is reported.
+
+    Args:
+        conn (sqlite3.Connection): Open connection to a migrated database.
+
+    Returns:
+        List[Dict]: One entry per problem with 'query', 'issue' and 'plan'; empty if all is well.
+    """
+    schema = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE sql IS NOT NULL AND type IN ('table', 'index', 'view') "
+        "AND name NOT LIKE 'sqlite_%' ORDER BY CASE type WHEN 'table' THEN 0 WHEN 'index' THEN 1 ELSE 2 END"
+    ).fetchall()
+    # Virtual tables (full-text search) and their shadow tables are not audited
+    virtual = [name for name, sql in schema if sql.upper().startswith('CREATE VIRTUAL')]
+    scratch = sqlite3.connect(':memory:')
+    try:
+        for name, statement in schema:
+            if not any(name == vt or name.startswith(f"{vt}_") for vt in virtual):
+                scratch.execute(statement)
+        return _audit_plans(scratch)
+    finally:
+        scratch.close()
+
+
+def _audit_plans(conn: sqlite3.Connection) -> List[Dict]:
+    problems = []
+    for name, sql, allowed_scans in AUDITED_QUERIES:
+        params = ['0'] * sql.count('?')
+        try:
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        except sqlite3.Error as e:
+            problems.append({'query': name, 'issue': f"cannot be planned: {e}", 'plan': ''})
+            continue
+
+        for step in plan:
+            words = step.split()
+            if words[0] == 'SCAN' and 'USING' not in words and words[1] not in allowed_scans \
+                    and words[1] not in ('CONSTANT',):
+                problems.append({'query': name, 'issue': f"full scan of {words[1]}", 'plan': ' | '.join(plan)})
+            elif step.startswith('USE TEMP B-TREE'):
+                problems.append({'query': name, 'issue': step.lower(), 'plan': ' | '.join(plan)})
+    return problems
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'instance/players.db'
+    with sqlite3.connect(db_path) as connection:
+        version = migrate(connection)
+        issues = audit_query_plans(connection)
+    print(f"{db_path}: schema version {version}, {len(AUDITED_QUERIES)} queries audited, {len(issues)} problem(s)")
+    for issue in issues:
+        print(f"  {issue['query']}: {issue['issue']}\n    {issue['plan']}")
+    sys.exit(1 if issues else 0)
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+SQLite connection pool for Empyrion Web Helper
+
+Keeps a small set of open connections per database file instead of opening a
+new one for every query. Connections are put in WAL mode with synchronous=NORMAL
+and a busy timeout, and keep their statement cache between uses, so repeated
+queries (update_player, get_app_setting) skip both the open and the re-prepare.
+
+Usage mirrors `with sqlite3.connect(path) as conn:` - the block commits on
+success and rolls back on error:
+
+    pool = get_pool('instance/players.db')
+    with pool.connection() as conn:
+        conn.execute(...)
+"""
+
+import os
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUSY_TIMEOUT = 5.0       # seconds a writer waits for a lock before 'database is locked'
+DEFAULT_SYNCHRONOUS = 'NORMAL'   # safe with WAL; only the last commits can be lost on power failure
+DEFAULT_CACHED_STATEMENTS = 256  # prepared statements kept per connection
+DEFAULT_MAX_IDLE = 8             # idle connections kept open per database
+
+_pools: Dict[str, 'ConnectionPool'] = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """
+    Pool of SQLite connections for one database file.
+
+    Connections are handed out per `with` block and returned afterwards, so the
+    number of open connections follows concurrency rather than thread count.
+    Nested `connection()` blocks on the same thread share one connection and only
+    the outermost block commits.
+    """
+
+    def __init__(self, db_path: str, busy_timeout: float = DEFAULT_BUSY_TIMEOUT,
+                 synchronous: str = DEFAULT_SYNCHRONOUS, cached_statements: int = DEFAULT_CACHED_STATEMENTS,
+                 max_idle: int = DEFAULT_MAX_IDLE):
+        """
+        Initialize the ConnectionPool.
+
+        Args:
+            db_path (str): Path to the SQLite database file.
+            busy_timeout (float, optional): Seconds to wait on a locked database.
+            synchronous (str, optional): PRAGMA synchronous level for each connection.
+            cached_statements (int, optional): Size of each connection's statement cache.
+            max_idle (int, optional): Idle connections kept open; extras are closed on release.
+        """
+        self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self.synchronous = synchronous
+        self.cached_statements = cached_statements
+        self.max_idle = max_idle
+
+        self._idle: List[sqlite3.Connection] = []
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._in_use = 0
+        self._exclusive_owner = None
+        self._wal_checked = False
+
+        self.stats = {
+            'opened': 0,        # connections created
+            'closed': 0,        # connections closed (pool full, exclusive, close_all)
+            'checkouts': 0,     # outermost connection() blocks
+            'reused': 0,        # checkouts served by an already open connection
+            'max_in_use': 0,
+            'exclusive': 0      # exclusive() sections entered
+        }
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        if not self._wal_checked:
+            # journal_mode is stored in the file, so this only needs to happen once per database
+            mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+            if mode.lower() != 'wal':
+                logger.warning(f"Could not enable WAL for {self.db_path} (journal_mode={mode})")
+            self._wal_checked = True
+        with self._cond:
+            self.stats['opened'] += 1
+        return conn
+
+    def _close(self, conn: sqlite3.Connection):
+        try:
+            conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Error closing connection to {self.db_path}: {e}")
+        with self._cond:
+            self.stats['closed'] += 1
+
+    def _checkout(self) -> sqlite3.Connection:
+        me = threading.get_ident()
+        with self._cond:
+            while self._exclusive_owner not in (None, me):
+                self._cond.wait()
+            self._in_use += 1
+            self.stats['checkouts'] += 1
+            self.stats['max_in_use'] = max(self.stats['max_in_use'], self._in_use)
+            if self._idle:
+                self.stats['reused'] += 1
+                return self._idle.pop()
+        try:
+            return self._open()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify_all()
+            raise
+
+    def _release(self, conn: sqlite3.Connection):
+        # Per-use settings must not leak into the next borrower
+        conn.row_factory = None
+        with self._cond:
+            self._in_use -= 1
+            if len(self._idle) < self.max_idle and self._exclusive_owner is None:
+                self._idle.append(conn)
+                conn = None
+            self._cond.notify_all()
+        if conn is not None:
+            self._close(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a connection for the duration of a `with` block.
+
+        Commits when the outermost block exits normally and rolls back if it raises.
+
+        Yields:
+            sqlite3.Connection: An open connection (shared with enclosing blocks on this thread).
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self._checkout()
+        self._local.conn = conn
+        self._local.depth = 1
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self._release(conn)
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        """
+        Block all other users of the pool and close every pooled connection.
+
+        Used around operations that replace the database file (restore). The owning
+        thread may still use connection() inside the block. If it entered exclusive()
+        from outside any connection() block, it gets a freshly opened connection. If it
+        was already inside one, that connection stays open and connection() keeps handing
+        it back. It still refers to the old file, so close it (leave the outer block)
+        before reading a replaced file.
+        """
+        me = threading.get_ident()
+        own_depth = 1 if getattr(self._local, 'conn', None) is not None else 0
+        with self._cond:
+            while self._exclusive_owner not in (None, me):
+                self._cond.wait()
+            self._exclusive_owner = me
+            self.stats['exclusive'] += 1
+            while self._in_use > own_depth:
+                self._cond.wait()
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._close(conn)
+        try:
+            yield
+        finally:
+            with self._cond:
+                # The file may have been replaced; re-apply WAL on the next open
+                self._wal_checked = False
+                self._exclusive_owner = None
+                self._cond.notify_all()
+
+    def close_all(self):
+        """Close all idle connections; connections in use are closed when released."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._close(conn)
+
+    def get_stats(self) -> Dict:
+        """
+        Get pool counters.
+
+        Returns:
+            dict: Open/reuse counters plus current idle and in-use connections.
+        """
+        with self._cond:
+            return dict(self.stats, idle=len(self._idle), in_use=self._in_use, db_path=self.db_path)
+
+
+def get_pool(db_path: str) -> ConnectionPool:
+    """
+    Get the shared pool for a database file, creating it on first use.
+
+    Args:
+        db_path (str): Path to the SQLite database file.
+
+    Returns:
+        ConnectionPool: One pool per absolute path, shared by every user of that file.
+    """
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(db_path)
+        return pool
+
+
+def close_all_pools():
+    """Close idle connections of every pool (used on shutdown)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_all()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Entity classification for Empyrion Web Helper
+
+Sorts entities from 'gents' by faction into NPC, Player and Neutral
+categories (using the faction codes from Factions.ecf) and by type into
+structures, ships and asteroids. The category is stored with each entity
+when it is saved, and the entity_aggregates table counts live entities per
+(playfield, type, category), so reports don't classify every entity again.
+"""
+
+from functools import lru_cache
+from typing import Tuple
+
+CATEGORY_NPC = 'NPC'
+CATEGORY_PLAYER = 'Player'
+CATEGORY_NEUTRAL = 'Neutral'
+FACTION_CATEGORIES = (CATEGORY_NPC, CATEGORY_PLAYER, CATEGORY_NEUTRAL)
+
+STRUCTURE_TYPES = ('BA',)
+SHIP_TYPES = ('CV', 'SV', 'HV')
+
+# DEFINITIVE NPC faction codes from Factions.ecf (IDs 1-99)
+NPC_FACTIONS = {
+    # Hardcoded Core Factions (IDs 1-8)
+    'Pub': 'Public',           # ID 1
+    'Zrx': 'Zirax',           # ID 2 
+    'Prd': 'Predator',        # ID 3
+    'Pry': 'Prey',            # ID 4
+    'Adm': 'Admin',           # ID 5
+    'Tal': 'Talon',           # ID 6 - Main Story Faction
+    'Pol': 'Polaris',         # ID 7 - Main Story Faction (Arkenian Republic)
+    'Aln': 'Alien',           # ID 8
+    
+    # Custom Static Factions (IDs 9-40)
+    'DSC': 'DESC',            # ID 9
+    'Lgc': 'TheLegacy',       # ID 10 - Main Story Faction
+    'Prg': 'Progenitor',      # ID 12 - Main Story Faction
+    'Voi': 'Void',            # ID 13 - Main Story Faction
+    'GLD': 'GLaD',            # ID 14 - Main Story Faction
+    'Civ': 'Civilian',        # ID 15
+    'War': 'Warlord',         # ID 27
+    'NTY': 'NTY',             # ID 31
+    'HIS': 'Hishkal',         # ID 32
+    'DRK': 'DarkFaction',     # ID 40
+    
+    # Custom Dynamic Factions (IDs 11, 16-30, 33-38)
+    'UCH': 'UCH',             # ID 11 - Main Story Faction
+    'Pir': 'Pirates',         # ID 16
+    'Kri': 'Kriel',           # ID 17
+    'Tra': 'Trader',          # ID 18 - Main Story Faction (Prenn Trading Federation)
+    'Col': 'Colonists',       # ID 19
+    'Tsc': 'Tesch',           # ID 20
+    'BoF': 'Farr',            # ID 28 - Brotherhood of Farr
+    'WST': 'Wastelanders',    # ID 29
+    'ARC': 'ARC',             # ID 30
+    'Ark': 'ArkenianRepublic', # ID 33
+    'Pre': 'PrennFederation', # ID 34
+    'HLS': 'Helios',          # ID 35
+    'RAV': 'Ravagers',        # ID 36
+    'KRN': 'Karana',          # ID 37
+    'TRS': 'Tresari',         # ID 38
+    
+    # Zirax Sub-Factions (IDs 21-26)
+    'Xen': 'Xenu',            # ID 21 - Zirax Empire Military
+    'Rad': 'Rados',           # ID 22 - Zirax Empire Support
+    'Eps': 'Epsilon',         # ID 23 - Zirax Empire Communication  
+    'Ghy': 'Ghyst',           # ID 24 - Zirax Empire Recon
+    'Ser': 'Serdu',           # ID 25 - Zirax Empire Religion
+    'Aby': 'Abyssal',         # ID 26 - Zirax Empire Science
+    
+    # Special Factions (IDs 39, 41)
+    'PDH': 'PlayerAssist',    # ID 39
+    'STR': 'STRY',            # ID 41 - Dynamic story faction
+    
+    # Star Salvage Scenario-Specific NPC Factions (Custom IDs)
+    'Gst': 'GhostShip',       # Custom faction
+    'Mys': 'Mystery',         # Custom faction  
+    'Slv': 'Salvage',         # Custom faction
+    'Isi': 'Interspace',      # ID 36 - Interspace Salvage Industries
+    'UEF': 'UEF',             # ID 37 - United Earth Fleet
+    'AJS': 'AJS',             # Custom faction (likely NPC based on ID pattern)
+    'SAS': 'SAS',             # Custom faction
+}
+
+NEUTRAL_FACTIONS = {'NoF'}  # No Faction - abandoned/neutral
+
+
+@lru_cache(maxsize=4096)
+def classify_entity_faction(faction: str) -> Tuple[str, str]:
+    """
+    Classify an entity's faction as NPC, Player, or Neutral.
+
+    A server has a few hundred factions at most, so results are cached.
+
+    Args:
+        faction (str): Faction code from 'gents', e.g. 'Zrx' or '1043'.
+
+    Returns:
+        Tuple[str, str]: (category, description).
+    """
+    faction = faction or ''
+    if faction in NPC_FACTIONS:
+        return CATEGORY_NPC, NPC_FACTIONS[faction]
+    elif faction in NEUTRAL_FACTIONS:
+        return CATEGORY_NEUTRAL, 'Abandoned/No Faction'
+    elif faction.isdigit():
+        return CATEGORY_PLAYER, f'Player Faction {faction}'
+    elif faction == '':
+        return CATEGORY_PLAYER, 'Private/No Faction'
+    else:
+        # Based on Factions.ecf rule: "The id must be < 100 else a player faction will be created!"
+        # Unknown 3-letter codes are likely player factions (ID 100+)
+        return CATEGORY_PLAYER, f'Player Faction: {faction}'
+
+
+def faction_category(faction: str) -> str:
+    """Category ('NPC', 'Player' or 'Neutral') of a faction code."""
+    return classify_entity_faction(faction or '')[0]
+
+
+def is_asteroid_type(entity_type: str) -> bool:
+    """Whether an entity type is an asteroid (AstVoxel and the like)."""
+    entity_type = (entity_type or '').lower()
+    return 'astvoxel' in entity_type or 'asteroid' in entity_type
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Entity snapshots for Empyrion Web Helper
+
+After each entity refresh (scheduled or manual) the live entities are kept as
+a snapshot, so entity counts, and counts of structures and ships (BA, CV, SV
+and HV), can be followed per playfield over time. A snapshot is split by
+playfield into chunks:
+
+- a chunk is the playfield's entities (id, type, faction, name; time_info
+  changes on every refresh and is left out), zlib-compressed and stored once
+  per content digest, so a playfield that did not change costs no new data
+- entity_snapshot_playfields links each snapshot to its chunks and is keyed
+  by (playfield, snapshot_id) for "playfield X over the last week"
+- a snapshot identical to the one before it only moves that snapshot's
+  last_taken_at forward, so a quiet server adds no rows at all
+
+Snapshots older than the retention are pruned with the chunks only they used.
+"""
+
+import hashlib
+import logging
+import zlib
+from datetime import datetime
+from itertools import groupby
+from typing import Dict, Iterator, List, Optional
+
+from entity_classification import STRUCTURE_TYPES, SHIP_TYPES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL_MINUTES = 60   # scheduled snapshots; 0 disables them
+DEFAULT_RETENTION_DAYS = 90
+SNAPSHOT_FIELDS = ('id', 'type', 'faction', 'name')
+
+_LATEST = "id = (SELECT MAX(id) FROM entity_snapshots)"  # newest snapshot, found through the primary key
+
+
+def _chunk_payload(rows: List[tuple]) -> bytes:
+    """One playfield's entities as tab-separated lines, ordered by id."""
+    rows.sort()
+    return ''.join(f"{entity_id}\t{entity_type}\t{faction or ''}\t{name}\n"
+                   for entity_id, entity_type, faction, name in rows).encode('utf-8')
+
+
+def _is_structure_or_ship(entity_type: str) -> bool:
+    return entity_type in STRUCTURE_TYPES or entity_type in SHIP_TYPES
+
+
+def _store_chunk(cursor, playfield: str, rows: List[tuple], structures_and_ships: int) -> tuple:
+    """Store a playfield chunk unless identical content is already stored; return (chunk id, digest, new)."""
+    payload = _chunk_payload(rows)
+    digest = hashlib.blake2b(playfield.encode('utf-8') + b'\0' + payload, digest_size=16).digest()
+    row = cursor.execute("SELECT id FROM entity_snapshot_chunks WHERE digest = ?", (digest,)).fetchone()
+    if row:
+        return row[0], digest, False
+    cursor.execute("INSERT INTO entity_snapshot_chunks (digest, entities, structures_and_ships, data) "
+                   "VALUES (?, ?, ?, ?)", (digest, len(rows), structures_and_ships, zlib.compress(payload)))
+    return cursor.lastrowid, digest, True
+
+
+def take_snapshot(cursor, now: datetime, source: str) -> Dict:
+    """
+    Snapshot the live entities.
+
+    Args:
+        cursor: Cursor inside the caller's transaction.
+        now (datetime): Time of the snapshot.
+        source (str): What triggered it ('scheduled', 'manual', 'poi').
+
+    Returns:
+        dict: 'snapshot_id', 'taken_at', 'entities', 'structures_and_ships', 'playfields', 'new_chunks'
+        and 'repeated' (True if it matched the previous snapshot and only extended it).
+    """
+    taken_at = now.isoformat(timespec='seconds')
+    links = []
+    digests = []
+    entities = structures_and_ships = new_chunks = 0
+    rows = cursor.execute("SELECT IFNULL(playfield, ''), id, type, faction, name FROM entities "
+                          "WHERE removed_at IS NULL ORDER BY playfield")
+    for playfield, group in groupby(rows.fetchall(), key=lambda row: row[0]):
+        chunk_rows = [row[1:] for row in group]
+        chunk_structures_and_ships = sum(1 for row in chunk_rows if _is_structure_or_ship(row[1]))
+        chunk_id, digest, new = _store_chunk(cursor, playfield, chunk_rows, chunk_structures_and_ships)
+        links.append((playfield, chunk_id))
+        digests.append(digest)
+        new_chunks += new
+        entities += len(chunk_rows)
+        structures_and_ships += chunk_structures_and_ships
+    snapshot_digest = hashlib.blake2b(b''.join(digests), digest_size=16).digest()
+    result = {'taken_at': taken_at, 'entities': entities, 'structures_and_ships': structures_and_ships,
+              'playfields': len(links), 'new_chunks': new_chunks}
+
+    previous = cursor.execute(f"SELECT id, digest FROM entity_snapshots WHERE {_LATEST}").fetchone()
+    if previous and previous[1] == snapshot_digest:
+        cursor.execute("UPDATE entity_snapshots SET last_taken_at = ?, repeats = repeats + 1 WHERE id = ?",
+                       (taken_at, previous[0]))
+        return {'snapshot_id': previous[0], 'repeated': True, **result}
+
+    cursor.execute("""
+        INSERT INTO entity_snapshots (taken_at, last_taken_at, source, digest, entities, structures_and_ships,
+                                      playfields)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, (taken_at, taken_at, source, snapshot_digest, entities, structures_and_ships, len(links)))
+    snapshot_id = cursor.lastrowid
+    cursor.executemany("INSERT INTO entity_snapshot_playfields (playfield, snapshot_id, chunk_id) VALUES (?, ?, ?)",
+                       [(playfield, snapshot_id, chunk_id) for playfield, chunk_id in links])
+    return {'snapshot_id': snapshot_id, 'repeated': False, **result}
+
+
+def last_snapshot_time(cursor) -> Optional[datetime]:
+    """Time the newest snapshot was last taken, or None if there is none."""
+    row = cursor.execute(f"SELECT last_taken_at FROM entity_snapshots WHERE {_LATEST}").fetchone()
+    return datetime.fromisoformat(row[0]) if row else None
+
+
+def prune_snapshots(cursor, before: datetime) -> int:
+    """
+    Delete snapshots last taken before a cutoff, and the chunks no other snapshot uses.
+
+    Args:
+        cursor: Cursor inside the caller's transaction.
+        before (datetime): Cutoff.
+
+    Returns:
+        int: Number of snapshots deleted.
+    """
+    cutoff = before.isoformat(timespec='seconds')
+    snapshot_ids = [row[0] for row in cursor.execute(
+        "SELECT id FROM entity_snapshots WHERE last_taken_at < ?", (cutoff,))]
+    if not snapshot_ids:
+        return 0
+    chunk_ids = set()
+    for snapshot_id in snapshot_ids:
+        chunk_ids.update(row[0] for row in cursor.execute(
+            "SELECT chunk_id FROM entity_snapshot_playfields WHERE snapshot_id = ?", (snapshot_id,)))
+        cursor.execute("DELETE FROM entity_snapshot_playfields WHERE snapshot_id = ?", (snapshot_id,))
+        cursor.execute("DELETE FROM entity_snapshots WHERE id = ?", (snapshot_id,))
+    cursor.executemany("DELETE FROM entity_snapshot_chunks WHERE id = ? AND NOT EXISTS ("
+                       "SELECT 1 FROM entity_snapshot_playfields WHERE chunk_id = ?)",
+                       [(chunk_id, chunk_id) for chunk_id in chunk_ids])
+    logger.info(f"Pruned {len(snapshot_ids)} entity snapshots from before {cutoff}")
+    return len(snapshot_ids)
+
+
+def snapshot_history(cursor, playfield: Optional[str], since: datetime, until: datetime) -> List[Dict]:
+    """
+    Entity counts and structure-and-ship counts over time, for one playfield or the whole galaxy.
+
+    Every snapshot in the range gives a point at taken_at, and one at last_taken_at if it
+    was repeated; a playfield missing from a snapshot had no entities then.
+
+    Args:
+        cursor: Database cursor.
+        playfield (Optional[str]): Playfield name, or None for totals.
+        since (datetime): Start of the range.
+        until (datetime): End of the range.
+
+    Returns:
+        List[Dict]: Points with 'time', 'entities' and 'structures_and_ships', oldest first.
+    """
+    snapshots = cursor.execute("""
+        SELECT id, taken_at, last_taken_at, entities, structures_and_ships FROM entity_snapshots
+        WHERE last_taken_at >= ? AND taken_at <= ? ORDER BY last_taken_at
+    """, (since.isoformat(timespec='seconds'), until.isoformat(timespec='seconds'))).fetchall()
+    if not snapshots:
+        return []
+
+    counts = {}
+    if playfield is not None:
+        counts = {snapshot_id: (entities, structures_and_ships)
+                  for snapshot_id, entities, structures_and_ships in cursor.execute("""
+            SELECT p.snapshot_id, c.entities, c.structures_and_ships FROM entity_snapshot_playfields p
+            JOIN entity_snapshot_chunks c ON c.id = p.chunk_id
+            WHERE p.playfield = ? AND p.snapshot_id BETWEEN ? AND ?
+        """, (playfield, snapshots[0][0], snapshots[-1][0]))}
+
+    points = []
+    for snapshot_id, taken_at, last_taken_at, entities, structures_and_ships in snapshots:
+        if playfield is not None:
+            entities, structures_and_ships = counts.get(snapshot_id, (0, 0))
+        for point_time in (taken_at, last_taken_at) if last_taken_at != taken_at else (taken_at,):
+            points.append({'time': point_time, 'entities': entities, 'structures_and_ships': structures_and_ships})
+    return points
+
+
+def list_snapshots(cursor, limit: int = 100) -> List[Dict]:
+    """Newest snapshots first, without their chunks."""
+    cursor.execute("""
+        SELECT id, taken_at, last_taken_at, repeats, source, entities, structures_and_ships, playfields
+        FROM entity_snapshots ORDER BY id DESC LIMIT ?
+    """, (limit,))
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def read_snapshot(cursor, snapshot_id: int, playfield: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Decompress a snapshot's entities, ordered by playfield and id.
+
+    Args:
+        cursor: Database cursor.
+        snapshot_id (int): Snapshot to read.
+        playfield (Optional[str]): Only this playfield.
+
+    Yields:
+        Dict: Entity with 'playfield' and the SNAPSHOT_FIELDS ('time_info' is not kept).
+    """
+    if playfield is None:
+        links = cursor.execute("""
+            SELECT p.playfield, c.data FROM entity_snapshot_playfields p
+            JOIN entity_snapshot_chunks c ON c.id = p.chunk_id
+            WHERE p.snapshot_id = ? ORDER BY p.playfield
+        """, (snapshot_id,)).fetchall()
+    else:
+        links = cursor.execute("""
+            SELECT p.playfield, c.data FROM entity_snapshot_playfields p
+            JOIN entity_snapshot_chunks c ON c.id = p.chunk_id
+            WHERE p.playfield = ? AND p.snapshot_id = ?
+        """, (playfield, snapshot_id)).fetchall()
+    for chunk_playfield, data in links:
+        for line in zlib.decompress(data).decode('utf-8').splitlines():
+            entity = dict(zip(SNAPSHOT_FIELDS, line.split('\t', 3)))
+            entity['playfield'] = chunk_playfield
+            entity['time_info'] = ''
+            yield entity
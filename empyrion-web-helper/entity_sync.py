@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Incremental entity sync for Empyrion Web Helper
+
+A 'gents' refresh lists every entity in the galaxy, but between two refreshes
+only a few of them change. Instead of deleting the entities table and
+inserting everything again, each refresh:
+
+1. stages the reply in a temporary table (one executemany)
+2. upserts the staged rows that are new, changed or back after being gone
+3. updates time_info alone where only the entity's timer moved
+4. tombstones live rows missing from the reply (removed_at = this refresh)
+
+Unchanged rows are only read, so the rows written (and the WAL, and the
+full-text index kept by triggers) scale with churn rather than galaxy size.
+Many entities carry a timer in time_info that moves on every refresh; that
+alone is not churn, and gets a narrow UPDATE that no trigger reacts to.
+A live entity was last seen at the last refresh, which is kept in
+entities_meta, so its stored last_seen is only set once it goes missing.
+
+The entities_new and entities_gone views (migration 5) list what the last
+refresh added and removed; triggers on the table (migration 6) keep the
+per-playfield entity_aggregates counts in step with every row written here.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from entity_classification import faction_category
+
+logger = logging.getLogger(__name__)
+
+TOMBSTONE_DAYS = 30  # gone entities are kept this long for history, then deleted
+
+ENTITY_FIELDS = ('id', 'name', 'type', 'faction', 'playfield', 'time_info')
+
+_STAGE_TABLE = """
+    CREATE TEMP TABLE IF NOT EXISTS entities_stage (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        type TEXT NOT NULL,
+        faction TEXT,
+        playfield TEXT,
+        time_info TEXT,
+        faction_category TEXT NOT NULL
+    ) WITHOUT ROWID
+"""
+
+
+def entity_rows(entities: Iterable) -> Iterable[Tuple]:
+    """
+    Turn GentsEntity records or entity dicts into rows for the staging table.
+
+    Args:
+        entities (Iterable): GentsEntity tuples or dicts.
+
+    Yields:
+        Tuple: (id, name, type, faction, playfield, time_info, faction_category) per entity.
+    """
+    for entity in entities:
+        if not isinstance(entity, tuple):
+            entity = tuple(entity.get(field, '') for field in ENTITY_FIELDS)
+        yield entity + (faction_category(entity[3]),)
+
+
+def classify_entities(conn) -> int:
+    """
+    Set faction_category on entities that have none or an outdated one.
+
+    Needed once after migration 6 and whenever the faction lists in
+    entity_classification change; a no-op otherwise.
+
+    Args:
+        conn (sqlite3.Connection): Open connection (the change is committed by the caller).
+
+    Returns:
+        int: Number of entities (re)classified.
+    """
+    conn.create_function('classify_faction', 1, faction_category, deterministic=True)
+    cursor = conn.execute("UPDATE entities SET faction_category = classify_faction(faction) "
+                          "WHERE faction_category IS NOT classify_faction(faction)")
+    if cursor.rowcount:
+        logger.info(f"Classified {cursor.rowcount} entities by faction")
+    return cursor.rowcount
+
+
+def get_last_refresh(cursor) -> Optional[str]:
+    """Time of the last entity refresh, or None if there has been none."""
+    cursor.execute("SELECT value FROM entities_meta WHERE key = 'last_refresh'")
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def sync_entities(cursor, entities: Iterable, now: datetime) -> Dict:
+    """
+    Bring the entities table in line with a full refresh.
+
+    Args:
+        cursor: Cursor inside the caller's transaction.
+        entities (Iterable): The refresh's entities (GentsEntity records or dicts), read once.
+        now (datetime): Time of the refresh.
+
+    Returns:
+        dict: Counts of 'total' entities in the refresh, 'added', 'changed', 'removed',
+        'purged' (expired tombstones deleted) and 'timers' (live entities whose time_info
+        was written on its own; a timer tick alone is not counted as changed).
+    """
+    refresh_time = now.isoformat()
+    previous_refresh = get_last_refresh(cursor)
+
+    cursor.execute(_STAGE_TABLE)
+    cursor.execute("DELETE FROM temp.entities_stage")
+    # Duplicate ids in a reply keep their first line
+    cursor.executemany("INSERT OR IGNORE INTO temp.entities_stage VALUES (?, ?, ?, ?, ?, ?, ?)",
+                       entity_rows(entities))
+    total = cursor.execute("SELECT COUNT(*) FROM temp.entities_stage").fetchone()[0]
+
+    live = cursor.execute("SELECT COUNT(*) FROM entities WHERE removed_at IS NULL").fetchone()[0]
+    if total == 0 and live:
+        # An empty reply is far more likely a server hiccup than an empty galaxy
+        logger.warning(f"Entity refresh returned no entities; keeping the {live} known entities")
+        return {'total': 0, 'added': 0, 'changed': 0, 'removed': 0, 'purged': 0, 'timers': 0}
+
+    added = cursor.execute("""
+        SELECT COUNT(*) FROM temp.entities_stage s
+        WHERE NOT EXISTS (SELECT 1 FROM entities e WHERE e.id = s.id AND e.removed_at IS NULL)
+    """).fetchone()[0]
+
+    # New, changed and returning entities; a live row that matches the reply is not touched.
+    # time_info is a timer that ticks between refreshes, so it is not a change (see below), but
+    # rows written here take the new one so the timer pass leaves them alone
+    cursor.execute("""
+        INSERT INTO entities (id, name, type, faction, playfield, time_info, faction_category, last_seen,
+                              created_at, removed_at, appeared_at)
+        SELECT s.id, s.name, s.type, s.faction, s.playfield, s.time_info, s.faction_category, :now, :now, NULL, :now
+        FROM temp.entities_stage s
+        WHERE NOT EXISTS (
+            SELECT 1 FROM entities e
+            WHERE e.id = s.id AND e.removed_at IS NULL AND e.name IS s.name AND e.type IS s.type
+              AND e.faction IS s.faction AND e.playfield IS s.playfield
+              AND e.faction_category IS s.faction_category
+        )
+        ON CONFLICT(id) DO UPDATE SET
+            name = excluded.name, type = excluded.type, faction = excluded.faction,
+            playfield = excluded.playfield, time_info = excluded.time_info,
+            faction_category = excluded.faction_category, last_seen = excluded.last_seen,
+            appeared_at = CASE WHEN entities.removed_at IS NULL THEN entities.appeared_at
+                               ELSE excluded.appeared_at END,
+            removed_at = NULL
+    """, {'now': refresh_time})
+    changed = cursor.rowcount - added
+
+    # Timers on unchanged rows: only time_info is written, which neither the aggregate nor the
+    # search triggers watch. Rows the upsert wrote already match and are skipped
+    cursor.execute("""
+        UPDATE entities SET time_info = (SELECT s.time_info FROM temp.entities_stage s WHERE s.id = entities.id)
+        WHERE removed_at IS NULL AND EXISTS (
+            SELECT 1 FROM temp.entities_stage s WHERE s.id = entities.id AND s.time_info IS NOT entities.time_info
+        )
+    """)
+    timers = cursor.rowcount
+
+    # Gone: last seen at the previous refresh
+    cursor.execute("""
+        UPDATE entities SET removed_at = :now, last_seen = COALESCE(:previous, last_seen)
+        WHERE removed_at IS NULL AND id NOT IN (SELECT id FROM temp.entities_stage)
+    """, {'now': refresh_time, 'previous': previous_refresh})
+    removed = cursor.rowcount
+
+    cursor.execute("DELETE FROM entities WHERE removed_at < ?",
+                   ((now - timedelta(days=TOMBSTONE_DAYS)).isoformat(),))
+    purged = cursor.rowcount
+    cursor.execute("DELETE FROM temp.entities_stage")
+
+    cursor.executemany("INSERT OR REPLACE INTO entities_meta (key, value, updated_at) VALUES (?, ?, ?)", [
+        ('last_refresh', refresh_time, refresh_time),
+        ('entity_count', str(total), refresh_time),
+    ])
+    return {'total': total, 'added': added, 'changed': changed, 'removed': removed, 'purged': purged,
+            'timers': timers}
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Parser for the Empyrion 'gents' command output
+
+A 'gents' reply lists every entity on the server, grouped under playfield
+headers:
+
+    Akua
+      01. 051001 BA [Zrx] False False 'Drone Base' (-)
+      02. 051004 CV [TRD] False True 'Cargo Hauler' (3d 4h)
+
+GentsParser is a generator: entities are yielded one compact record at a
+time as their lines complete, either from a whole reply or from chunks fed
+as they arrive, so callers can write them to the database without holding
+a second copy of the reply as a list of lines and dicts. Counts per type and
+playfield are kept as it goes for the refresh summary.
+"""
+
+import sys
+import logging
+from collections import Counter
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class GentsEntity(NamedTuple):
+    """One entity line; field order matches the entities table."""
+    id: str
+    name: str
+    type: str
+    faction: str
+    playfield: str
+    time_info: str
+
+
+class GentsParser:
+    """
+    Incremental parser for 'gents' replies.
+
+    Use parse() for a whole reply or an iterable of text chunks, or feed()
+    chunks by hand and finish with close(). Either way summary() describes
+    the entities yielded so far.
+    """
+
+    def __init__(self):
+        """Initialize the GentsParser."""
+        self.reset()
+
+    def reset(self):
+        """Forget the current playfield, partial line and counts."""
+        self._tail = ''
+        self._playfield = ''
+        self.total = 0
+        self.skipped = 0
+        self.by_type = Counter()
+        self.by_playfield = Counter()
+
+    def parse(self, source: Union[str, Iterable[str]]) -> Iterator[GentsEntity]:
+        """
+        Parse a reply, yielding entities in reply order.
+
+        Args:
+            source (Union[str, Iterable[str]]): Whole reply text, or chunks of it in order.
+
+        Yields:
+            GentsEntity: Each entity line.
+        """
+        self.reset()
+        if isinstance(source, str):
+            # Walk the reply in place; split('\n') would hold every line at once
+            start, length = 0, len(source)
+            while start < length:
+                end = source.find('\n', start)
+                if end < 0:
+                    end = length
+                entity = self._parse_line(source[start:end])
+                if entity:
+                    yield entity
+                start = end + 1
+        else:
+            for chunk in source:
+                yield from self.feed(chunk)
+        yield from self.close()
+
+    def feed(self, chunk: str) -> Iterator[GentsEntity]:
+        """
+        Parse the complete lines in a chunk; a trailing partial line waits for the next chunk.
+
+        Args:
+            chunk (str): Next piece of the reply.
+
+        Yields:
+            GentsEntity: Each entity line completed by this chunk.
+        """
+        if self._tail:
+            chunk = self._tail + chunk
+        lines = chunk.split('\n')
+        self._tail = lines.pop()
+        for line in lines:
+            entity = self._parse_line(line)
+            if entity:
+                yield entity
+
+    def close(self) -> Iterator[GentsEntity]:
+        """
+        Parse the last partial line fed, if any, and log the totals.
+
+        Yields:
+            GentsEntity: The final entity if the reply did not end with a newline.
+        """
+        tail, self._tail = self._tail, ''
+        entity = self._parse_line(tail) if tail else None
+        if entity:
+            yield entity
+        logger.info(f"Parsed gents reply: {self.total} entities in {len(self.by_playfield)} playfields"
+                    f"{f', {self.skipped} unreadable lines skipped' if self.skipped else ''}")
+
+    def summary(self) -> Dict:
+        """
+        Get the counts for the entities yielded so far.
+
+        Returns:
+            dict: 'total', 'by_type' and 'by_playfield' counts.
+        """
+        return {'total': self.total, 'by_type': dict(self.by_type), 'by_playfield': dict(self.by_playfield)}
+
+    def _parse_line(self, line: str) -> Optional[GentsEntity]:
+        line = line.rstrip('\r')
+        line_stripped = line.strip()
+
+        # Empty lines and command echoes / "No entities" replies
+        if not line_stripped or line_stripped.startswith('gents:') or line_stripped.startswith('No '):
+            return None
+
+        # Playfield header: not indented and not numbered
+        if not line.startswith('  ') and not line_stripped[0].isdigit():
+            self._playfield = sys.intern(line_stripped)
+            return None
+
+        if not line.startswith('  ') or '. ' not in line:
+            return None
+
+        # "01. 051001 BA [Zrx] False False 'Drone Base' (-)"
+        parts = line_stripped.split(' ', 6)
+        if len(parts) < 7:
+            self.skipped += 1
+            return None
+        faction = parts[3].strip('[]') if parts[3].startswith('[') else ''
+
+        name = time_info = ''
+        name_and_time = parts[6]
+        name_start = name_and_time.find("'")
+        if name_start >= 0:
+            name_end = name_and_time.find("'", name_start + 1)
+            if name_end < 0:
+                name = name_and_time[name_start + 1:]
+            else:
+                name = name_and_time[name_start + 1:name_end]
+                remaining = name_and_time[name_end + 1:]
+                open_paren = remaining.find('(')
+                close_paren = remaining.find(')')
+                if open_paren >= 0 and close_paren >= 0:
+                    time_info = remaining[open_paren + 1:close_paren]
+
+        entity_type = sys.intern(parts[2])
+        entity = GentsEntity(parts[1], name, entity_type, sys.intern(faction), self._playfield, time_info)
+        self.total += 1
+        self.by_type[entity_type] += 1
+        self.by_playfield[self._playfield or 'Unknown'] += 1
+        return entity
+
+
+def format_gents(entities: Iterable[Dict]) -> Iterator[str]:
+    """
+    Write entities back out in the 'gents' layout, one line at a time.
+
+    Args:
+        entities (Iterable[Dict]): Entity rows ordered by playfield.
+
+    Yields:
+        str: Header and entity lines, each ending in a newline.
+    """
+    playfield = None
+    number = 0
+    for entity in entities:
+        if entity['playfield'] != playfield:
+            playfield = entity['playfield']
+            number = 0
+            yield f"{playfield or 'Unknown'}\n"
+        number += 1
+        faction = f"[{entity['faction']}]" if entity['faction'] else '[]'
+        yield (f"  {number:02d}. {entity['id']} {entity['type']} {faction} False False "
+               f"'{entity['name']}' ({entity['time_info'] or '-'})\n")
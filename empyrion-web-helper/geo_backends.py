@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Geolocation backends for Empyrion Web Helper
+
+Two kinds of backend feed GeoResolver:
+
+- Local range databases answer synchronously, without the network:
+  RangeFileBackend loads a CSV of IP ranges (DB-IP / IP2Location LITE style)
+  into sorted arrays and answers with a binary search; MmdbBackend reads a
+  MaxMind-format .mmdb file if the optional maxminddb package is installed.
+- IpApiBackend asks ip-api's batch endpoint; the resolver calls it from its
+  worker thread for addresses the local database does not know.
+
+Use open_local_backend() to pick the right local backend for a file.
+"""
+
+import csv
+import ipaddress
+import os
+import socket
+import threading
+import time
+import logging
+from array import array
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+# Import maxminddb only if available
+try:
+    import maxminddb
+    MAXMINDDB_AVAILABLE = True
+except ImportError:
+    MAXMINDDB_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_URL = 'http://ip-api.com/batch'
+API_FIELDS = 'status,message,country,query'
+BATCH_SIZE = 100                    # ip-api's limit per batch request
+REQUEST_TIMEOUT = 10                # seconds
+MIN_REQUEST_INTERVAL = 4.0          # ip-api allows 15 batch requests per minute
+
+LOCAL_NETWORK = 'Local network'
+UNKNOWN_LOCATION = 'Unknown location'
+
+# Range files often carry only ISO 3166 codes; show the same names ip-api would
+_COUNTRY_NAMES = dict(entry.split(':', 1) for entry in (
+    "AD:Andorra|AE:United Arab Emirates|AF:Afghanistan|AG:Antigua and Barbuda|AI:Anguilla|AL:Albania|AM:Armenia|"
+    "AO:Angola|AQ:Antarctica|AR:Argentina|AS:American Samoa|AT:Austria|AU:Australia|AW:Aruba|AX:Åland|"
+    "AZ:Azerbaijan|BA:Bosnia and Herzegovina|BB:Barbados|BD:Bangladesh|BE:Belgium|BF:Burkina Faso|BG:Bulgaria|"
+    "BH:Bahrain|BI:Burundi|BJ:Benin|BL:Saint Barthélemy|BM:Bermuda|BN:Brunei|BO:Bolivia|BQ:Bonaire|BR:Brazil|"
+    "BS:Bahamas|BT:Bhutan|BW:Botswana|BY:Belarus|BZ:Belize|CA:Canada|CD:DR Congo|CF:Central African Republic|"
+    "CG:Congo Republic|CH:Switzerland|CI:Ivory Coast|CK:Cook Islands|CL:Chile|CM:Cameroon|CN:China|CO:Colombia|"
+    "CR:Costa Rica|CU:Cuba|CV:Cabo Verde|CW:Curaçao|CY:Cyprus|CZ:Czech Republic|DE:Germany|DJ:Djibouti|"
+    "DK:Denmark|DM:Dominica|DO:Dominican Republic|DZ:Algeria|EC:Ecuador|EE:Estonia|EG:Egypt|ER:Eritrea|"
+    "ES:Spain|ET:Ethiopia|FI:Finland|FJ:Fiji|FK:Falkland Islands|FM:Micronesia|FO:Faroe Islands|FR:France|"
+    "GA:Gabon|GB:United Kingdom|GD:Grenada|GE:Georgia|GF:French Guiana|GG:Guernsey|GH:Ghana|GI:Gibraltar|"
+    "GL:Greenland|GM:Gambia|GN:Guinea|GP:Guadeloupe|GQ:Equatorial Guinea|GR:Greece|GT:Guatemala|GU:Guam|"
+    "GW:Guinea-Bissau|GY:Guyana|HK:Hong Kong|HN:Honduras|HR:Croatia|HT:Haiti|HU:Hungary|ID:Indonesia|"
+    "IE:Ireland|IL:Israel|IM:Isle of Man|IN:India|IQ:Iraq|IR:Iran|IS:Iceland|IT:Italy|JE:Jersey|JM:Jamaica|"
+    "JO:Jordan|JP:Japan|KE:Kenya|KG:Kyrgyzstan|KH:Cambodia|KI:Kiribati|KM:Comoros|KN:St Kitts and Nevis|"
+    "KP:North Korea|KR:South Korea|KW:Kuwait|KY:Cayman Islands|KZ:Kazakhstan|LA:Laos|LB:Lebanon|LC:Saint Lucia|"
+    "LI:Liechtenstein|LK:Sri Lanka|LR:Liberia|LS:Lesotho|LT:Lithuania|LU:Luxembourg|LV:Latvia|LY:Libya|"
+    "MA:Morocco|MC:Monaco|MD:Moldova|ME:Montenegro|MF:Saint Martin|MG:Madagascar|MH:Marshall Islands|"
+    "MK:North Macedonia|ML:Mali|MM:Myanmar|MN:Mongolia|MO:Macao|MP:Northern Mariana Islands|MQ:Martinique|"
+    "MR:Mauritania|MS:Montserrat|MT:Malta|MU:Mauritius|MV:Maldives|MW:Malawi|MX:Mexico|MY:Malaysia|"
+    "MZ:Mozambique|NA:Namibia|NC:New Caledonia|NE:Niger|NG:Nigeria|NI:Nicaragua|NL:Netherlands|NO:Norway|"
+    "NP:Nepal|NR:Nauru|NZ:New Zealand|OM:Oman|PA:Panama|PE:Peru|PF:French Polynesia|PG:Papua New Guinea|"
+    "PH:Philippines|PK:Pakistan|PL:Poland|PM:Saint Pierre and Miquelon|PR:Puerto Rico|PS:Palestine|"
+    "PT:Portugal|PW:Palau|PY:Paraguay|QA:Qatar|RE:Réunion|RO:Romania|RS:Serbia|RU:Russia|RW:Rwanda|"
+    "SA:Saudi Arabia|SB:Solomon Islands|SC:Seychelles|SD:Sudan|SE:Sweden|SG:Singapore|SI:Slovenia|SK:Slovakia|"
+    "SL:Sierra Leone|SM:San Marino|SN:Senegal|SO:Somalia|SR:Suriname|SS:South Sudan|ST:São Tomé and Príncipe|"
+    "SV:El Salvador|SX:Sint Maarten|SY:Syria|SZ:Eswatini|TC:Turks and Caicos Islands|TD:Chad|TG:Togo|"
+    "TH:Thailand|TJ:Tajikistan|TL:Timor-Leste|TM:Turkmenistan|TN:Tunisia|TO:Tonga|TR:Turkey|"
+    "TT:Trinidad and Tobago|TV:Tuvalu|TW:Taiwan|TZ:Tanzania|UA:Ukraine|UG:Uganda|US:United States|UY:Uruguay|"
+    "UZ:Uzbekistan|VA:Vatican City|VC:St Vincent and Grenadines|VE:Venezuela|VG:British Virgin Islands|"
+    "VI:U.S. Virgin Islands|VN:Vietnam|VU:Vanuatu|WS:Samoa|XK:Kosovo|YE:Yemen|YT:Mayotte|ZA:South Africa|"
+    "ZM:Zambia|ZW:Zimbabwe"
+).split('|'))
+
+
+class GeoServiceError(Exception):
+    """A remote backend could not be used (no connection, timeout, bad status); the batch should be retried."""
+
+
+def country_name(value: str) -> str:
+    """Map a two-letter country code to its name; other values are returned unchanged."""
+    value = (value or '').strip()
+    if len(value) == 2 and value.isalpha():
+        return _COUNTRY_NAMES.get(value.upper(), value.upper())
+    return value
+
+
+def classify_local(ip_address: str) -> Optional[str]:
+    """
+    Answer addresses that need no lookup.
+
+    Args:
+        ip_address (str): Address as reported by the server.
+
+    Returns:
+        Optional[str]: 'Local network' for private/reserved addresses, 'Unknown location'
+            for strings that are not addresses, None if the address must be looked up.
+    """
+    try:
+        address = ipaddress.ip_address(ip_address)
+    except ValueError:
+        return UNKNOWN_LOCATION
+    if address.is_private or address.is_reserved or address.is_loopback or address.is_link_local \
+            or address.is_multicast or address.is_unspecified:
+        return LOCAL_NETWORK
+    return None
+
+
+# ============================================================================
+# LOCAL RANGE DATABASES
+# ============================================================================
+
+class RangeFileBackend:
+    """
+    IP range -> country table held in sorted arrays, searched with bisect.
+
+    Accepts CSV rows of `start, end, country...` where start/end are either
+    addresses (DB-IP lite: 1.0.0.0,1.0.0.255,AU) or integers (IP2Location LITE:
+    "16777216","16777471","AU","Australia"). The last column is used as the
+    country; two-letter codes are mapped to names. IPv4 ranges live in compact
+    unsigned 64-bit arrays, IPv6 ranges in integer lists.
+    """
+
+    def __init__(self, path: str):
+        """
+        Load a range file.
+
+        Args:
+            path (str): CSV file of IP ranges.
+
+        Raises:
+            OSError: If the file cannot be read.
+        """
+        self.path = path
+        self.countries: List[str] = []
+        self._v4 = (array('Q'), array('Q'), array('H'))   # starts, ends, country index
+        self._v6 = ([], [], array('H'))
+        started = time.perf_counter()
+        self._load()
+        self.load_seconds = time.perf_counter() - started
+        logger.info(f"🌍 Loaded {self.range_count:,} IP ranges ({len(self.countries)} countries) from "
+                    f"{os.path.basename(path)} in {self.load_seconds:.2f}s")
+
+    @property
+    def range_count(self) -> int:
+        return len(self._v4[0]) + len(self._v6[0])
+
+    def _load(self):
+        country_ids: Dict[str, int] = {}
+        targets = {4: self._v4, 6: self._v6}
+        with open(self.path, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.reader(f):
+                if len(row) < 3 or row[0].startswith('#'):
+                    continue
+                try:
+                    start, end, version = self._parse_bounds(row[0].strip(), row[1].strip())
+                except ValueError:
+                    continue  # header or malformed line
+                country = country_name(row[-1])
+                if not country or country == '-':
+                    continue
+                index = country_ids.get(country)
+                if index is None:
+                    index = country_ids[country] = len(self.countries)
+                    self.countries.append(country)
+                # Appended straight into the arrays: no per-row tuples, so a 500k-range file
+                # peaks at a few times the final size instead of ~10x
+                starts, ends, ids = targets[version]
+                starts.append(start)
+                ends.append(end)
+                ids.append(index)
+
+        for starts, ends, ids in targets.values():
+            if any(starts[i] > starts[i + 1] for i in range(len(starts) - 1)):
+                order = sorted(range(len(starts)), key=starts.__getitem__)
+                for part in (starts, ends, ids):
+                    reordered = [part[i] for i in order]
+                    part[:] = array(part.typecode, reordered) if isinstance(part, array) else reordered
+
+    @staticmethod
+    def _parse_bounds(start: str, end: str) -> Tuple[int, int, int]:
+        if start.isdigit() and end.isdigit():
+            low, high = int(start), int(end)
+            # IP2Location ships IPv4 as integers and IPv6 as IPv4-mapped integers
+            version = 4 if high <= 0xFFFFFFFF else 6
+            return low, high, version
+        low, high = ipaddress.ip_address(start), ipaddress.ip_address(end)
+        if low.version != high.version:
+            raise ValueError("mixed address families")
+        return int(low), int(high), low.version
+
+    def lookup(self, ip_address: str) -> Optional[str]:
+        """
+        Find the country of an address.
+
+        Args:
+            ip_address (str): IPv4 or IPv6 address.
+
+        Returns:
+            Optional[str]: Country name, or None if no range contains the address.
+        """
+        try:
+            # inet_pton is several times faster than ipaddress for the common IPv4 case
+            value = int.from_bytes(socket.inet_pton(socket.AF_INET, ip_address), 'big')
+            version, mapped = 4, None
+        except (OSError, TypeError):
+            try:
+                address = ipaddress.ip_address(ip_address)
+            except ValueError:
+                return None
+            value, version = int(address), address.version
+            mapped = address.ipv4_mapped if version == 6 else None
+        if version == 4:
+            starts, ends, ids = self._v4
+            if not starts:
+                # IPv6 files (IP2Location DB1 IPv6) hold IPv4 as ::ffff:a.b.c.d
+                starts, ends, ids = self._v6
+                value |= 0xFFFF00000000
+        else:
+            starts, ends, ids = self._v6
+            if mapped and self._v4[0]:
+                starts, ends, ids = self._v4
+                value = int(mapped)
+        position = bisect_right(starts, value) - 1
+        if position >= 0 and value <= ends[position]:
+            return self.countries[ids[position]]
+        return None
+
+    def lookup_many(self, ip_addresses: Iterable[str]) -> Dict[str, str]:
+        """Look up several addresses; addresses without a range are left out."""
+        found = {}
+        for ip in ip_addresses:
+            country = self.lookup(ip)
+            if country:
+                found[ip] = country
+        return found
+
+    def describe(self) -> Dict:
+        return {'type': 'range_file', 'path': self.path, 'ranges': self.range_count,
+                'countries': len(self.countries), 'load_seconds': round(self.load_seconds, 3)}
+
+
+class MmdbBackend:
+    """Country lookups from a MaxMind-format .mmdb file (GeoLite2-Country, DB-IP lite mmdb)."""
+
+    def __init__(self, path: str):
+        """
+        Open an .mmdb file.
+
+        Args:
+            path (str): Path to the database file.
+
+        Raises:
+            RuntimeError: If the maxminddb package is not installed.
+        """
+        if not MAXMINDDB_AVAILABLE:
+            raise RuntimeError("maxminddb not installed - install with: pip install maxminddb")
+        self.path = path
+        self._reader = maxminddb.open_database(path)
+        logger.info(f"🌍 Opened IP database {os.path.basename(path)} ({self._reader.metadata().database_type})")
+
+    def lookup(self, ip_address: str) -> Optional[str]:
+        try:
+            record = self._reader.get(ip_address)
+        except ValueError:
+            return None
+        if not isinstance(record, dict):
+            return None
+        country = record.get('country') or record.get('registered_country') or {}
+        names = country.get('names') or {}
+        return names.get('en') or (country_name(country['iso_code']) if country.get('iso_code') else None)
+
+    def lookup_many(self, ip_addresses: Iterable[str]) -> Dict[str, str]:
+        found = {}
+        for ip in ip_addresses:
+            country = self.lookup(ip)
+            if country:
+                found[ip] = country
+        return found
+
+    def describe(self) -> Dict:
+        return {'type': 'mmdb', 'path': self.path}
+
+
+_local_backends: Dict[tuple, object] = {}
+_local_lock = threading.Lock()
+
+
+def open_local_backend(path: str):
+    """
+    Open a local IP database, shared between all resolvers in the process.
+
+    Args:
+        path (str): .csv range file or .mmdb file; empty or missing disables the local backend.
+
+    Returns:
+        RangeFileBackend, MmdbBackend or None.
+    """
+    if not path or not os.path.isfile(path):
+        return None
+    key = (os.path.abspath(path), os.path.getmtime(path))
+    with _local_lock:
+        backend = _local_backends.get(key)
+        if backend is None:
+            try:
+                backend = MmdbBackend(path) if path.lower().endswith('.mmdb') else RangeFileBackend(path)
+            except Exception as e:
+                logger.error(f"Could not load IP database {path}: {e}")
+                return None
+            _local_backends[key] = backend
+        return backend
+
+
+# ============================================================================
+# REMOTE LOOKUPS
+# ============================================================================
+
+# Shared by every resolver in the process: ip-api rate limits per client address
+_rate_lock = threading.Lock()
+_next_request_at = 0.0
+
+
+class IpApiBackend:
+    """ip-api.com batch endpoint (or a compatible server) with its rate limit."""
+
+    batch_size = BATCH_SIZE
+
+    def __init__(self, api_url: str = DEFAULT_API_URL):
+        """
+        Initialize the IpApiBackend.
+
+        Args:
+            api_url (str, optional): Batch endpoint URL.
+        """
+        self.api_url = api_url
+        self._session = requests.Session()
+
+    def rate_wait(self) -> float:
+        """Seconds until the next request may be sent."""
+        with _rate_lock:
+            return max(0.0, _next_request_at - time.monotonic())
+
+    def _note_request(self, response: Optional[requests.Response]):
+        """Space requests out, honouring ip-api's X-Rl (requests left) and X-Ttl (seconds to reset)."""
+        global _next_request_at
+        delay = MIN_REQUEST_INTERVAL
+        if response is not None:
+            try:
+                if int(response.headers.get('X-Rl', 1)) <= 0 or response.status_code == 429:
+                    delay = max(delay, float(response.headers.get('X-Ttl', 60)) + 1)
+            except ValueError:
+                pass
+        with _rate_lock:
+            _next_request_at = max(_next_request_at, time.monotonic() + delay)
+
+    def lookup_batch(self, batch: List[str]) -> Optional[Dict[str, Tuple[str, bool]]]:
+        """
+        Look up one batch of addresses.
+
+        Args:
+            batch (List[str]): Up to batch_size addresses.
+
+        Returns:
+            Optional[Dict[str, Tuple[str, bool]]]: ip -> (country, resolved) for every address,
+                or None if the service asked us to slow down (the batch should be retried).
+
+        Raises:
+            GeoServiceError: If the service could not be reached or answered with an error.
+        """
+        response = None
+        try:
+            response = self._session.post(self.api_url, params={'fields': API_FIELDS}, json=batch,
+                                          timeout=REQUEST_TIMEOUT)
+            if response.status_code == 429:
+                logger.warning(f"Geolocation API rate limited; retrying {len(batch)} address(es) later")
+                return None
+            if response.status_code != 200:
+                raise GeoServiceError(f"HTTP {response.status_code}")
+            results = response.json()
+        except requests.exceptions.ConnectionError:
+            raise GeoServiceError('no connection')
+        except requests.exceptions.Timeout:
+            raise GeoServiceError('timeout')
+        except (requests.exceptions.RequestException, ValueError) as e:
+            raise GeoServiceError(str(e))
+        finally:
+            self._note_request(response)
+
+        answers = {}
+        for ip, result in zip(batch, results if isinstance(results, list) else []):
+            if not isinstance(result, dict):
+                continue
+            if result.get('status') == 'success':
+                answers[ip] = (result.get('country') or UNKNOWN_LOCATION, True)
+            else:
+                message = str(result.get('message', '')).lower()
+                if 'private range' in message or 'reserved range' in message:
+                    answers[ip] = (LOCAL_NETWORK, True)
+                else:
+                    answers[ip] = (UNKNOWN_LOCATION, False)
+        for ip in batch:
+            # Addresses missing from the reply are cached as failed rather than retried forever
+            answers.setdefault(ip, (UNKNOWN_LOCATION, False))
+        return answers
+
+    def describe(self) -> Dict:
+        return {'type': 'ip-api', 'url': self.api_url}
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Background IP geolocation for Empyrion Web Helper
+
+Player writes never wait for geolocation. resolve() answers, in order, from:
+private/invalid address classification, the local IP range database (if one
+is configured; see geo_backends), and the persistent geo_cache table.
+Everything else is queued for the remote backend (ip-api): a worker thread
+sends the queue in batches of up to 100, stores the answers in geo_cache with
+a TTL, and backfills players.country for every player on that address.
+
+Failed lookups ('invalid query' etc.) are cached as negative entries with a
+shorter TTL so they are not asked again every cycle. When the service cannot
+be reached, a circuit breaker backs the worker off instead of hammering it.
+"""
+
+import threading
+import time
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+from circuit_breaker import CircuitBreaker
+from geo_backends import GeoServiceError, classify_local, REQUEST_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+POSITIVE_TTL = 30 * 24 * 3600       # countries rarely change for an address
+NEGATIVE_TTL = 24 * 3600            # retry failed lookups once a day
+
+
+class GeoResolver:
+    """
+    Local database, persistent cache and background remote lookups for the player databases.
+
+    geo_cache lives in the first database; answers are backfilled into every
+    database added with add_player_pool(). The worker thread starts on the
+    first queued address.
+    """
+
+    def __init__(self, pool, local_backend=None, remote_backend=None,
+                 on_update: Optional[Callable[[int], None]] = None):
+        """
+        Initialize the GeoResolver.
+
+        Args:
+            pool (ConnectionPool): Pool of the database holding players and geo_cache.
+            local_backend (optional): Synchronous backend with lookup_many() (RangeFileBackend,
+                MmdbBackend); None to rely on the cache and the remote backend.
+            remote_backend (optional): Batch backend with lookup_batch() (IpApiBackend);
+                None disables network lookups.
+            on_update (Callable[[int], None], optional): Called with the number of players whose
+                country was backfilled, from the worker thread.
+        """
+        self.pool = pool
+        self.player_pools = [pool]
+        self.local_backend = local_backend
+        self.remote_backend = remote_backend
+        self.on_update = on_update
+        self.circuit = CircuitBreaker('geoip', failure_threshold=1, base_delay=10, max_delay=600)
+
+        self._pending = OrderedDict()  # addresses waiting for the worker, oldest first
+        self._in_flight = set()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {'requests': 0, 'resolved': 0, 'failed': 0, 'backfilled': 0, 'cache_hits': 0,
+                      'local_hits': 0}
+
+    def add_player_pool(self, pool):
+        """Also backfill countries into the players table of another database (one per server)."""
+        with self._cond:
+            if pool not in self.player_pools:
+                self.player_pools = self.player_pools + [pool]
+
+    def remove_player_pool(self, pool):
+        """Stop backfilling a database added with add_player_pool()."""
+        with self._cond:
+            if pool is not self.pool:
+                self.player_pools = [p for p in self.player_pools if p is not pool]
+
+    # ------------------------------------------------------------------
+    # Lookup side (called from player writes; never blocks on the network)
+    # ------------------------------------------------------------------
+
+    def resolve(self, ip_addresses: Iterable[str]) -> Dict[str, str]:
+        """
+        Get known countries for the given addresses and queue the unknown ones.
+
+        Args:
+            ip_addresses (Iterable[str]): Addresses to resolve.
+
+        Returns:
+            Dict[str, str]: ip -> country for addresses that are answered locally or cached.
+        """
+        known, wanted = {}, []
+        for ip in {ip.strip() for ip in ip_addresses if ip and ip.strip()}:
+            local = classify_local(ip)
+            if local:
+                known[ip] = local
+            else:
+                wanted.append(ip)
+
+        if wanted and self.local_backend:
+            # Microseconds per address, no network: the local database wins over the cache
+            local = self.local_backend.lookup_many(wanted)
+            known.update(local)
+            self.stats['local_hits'] += len(local)
+            wanted = [ip for ip in wanted if ip not in local]
+
+        if wanted:
+            cached = self.cached_countries(wanted)
+            known.update(cached)
+            self.stats['cache_hits'] += len(cached)
+            self.enqueue(ip for ip in wanted if ip not in cached)
+        return known
+
+    def cached_countries(self, ip_addresses: List[str]) -> Dict[str, str]:
+        """
+        Read unexpired geo_cache entries.
+
+        Args:
+            ip_addresses (List[str]): Addresses to look up.
+
+        Returns:
+            Dict[str, str]: ip -> cached country.
+        """
+        found = {}
+        now = time.time()
+        with self.pool.connection() as conn:
+            for start in range(0, len(ip_addresses), 500):
+                chunk = ip_addresses[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT ip_address, country FROM geo_cache WHERE expires_at > ? "
+                    f"AND ip_address IN ({','.join('?' * len(chunk))})", [now] + chunk)
+                found.update(rows.fetchall())
+        return found
+
+    def enqueue(self, ip_addresses: Iterable[str]):
+        """Queue addresses for lookup; duplicates and addresses already in flight are skipped."""
+        if not self.remote_backend:
+            return
+        with self._cond:
+            added = 0
+            for ip in ip_addresses:
+                if ip not in self._pending and ip not in self._in_flight:
+                    self._pending[ip] = None
+                    added += 1
+            if added:
+                self._ensure_worker()
+                self._cond.notify_all()
+
+    def pending_count(self) -> int:
+        """Number of addresses queued or being looked up."""
+        with self._cond:
+            return len(self._pending) + len(self._in_flight)
+
+    def wait_idle(self, timeout: float) -> bool:
+        """Block until the queue is empty (used by maintenance tasks and benchmarks)."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(min(remaining, 0.5))
+        return True
+
+    def stop(self):
+        """Stop the worker thread; queued addresses are dropped."""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=REQUEST_TIMEOUT + 1)
+
+    def get_status(self) -> Dict:
+        """
+        Get resolver counters for the status page.
+
+        Returns:
+            dict: Queue length, request/result counters and the service circuit state.
+        """
+        return dict(self.stats, pending=self.pending_count(), circuit=self.circuit.get_status(),
+                    local_backend=self.local_backend.describe() if self.local_backend else None,
+                    remote_backend=self.remote_backend.describe() if self.remote_backend else None)
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True, name="GeoResolver")
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self._cond:
+                while not self._pending and not self._stop.is_set():
+                    self._cond.wait()
+                if self._stop.is_set():
+                    return
+
+            # Respect the shared rate limit and the circuit's backoff before taking a batch
+            backend = self.remote_backend
+            if backend is None:
+                with self._cond:
+                    self._pending.clear()
+                    self._cond.notify_all()
+                continue
+            wait = max(backend.rate_wait(), self.circuit.retry_in())
+            if wait > 0:
+                self._stop.wait(wait)
+                continue
+            if not self.circuit.allow_request():
+                self._stop.wait(1.0)
+                continue
+
+            with self._cond:
+                batch = []
+                while self._pending and len(batch) < backend.batch_size:
+                    ip, _ = self._pending.popitem(last=False)
+                    batch.append(ip)
+                self._in_flight.update(batch)
+
+            self.stats['requests'] += 1
+            try:
+                answers = backend.lookup_batch(batch)
+                if answers is not None:
+                    self.circuit.record_success()
+                    self._store(answers)
+            except GeoServiceError as e:
+                self.circuit.record_failure(str(e))
+                logger.warning(f"Geolocation lookup failed ({e}); retrying {len(batch)} address(es) later")
+                answers = None
+            except Exception as e:
+                logger.error(f"Error storing geolocation results: {e}", exc_info=True)
+                answers = {}
+            finally:
+                with self._cond:
+                    self._in_flight.difference_update(batch)
+                    if answers is None:
+                        # Service unreachable: keep the batch for the next attempt
+                        for ip in batch:
+                            self._pending.setdefault(ip, None)
+                    self._cond.notify_all()
+
+    def _store(self, answers: Dict[str, tuple]):
+        """Write answers to geo_cache and backfill players on those addresses, one transaction per database."""
+        now = time.time()
+        current_time = datetime.now().isoformat()
+        with self.pool.connection() as conn:
+            conn.executemany("""
+                INSERT INTO geo_cache (ip_address, country, resolved, expires_at, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(ip_address) DO UPDATE SET
+                    country = excluded.country, resolved = excluded.resolved,
+                    expires_at = excluded.expires_at, updated_at = excluded.updated_at
+            """, [(ip, country, int(resolved), now + (POSITIVE_TTL if resolved else NEGATIVE_TTL), current_time)
+                  for ip, (country, resolved) in answers.items()])
+        backfilled = 0
+        for pool in self.player_pools:
+            with pool.connection() as conn:
+                before = conn.total_changes
+                conn.executemany(
+                    "UPDATE players SET country = ?, updated_at = ? WHERE ip_address = ? AND country IS NOT ?",
+                    [(country, current_time, ip, country) for ip, (country, _) in answers.items()])
+                backfilled += conn.total_changes - before
+
+        resolved = sum(1 for _, ok in answers.values() if ok)
+        self.stats['resolved'] += resolved
+        self.stats['failed'] += len(answers) - resolved
+        self.stats['backfilled'] += backfilled
+        logger.info(f"🌍 Geolocated {len(answers)} address(es) ({len(answers) - resolved} failed), "
+                    f"updated {backfilled} player(s)")
+        if backfilled and self.on_update:
+            try:
+                self.on_update(backfilled)
+            except Exception as e:
+                logger.error(f"Error in geolocation update callback: {e}", exc_info=True)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Latency histogram for Empyrion Web Helper
+
+Small fixed-bucket histogram used to expose timings (such as RCON connect
+latency) on the status endpoint without keeping every sample.
+"""
+
+import bisect
+import threading
+from typing import Dict, Optional, Sequence
+
+# Upper bucket bounds in milliseconds; anything slower lands in the overflow bucket
+DEFAULT_BOUNDS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class LatencyHistogram:
+    """
+    Thread-safe histogram of durations with fixed millisecond buckets.
+
+    Percentiles are estimated from bucket upper bounds, which is plenty for a status page.
+    """
+
+    def __init__(self, bounds_ms: Sequence[float] = DEFAULT_BOUNDS_MS):
+        """
+        Initialize the LatencyHistogram.
+
+        Args:
+            bounds_ms (Sequence[float], optional): Ascending bucket upper bounds in milliseconds.
+        """
+        self.bounds_ms = tuple(bounds_ms)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Clear all recorded samples."""
+        with self._lock:
+            self._buckets = [0] * (len(self.bounds_ms) + 1)
+            self._count = 0
+            self._total_ms = 0.0
+            self._min_ms = None
+            self._max_ms = None
+            self._last_ms = None
+
+    def record(self, seconds: float):
+        """
+        Record one duration.
+
+        Args:
+            seconds (float): Measured duration in seconds.
+        """
+        ms = seconds * 1000.0
+        with self._lock:
+            self._buckets[bisect.bisect_left(self.bounds_ms, ms)] += 1
+            self._count += 1
+            self._total_ms += ms
+            self._min_ms = ms if self._min_ms is None else min(self._min_ms, ms)
+            self._max_ms = ms if self._max_ms is None else max(self._max_ms, ms)
+            self._last_ms = ms
+
+    def _percentile(self, fraction: float) -> Optional[float]:
+        if not self._count:
+            return None
+        rank = fraction * self._count
+        seen = 0
+        for index, count in enumerate(self._buckets):
+            seen += count
+            if seen >= rank and count:
+                bound = self.bounds_ms[index] if index < len(self.bounds_ms) else self._max_ms
+                return min(bound, self._max_ms)
+        return self._max_ms
+
+    def snapshot(self) -> Dict:
+        """
+        Get a JSON-friendly summary of the histogram.
+
+        Returns:
+            dict: count, min/max/mean/last and p50/p95/p99 in milliseconds, plus the bucket counts.
+        """
+        with self._lock:
+            def rounded(value):
+                return round(value, 1) if value is not None else None
+
+            labels = [f"<={bound}ms" for bound in self.bounds_ms] + [f">{self.bounds_ms[-1]}ms"]
+            return {
+                'count': self._count,
+                'min_ms': rounded(self._min_ms),
+                'max_ms': rounded(self._max_ms),
+                'mean_ms': rounded(self._total_ms / self._count) if self._count else None,
+                'last_ms': rounded(self._last_ms),
+                'p50_ms': rounded(self._percentile(0.50)),
+                'p95_ms': rounded(self._percentile(0.95)),
+                'p99_ms': rounded(self._percentile(0.99)),
+                'buckets': {label: count for label, count in zip(labels, self._buckets) if count}
+            }
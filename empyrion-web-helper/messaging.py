@@ -11,7 +11,6 @@ Handles all messaging functionality:
 Configuration stored in empyrion_helper.conf under [messaging] section
 """
 
-import sqlite3
 import json
 import logging
 import os
@@ -22,6 +21,8 @@ from typing import List, Dict, Optional
 from threading import Timer
 import io
 
+from db_pool import get_pool
+
 logger = logging.getLogger(__name__)
 
 class MessagingManager:
@@ -43,6 +44,8 @@ class MessagingManager:
         self.connection_handler = connection_handler
         self.player_db = player_db
         self.config_file = config_file
+        # Message history shares the player database (and its connection pool)
+        self.db_pool = player_db.pool if player_db else get_pool('instance/players.db')
         
         # Message templates (defaults)
         self.welcome_message_template = 'Welcome to Space Cowboys, <playername>!'
@@ -422,7 +425,7 @@ class MessagingManager:
         Initialize the SQLite database tables for message history logging.
         """
         try:
-            with sqlite3.connect('instance/players.db') as conn:
+            with self.db_pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 # Message history table (only this, no config tables)
@@ -764,7 +767,7 @@ class MessagingManager:
             List[Dict]: List of message history entries.
         """
         try:
-            with sqlite3.connect('instance/players.db') as conn:
+            with self.db_pool.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT timestamp, message_type, message_text, player_name, success
@@ -802,7 +805,7 @@ class MessagingManager:
         try:
             current_time = datetime.now().isoformat()
             
-            with sqlite3.connect('instance/players.db') as conn:
+            with self.db_pool.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     INSERT INTO message_history 
@@ -851,7 +854,7 @@ class MessagingManager:
             Dict[str, int]: Dictionary with total, successful, failed, and by_type message counts.
         """
         try:
-            with sqlite3.connect('instance/players.db') as conn:
+            with self.db_pool.connection() as conn:
                 cursor = conn.cursor()
                 
                 # Total messages
@@ -894,7 +897,7 @@ class MessagingManager:
             bool: True if cleared successfully, False otherwise.
         """
         try:
-            with sqlite3.connect('instance/players.db') as conn:
+            with self.db_pool.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("DELETE FROM message_history")
                 conn.commit()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Player snapshot diffing for Empyrion Web Helper
+
+Keeps a compact copy of the last player list seen by the monitor loop and
+computes what changed since then, so only changed players are written to the
+database and pushed to subscribers.
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Fields compared between cycles, stored per player as a tuple in this order
+TRACKED_FIELDS = ('name', 'status', 'faction', 'role', 'ip_address', 'playfield')
+_STATUS = TRACKED_FIELDS.index('status')
+_PLAYFIELD = TRACKED_FIELDS.index('playfield')
+
+
+class PlayerDelta:
+    """
+    Differences between two consecutive player lists.
+
+    Attributes:
+        joined (List[Dict]): Players that came online (including first-time players).
+        left (List[Dict]): Players that went offline or disappeared from the list.
+        moved (List[Dict]): Online players whose playfield changed.
+        changed (List[Dict]): Players whose faction, IP, name or role changed.
+        new (List[Dict]): Players not in the previous snapshot at all.
+        removed_steam_ids (List[str]): Steam IDs no longer present in the player list.
+        server_id (Optional[str]): Server the delta belongs to, set by the monitor.
+    """
+
+    __slots__ = ('joined', 'left', 'moved', 'changed', 'new', 'removed_steam_ids', 'server_id')
+
+    def __init__(self):
+        self.server_id = None
+        self.joined = []
+        self.left = []
+        self.moved = []
+        self.changed = []
+        self.new = []
+        self.removed_steam_ids = []
+
+    def __bool__(self) -> bool:
+        return bool(self.joined or self.left or self.moved or self.changed or self.new or self.removed_steam_ids)
+
+    def changed_players(self) -> List[Dict]:
+        """
+        Get every player row that needs to be written, each once.
+
+        Returns:
+            List[Dict]: Player dictionaries that differ from the previous snapshot.
+        """
+        rows = {}
+        for group in (self.new, self.joined, self.left, self.moved, self.changed):
+            for player in group:
+                if player.get('steam_id'):
+                    rows[player['steam_id']] = player
+        return list(rows.values())
+
+    def left_steam_ids(self) -> List[str]:
+        """Steam IDs of players who went offline this cycle."""
+        return [player['steam_id'] for player in self.left]
+
+    def to_dict(self) -> Dict:
+        """
+        JSON-friendly form for subscribers (e.g. the players_changed socket event).
+
+        Returns:
+            dict: Lists of steam_id/name pairs per change type plus counts.
+        """
+        def brief(players, *extra):
+            return [{'steam_id': p.get('steam_id'), 'name': p.get('name'),
+                     **{key: p.get(key) for key in extra}} for p in players]
+
+        return {
+            'server_id': self.server_id,
+            'joined': brief(self.joined, 'playfield'),
+            'left': brief(self.left),
+            'moved': brief(self.moved, 'playfield'),
+            'changed': brief(self.changed, 'faction', 'ip_address'),
+            'new': brief(self.new),
+            'removed': list(self.removed_steam_ids),
+            'total_changed': len({p['steam_id'] for p in self.changed_players()} | set(self.removed_steam_ids))
+        }
+
+
+class PlayerSnapshot:
+    """
+    Last known player list, keyed by steam_id.
+
+    Only the tracked fields are kept (as tuples), which is enough to detect every
+    change that ends up in the players table.
+    """
+
+    def __init__(self):
+        self._players: Optional[Dict[str, tuple]] = None
+
+    @property
+    def is_empty(self) -> bool:
+        """True until the first player list has been recorded."""
+        return self._players is None
+
+    def reset(self):
+        """Forget the snapshot so the next cycle is treated as a full sync."""
+        self._players = None
+
+    def __len__(self) -> int:
+        return len(self._players) if self._players else 0
+
+    @staticmethod
+    def _key(player: Dict) -> tuple:
+        return tuple(player.get(field) or '' for field in TRACKED_FIELDS)
+
+    def diff(self, players: List[Dict]) -> PlayerDelta:
+        """
+        Compare a fresh player list with the snapshot, then make it the new snapshot.
+
+        Args:
+            players (List[Dict]): Current merged player list from 'plys'.
+
+        Returns:
+            PlayerDelta: What changed. On the first call every player counts as new.
+        """
+        delta = PlayerDelta()
+        previous = self._players or {}
+        current = {}
+
+        for player in players:
+            steam_id = player.get('steam_id')
+            if not steam_id:
+                continue
+            key = self._key(player)
+            current[steam_id] = key
+
+            old = previous.get(steam_id)
+            if old is None:
+                delta.new.append(player)
+                if key[_STATUS] == 'Online':
+                    delta.joined.append(player)
+                continue
+            if old == key:
+                continue
+
+            was_online = old[_STATUS] == 'Online'
+            is_online = key[_STATUS] == 'Online'
+            status_or_place_changed = True
+            if is_online and not was_online:
+                delta.joined.append(player)
+            elif was_online and not is_online:
+                delta.left.append(player)
+            elif is_online and old[_PLAYFIELD] != key[_PLAYFIELD]:
+                delta.moved.append(player)
+            else:
+                status_or_place_changed = False
+
+            # Anything else that differs (faction, IP, name, role)
+            if not status_or_place_changed or any(
+                    old[i] != key[i] for i in range(len(TRACKED_FIELDS)) if i not in (_STATUS, _PLAYFIELD)):
+                delta.changed.append(player)
+
+        for steam_id, old in previous.items():
+            if steam_id not in current:
+                delta.removed_steam_ids.append(steam_id)
+                if old[_STATUS] == 'Online':
+                    delta.left.append(dict(zip(TRACKED_FIELDS, old), steam_id=steam_id, status='Offline'))
+
+        self._players = current
+        return delta
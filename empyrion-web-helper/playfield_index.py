@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Playfield name index for Empyrion Web Helper
+
+The 'servers' command names playfields slightly differently from 'gents':
+an entity playfield may carry a " (loaded)" suffix, a number the playfield
+server leaves out, or a longer or shorter form of the same name. This index
+maps names as 'servers' reports them onto the entity playfields in one pass:
+
+1. exact name, then the name with " (loaded)"
+2. normalized key: lower case, no " (loaded)", digits and extra spaces dropped
+3. partial match: one normalized name contains the other, found through a
+   trigram index (this way) and a lookup of each substring (the other way)
+
+It is built once per entity refresh (see PlayerDatabase.get_playfield_index),
+so each lookup costs the length of the name rather than a scan over every
+entity playfield.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+LOADED_SUFFIX = ' (loaded)'
+MIN_PARTIAL_LENGTH = 3  # shorter normalized names only match exactly
+
+_DIGITS = re.compile(r'\s*\d+\s*')
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_playfield(name: str) -> str:
+    """
+    Reduce a playfield name to the key names are matched on.
+
+    Args:
+        name (str): Playfield name as reported by 'servers' or 'gents'.
+
+    Returns:
+        str: Lower-case name without " (loaded)", digits and repeated spaces.
+    """
+    name = name.strip()
+    if name.endswith(LOADED_SUFFIX):
+        name = name[:-len(LOADED_SUFFIX)]
+    return _SPACES.sub(' ', _DIGITS.sub(' ', name)).strip().lower()
+
+
+def _trigrams(key: str) -> Set[str]:
+    return {key[index:index + 3] for index in range(len(key) - 2)}
+
+
+class PlayfieldIndex:
+    """
+    Name lookup over the playfields of one entity refresh.
+
+    Values are whatever the caller keeps per playfield (entity counts for the
+    active-playfields report). When several playfields share a normalized key
+    or partially match, the one added first wins.
+    """
+
+    def __init__(self, playfields: Iterable[Tuple[str, Any]] = ()):
+        """
+        Build the index.
+
+        Args:
+            playfields (Iterable[Tuple[str, Any]]): (playfield name, value) pairs.
+        """
+        self._exact: Dict[str, Any] = {}
+        self._normalized: Dict[str, Any] = {}
+        self._order: Dict[str, int] = {}  # normalized key -> position, for first-added-wins
+        self._trigrams: Dict[str, Set[str]] = {}
+        for name, value in playfields:
+            self.add(name, value)
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def add(self, name: str, value: Any):
+        """
+        Add a playfield.
+
+        Args:
+            name (str): Playfield name as stored with the entities.
+            value: Value returned for lookups that resolve to this playfield.
+        """
+        self._exact[name] = value
+        key = normalize_playfield(name)
+        if not key or key in self._normalized:
+            return
+        self._normalized[key] = value
+        self._order[key] = len(self._order)
+        if len(key) >= MIN_PARTIAL_LENGTH:
+            for trigram in _trigrams(key):
+                self._trigrams.setdefault(trigram, set()).add(key)
+
+    def lookup(self, name: str) -> Optional[Any]:
+        """
+        Find the playfield a name refers to.
+
+        Args:
+            name (str): Playfield name, typically from the 'servers' command.
+
+        Returns:
+            Optional[Any]: Value of the matching playfield, or None if nothing matches.
+        """
+        value = self._exact.get(name)
+        if value is None:
+            value = self._exact.get(name + LOADED_SUFFIX)
+        if value is not None:
+            return value
+
+        key = normalize_playfield(name)
+        if not key:
+            return None
+        value = self._normalized.get(key)
+        if value is not None or len(key) < MIN_PARTIAL_LENGTH:
+            return value
+
+        matches = self._containing(key) + self._contained_in(key)
+        if not matches:
+            return None
+        return self._normalized[min(matches, key=self._order.__getitem__)]
+
+    def _containing(self, key: str) -> List[str]:
+        """Indexed keys that contain key: candidates share all of its trigrams."""
+        postings = sorted((self._trigrams.get(trigram, set()) for trigram in _trigrams(key)), key=len)
+        if not postings or not postings[0]:
+            return []
+        candidates = postings[0].intersection(*postings[1:])
+        return [candidate for candidate in candidates if key in candidate]
+
+    def _contained_in(self, key: str) -> List[str]:
+        """Indexed keys that are substrings of key."""
+        length = len(key)
+        return [key[start:end] for start in range(length)
+                for end in range(start + MIN_PARTIAL_LENGTH, length + 1)
+                if key[start:end] in self._normalized]
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Parser for the Empyrion 'plys' command output
+
+Turns the three sections of a 'plys' reply (connected players, global online
+players, global players) into one merged player list. Each section is scanned
+once with a precompiled multi-line pattern and players are merged by Steam ID
+as they are found, so there is no per-line Python loop in the common case.
+"""
+
+import re
+import logging
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SECTION_CONNECTED = 'connected'
+SECTION_ONLINE = 'online'
+SECTION_GLOBAL = 'global'
+
+SECTION_HEADER_RE = re.compile(r'(Players connected|Global online players list|Global players list)[^\n]*')
+SECTION_NAMES = {
+    'Players connected': SECTION_CONNECTED,
+    'Global online players list': SECTION_ONLINE,
+    'Global players list': SECTION_GLOBAL,
+}
+
+# "  3: 76561198006480895, Orbit Rat2, Omicron Orbit, 203.0.113.183|32057"
+CONNECTED_LINE_RE = re.compile(
+    r'^[ \t]*\d+:[ \t]*(\d+),[ \t]*([^,\n]+),[ \t]*([^,\n]+),[ \t]*([^|\n]+)', re.MULTILINE
+)
+# "  id=76561198043464098 name=Nova0 fac=[SCB] role=Member online=329804"
+PLAYER_LINE_RE = re.compile(
+    r'^[ \t]*id=(\d+)[ \t]+name=([^\n]*?)[ \t]+fac=\[([^\]\n]*)\]'
+    r'(?:[ \t]+role=(\w+))?(?:[^\n]*?[ \t]online=(\d+))?',
+    re.MULTILINE
+)
+
+# Per-line fallbacks for lines that don't follow the usual field order
+ID_RE = re.compile(r'id=(\d+)')
+NAME_RE = re.compile(r'name=(.*?)\s+fac=')
+NAME_WORD_RE = re.compile(r'name=(\S+)')
+FACTION_RE = re.compile(r'fac=\[([^\]]+)\]')
+ROLE_RE = re.compile(r'role=(\w+)')
+ONLINE_RE = re.compile(r'online=(\d+)')
+
+
+class PlysParser:
+    """
+    Parser for 'plys' replies.
+
+    Players are merged by Steam ID as they are read: name, faction and role keep
+    the first non-empty value, playfield and IP come from the connected section,
+    and only players in the connected section are reported as Online.
+    """
+
+    def parse(self, response: str) -> List[Dict]:
+        """
+        Parse a 'plys' reply into a merged player list.
+
+        Args:
+            response (str): Raw 'plys' reply text.
+
+        Returns:
+            List[Dict]: Player dictionaries, Online players first, then by name.
+        """
+        merged = {}
+        # Sections are scanned in place (pos/endpos) rather than sliced out of the reply
+        for section, start, end in self._split_sections(response):
+            if section == SECTION_CONNECTED:
+                self._merge_connected(response, start, end, merged)
+            else:
+                self._merge_listed(response, start, end, merged, keep_playtime=(section == SECTION_GLOBAL))
+
+        result = list(merged.values())
+        result.sort(key=lambda p: (p['status'] != 'Online', p['name'].lower()))
+
+        online_count = sum(1 for p in result if p['status'] == 'Online')
+        logger.info(f"Parsed plys reply: {online_count} online, {len(result) - online_count} offline players")
+        return result
+
+    @staticmethod
+    def _split_sections(response: str) -> Iterator[Tuple[str, int, int]]:
+        """Yield (section, start, end) offsets of each section body in the reply."""
+        headers = list(SECTION_HEADER_RE.finditer(response))
+        for index, header in enumerate(headers):
+            end = headers[index + 1].start() if index + 1 < len(headers) else len(response)
+            yield SECTION_NAMES[header.group(1)], header.end(), end
+
+    @staticmethod
+    def _merge_connected(response: str, start: int, end: int, merged: Dict[str, Dict]):
+        for steam_id, name, playfield, ip_address in CONNECTED_LINE_RE.findall(response, start, end):
+            name = name.strip()
+            playfield = playfield.strip()
+            ip_address = ip_address.strip()
+
+            player = merged.get(steam_id)
+            if player is None:
+                merged[steam_id] = {
+                    'steam_id': steam_id, 'name': name, 'status': 'Online',
+                    'playfield': playfield, 'ip_address': ip_address,
+                    'faction': '', 'role': '', 'ping': 0, 'total_playtime': 0
+                }
+                continue
+            if not player['name']:
+                player['name'] = name
+            if playfield:
+                player['playfield'] = playfield
+            if ip_address:
+                player['ip_address'] = ip_address
+            player['status'] = 'Online'
+
+    def _merge_listed(self, response: str, start: int, end: int, merged: Dict[str, Dict], keep_playtime: bool):
+        matches = PLAYER_LINE_RE.findall(response, start, end)
+        if len(matches) != response.count('id=', start, end):
+            # Some line is not in the usual layout; parse the section line by line
+            lines = response[start:end].split('\n')
+            matches = [fields for fields in map(self._parse_player_line, lines) if fields]
+
+        for steam_id, name, faction, role, online in matches:
+            name = name.strip() or 'Unknown'
+            role = role or ''
+            total_playtime = int(online) if (keep_playtime and online) else 0
+
+            player = merged.get(steam_id)
+            if player is None:
+                merged[steam_id] = {
+                    'steam_id': steam_id, 'name': name, 'status': 'Offline',
+                    'playfield': '', 'ip_address': '',
+                    'faction': faction, 'role': role, 'ping': 0, 'total_playtime': total_playtime
+                }
+                continue
+            if not player['name']:
+                player['name'] = name
+            if not player['faction']:
+                player['faction'] = faction
+            if not player['role']:
+                player['role'] = role
+            if not player['total_playtime']:
+                player['total_playtime'] = total_playtime
+
+    @staticmethod
+    def _parse_player_line(line: str) -> Optional[tuple]:
+        """
+        Parse one 'id=... name=... fac=[...] role=... [online=...]' line field by field.
+
+        Args:
+            line (str): Line from the online or global section.
+
+        Returns:
+            Optional[tuple]: (steam_id, name, faction, role, online) as strings, or None if there is no id.
+        """
+        id_match = ID_RE.search(line)
+        if not id_match:
+            return None
+        name_match = NAME_RE.search(line) or NAME_WORD_RE.search(line)
+        faction_match = FACTION_RE.search(line)
+        role_match = ROLE_RE.search(line)
+        online_match = ONLINE_RE.search(line)
+        return (
+            id_match.group(1),
+            name_match.group(1) if name_match else '',
+            faction_match.group(1) if faction_match else '',
+            role_match.group(1) if role_match else '',
+            online_match.group(1) if online_match else None
+        )
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Adaptive poll scheduler for the Empyrion Web Helper monitor loop
+
+Decides how long the monitor waits between 'plys' polls: it drops to a floor
+after player churn or admin activity and backs off towards a ceiling while the
+server is empty or nothing changes.
+"""
+
+import threading
+import logging
+from datetime import datetime
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLOOR = 10       # seconds; same minimum the monitoring settings enforce
+DEFAULT_CEILING = 120    # seconds
+QUIET_CYCLES_BEFORE_BACKOFF = 3
+QUIET_CYCLES_BEFORE_CEILING = 10  # with players online, stay at the baseline this long first
+BACKOFF_FACTOR = 1.5
+EMPTY_BACKOFF_FACTOR = 2.0
+
+
+class AdaptivePollScheduler:
+    """
+    Tracks the current poll interval and why it was last changed.
+
+    The configured update_interval is the baseline. Churn (joins/leaves) or admin
+    activity snaps the interval to the floor; consecutive quiet cycles grow it
+    back to the baseline and, if things stay quiet or the server is empty, up to
+    the ceiling.
+    """
+
+    def __init__(self, base_interval: float, floor: float = DEFAULT_FLOOR, ceiling: float = DEFAULT_CEILING):
+        """
+        Initialize the AdaptivePollScheduler.
+
+        Args:
+            base_interval (float): Configured update_interval in seconds.
+            floor (float, optional): Fastest allowed interval. Defaults to DEFAULT_FLOOR.
+            ceiling (float, optional): Slowest allowed interval. Defaults to DEFAULT_CEILING.
+        """
+        self._lock = threading.Lock()
+        self.configure(base_interval, floor, ceiling)
+        self.interval = self.base_interval
+        self.reason = 'configured update_interval'
+        self.changed_at = datetime.now().isoformat()
+        self.quiet_cycles = 0
+        self.polls = 0
+
+    def configure(self, base_interval: float, floor: float = DEFAULT_FLOOR, ceiling: float = DEFAULT_CEILING):
+        """
+        Update the limits (e.g. after the monitoring settings change).
+
+        Args:
+            base_interval (float): Configured update_interval in seconds.
+            floor (float, optional): Fastest allowed interval.
+            ceiling (float, optional): Slowest allowed interval.
+        """
+        floor = max(1.0, float(floor))
+        ceiling = max(floor, float(ceiling))
+        with self._lock:
+            self.floor = floor
+            self.ceiling = ceiling
+            self.base_interval = min(max(float(base_interval), floor), ceiling)
+            if hasattr(self, 'interval'):
+                self.interval = min(max(self.interval, floor), ceiling)
+
+    def _set(self, interval: float, reason: str):
+        interval = round(min(max(interval, self.floor), self.ceiling), 1)
+        if interval != self.interval or reason != self.reason:
+            if interval != self.interval:
+                logger.info(f"⏱️ Poll interval {self.interval:g}s -> {interval:g}s ({reason})")
+            self.interval = interval
+            self.reason = reason
+            self.changed_at = datetime.now().isoformat()
+
+    def record_cycle(self, online_count: int, joins: int = 0, leaves: int = 0, changes: int = 0):
+        """
+        Feed the outcome of one monitor cycle into the scheduler.
+
+        Args:
+            online_count (int): Players online after this cycle.
+            joins (int, optional): Players who joined this cycle.
+            leaves (int, optional): Players who left this cycle.
+            changes (int, optional): Other changed players (moves, faction/IP changes).
+        """
+        with self._lock:
+            self.polls += 1
+            if joins or leaves:
+                self.quiet_cycles = 0
+                self._set(self.floor, f"player churn ({joins} joined, {leaves} left)")
+                return
+            if changes:
+                self.quiet_cycles = 0
+                if self.interval > self.base_interval:
+                    self._set(self.base_interval, f"player activity ({changes} changed)")
+                return
+
+            self.quiet_cycles += 1
+            if self.quiet_cycles < QUIET_CYCLES_BEFORE_BACKOFF:
+                return
+
+            if online_count == 0:
+                self._set(self.interval * EMPTY_BACKOFF_FACTOR, "server empty")
+            elif self.interval < self.base_interval:
+                self._set(min(self.interval * BACKOFF_FACTOR, self.base_interval),
+                          f"no changes for {self.quiet_cycles} cycles")
+            elif self.quiet_cycles >= QUIET_CYCLES_BEFORE_CEILING:
+                self._set(self.interval * BACKOFF_FACTOR, f"no changes for {self.quiet_cycles} cycles")
+
+    def note_admin_activity(self, reason: str = 'admin activity'):
+        """
+        Poll at the floor rate for a while.
+
+        Args:
+            reason (str, optional): What the admin did, for /status. Defaults to 'admin activity'.
+        """
+        with self._lock:
+            self.quiet_cycles = 0
+            self._set(self.floor, reason)
+
+    def reset(self, reason: str = 'configured update_interval'):
+        """Go back to the baseline interval (e.g. after a reconnect)."""
+        with self._lock:
+            self.quiet_cycles = 0
+            self._set(self.base_interval, reason)
+
+    def get_status(self) -> Dict:
+        """
+        Get the scheduler state for the status page.
+
+        Returns:
+            dict: Current interval, reason, limits and counters.
+        """
+        with self._lock:
+            return {
+                'interval': self.interval,
+                'reason': self.reason,
+                'changed_at': self.changed_at,
+                'floor': self.floor,
+                'base_interval': self.base_interval,
+                'ceiling': self.ceiling,
+                'quiet_cycles': self.quiet_cycles,
+                'polls': self.polls
+            }
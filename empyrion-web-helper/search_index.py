@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Full-text search for Empyrion Web Helper
+
+Keeps FTS5 indexes over players (name, faction, playfield), entities (name,
+type, faction, playfield) and message history (text, player) and searches
+them together, ranked with bm25. The indexes are external-content tables: they
+store only the index, read the text from the base tables, and are kept in sync
+by triggers, so the writers in database.py and messaging.py need no changes.
+
+If the SQLite library was built without FTS5 the same search falls back to
+LIKE substring matching (slow on big tables, but the endpoint keeps working).
+"""
+
+import re
+import sqlite3
+import logging
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SEARCH_KINDS = ('player', 'entity', 'message')
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+# kind -> base table, FTS table, indexed columns with their bm25 weights, columns returned
+_SOURCES = {
+    'player': {
+        'table': 'players', 'fts': 'players_fts',
+        'columns': (('name', 10.0), ('faction', 2.0), ('playfield', 1.0)),
+        'select': ('steam_id', 'name', 'status', 'faction', 'playfield', 'last_seen'),
+        'id': 'steam_id', 'title': 'name'
+    },
+    'entity': {
+        'table': 'entities', 'fts': 'entities_fts',
+        'columns': (('name', 10.0), ('type', 2.0), ('faction', 2.0), ('playfield', 1.0)),
+        'select': ('id', 'name', 'type', 'faction', 'playfield'),
+        'id': 'id', 'title': 'name',
+        # Tombstoned entities stay indexed until they expire but are not search hits
+        'where': 't.removed_at IS NULL'
+    },
+    'message': {
+        'table': 'message_history', 'fts': 'message_history_fts',
+        'columns': (('message_text', 5.0), ('player_name', 2.0)),
+        'select': ('id', 'timestamp', 'message_type', 'message_text', 'player_name'),
+        'id': 'id', 'title': 'message_text'
+    }
+}
+
+
+def fts5_available(conn: sqlite3.Connection) -> bool:
+    """Check whether the SQLite library has the FTS5 extension."""
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp.fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def _index_statements(source: Dict) -> List[str]:
+    table, fts = source['table'], source['fts']
+    names = [name for name, _ in source['columns']]
+    cols = ', '.join(names)
+    new_values = ', '.join(f"new.{name}" for name in names)
+    old_values = ', '.join(f"old.{name}" for name in names)
+    changed = ' OR '.join(f"old.{name} IS NOT new.{name}" for name in names)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{table}', content_rowid='rowid', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.rowid, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.rowid, {old_values}); END",
+        # Status/last_seen updates from the monitor don't touch the index
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} WHEN {changed} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.rowid, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.rowid, {new_values}); END",
+    ]
+
+
+def ensure_search_index(conn: sqlite3.Connection) -> bool:
+    """
+    Create the FTS5 tables and sync triggers if they are missing, and fill new ones.
+
+    Expects players, entities and message_history to exist (see db_migrations).
+
+    Args:
+        conn (sqlite3.Connection): Open connection to the database.
+
+    Returns:
+        bool: True if FTS5 search is available, False if search falls back to LIKE.
+    """
+    if not fts5_available(conn):
+        logger.warning("SQLite was built without FTS5 - search falls back to slow substring matching")
+        return False
+
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    for source in _SOURCES.values():
+        if source['table'] not in existing:
+            continue
+        for statement in _index_statements(source):
+            conn.execute(statement)
+        if source['fts'] not in existing:
+            # Index the rows that were there before the triggers
+            conn.execute(f"INSERT INTO {source['fts']}({source['fts']}) VALUES ('rebuild')")
+            logger.info(f"Built search index {source['fts']}")
+    conn.commit()
+    return True
+
+
+def rebuild_search_index(conn: sqlite3.Connection):
+    """Re-index every source from its base table (e.g. after rows were changed with triggers disabled)."""
+    for source in _SOURCES.values():
+        conn.execute(f"INSERT INTO {source['fts']}({source['fts']}) VALUES ('rebuild')")
+    conn.commit()
+
+
+def build_match_query(text: str) -> Optional[str]:
+    """
+    Turn free text into an FTS5 query: every word must match, as a prefix.
+
+    Args:
+        text (str): What the admin typed, e.g. 'zir bas'.
+
+    Returns:
+        Optional[str]: FTS5 MATCH expression ('"zir"* "bas"*'), or None if there are no words.
+    """
+    words = re.findall(r'\w+', text or '', re.UNICODE)
+    if not words:
+        return None
+    # Quoted, so words like AND/NOT/NEAR are not read as operators
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search(conn: sqlite3.Connection, text: str, limit: int = DEFAULT_SEARCH_LIMIT,
+           kinds: Optional[Iterable[str]] = None, use_fts: bool = True) -> List[Dict]:
+    """
+    Search players, entities and message history and rank the hits together.
+
+    bm25 scores from different tables are not strictly comparable, but with the
+    column weights above a name hit ranks above a hit in a secondary column
+    across all three sources, which is what the admin is looking for.
+
+    Args:
+        conn (sqlite3.Connection): Open connection to the database.
+        text (str): Search text.
+        limit (int, optional): Maximum number of results.
+        kinds (Iterable[str], optional): Subset of SEARCH_KINDS to search.
+        use_fts (bool, optional): False uses LIKE matching (no FTS5 available).
+
+    Returns:
+        List[Dict]: Results, best first, each with 'kind', 'id', 'title', 'score' and the row's columns.
+    """
+    limit = max(1, min(int(limit or DEFAULT_SEARCH_LIMIT), MAX_SEARCH_LIMIT))
+    kinds = [kind for kind in (kinds or SEARCH_KINDS) if kind in _SOURCES]
+    match = build_match_query(text)
+    if not match or not kinds:
+        return []
+
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    previous_factory = conn.row_factory
+    conn.row_factory = sqlite3.Row
+    results = []
+    try:
+        for kind in kinds:
+            source = _SOURCES[kind]
+            if source['table'] not in existing or (use_fts and source['fts'] not in existing):
+                continue
+            columns = ', '.join(f"t.{name}" for name in source['select'])
+            live = f" AND {source['where']}" if 'where' in source else ''
+            if use_fts:
+                weights = ', '.join(str(weight) for _, weight in source['columns'])
+                rows = conn.execute(
+                    f"SELECT {columns}, bm25({source['fts']}, {weights}) AS score "
+                    f"FROM {source['fts']} JOIN {source['table']} t ON t.rowid = {source['fts']}.rowid "
+                    f"WHERE {source['fts']} MATCH ?{live} ORDER BY score LIMIT ?", (match, limit)
+                ).fetchall()
+            else:
+                conditions = ' OR '.join(f"t.{name} LIKE ?" for name, _ in source['columns'])
+                rows = conn.execute(
+                    f"SELECT {columns}, 0.0 AS score FROM {source['table']} t WHERE ({conditions}){live} LIMIT ?",
+                    [f"%{text.strip()}%"] * len(source['columns']) + [limit]
+                ).fetchall()
+
+            for row in rows:
+                result = dict(row)
+                result['score'] = round(-result['score'], 4) or 0.0  # bm25 is lower-is-better; report higher-is-better
+                result.update(kind=kind, id=row[source['id']], title=row[source['title']])
+                results.append(result)
+    finally:
+        conn.row_factory = previous_factory
+
+    results.sort(key=lambda result: result['score'], reverse=True)
+    return results[:limit]
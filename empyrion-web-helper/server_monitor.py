@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Per-server monitor for Empyrion Web Helper
+
+A ServerMonitor owns everything one monitored server needs between cycles: its
+RCON connection, reconnect/backoff state, player snapshot and poll schedule.
+It does no waiting of its own; BackgroundService runs due monitors on a shared,
+bounded worker pool, so idle servers cost no thread.
+"""
+
+import threading
+import time
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from circuit_breaker import CircuitBreaker
+from entity_classification import STRUCTURE_TYPES, SHIP_TYPES
+from gents_parser import GentsParser
+from latency_histogram import LatencyHistogram
+from timeseries import get_metrics_store
+from player_snapshot import PlayerSnapshot, PlayerDelta
+from poll_scheduler import AdaptivePollScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class ServerMonitor:
+    """
+    Connection and player-tracking state for one monitored server.
+    """
+
+    RECONNECT_DELAY = 10        # seconds the circuit stays open after the first trip
+    MAX_RECONNECT_DELAY = 300   # 5 minutes max delay
+    FULL_SYNC_EVERY = 15        # cycles between full writes (refreshes last_seen of online players)
+
+    def __init__(self, server_id: str, registry, player_db, poll_scheduler: AdaptivePollScheduler,
+                 listeners: List[Callable[[PlayerDelta], None]], wake_event: threading.Event,
+                 messaging_manager=None):
+        """
+        Initialize the ServerMonitor.
+
+        Args:
+            server_id (str): Server identifier in the registry.
+            registry (ServerRegistry): Resolves the server's endpoint on each connect attempt.
+            player_db (PlayerDatabase): The server's player database.
+            poll_scheduler (AdaptivePollScheduler): The server's poll interval state.
+            listeners (List[Callable[[PlayerDelta], None]]): Shared player change listeners.
+            wake_event (threading.Event): Set to make the dispatcher look at due monitors now.
+            messaging_manager (MessagingManager, optional): Given the connection once connected.
+        """
+        self.server_id = server_id
+        self.registry = registry
+        self.player_db = player_db
+        self.poll_scheduler = poll_scheduler
+        self.listeners = listeners
+        self.wake_event = wake_event
+        self.messaging_manager = messaging_manager
+
+        self.is_connected = False
+        self.connection_handler = None
+        self.last_connection_attempt = None
+        self.connect_latency = LatencyHistogram()  # Successful connect+auth durations
+        self.metrics = get_metrics_store()  # players.online / rcon.latency_ms / entities.* history
+        self._entity_refresh_lock = threading.Lock()  # one 'gents' refresh at a time
+
+        # Player tracking: last plys result, diffed each cycle so only changes are written
+        self.player_snapshot = PlayerSnapshot()
+        self.monitor_cycles = 0
+
+        self.next_due = 0.0  # time.monotonic() of the next cycle; 0 means now
+        self.active = True
+        self.reconnect_requested = False
+
+        # Reconnects are gated by the breaker so a server that is down costs no connect() calls
+        self.circuit = CircuitBreaker(server_id, base_delay=self.RECONNECT_DELAY,
+                                      max_delay=self.MAX_RECONNECT_DELAY)
+
+    @property
+    def reconnect_attempts(self) -> int:
+        """Consecutive failed connection attempts or polls."""
+        return self.circuit.consecutive_failures
+
+    def is_due(self, now: float) -> bool:
+        """True if the next cycle should run at monotonic time `now`."""
+        return self.active and now >= self.next_due
+
+    def run_cycle(self):
+        """
+        Run one monitor cycle: (re)connect if needed, then poll players.
+
+        Runs on a dispatcher worker thread; never called concurrently for the same server.
+        """
+        try:
+            if self.reconnect_requested:
+                self.reconnect_requested = False
+                self.disconnect()
+
+            if not self.is_connected or not self.connection_handler:
+                if not self.circuit.allow_request():
+                    self.next_due = time.monotonic() + self.circuit.retry_in()
+                    return
+                logger.info(f"🔌 [{self.server_id}] Not connected - attempting connection...")
+                self._attempt_connection()
+            # The plys poll below is the round trip; a silent server fails it
+            elif not self.connection_handler.is_connection_alive(max_idle=None):
+                logger.warning(f"🔌 [{self.server_id}] Connection is dead - reconnecting...")
+                self.is_connected = False
+                self._attempt_connection()
+
+            if self.is_connected and self.connection_handler and self.active:
+                self._monitor_players()
+
+        except Exception as e:
+            logger.error(f"Exception in monitor cycle for '{self.server_id}': {e}", exc_info=True)
+            if self.active:
+                self._handle_connection_error(str(e))
+
+        # Errors have already pushed next_due out by the backoff delay
+        if self.is_connected:
+            self.next_due = time.monotonic() + self.poll_scheduler.interval
+
+    def note_admin_activity(self, reason: str = 'admin activity'):
+        """
+        Poll at the fast rate for a while and run the next cycle now.
+
+        Args:
+            reason (str, optional): Short description shown in /status.
+        """
+        self.poll_scheduler.note_admin_activity(reason)
+        if self.is_connected:
+            self.next_due = 0.0
+            self.wake_event.set()
+
+    def request_reconnect(self):
+        """
+        Reconnect at the start of the next cycle (e.g. after the server's settings changed)
+        and run that cycle now, skipping any backoff.
+        """
+        self.reconnect_requested = True
+        self.circuit.reset()
+        self.next_due = 0.0
+        self.wake_event.set()
+
+    def stop(self):
+        """Stop scheduling cycles and close the connection."""
+        self.active = False
+        self.disconnect()
+
+    def disconnect(self):
+        """
+        Disconnect from the server.
+
+        Closes the current connection handler and updates connection state.
+        """
+        if self.connection_handler:
+            try:
+                self.connection_handler.disconnect()
+            except Exception as e:
+                logger.error(f"Error during disconnect from '{self.server_id}': {e}", exc_info=True)
+
+        self.is_connected = False
+        self.connection_handler = None
+        logger.info(f"🔌 [{self.server_id}] Disconnected from server")
+
+    def refresh_entities(self, source: str = 'manual') -> Dict:
+        """
+        Run 'gents' on this server, sync the entities table and take an entity snapshot.
+
+        Used by the Refresh Entity Data button, scheduled entity snapshots and automatic
+        POI regeneration; a refresh asked for while another is running fails fast.
+
+        Args:
+            source (str, optional): What asked for it ('manual', 'scheduled', 'poi').
+
+        Returns:
+            dict: 'success', 'last_refresh', 'stats' (GentsParser summary), 'changes' (added,
+            changed, removed), 'updated_count' and 'snapshot', or 'message' on failure.
+        """
+        if (not self.is_connected or not self.connection_handler
+                or not self.connection_handler.is_connection_alive(max_idle=None)):
+            return {'success': False, 'message': 'Not connected to Empyrion server'}
+        if not self._entity_refresh_lock.acquire(blocking=False):
+            return {'success': False, 'message': 'An entity refresh is already running'}
+        try:
+            response = self.connection_handler.send_command('gents')
+            if not response:
+                logger.error(f"[{self.server_id}] No response from 'gents' command")
+                return {'success': False, 'message': 'No response from gents command'}
+            if isinstance(response, dict) and not response.get('success', True):
+                error_msg = response.get('message', 'Failed to execute gents command')
+                logger.error(f"[{self.server_id}] Failed to get entity list: {error_msg}")
+                return {'success': False, 'message': f'Failed to get entity list: {error_msg}'}
+
+            # Entities go from the parser straight into the database, one record at a time
+            parser = GentsParser()
+            saved = self.player_db.save_entities(parser.parse(response if isinstance(response, str) else str(response)))
+            if not saved['success']:
+                return {'success': False, 'message': 'Failed to save entities to database'}
+            stats = parser.summary()
+
+            # Entity history for capacity planning (/api/metrics/range)
+            self.metrics.record(self.server_id, 'entities.total', stats['total'])
+            self.metrics.record(self.server_id, 'entities.structures_and_ships',
+                                sum(count for entity_type, count in stats['by_type'].items()
+                                    if entity_type in STRUCTURE_TYPES or entity_type in SHIP_TYPES))
+            snapshot = self.player_db.save_entity_snapshot(source)
+
+            return {
+                'success': True,
+                'last_refresh': datetime.now().isoformat(),
+                'stats': stats,
+                'changes': {key: saved[key] for key in ('added', 'changed', 'removed')},
+                'updated_count': stats['total'],
+                'snapshot': {key: value for key, value in snapshot.items() if key != 'success'}
+            }
+        finally:
+            self._entity_refresh_lock.release()
+
+    def get_status(self) -> Dict:
+        """
+        Get connection and polling status for this server.
+
+        Returns:
+            dict: Connection state, queue/auth/liveness details and poll schedule.
+        """
+        handler = self.connection_handler
+        queue = getattr(handler, 'command_queue', None) if handler else None
+        retry_in = max(0.0, self.next_due - time.monotonic()) if not self.is_connected else 0.0
+        circuit = self.circuit.get_status()
+
+        return {
+            'server_id': self.server_id,
+            'is_connected': self.is_connected,
+            'last_attempt': self.last_connection_attempt,
+            'reconnect_attempts': self.reconnect_attempts,
+            'retry_in': round(retry_in, 1),
+            'circuit': circuit,
+            'tracked_players': len(self.player_snapshot),
+            'command_queue': queue.get_stats() if queue else None,
+            'auth_method': getattr(handler, 'auth_method', None) if handler else None,
+            'liveness': handler.get_liveness_stats() if handler else None,
+            'connect_latency': self.connect_latency.snapshot(),
+            'poll_schedule': self.poll_scheduler.get_status()
+        }
+
+    def _attempt_connection(self) -> bool:
+        """
+        Attempt to connect to the server.
+
+        Handles reconnection logic and updates connection state.
+        """
+        if not self.active:
+            return False
+
+        try:
+            self.last_connection_attempt = datetime.now().isoformat()
+
+            # Resolved on every attempt so changed settings apply on the next reconnect
+            endpoint = self.registry.get_endpoint(self.server_id)
+            if not endpoint:
+                logger.error(f"❌ [{self.server_id}] No host, port or RCON password configured")
+                self._handle_connection_error('not configured')
+                return False
+            server_host, server_port, rcon_password = endpoint
+
+            logger.info(f"🔌 [{self.server_id}] Attempting connection to {server_host}:{server_port}")
+
+            # Clean up any existing connection
+            if self.connection_handler:
+                try:
+                    self.connection_handler.disconnect()
+                except Exception:
+                    pass
+
+            # Import here to avoid circular imports
+            from connection import EmpyrionConnection
+
+            self.connection_handler = EmpyrionConnection(
+                host=server_host,
+                port=server_port,
+                password=rcon_password,
+                timeout=10,
+                settings_store=self.registry.player_db
+            )
+
+            connect_started = time.monotonic()
+            connection_result = self.connection_handler.connect()
+
+            if connection_result is True:
+                self.connect_latency.record(time.monotonic() - connect_started)
+                self.is_connected = True
+                self.circuit.record_success()
+                # Nobody was seen while disconnected: sessions still open end at the last heartbeat
+                # (players still online get a new one on the first sync) instead of spanning the outage
+                self._close_open_sessions()
+                # The database may have drifted while disconnected; start with a full sync
+                self.player_snapshot.reset()
+                self.monitor_cycles = 0
+                self.poll_scheduler.reset('reconnected')
+
+                # Single I/O thread owns the socket from here on; monitor, web routes
+                # and messaging all go through its queue
+                self.connection_handler.start_command_queue()
+
+                if self.messaging_manager:
+                    self.messaging_manager.set_connection_handler(self.connection_handler)
+
+                logger.info(f"✅ [{self.server_id}] Connected to Empyrion server at {server_host}:{server_port}")
+                return True
+
+            logger.error(f"❌ [{self.server_id}] Failed to connect to Empyrion server: {connection_result}")
+            self._handle_connection_error(f"connect failed: {connection_result}")
+            return False
+
+        except Exception as e:
+            logger.error(f"❌ [{self.server_id}] Connection attempt failed: {e}", exc_info=True)
+            self._handle_connection_error(f"connect error: {e}")
+            return False
+
+    def _handle_connection_error(self, reason: str = ''):
+        """
+        Handle connection errors.
+
+        Drops the connection and reports the failure to the circuit breaker, which decides
+        when the next attempt may happen (jittered exponential backoff once it opens).
+
+        Args:
+            reason (str, optional): What failed, shown in /status.
+        """
+        was_connected = self.is_connected
+        self.is_connected = False
+        delay = self.circuit.record_failure(reason) or self.RECONNECT_DELAY
+        self.next_due = time.monotonic() + delay
+
+        logger.warning(f"⚠️ [{self.server_id}] Connection lost. Attempt #{self.reconnect_attempts}. "
+                       f"Retrying in {delay:.1f} seconds...")
+
+        if self.connection_handler:
+            try:
+                self.connection_handler.disconnect()
+            except Exception:
+                pass
+        self.connection_handler = None
+        if was_connected:
+            self._close_open_sessions()
+
+    def _close_open_sessions(self):
+        """End open player sessions at the last heartbeat, the last time the online list was confirmed."""
+        if self.player_db:
+            self.player_db.reconcile_sessions()
+
+    def _monitor_players(self):
+        """
+        Monitor players.
+
+        Retrieves current player list, writes what changed and notifies listeners.
+        """
+        try:
+            plys_started = time.monotonic()
+            current_players = self.connection_handler.get_players()
+            plys_seconds = time.monotonic() - plys_started
+
+            if current_players is None or (isinstance(current_players, dict)
+                                           and not current_players.get('success', True)):
+                logger.warning(f"⚠️ [{self.server_id}] Failed to get player list from server")
+                if self.active:
+                    self._handle_connection_error('plys failed')
+                return
+
+            logger.debug(f"📊 [{self.server_id}] Retrieved {len(current_players)} players from server")
+
+            first_cycle = self.player_snapshot.is_empty
+            full_sync = first_cycle or self.monitor_cycles % self.FULL_SYNC_EVERY == 0
+            self.monitor_cycles += 1
+            delta = self.player_snapshot.diff(current_players)
+            delta.server_id = self.server_id
+
+            # Update database: everything on a full sync, otherwise only what changed
+            if self.player_db and self.active:
+                if full_sync:
+                    updated_count = self.player_db.update_multiple_players(current_players)
+                    logger.debug(f"💾 [{self.server_id}] Full sync: updated {updated_count} players in database")
+                elif delta:
+                    updated_count = self.player_db.apply_player_changes(delta.changed_players(), delta.left_steam_ids())
+                    logger.debug(f"💾 [{self.server_id}] Updated {updated_count} changed players in database")
+                # Lets the next start close sessions at the last moment we knew who was online
+                self.player_db.record_session_heartbeat()
+
+            if delta and self.active:
+                self._log_status_changes(delta)
+                self._notify_player_listeners(delta)
+
+            # The first cycle after connecting sees everyone as new; that isn't churn
+            online_count = sum(1 for p in current_players if p.get('status') == 'Online')
+            self.metrics.record(self.server_id, 'players.online', online_count)
+            self.metrics.record(self.server_id, 'rcon.latency_ms', round(plys_seconds * 1000, 1))
+            if first_cycle:
+                self.poll_scheduler.record_cycle(online_count)
+            else:
+                self.poll_scheduler.record_cycle(online_count, joins=len(delta.joined), leaves=len(delta.left),
+                                                 changes=len(delta.moved) + len(delta.changed))
+
+        except Exception as e:
+            logger.error(f"❌ [{self.server_id}] Error monitoring players: {e}", exc_info=True)
+            if self.active:
+                self._handle_connection_error(f"plys error: {e}")
+
+    def _log_status_changes(self, delta: PlayerDelta):
+        """
+        Log joins, leaves and moves from a monitor cycle.
+
+        Welcome/goodbye messages are handled by PlayerStatusMod, so nothing is sent here.
+
+        Args:
+            delta (PlayerDelta): Changes detected this cycle.
+        """
+        for player in delta.joined:
+            logger.info(f"👋 [{self.server_id}] Player joined: {player.get('name')} (message handled by PlayerStatusMod)")
+        for player in delta.left:
+            logger.info(f"👋 [{self.server_id}] Player left: {player.get('name')} (message handled by PlayerStatusMod)")
+        for player in delta.moved:
+            logger.debug(f"🚀 [{self.server_id}] Player moved: {player.get('name')} -> {player.get('playfield')}")
+
+    def _notify_player_listeners(self, delta: PlayerDelta):
+        """
+        Pass a delta to every registered listener, isolating listener errors.
+
+        Args:
+            delta (PlayerDelta): Changes detected this cycle.
+        """
+        for callback in list(self.listeners):
+            try:
+                callback(delta)
+            except Exception as e:
+                logger.error(f"Error in player change listener: {e}", exc_info=True)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Server registry for Empyrion Web Helper
+
+Knows which Empyrion servers are monitored, how to reach them and where each
+one's player data lives. The original single server is the 'default' server: it
+keeps using server_host/server_port, the 'rcon' credential and instance/players.db.
+Additional servers are stored in the monitored_servers table, with their RCON
+password in credentials as 'rcon:<server_id>' and their own player database
+under instance/servers/<server_id>/.
+"""
+
+import os
+import re
+import threading
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from database import PlayerDatabase
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SERVER_ID = 'default'
+SERVER_DATA_DIR = os.path.join('instance', 'servers')
+SERVER_ID_RE = re.compile(r'^[a-z0-9][a-z0-9_-]{0,31}$')
+
+
+class ServerRegistry:
+    """
+    Registry of monitored servers and their per-server player databases.
+    """
+
+    def __init__(self, player_db, config_manager):
+        """
+        Initialize the ServerRegistry.
+
+        Args:
+            player_db (PlayerDatabase): Main database (settings, credentials, default server's players).
+            config_manager (ConfigManager): The configuration manager instance.
+        """
+        self.player_db = player_db
+        self.config_manager = config_manager
+        self._databases = {DEFAULT_SERVER_ID: player_db}
+        self._lock = threading.Lock()
+
+    def _default_server(self) -> Dict:
+        host = self.player_db.get_app_setting('server_host') or self.config_manager.get('host')
+        port = self.player_db.get_app_setting('server_port') or self.config_manager.get('telnet_port')
+        return {
+            'server_id': DEFAULT_SERVER_ID,
+            'name': self.player_db.get_app_setting('server_name') or 'Default server',
+            'host': host,
+            'port': int(port) if port else None,
+            'enabled': True
+        }
+
+    def list_servers(self) -> List[Dict]:
+        """
+        List all servers, the default server first.
+
+        Returns:
+            List[Dict]: server_id, name, host, port and enabled for each server.
+        """
+        return [self._default_server()] + self.player_db.get_monitored_servers()
+
+    def get_server(self, server_id: str) -> Optional[Dict]:
+        """
+        Look up one server.
+
+        Args:
+            server_id (str): Server identifier.
+
+        Returns:
+            Optional[Dict]: Server definition, or None if unknown.
+        """
+        for server in self.list_servers():
+            if server['server_id'] == server_id:
+                return server
+        return None
+
+    def get_endpoint(self, server_id: str) -> Optional[Tuple[str, int, str]]:
+        """
+        Resolve where and how to connect to a server. Read on every connect attempt so
+        changed settings apply on the next reconnect.
+
+        Args:
+            server_id (str): Server identifier.
+
+        Returns:
+            Optional[Tuple[str, int, str]]: (host, port, password), or None if incomplete.
+        """
+        server = self.get_server(server_id)
+        if not server or not server['host'] or not server['port']:
+            return None
+
+        if server_id == DEFAULT_SERVER_ID:
+            password = self.config_manager.get('telnet_password')
+        else:
+            creds = self.player_db.get_credential(f'rcon:{server_id}')
+            password = creds.get('password') if creds else None
+        if not password:
+            return None
+        return server['host'], int(server['port']), password
+
+    def add_server(self, server_id: str, name: str, host: str, port: int, password: str = '',
+                   enabled: bool = True) -> Dict:
+        """
+        Add or update an additional server.
+
+        Args:
+            server_id (str): Short identifier (lowercase letters, digits, '-' and '_').
+            name (str): Display name.
+            host (str): Server hostname or IP address.
+            port (int): RCON/telnet port.
+            password (str, optional): RCON password; leave empty to keep the stored one.
+            enabled (bool, optional): Whether the server is monitored. Defaults to True.
+
+        Returns:
+            dict: {'success': bool, 'message': str}
+        """
+        if server_id == DEFAULT_SERVER_ID or not SERVER_ID_RE.match(server_id or ''):
+            return {'success': False, 'message': 'Invalid server id'}
+        try:
+            port = int(port)
+        except (TypeError, ValueError):
+            return {'success': False, 'message': 'Invalid port number'}
+        if not host:
+            return {'success': False, 'message': 'Host is required'}
+        if not password and not self.player_db.get_credential(f'rcon:{server_id}'):
+            return {'success': False, 'message': 'RCON password is required'}
+
+        if password:
+            self.player_db.store_credential(f'rcon:{server_id}', password=password, host=host, port=port)
+        if not self.player_db.save_monitored_server(server_id, name or server_id, host, port, enabled):
+            return {'success': False, 'message': 'Could not save server'}
+        logger.info(f"Registered server '{server_id}' at {host}:{port}")
+        return {'success': True, 'message': f"Server '{server_id}' saved"}
+
+    def remove_server(self, server_id: str) -> Dict:
+        """
+        Remove an additional server. Its player database file is kept on disk.
+
+        Args:
+            server_id (str): Server identifier.
+
+        Returns:
+            dict: {'success': bool, 'message': str}
+        """
+        if server_id == DEFAULT_SERVER_ID:
+            return {'success': False, 'message': 'The default server cannot be removed'}
+        if not self.player_db.delete_monitored_server(server_id):
+            return {'success': False, 'message': f"Unknown server '{server_id}'"}
+        self.player_db.delete_credential(f'rcon:{server_id}')
+        with self._lock:
+            db = self._databases.pop(server_id, None)
+        if db:
+            db.geo_resolver.remove_player_pool(db.pool)
+        logger.info(f"Removed server '{server_id}'")
+        return {'success': True, 'message': f"Server '{server_id}' removed"}
+
+    def open_databases(self) -> List[Tuple[str, PlayerDatabase]]:
+        """
+        Get the player databases opened so far.
+
+        Returns:
+            List[Tuple[str, PlayerDatabase]]: (server_id, database) pairs, default server first.
+        """
+        with self._lock:
+            return list(self._databases.items())
+
+    def get_player_db(self, server_id: str) -> Optional[PlayerDatabase]:
+        """
+        Get the player database partition for a server, opening it on first use.
+
+        Args:
+            server_id (str): Server identifier.
+
+        Returns:
+            Optional[PlayerDatabase]: The server's database, or None if the server is unknown.
+        """
+        with self._lock:
+            db = self._databases.get(server_id)
+        if db:
+            return db
+        if not SERVER_ID_RE.match(server_id or '') or not self.get_server(server_id):
+            return None
+
+        # Opened under the lock so two racing requests cannot each build one. Admin settings
+        # and geolocation (worker, cache, IP range file) come from the default database.
+        with self._lock:
+            db = self._databases.get(server_id)
+            if not db:
+                db = PlayerDatabase(os.path.join(SERVER_DATA_DIR, server_id, 'players.db'),
+                                    settings_db=self.player_db, geo_resolver=self.player_db.geo_resolver)
+                self._databases[server_id] = db
+            return db
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Player session tracking for Empyrion Web Helper
+
+Turns the players table's Online/Offline transitions into player_sessions
+rows and rolls every closed session up into three aggregate tables:
+
+- playtime_totals: per player (all-time leaderboard)
+- playtime_daily: per day and player (daily leaderboards, unique players)
+- concurrency_hourly: player-seconds, sessions started and peak online per
+  hour (concurrency over time; average online = player_seconds / 3600)
+
+sync_sessions() runs inside the writers' transactions after the players rows
+are written: one INSERT opens a session for every online player without one
+(a partial unique index allows only one open session per player) and the
+sessions of players who are no longer online are closed and rolled up in the
+same batch. Readers never scan player_sessions; only the few open sessions
+are added on top of the rollups.
+
+After a crash or a lost server connection the sessions that were open are
+closed at the last heartbeat, the last time the monitor confirmed who was
+online (see reconcile_open_sessions).
+"""
+
+import logging
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_KEY = 'session_heartbeat'
+HEARTBEAT_INTERVAL = 60  # seconds between heartbeat writes
+
+
+def _parse(timestamp: str) -> datetime:
+    return datetime.fromisoformat(timestamp)
+
+
+def split_by_hour(start: str, end: str) -> Iterable[Tuple[str, int]]:
+    """
+    Split a session into the hours it covers.
+
+    Args:
+        start (str): ISO session start.
+        end (str): ISO session end.
+
+    Yields:
+        Tuple[str, int]: (hour key 'YYYY-MM-DDTHH', seconds within that hour).
+    """
+    current, finish = _parse(start), _parse(end)
+    while current < finish:
+        next_hour = current.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        piece_end = min(next_hour, finish)
+        seconds = int((piece_end - current).total_seconds())
+        if seconds > 0:
+            yield current.strftime('%Y-%m-%dT%H'), seconds
+        current = piece_end
+
+
+def open_sessions(cursor, current_time: str) -> int:
+    """Open a session for every online player that has none. Returns the number opened."""
+    cursor.execute("""
+        INSERT OR IGNORE INTO player_sessions (steam_id, session_start, ip_address, playfield)
+        SELECT p.steam_id, ?, p.ip_address, p.playfield FROM players p
+        WHERE p.status = 'Online'
+        AND NOT EXISTS (SELECT 1 FROM player_sessions s WHERE s.steam_id = p.steam_id AND s.session_end IS NULL)
+    """, (current_time,))
+    opened = cursor.rowcount
+    if opened > 0:
+        cursor.execute("""
+            INSERT INTO concurrency_hourly (hour, sessions_started) VALUES (?, ?)
+            ON CONFLICT(hour) DO UPDATE SET sessions_started = sessions_started + excluded.sessions_started
+        """, (current_time[:13], opened))
+    return max(opened, 0)
+
+
+def close_sessions(cursor, sessions: List[Tuple[int, str, str]], end_time: str) -> int:
+    """
+    Close sessions and add them to the rollups.
+
+    Args:
+        cursor: Cursor inside the caller's transaction.
+        sessions (List[Tuple[int, str, str]]): (id, steam_id, session_start) of open sessions.
+        end_time (str): ISO time the sessions ended.
+
+    Returns:
+        int: Number of sessions closed.
+    """
+    if not sessions:
+        return 0
+
+    totals = {}
+    daily = defaultdict(lambda: [0, 0])    # (day, steam_id) -> [sessions, seconds]
+    hourly = defaultdict(int)              # hour -> player seconds
+    for _, steam_id, start in sessions:
+        end = max(start, end_time)
+        duration = 0
+        for hour, seconds in split_by_hour(start, end):
+            hourly[hour] += seconds
+            daily[(hour[:10], steam_id)][1] += seconds
+            duration += seconds
+        daily[(start[:10], steam_id)][0] += 1
+        count, total, longest = totals.get(steam_id, (0, 0, 0))
+        totals[steam_id] = (count + 1, total + duration, max(longest, duration))
+
+    cursor.executemany("UPDATE player_sessions SET session_end = ? WHERE id = ?",
+                       [(max(start, end_time), session_id) for session_id, _, start in sessions])
+    cursor.executemany("""
+        INSERT INTO playtime_totals (steam_id, sessions, seconds, longest_seconds, last_session_end)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(steam_id) DO UPDATE SET
+            sessions = sessions + excluded.sessions, seconds = seconds + excluded.seconds,
+            longest_seconds = MAX(longest_seconds, excluded.longest_seconds),
+            last_session_end = excluded.last_session_end
+    """, [(steam_id, count, total, longest, end_time) for steam_id, (count, total, longest) in totals.items()])
+    cursor.executemany("""
+        INSERT INTO playtime_daily (day, steam_id, sessions, seconds) VALUES (?, ?, ?, ?)
+        ON CONFLICT(day, steam_id) DO UPDATE SET
+            sessions = sessions + excluded.sessions, seconds = seconds + excluded.seconds
+    """, [(day, steam_id, count, seconds) for (day, steam_id), (count, seconds) in daily.items()])
+    cursor.executemany("""
+        INSERT INTO concurrency_hourly (hour, player_seconds) VALUES (?, ?)
+        ON CONFLICT(hour) DO UPDATE SET player_seconds = player_seconds + excluded.player_seconds
+    """, list(hourly.items()))
+    return len(sessions)
+
+
+def record_peak(cursor, current_time: str) -> int:
+    """Raise the current hour's peak to the number of open sessions. Returns that number."""
+    online = cursor.execute("SELECT COUNT(*) FROM player_sessions WHERE session_end IS NULL").fetchone()[0]
+    cursor.execute("""
+        INSERT INTO concurrency_hourly (hour, peak_online) VALUES (?, ?)
+        ON CONFLICT(hour) DO UPDATE SET peak_online = MAX(peak_online, excluded.peak_online)
+    """, (current_time[:13], online))
+    return online
+
+
+def sync_sessions(cursor, current_time: str) -> Tuple[int, int]:
+    """
+    Bring player_sessions in line with players.status (call after writing players).
+
+    Args:
+        cursor: Cursor inside the caller's transaction.
+        current_time (str): ISO time of the write.
+
+    Returns:
+        Tuple[int, int]: (sessions opened, sessions closed).
+    """
+    ended = cursor.execute("""
+        SELECT s.id, s.steam_id, s.session_start FROM player_sessions s
+        LEFT JOIN players p ON p.steam_id = s.steam_id
+        WHERE s.session_end IS NULL AND (p.status IS NULL OR p.status != 'Online')
+    """).fetchall()
+    if ended:
+        # They were online up to now, so they count towards this hour's peak
+        record_peak(cursor, current_time)
+    closed = close_sessions(cursor, ended, current_time)
+    opened = open_sessions(cursor, current_time)
+    if opened:
+        record_peak(cursor, current_time)
+    return opened, closed
+
+
+def write_heartbeat(cursor, current_time: str):
+    """Remember that the monitor saw the current online list at current_time."""
+    cursor.execute("""
+        INSERT INTO app_settings (key, value, updated_at) VALUES (?, ?, ?)
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+    """, (HEARTBEAT_KEY, current_time, current_time))
+    record_peak(cursor, current_time)
+
+
+def reconcile_open_sessions(cursor, current_time: str) -> int:
+    """
+    Close open sessions at the last heartbeat.
+
+    Used on startup (sessions a previous run left open) and when the monitor loses
+    or regains the server connection. Nobody can be known to be online between the
+    last heartbeat and the monitor's next cycle, so every open session ends at the
+    heartbeat (or at its own start if there is none); players still online get a new
+    session on the next cycle.
+
+    Args:
+        cursor: Cursor inside the caller's transaction.
+        current_time (str): ISO time now, the upper bound for the end time.
+
+    Returns:
+        int: Number of sessions closed.
+    """
+    stale = cursor.execute(
+        "SELECT id, steam_id, session_start FROM player_sessions WHERE session_end IS NULL").fetchall()
+    if not stale:
+        return 0
+    row = cursor.execute("SELECT value FROM app_settings WHERE key = ?", (HEARTBEAT_KEY,)).fetchone()
+    heartbeat = min(row[0], current_time) if row else None
+
+    by_end = defaultdict(list)
+    for session in stale:
+        by_end[heartbeat or session[2]].append(session)
+    for end_time, sessions in by_end.items():
+        close_sessions(cursor, sessions, end_time)
+    logger.info(f"Closed {len(stale)} open session(s) at the last heartbeat ({heartbeat or 'their start'})")
+    return len(stale)
+
+
+def open_session_seconds(cursor, current_time: str) -> Dict[str, Tuple[str, int]]:
+    """
+    Get the sessions in progress.
+
+    Returns:
+        Dict[str, Tuple[str, int]]: steam_id -> (session_start, seconds so far).
+    """
+    now = _parse(current_time)
+    return {steam_id: (start, max(0, int((now - _parse(start)).total_seconds())))
+            for steam_id, start in cursor.execute(
+                "SELECT steam_id, session_start FROM player_sessions WHERE session_end IS NULL")}
+
+
+def leaderboard(cursor, current_time: str, limit: int, day: Optional[str] = None) -> List[Dict]:
+    """
+    Rank players by playtime from the rollups plus the sessions in progress.
+
+    Args:
+        cursor: Open cursor.
+        current_time (str): ISO time now.
+        limit (int): Number of players to return.
+        day (str, optional): 'YYYY-MM-DD' for a single day, None for all time.
+
+    Returns:
+        List[Dict]: steam_id, name, status, seconds and sessions, most playtime first.
+    """
+    live = open_session_seconds(cursor, current_time)
+    if day:
+        live_seconds = {}
+        day_start = datetime.strptime(day, '%Y-%m-%d')
+        day_end = min(day_start + timedelta(days=1), _parse(current_time))
+        for steam_id, (start, _) in live.items():
+            seconds = int((day_end - max(day_start, _parse(start))).total_seconds())
+            if seconds > 0:
+                live_seconds[steam_id] = seconds
+        source, where, params = "playtime_daily t", "t.day = ?", [day]
+    else:
+        live_seconds = {steam_id: seconds for steam_id, (_, seconds) in live.items()}
+        source, where, params = "playtime_totals t", "1 = 1", []
+
+    # Only the top rows and the players online now can be in the result
+    columns = "t.steam_id, p.name, p.status, t.seconds, t.sessions"
+    rows = cursor.execute(
+        f"SELECT {columns} FROM {source} JOIN players p ON p.steam_id = t.steam_id "
+        f"WHERE {where} ORDER BY t.seconds DESC LIMIT ?", params + [limit]).fetchall()
+    found = {row[0] for row in rows}
+    missing = [steam_id for steam_id in live_seconds if steam_id not in found]
+    for start in range(0, len(missing), 500):
+        chunk = missing[start:start + 500]
+        rows += cursor.execute(
+            f"SELECT {columns} FROM {source} JOIN players p ON p.steam_id = t.steam_id "
+            f"WHERE {where} AND t.steam_id IN ({','.join('?' * len(chunk))})", params + chunk).fetchall()
+        found.update(row[0] for row in rows)
+        new_players = [s for s in chunk if s not in found]
+        if new_players:
+            # First session still running: no rollup row yet
+            rows += [(steam_id, name, status, 0, 0) for steam_id, name, status in cursor.execute(
+                f"SELECT steam_id, name, status FROM players WHERE steam_id IN ({','.join('?' * len(new_players))})",
+                new_players)]
+
+    board = [{'steam_id': steam_id, 'name': name, 'status': status,
+              'seconds': seconds + live_seconds.get(steam_id, 0),
+              'sessions': sessions + (1 if steam_id in live_seconds else 0)}
+             for steam_id, name, status, seconds, sessions in rows]
+    board.sort(key=lambda entry: entry['seconds'], reverse=True)
+    return board[:limit]
+
+
+def concurrency(cursor, current_time: str, start: str, end: str, bucket: str = 'hour') -> List[Dict]:
+    """
+    Online players over time from concurrency_hourly plus the sessions in progress.
+
+    Args:
+        cursor: Open cursor.
+        current_time (str): ISO time now.
+        start (str): First hour/day to include (ISO prefix; a date alone starts at its first hour).
+        end (str): Last hour/day to include (ISO prefix; a date alone ends with its last hour).
+        bucket (str, optional): 'hour' or 'day'.
+
+    Returns:
+        List[Dict]: period, avg_online, peak_online, player_hours, sessions_started; oldest first.
+    """
+    width, key_format, step = (13, '%Y-%m-%dT%H', timedelta(hours=1)) if bucket == 'hour' \
+        else (10, '%Y-%m-%d', timedelta(days=1))
+    start, end = start[:width], end[:width]
+    if bucket == 'hour':
+        # A date on its own covers that whole day
+        start = start if len(start) == width else start[:10] + 'T00'
+        end = end if len(end) == width else end[:10] + 'T23'
+    buckets = defaultdict(lambda: [0, 0, 0])  # period -> [player_seconds, peak_online, sessions_started]
+    for hour, player_seconds, peak_online, sessions_started in cursor.execute(
+            "SELECT hour, player_seconds, peak_online, sessions_started FROM concurrency_hourly "
+            "WHERE hour >= ? AND hour <= ? ORDER BY hour", (start, end + 'T99')):
+        entry = buckets[hour[:width]]
+        entry[0] += player_seconds
+        entry[1] = max(entry[1], peak_online)
+        entry[2] += sessions_started
+
+    # Sessions in progress, per period: those that started before it count in full,
+    # those that started inside it from their start (sorted starts + prefix sums)
+    now = _parse(current_time)
+    starts = sorted(_parse(session_start) for session_start, _ in open_session_seconds(cursor, current_time).values())
+    if starts:
+        origin = starts[0]
+        offsets = [(moment - origin).total_seconds() for moment in starts]
+        prefix = [0.0]
+        for offset in offsets:
+            prefix.append(prefix[-1] + offset)
+        period = max(datetime.strptime(start, key_format), datetime.strptime(origin.strftime(key_format), key_format))
+        last = min(datetime.strptime(end, key_format), now)
+        while period <= last:
+            low = (period - origin).total_seconds()
+            high = (min(period + step, now) - origin).total_seconds()
+            covering = bisect_right(offsets, low)
+            started = bisect_left(offsets, high)
+            seconds = covering * (high - low) + (started - covering) * high - (prefix[started] - prefix[covering])
+            if started:
+                entry = buckets[period.strftime(key_format)]
+                entry[0] += int(seconds)
+                entry[1] = max(entry[1], started)
+            period += step
+
+    period_seconds = step.total_seconds()
+    return [{'period': period, 'avg_online': round(player_seconds / period_seconds, 2),
+             'peak_online': peak_online, 'player_hours': round(player_seconds / 3600, 2),
+             'sessions_started': sessions_started}
+            for period, (player_seconds, peak_online, sessions_started) in sorted(buckets.items())]
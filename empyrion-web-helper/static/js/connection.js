@@ -42,6 +42,24 @@ window.ConnectionManager = {
             this.updateConnectionStatus(data.connected);
         });
 
+        socket.on('players_changed', (data) => {
+            // Background monitor saw joins/leaves/moves; reload the visible player list
+            // (the page shows the default server; other servers' changes are ignored here)
+            const isShownServer = !data.server_id || data.server_id === 'default';
+            if (window.PlayersManager && isShownServer && data.total_changed > 0) {
+                debugLog(`Players changed: ${data.joined.length} joined, ${data.left.length} left`);
+                window.PlayersManager.loadPlayersFromDatabase();
+            }
+        });
+
+        socket.on('players_updated', (data) => {
+            // Stored player data changed outside a monitor cycle (e.g. countries were geolocated)
+            if (window.PlayersManager) {
+                debugLog(`Players updated: ${data.reason}`);
+                window.PlayersManager.loadPlayersFromDatabase();
+            }
+        });
+
         socket.on('message_history_update', (data) => {
             if (data.history && window.MessagingManager) {
                 window.MessagingManager.messageHistoryData = data.history;
@@ -9,7 +9,6 @@
 window.EntitiesManager = {
     allEntities: [],
     filteredEntities: [],
-    rawGentsData: '',
     lastRefresh: null,
     filterElements: {},
     
@@ -93,18 +92,13 @@ window.EntitiesManager = {
             debugLog('Server refresh response:', data);
 
             if (data.success) {
-                this.rawGentsData = data.raw_data || '';
-                this.allEntities = data.entities || [];
-                this.filteredEntities = [...this.allEntities];
-                this.lastRefresh = data.last_refresh;
-                this.currentPage = 1;
-                this.updatePagination();
-                this.updateEntitiesTable();
-                this.updateEntityStats(data.stats);
-                this.updateLastRefreshDisplay();
+                // The refresh only returns a summary; the entities themselves come from the database
+                await this.loadEntitiesFromDatabase();
                 
                 const updatedCount = data.updated_count || this.allEntities.length;
-                showToast(`Refreshed ${updatedCount} entities from server`, 'success');
+                const changes = data.changes || {};
+                const churn = changes.added !== undefined ? ` (${changes.added} new, ${changes.removed} gone)` : '';
+                showToast(`Refreshed ${updatedCount} entities from server${churn}`, 'success');
             } else {
                 showToast(data.message || 'Failed to refresh entities from server', 'error');
             }
@@ -310,26 +304,15 @@ window.EntitiesManager = {
     },
 
     exportEntitiesData() {
-        if (!this.rawGentsData) {
-            showToast('No raw entity data available. Refresh from server first.', 'error');
+        if (this.allEntities.length === 0) {
+            showToast('No entity data available. Refresh from server first.', 'error');
             return;
         }
 
         try {
-            // Create downloadable file
-            const blob = new Blob([this.rawGentsData], { type: 'text/plain' });
-            const url = window.URL.createObjectURL(blob);
-            
-            // Create download link
-            const a = document.createElement('a');
-            a.href = url;
-            a.download = `empyrion_entities_${new Date().toISOString().slice(0, 19).replace(/:/g, '-')}.txt`;
-            document.body.appendChild(a);
-            a.click();
-            document.body.removeChild(a);
-            window.URL.revokeObjectURL(url);
-            
-            showToast('Entity data exported successfully', 'success');
+            // The server streams the stored entities back in the 'gents' layout
+            window.open('/entities/export', '_blank');
+            showToast('Entity data export started', 'info');
         } catch (error) {
             console.error('Error exporting entity data:', error);
             showToast('Error exporting entity data: ' + error, 'error');
@@ -347,7 +330,6 @@ window.EntitiesManager = {
             if (data.success) {
                 this.allEntities = [];
                 this.filteredEntities = [];
-                this.rawGentsData = '';
                 this.lastRefresh = null;
                 this.currentPage = 1;
                 this.updatePagination();
@@ -9,6 +9,12 @@
 window.PlayersManager = {
     allPlayers: [],
     filterElements: {},
+    pageSize: 100,          // rows fetched per page while scrolling
+    maxReloadSize: 500,     // a background reload keeps up to this many already loaded rows
+    nextCursor: null,
+    pageLoading: false,
+    loadSeq: 0,             // bumped per reload so late responses of older requests are dropped
+    pageObserver: null,
 
     init() {
         // Get filter elements - now includes country filter
@@ -30,19 +36,41 @@ window.PlayersManager = {
             }
         }
 
+        // Load the next page when the end of the table scrolls into view
+        if ('IntersectionObserver' in window) {
+            this.pageObserver = new IntersectionObserver((entries) => {
+                if (entries.some(entry => entry.isIntersecting)) {
+                    this.loadNextPage();
+                }
+            }, { rootMargin: '300px' });
+        }
+
         debugLog('Players manager initialized - database-only mode');
     },
 
+    fetchPage(cursor, limit) {
+        const params = new URLSearchParams(this.getFilterParams());
+        params.set('limit', limit);
+        if (cursor) {
+            params.set('cursor', cursor);
+        }
+        return apiCall('/players/page?' + params.toString());
+    },
 
-    async loadPlayersFromDatabase() {
+    async loadPlayersFromDatabase(limit = null) {
         debugLog('loadPlayersFromDatabase() called');
+        const seq = ++this.loadSeq;
+        // Refreshes keep the rows already scrolled into view instead of collapsing to one page
+        const pageSize = limit || Math.min(Math.max(this.pageSize, this.allPlayers.length), this.maxReloadSize);
         
         try {
-            const data = await apiCall('/players/all?' + this.getFilterParams());
+            const data = await this.fetchPage(null, pageSize);
             debugLog('Database load response:', data);
+            if (seq !== this.loadSeq) return false; // superseded by a newer load
             
             if (data.success) {
                 this.allPlayers = data.players;
+                this.nextCursor = data.next_cursor;
                 this.updatePlayersTable();
                 this.updatePlayerStats(data.stats);
                 return true; // Success
@@ -58,6 +86,29 @@ window.PlayersManager = {
         }
     },
 
+    async loadNextPage() {
+        if (!this.nextCursor || this.pageLoading) return;
+        this.pageLoading = true;
+        const seq = this.loadSeq;
+        
+        try {
+            const data = await this.fetchPage(this.nextCursor, this.pageSize);
+            if (seq !== this.loadSeq) return; // list was reloaded meanwhile
+            
+            if (data.success) {
+                this.allPlayers = this.allPlayers.concat(data.players);
+                this.nextCursor = data.next_cursor;
+                this.appendPlayerRows(data.players);
+            } else {
+                debugLog('Player page load failed:', data.message);
+            }
+        } catch (error) {
+            debugLog('Player page load error:', error);
+        } finally {
+            this.pageLoading = false;
+        }
+    },
+
     getFilterParams() {
         const params = new URLSearchParams();
         for (const [key, element] of Object.entries(this.filterElements)) {
@@ -69,19 +120,11 @@ window.PlayersManager = {
     },
 
     async applyFilters() {
-        // Filters always work on database data
+        // Filters always work on database data; start again from the first page
         showLoading(true);
         
         try {
-            const data = await apiCall('/players/all?' + this.getFilterParams());
-            
-            if (data.success) {
-                this.allPlayers = data.players;
-                this.updatePlayersTable();
-                this.updatePlayerStats(data.stats);
-            } else {
-                showToast('Failed to apply filters', 'error');
-            }
+            await this.loadPlayersFromDatabase(this.pageSize);
         } catch (error) {
             showToast('Error applying filters: ' + error, 'error');
         } finally {
@@ -113,46 +156,78 @@ window.PlayersManager = {
             return;
         }
 
-        let html = '';
-        this.allPlayers.forEach(player => {
-            const lastSeen = formatLastSeen(player.last_seen, player.status);
-            const ipDisplay = player.ip_address || '';
-            const countryDisplay = this.formatCountry(player.country);
-            const playfieldDisplay = player.playfield || '';
-            const factionDisplay = player.faction || '';
-            
-            // Generate action buttons based on player status
-            let actionButtons = '';
-            if (player.status === 'Online') {
-                // Online players: can kick and ban
-                actionButtons = `
-                    <button class="action-btn kick" data-tooltip="Kick Player" onclick="PlayersManager.showKickModal('${escapeHtml(player.name)}', '${player.steam_id}')">🦶</button>
-                    <button class="action-btn ban" data-tooltip="Ban Player (1 day)" onclick="PlayersManager.banPlayer('${player.steam_id}', '${escapeHtml(player.name)}')">🚫</button>
-                `;
-            } else {
-                // Offline players: can ban and unban
-                actionButtons = `
-                    <button class="action-btn ban" data-tooltip="Ban Player (1 day)" onclick="PlayersManager.banPlayer('${player.steam_id}', '${escapeHtml(player.name)}')">🚫</button>
-                    <button class="action-btn unban" data-tooltip="Unban Player" onclick="PlayersManager.unbanPlayer('${player.steam_id}', '${escapeHtml(player.name)}')">✅</button>
-                `;
-            }
-            
-            html += `
-                <tr>
-                    <td class="player-steam-id">${escapeHtml(player.steam_id)}</td>
-                    <td class="player-name">${escapeHtml(player.name)}</td>
-                    <td><span class="player-status ${player.status.toLowerCase()}">${player.status}</span></td>
-                    <td class="player-faction">${escapeHtml(factionDisplay)}</td>
-                    <td class="player-ip">${escapeHtml(ipDisplay)}</td>
-                    <td class="player-country">${countryDisplay}</td>
-                    <td class="player-playfield">${escapeHtml(playfieldDisplay)}</td>
-                    <td class="player-last-seen">${lastSeen}</td>
-                    <td class="player-actions">${actionButtons}</td>
-                </tr>
+        playersTableBody.innerHTML = this.allPlayers.map(player => this.renderPlayerRow(player)).join('') +
+            this.renderPageSentinel();
+        this.observePageSentinel();
+    },
+
+    appendPlayerRows(players) {
+        const playersTableBody = document.getElementById('playersTableBody');
+        if (!playersTableBody) return;
+
+        const sentinel = document.getElementById('playersPageSentinel');
+        if (sentinel) sentinel.remove();
+        playersTableBody.insertAdjacentHTML('beforeend',
+            players.map(player => this.renderPlayerRow(player)).join('') + this.renderPageSentinel());
+        this.observePageSentinel();
+    },
+
+    renderPageSentinel() {
+        if (!this.nextCursor) return '';
+        return `
+            <tr id="playersPageSentinel">
+                <td colspan="9" class="empty-state">
+                    <button onclick="PlayersManager.loadNextPage()">Load more players</button>
+                </td>
+            </tr>
+        `;
+    },
+
+    observePageSentinel() {
+        if (!this.pageObserver) return;
+        // Re-observing reports the current visibility, so a sentinel that is still
+        // on screen after appending a page triggers the next one
+        this.pageObserver.disconnect();
+        const sentinel = document.getElementById('playersPageSentinel');
+        if (sentinel) this.pageObserver.observe(sentinel);
+    },
+
+    renderPlayerRow(player) {
+        const lastSeen = formatLastSeen(player.last_seen, player.status);
+        const ipDisplay = player.ip_address || '';
+        const countryDisplay = this.formatCountry(player.country);
+        const playfieldDisplay = player.playfield || '';
+        const factionDisplay = player.faction || '';
+        
+        // Generate action buttons based on player status
+        let actionButtons = '';
+        if (player.status === 'Online') {
+            // Online players: can kick and ban
+            actionButtons = `
+                <button class="action-btn kick" data-tooltip="Kick Player" onclick="PlayersManager.showKickModal('${escapeHtml(player.name)}', '${player.steam_id}')">🦶</button>
+                <button class="action-btn ban" data-tooltip="Ban Player (1 day)" onclick="PlayersManager.banPlayer('${player.steam_id}', '${escapeHtml(player.name)}')">🚫</button>
             `;
-        });
+        } else {
+            // Offline players: can ban and unban
+            actionButtons = `
+                <button class="action-btn ban" data-tooltip="Ban Player (1 day)" onclick="PlayersManager.banPlayer('${player.steam_id}', '${escapeHtml(player.name)}')">🚫</button>
+                <button class="action-btn unban" data-tooltip="Unban Player" onclick="PlayersManager.unbanPlayer('${player.steam_id}', '${escapeHtml(player.name)}')">✅</button>
+            `;
+        }
         
-        playersTableBody.innerHTML = html;
+        return `
+            <tr>
+                <td class="player-steam-id">${escapeHtml(player.steam_id)}</td>
+                <td class="player-name">${escapeHtml(player.name)}</td>
+                <td><span class="player-status ${player.status.toLowerCase()}">${player.status}</span></td>
+                <td class="player-faction">${escapeHtml(factionDisplay)}</td>
+                <td class="player-ip">${escapeHtml(ipDisplay)}</td>
+                <td class="player-country">${countryDisplay}</td>
+                <td class="player-playfield">${escapeHtml(playfieldDisplay)}</td>
+                <td class="player-last-seen">${lastSeen}</td>
+                <td class="player-actions">${actionButtons}</td>
+            </tr>
+        `;
     },
 
     formatCountry(country) {
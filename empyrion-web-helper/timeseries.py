@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Time-series metrics for Empyrion Web Helper
+
+Keeps history for capacity planning: online players and RCON round trip per
+monitor cycle, entity counts per refresh. Samples live in their own database
+(instance/metrics.db) so player database backups stay small.
+
+Storage is fixed-width rows in WITHOUT ROWID tables keyed by (series, time):
+
+- metric_raw: every sample, kept for RAW_RETENTION
+- metric_rollup: count/sum/min/max per 1 minute, 1 hour and 1 day bucket,
+  each tier with its own retention (days are kept for good)
+
+Samples are buffered in memory and written every FLUSH_INTERVAL seconds in one
+transaction, which also folds them into all three rollup tiers, so no
+separate downsampling pass is needed. Expired rows are pruned at most once an
+hour. Reads pick the finest tier that still covers the range and keeps the
+result under MAX_POINTS.
+"""
+
+import os
+import threading
+import time
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from db_pool import get_pool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_METRICS_DB = 'instance/metrics.db'
+FLUSH_INTERVAL = 30          # seconds samples wait in memory before being written
+PRUNE_INTERVAL = 3600        # seconds between retention passes
+MAX_POINTS = 1500            # most points returned per series by range()
+
+RAW_RETENTION = 2 * 86400
+# (tier name, bucket width in seconds, retention in seconds or None to keep forever)
+TIERS = (
+    ('1m', 60, 14 * 86400),
+    ('1h', 3600, 400 * 86400),
+    ('1d', 86400, None),
+)
+TIER_NAMES = ('raw',) + tuple(name for name, _, _ in TIERS)
+
+# Series recorded by the helper, per server (value units in the name)
+KNOWN_SERIES = ('players.online', 'rcon.latency_ms', 'entities.total', 'entities.structures_and_ships')
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS metric_series (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)",
+    """CREATE TABLE IF NOT EXISTS metric_raw (
+        series_id INTEGER NOT NULL,
+        ts INTEGER NOT NULL,
+        value REAL NOT NULL,
+        PRIMARY KEY (series_id, ts)
+    ) WITHOUT ROWID""",
+    """CREATE TABLE IF NOT EXISTS metric_rollup (
+        series_id INTEGER NOT NULL,
+        width INTEGER NOT NULL,
+        ts INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        total REAL NOT NULL,
+        min REAL NOT NULL,
+        max REAL NOT NULL,
+        PRIMARY KEY (series_id, width, ts)
+    ) WITHOUT ROWID""",
+]
+
+_stores: Dict[str, 'MetricsStore'] = {}
+_stores_lock = threading.Lock()
+
+
+class MetricsStore:
+    """
+    Buffered writer and range reader for one metrics database.
+
+    Series are named '<server_id>/<metric>', e.g. 'default/players.online'.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_METRICS_DB):
+        """
+        Initialize the MetricsStore.
+
+        Args:
+            db_path (str, optional): SQLite file for the samples.
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.pool = get_pool(db_path)
+        self._lock = threading.Lock()
+        self._buffer: List[Tuple[str, int, float]] = []
+        self._series_ids: Dict[str, int] = {}
+        self._last_flush = time.monotonic()
+        self._last_prune = 0.0
+        with self.pool.connection() as conn:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0 and \
+                    not conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone():
+                # New file: lets pruning hand pages back to the filesystem (needs a VACUUM to apply)
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            self._series_ids.update(conn.execute("SELECT name, id FROM metric_series"))
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def record(self, server_id: str, metric: str, value: float, timestamp: Optional[float] = None):
+        """
+        Add one sample; written with the next flush.
+
+        Args:
+            server_id (str): Server the sample belongs to.
+            metric (str): Metric name, e.g. 'players.online'.
+            value (float): Sample value.
+            timestamp (float, optional): Unix time of the sample; now if omitted.
+        """
+        if value is None:
+            return
+        with self._lock:
+            self._buffer.append((f"{server_id}/{metric}", int(timestamp if timestamp is not None else time.time()),
+                                 float(value)))
+            due = time.monotonic() - self._last_flush >= FLUSH_INTERVAL
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Write buffered samples and fold them into the rollup tiers in one transaction.
+
+        Returns:
+            int: Number of samples written.
+        """
+        with self._lock:
+            samples, self._buffer = self._buffer, []
+            self._last_flush = time.monotonic()
+        if not samples:
+            return 0
+
+        try:
+            with self.pool.connection() as conn:
+                rows = [(self._series_id(conn, name), ts, value) for name, ts, value in samples]
+                conn.executemany("INSERT OR REPLACE INTO metric_raw (series_id, ts, value) VALUES (?, ?, ?)", rows)
+
+                # Pre-aggregate per bucket so each rollup row is written once per flush
+                buckets = defaultdict(lambda: [0, 0.0, None, None])
+                for series_id, ts, value in rows:
+                    for _, width, _ in TIERS:
+                        bucket = buckets[(series_id, width, ts - ts % width)]
+                        bucket[0] += 1
+                        bucket[1] += value
+                        bucket[2] = value if bucket[2] is None else min(bucket[2], value)
+                        bucket[3] = value if bucket[3] is None else max(bucket[3], value)
+                conn.executemany("""
+                    INSERT INTO metric_rollup (series_id, width, ts, count, total, min, max)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(series_id, width, ts) DO UPDATE SET
+                        count = count + excluded.count, total = total + excluded.total,
+                        min = MIN(min, excluded.min), max = MAX(max, excluded.max)
+                """, [key + tuple(bucket) for key, bucket in buckets.items()])
+
+                if time.monotonic() - self._last_prune >= PRUNE_INTERVAL:
+                    self._prune(conn)
+        except Exception as e:
+            logger.error(f"Error writing {len(samples)} metric samples: {e}", exc_info=True)
+            return 0
+        return len(samples)
+
+    def _series_id(self, conn, name: str) -> int:
+        series_id = self._series_ids.get(name)
+        if series_id is None:
+            conn.execute("INSERT OR IGNORE INTO metric_series (name) VALUES (?)", (name,))
+            series_id = conn.execute("SELECT id FROM metric_series WHERE name = ?", (name,)).fetchone()[0]
+            self._series_ids[name] = series_id
+        return series_id
+
+    def _prune(self, conn):
+        """Delete rows past their tier's retention, one primary key range per series."""
+        self._last_prune = time.monotonic()
+        now = int(time.time())
+        series_ids = [(series_id,) for series_id in self._series_ids.values()]
+        before = conn.total_changes
+        conn.executemany("DELETE FROM metric_raw WHERE series_id = ? AND ts < ?",
+                         [(series_id, now - RAW_RETENTION) for (series_id,) in series_ids])
+        for _, width, retention in TIERS:
+            if retention:
+                conn.executemany("DELETE FROM metric_rollup WHERE series_id = ? AND width = ? AND ts < ?",
+                                 [(series_id, width, now - retention) for (series_id,) in series_ids])
+        pruned = conn.total_changes - before
+        if pruned:
+            # executescript runs the pragma to completion (execute() would free a single page);
+            # it commits first, which is fine as the prune is the last step of a flush
+            conn.executescript("PRAGMA incremental_vacuum")
+            logger.info(f"📉 Pruned {pruned} expired metric rows")
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def choose_tier(self, start: int, end: int, now: Optional[int] = None) -> str:
+        """
+        Pick the finest tier that still holds `start` and keeps the range under MAX_POINTS.
+
+        Args:
+            start (int): Range start, Unix time.
+            end (int): Range end, Unix time.
+            now (int, optional): Current Unix time.
+
+        Returns:
+            str: 'raw', '1m', '1h' or '1d'.
+        """
+        now = int(now if now is not None else time.time())
+        # Raw samples arrive every few seconds; treat them like a 5 s tier for the point budget
+        if start >= now - RAW_RETENTION and (end - start) / 5 <= MAX_POINTS:
+            return 'raw'
+        for name, width, retention in TIERS:
+            if (retention is None or start >= now - retention) and (end - start) / width <= MAX_POINTS:
+                return name
+        return TIERS[-1][0]
+
+    def range(self, server_id: str, metrics: List[str], start: int, end: int,
+              tier: Optional[str] = None) -> Dict:
+        """
+        Read samples for one server.
+
+        Args:
+            server_id (str): Server the series belong to.
+            metrics (List[str]): Metric names.
+            start (int): Range start, Unix time (inclusive).
+            end (int): Range end, Unix time (inclusive).
+            tier (str, optional): Force a tier; picked with choose_tier() if omitted.
+
+        Returns:
+            dict: 'tier' and 'series' mapping each metric to [ts, avg, min, max, count] points.
+        """
+        self.flush()  # make the newest samples visible
+        tier = tier if tier in TIER_NAMES else self.choose_tier(start, end)
+        width = dict((name, width) for name, width, _ in TIERS).get(tier)
+        series = {}
+        with self.pool.connection() as conn:
+            for metric in metrics:
+                series_id = self._series_ids.get(f"{server_id}/{metric}")
+                if series_id is None:
+                    series[metric] = []
+                elif width is None:
+                    series[metric] = [[ts, value, value, value, 1] for ts, value in conn.execute(
+                        "SELECT ts, value FROM metric_raw WHERE series_id = ? AND ts BETWEEN ? AND ? ORDER BY ts",
+                        (series_id, start, end))]
+                else:
+                    series[metric] = [[ts, round(total / count, 3), low, high, count]
+                                      for ts, count, total, low, high in conn.execute(
+                        "SELECT ts, count, total, min, max FROM metric_rollup "
+                        "WHERE series_id = ? AND width = ? AND ts BETWEEN ? AND ? ORDER BY ts",
+                        (series_id, width, start - start % width, end))]
+        return {'tier': tier, 'series': series}
+
+    def list_series(self, server_id: str) -> List[str]:
+        """Get the metric names recorded for a server."""
+        prefix = f"{server_id}/"
+        return sorted(name[len(prefix):] for name in list(self._series_ids) if name.startswith(prefix))
+
+    def get_status(self) -> Dict:
+        """
+        Get storage figures for the status page.
+
+        Returns:
+            dict: Buffered samples, row counts per table and the database file size.
+        """
+        with self._lock:
+            buffered = len(self._buffer)
+        with self.pool.connection() as conn:
+            raw_rows = conn.execute("SELECT COUNT(*) FROM metric_raw").fetchone()[0]
+            rollup_rows = conn.execute("SELECT COUNT(*) FROM metric_rollup").fetchone()[0]
+        size = sum(os.path.getsize(path) for path in (self.db_path, self.db_path + '-wal') if os.path.exists(path))
+        return {'series': len(self._series_ids), 'buffered': buffered, 'raw_rows': raw_rows,
+                'rollup_rows': rollup_rows, 'file_bytes': size}
+
+
+def get_metrics_store(db_path: str = DEFAULT_METRICS_DB) -> MetricsStore:
+    """
+    Get the shared store for a metrics database, creating it on first use.
+
+    Args:
+        db_path (str, optional): SQLite file for the samples.
+
+    Returns:
+        MetricsStore: One store per absolute path.
+    """
+    key = os.path.abspath(db_path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = MetricsStore(db_path)
+        return store
+
+
+def flush_all_stores():
+    """Write every store's buffered samples (used on shutdown)."""
+    with _stores_lock:
+        stores = list(_stores.values())
+    for store in stores:
+        store.flush()